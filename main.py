@@ -41,6 +41,34 @@ app.config['MAX_CONTENT_LENGTH'] = 20 * 1024 * 1024  # 20MB máximo para uploads
 # Configurar CORS para APIs
 CORS(app)
 
+# Registro central de engines: sesiones con alcance de request
+from modulos.backend.menu.database.managers.db_manager import init_app as init_db_manager
+init_db_manager(app)
+
+# Tablas de los modelos (create_all) y migraciones versionadas: cada worker las intenta,
+# BEGIN IMMEDIATE las serializa
+if os.environ.get('MIGRAR_AL_INICIO', '1') == '1':
+    try:
+        from modulos.backend.menu.database.migrations import ejecutar_migraciones
+        ejecutar_migraciones()
+    except Exception as e:
+        print(f"❌ Error aplicando migraciones: {e}")
+
+# Bus de eventos entre workers: cada uno lee lo que publican los demás
+try:
+    from modulos.backend.menu.database.managers.bus_eventos import bus_eventos
+    bus_eventos.iniciar()
+except Exception as e:
+    print(f"❌ Error iniciando bus de eventos: {e}")
+
+# Cierre de sesiones vencidas: un hilo por worker, solo el que tiene el turno barre
+if os.environ.get('BARRIDO_SESIONES', '1') == '1':
+    try:
+        from modulos.backend.chatbot.expiracion_sesiones import barrido_sesiones
+        barrido_sesiones.iniciar()
+    except Exception as e:
+        print(f"❌ Error iniciando barrido de sesiones: {e}")
+
 # Importar y registrar blueprints principales uno por uno
 blueprints_cargados = 0
 
@@ -7,8 +7,7 @@ Endpoints para el panel de administración del chatbot.
 """
 
 from flask import Blueprint, render_template, jsonify, request
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, func, desc
+from sqlalchemy import func, desc
 from datetime import datetime, timedelta
 import json
 import os
@@ -16,6 +15,14 @@ import os
 # Importar modelos - ELIMINADO: TemaPersonalizacion, PropiedadTema para simplificar sistema
 from .models import Sesion, Calificacion, Comentario, NotificacionMesero, Analytics, FondoPersonalizado
 from .services import verificar_estado_backend
+from .analytics_rollups import consolidar, sesiones_por_dia, calificaciones_por_dia, notificaciones_por_tipo
+from .analytics_sink import sumidero_analytics
+from .latidos_sesion import latidos_sesion
+from .expiracion_sesiones import barrido_sesiones, estado_tarea
+from .notificaciones_stream import canal_notificaciones, responder_stream
+from .despachador_notificaciones import despachador_notificaciones
+from .idempotencia import idempotencia
+from modulos.backend.menu.database.managers.db_manager import get_session, get_engine, CHATBOT_DB_PATH
 
 # Blueprint para el dashboard administrativo
 chatbot_admin_bp = Blueprint('chatbot_admin', __name__, 
@@ -24,15 +31,8 @@ chatbot_admin_bp = Blueprint('chatbot_admin', __name__,
                            url_prefix='/admin/chatbot')
 
 def get_db_session():
-    """Obtener sesión de base de datos"""
-    db_path = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)), 
-        'menu', 
-        'menu.db'
-    )
-    engine = create_engine(f'sqlite:///{db_path}')
-    Session = sessionmaker(bind=engine)
-    return Session()
+    """Obtener sesión de base de datos (engine compartido, sesión del request)"""
+    return get_session(CHATBOT_DB_PATH)
 
 # ==================== RUTAS DEL DASHBOARD ====================
 
@@ -183,37 +183,10 @@ def api_resumen_dashboard():
 def api_notificaciones_tiempo_real():
     """
     API para obtener notificaciones en tiempo real
+    (consulta puntual; los paneles abiertos usan /api/notificaciones/stream)
     """
     try:
-        db = get_db_session()
-        
-        # Obtener notificaciones pendientes con datos de sesión
-        notificaciones = db.query(NotificacionMesero, Sesion).join(
-            Sesion, NotificacionMesero.sesion_id == Sesion.id
-        ).filter(
-            NotificacionMesero.atendida == False
-        ).order_by(
-            desc(NotificacionMesero.prioridad),
-            NotificacionMesero.fecha_notificacion
-        ).all()
-        
-        resultado = []
-        for notificacion, sesion in notificaciones:
-            tiempo_espera = datetime.utcnow() - notificacion.fecha_notificacion
-            
-            resultado.append({
-                'id': notificacion.id,
-                'mesa': sesion.mesa,
-                'cliente': sesion.nombre_cliente or 'Anónimo',
-                'tipo': notificacion.tipo_notificacion,
-                'mensaje': notificacion.mensaje,
-                'prioridad': notificacion.prioridad,
-                'fecha': notificacion.fecha_notificacion.isoformat(),
-                'tiempo_espera_minutos': int(tiempo_espera.total_seconds() / 60),
-                'es_urgente': notificacion.prioridad in ['alta', 'urgente']
-            })
-        
-        db.close()
+        resultado = despachador_notificaciones.listar()
         
         return jsonify({
             'success': True,
@@ -228,6 +201,18 @@ def api_notificaciones_tiempo_real():
             'error': str(e)
         }), 500
 
+@chatbot_admin_bp.route('/api/notificaciones/stream')
+def api_notificaciones_stream():
+    """
+    Server-Sent Events de notificaciones al mesero (ver notificaciones_stream.py)
+    
+    Eventos: 'pendientes' (instantánea al conectar), 'nueva', 'atendida',
+    'actualizada', 'eliminada'. Reanuda con la cabecera Last-Event-ID
+    (o ?ultimo_id= para clientes que no la envían).
+    """
+    ultimo_id = request.headers.get('Last-Event-ID') or request.args.get('ultimo_id')
+    return responder_stream(canal_notificaciones, ultimo_id, despachador_notificaciones.listar)
+
 @chatbot_admin_bp.route('/api/notificacion/<int:notificacion_id>/atender', methods=['POST'])
 def api_atender_notificacion(notificacion_id):
     """
@@ -313,43 +298,20 @@ def api_comentarios_sin_moderar():
 @chatbot_admin_bp.route('/api/analytics/graficos')
 def api_analytics_graficos():
     """
-    Datos para gráficos de analytics
+    Datos para gráficos de analytics (desde los rollups por hora y día)
     """
     try:
         dias = request.args.get('dias', 30, type=int)
         fecha_inicio = datetime.utcnow() - timedelta(days=dias)
         
+        # Consolidar lo pendiente (periodo abierto) y leer los rollups
+        consolidar()
         db = get_db_session()
+        conexion = db.connection()
         
-        # Actividad por día
-        actividad_diaria = db.query(
-            func.date(Sesion.fecha_inicio).label('fecha'),
-            func.count(Sesion.id).label('sesiones')
-        ).filter(
-            Sesion.fecha_inicio >= fecha_inicio
-        ).group_by(
-            func.date(Sesion.fecha_inicio)
-        ).order_by('fecha').all()
-        
-        # Calificaciones por día
-        calificaciones_diarias = db.query(
-            func.date(Calificacion.fecha_calificacion).label('fecha'),
-            func.avg(Calificacion.estrellas).label('promedio')
-        ).filter(
-            Calificacion.fecha_calificacion >= fecha_inicio
-        ).group_by(
-            func.date(Calificacion.fecha_calificacion)
-        ).order_by('fecha').all()
-        
-        # Tipos de notificaciones
-        tipos_notificaciones = db.query(
-            NotificacionMesero.tipo_notificacion,
-            func.count(NotificacionMesero.id).label('cantidad')
-        ).filter(
-            NotificacionMesero.fecha_notificacion >= fecha_inicio
-        ).group_by(
-            NotificacionMesero.tipo_notificacion
-        ).all()
+        actividad_diaria = sesiones_por_dia(conexion, fecha_inicio)
+        calificaciones_diarias = calificaciones_por_dia(conexion, fecha_inicio)
+        tipos_notificaciones = notificaciones_por_tipo(conexion, fecha_inicio)
         
         db.close()
         
@@ -379,6 +341,115 @@ def api_analytics_graficos():
             'error': str(e)
         }), 500
 
+@chatbot_admin_bp.route('/api/analytics/sumidero')
+def api_analytics_sumidero():
+    """
+    Estado del escritor asíncrono de analytics: encolados, escritos, descartados
+    por cola llena, lotes, errores y eventos pendientes
+    """
+    return jsonify({
+        'success': True,
+        'sumidero': sumidero_analytics.info(),
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+@chatbot_admin_bp.route('/api/sesiones/latidos')
+def api_sesiones_latidos():
+    """
+    Estado del volcado diferido de latidos de sesión: latidos recibidos, volcados,
+    filas escritas, errores y sesiones pendientes de volcar
+    """
+    return jsonify({
+        'success': True,
+        'latidos': latidos_sesion.info(),
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+@chatbot_admin_bp.route('/api/notificaciones/asignar', methods=['POST'])
+def api_asignar_notificacion():
+    """
+    Asigna al mesero la llamada pendiente más prioritaria que nadie tenga asignada
+    
+    POST /admin/chatbot/api/notificaciones/asignar
+    Body: {"mesero": "Carlos"}
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        mesero = (data.get('mesero') or '').strip()
+        if not mesero:
+            return jsonify({
+                'success': False,
+                'error': 'Se requiere mesero'
+            }), 400
+        
+        notificacion = despachador_notificaciones.asignar(mesero[:100])
+        return jsonify({
+            'success': True,
+            'notificacion': notificacion,
+            'mensaje': f"Mesa {notificacion['mesa']} asignada a {mesero}" if notificacion else 'No hay llamadas sin asignar',
+            'timestamp': datetime.utcnow().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@chatbot_admin_bp.route('/api/notificaciones/despacho')
+def api_notificaciones_despacho():
+    """Cola del despachador: pendientes por prioridad efectiva y tiempo hasta la atención (p50/p95)"""
+    try:
+        return jsonify({
+            'success': True,
+            'despacho': despachador_notificaciones.info(),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@chatbot_admin_bp.route('/api/idempotencia')
+def api_idempotencia():
+    """Repeticiones absorbidas por Idempotency-Key y por la ventana de llamadas (este worker)"""
+    return jsonify({
+        'success': True,
+        'idempotencia': idempotencia.info(),
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+@chatbot_admin_bp.route('/api/notificaciones/stream/estado')
+def api_notificaciones_stream_estado():
+    """Conexiones SSE de este worker y eventos publicados"""
+    return jsonify({
+        'success': True,
+        'stream': canal_notificaciones.info(),
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+@chatbot_admin_bp.route('/api/sesiones/barrido')
+def api_sesiones_barrido():
+    """
+    Cierre automático de sesiones vencidas: última pasada y acumulado (de la tabla
+    chatbot_tareas, sea cual sea el worker que barrió) y contadores de este proceso
+    """
+    try:
+        with get_engine(CHATBOT_DB_PATH).connect() as conexion:
+            tarea = estado_tarea(conexion)
+        return jsonify({
+            'success': True,
+            'tarea': tarea,
+            'proceso': barrido_sesiones.info(),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 
 # ==================== GESTIÓN DE TEMAS - ELIMINADO ====================
 # Sistema simplificado solo fondos personalizados
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ingesta por Lotes de Analytics del Cliente
+==========================================
+El front del chatbot acumula sus eventos (vistas, navegación, visibilidad) en un
+buffer y los envía juntos a POST /api/chatbot/analytics/lote. Cada evento trae:
+
+- id: generado en el navegador; con el índice único de id_cliente (migración 0011)
+  un lote reenviado tras un timeout no duplica filas
+- evento: uno de EVENTOS_CLIENTE
+- t: momento del evento en el cliente (epoch en milisegundos o ISO 8601)
+- valor_numerico, valor_texto y metadatos opcionales
+
+Todo el lote se valida antes de escribir: los eventos inválidos se devuelven con su
+posición y motivo, y los válidos se insertan con un solo executemany en la
+transacción del request.
+"""
+
+import json
+import math
+from datetime import datetime, timedelta, timezone
+
+from .analytics_sink import FORMATO_FECHA
+
+MAXIMO_EVENTOS_LOTE = 500
+EVENTOS_CLIENTE = ('vista', 'navegacion', 'interaccion', 'visibilidad', 'tema')
+LARGO_MAXIMO_ID = 64
+LARGO_MAXIMO_TEXTO = 500
+LARGO_MAXIMO_METADATOS = 2000
+
+# Ventana aceptada para el reloj del cliente: eventos viejos guardados en un buffer
+# de una pestaña dormida, y un pequeño adelanto de relojes desajustados
+ANTIGUEDAD_MAXIMA = timedelta(days=1)
+ADELANTO_MAXIMO = timedelta(minutes=5)
+
+COLUMNAS = ('fecha', 'mesa', 'evento', 'valor_numerico', 'valor_texto', 'metadatos', 'id_cliente')
+SQL_INSERTAR = (
+    f"INSERT INTO chatbot_analytics ({', '.join(COLUMNAS)}) "
+    f"VALUES ({', '.join('?' for _ in COLUMNAS)}) "
+    f"ON CONFLICT DO NOTHING"
+)
+
+
+def fecha_cliente(valor, ahora):
+    """
+    Convierte la marca de tiempo del cliente a UTC sin zona.
+    Lanza ValueError si no se entiende o cae fuera de la ventana aceptada;
+    un adelanto dentro de ADELANTO_MAXIMO se recorta a 'ahora'.
+    """
+    if isinstance(valor, bool) or valor is None:
+        raise ValueError('t requerido (epoch en ms o ISO 8601)')
+    if isinstance(valor, (int, float)):
+        try:
+            fecha = datetime.utcfromtimestamp(valor / 1000)
+        except (OverflowError, OSError, ValueError):
+            raise ValueError('t inválido') from None
+    elif isinstance(valor, str):
+        try:
+            fecha = datetime.fromisoformat(valor.replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError('t inválido') from None
+        if fecha.tzinfo is not None:
+            fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    else:
+        raise ValueError('t inválido')
+
+    if fecha < ahora - ANTIGUEDAD_MAXIMA:
+        raise ValueError('evento demasiado antiguo')
+    if fecha > ahora + ADELANTO_MAXIMO:
+        raise ValueError('fecha en el futuro')
+    return min(fecha, ahora)
+
+
+def _validar_evento(evento, mesa, ahora):
+    """Fila lista para SQL_INSERTAR o ValueError con el motivo"""
+    if not isinstance(evento, dict):
+        raise ValueError('el evento debe ser un objeto')
+
+    id_cliente = evento.get('id')
+    if not isinstance(id_cliente, str) or not id_cliente or len(id_cliente) > LARGO_MAXIMO_ID:
+        raise ValueError(f'id requerido (texto de hasta {LARGO_MAXIMO_ID} caracteres)')
+
+    nombre = evento.get('evento')
+    if nombre not in EVENTOS_CLIENTE:
+        raise ValueError(f"evento debe ser uno de: {', '.join(EVENTOS_CLIENTE)}")
+
+    valor_numerico = evento.get('valor_numerico')
+    if valor_numerico is not None and (
+            isinstance(valor_numerico, bool) or not isinstance(valor_numerico, (int, float))
+            or not math.isfinite(valor_numerico)):
+        raise ValueError('valor_numerico debe ser un número')
+
+    valor_texto = evento.get('valor_texto')
+    if valor_texto is not None and not isinstance(valor_texto, str):
+        raise ValueError('valor_texto debe ser texto')
+
+    metadatos = evento.get('metadatos')
+    if metadatos is not None:
+        metadatos = json.dumps(metadatos, ensure_ascii=False)
+        if len(metadatos) > LARGO_MAXIMO_METADATOS:
+            raise ValueError(f'metadatos excede {LARGO_MAXIMO_METADATOS} caracteres')
+
+    return (
+        fecha_cliente(evento.get('t'), ahora).strftime(FORMATO_FECHA),
+        mesa, nombre, valor_numerico,
+        valor_texto[:LARGO_MAXIMO_TEXTO] if valor_texto else valor_texto,
+        metadatos, id_cliente
+    )
+
+
+def validar_lote(eventos, mesa, ahora=None):
+    """
+    Valida todos los eventos del lote.
+    Devuelve (filas, rechazados, fecha más reciente aceptada o None);
+    rechazados = [{'indice', 'id', 'error'}]. Un id repetido dentro del lote se
+    rechaza en su segunda aparición.
+    """
+    ahora = ahora or datetime.utcnow()
+    filas, rechazados, vistos = [], [], set()
+    for indice, evento in enumerate(eventos):
+        try:
+            fila = _validar_evento(evento, mesa, ahora)
+            if fila[-1] in vistos:
+                raise ValueError('id repetido en el lote')
+        except ValueError as e:
+            rechazados.append({
+                'indice': indice,
+                'id': evento.get('id') if isinstance(evento, dict) else None,
+                'error': str(e)
+            })
+            continue
+        vistos.add(fila[-1])
+        filas.append(fila)
+
+    ultima = max((fila[0] for fila in filas), default=None)
+    return filas, rechazados, datetime.strptime(ultima, FORMATO_FECHA) if ultima else None
+
+
+def escribir_lote(conexion, filas):
+    """Inserta las filas en la transacción de 'conexion'; devuelve cuántas eran nuevas"""
+    if not filas:
+        return 0
+    return conexion.exec_driver_sql(SQL_INSERTAR, filas).rowcount
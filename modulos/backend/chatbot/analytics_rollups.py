@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rollups de Analytics del Chatbot
+================================
+Consolida las filas crudas de sesiones, calificaciones y notificaciones en tablas
+de agregados por hora y por día (modelos Rollup* en models.py):
+
+- sesiones por mesa
+- suma y cantidad de estrellas por categoría
+- notificaciones por tipo y prioridad
+
+Cada tabla fuente se consolida por id: chatbot_rollup_estado guarda el último id
+plegado y cada pasada suma (UPSERT) solo las filas nuevas. Un evento tardío, con
+fecha de un periodo ya cerrado, se suma igual a su periodo. Los borrados del crudo
+no restan: los rollups conservan la historia aunque se depuren las filas viejas.
+
+Las consultas por rango consolidan primero lo pendiente (solo lee las filas crudas
+con id mayor al último plegado, es decir, el periodo abierto) y luego leen los rollups.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect
+
+from .models import Calificacion
+from modulos.backend.menu.database.managers.db_manager import get_engine, CHATBOT_DB_PATH
+
+TABLA_ESTADO = 'chatbot_rollup_estado'
+
+# Formato strftime del periodo de cada granularidad (igual en SQL y en Python)
+GRANULARIDADES = {
+    'hora': '%Y-%m-%d %H:00',
+    'dia': '%Y-%m-%d',
+}
+
+# fuente -> tabla cruda, columna de fecha, tabla destino, dimensiones y medidas
+# (columna destino, expresión SQL sobre la tabla cruda)
+FUENTES = {
+    'sesiones': {
+        'tabla': 'chatbot_sesiones',
+        'fecha': 'fecha_inicio',
+        'destino': 'chatbot_rollup_sesiones',
+        'dimensiones': (('mesa', 'mesa'),),
+        'medidas': (('sesiones', 'COUNT(*)'),),
+    },
+    'calificaciones': {
+        'tabla': 'chatbot_calificaciones',
+        'fecha': 'fecha_calificacion',
+        'destino': 'chatbot_rollup_calificaciones',
+        'dimensiones': (('categoria', "COALESCE(categoria, 'general')"),),
+        'medidas': (('suma_estrellas', 'SUM(estrellas)'), ('cantidad', 'COUNT(*)')),
+    },
+    'notificaciones': {
+        'tabla': 'chatbot_notificaciones',
+        'fecha': 'fecha_notificacion',
+        'destino': 'chatbot_rollup_notificaciones',
+        'dimensiones': (
+            ('tipo_notificacion', 'tipo_notificacion'),
+            ('prioridad', "COALESCE(prioridad, 'normal')"),
+        ),
+        'medidas': (('cantidad', 'COUNT(*)'),),
+    },
+}
+
+
+def _sql_upsert(fuente, granularidad):
+    """INSERT ... SELECT agrupado por periodo y dimensiones, sumando sobre lo existente"""
+    config = FUENTES[fuente]
+    dimensiones = [columna for columna, _ in config['dimensiones']]
+    medidas = [columna for columna, _ in config['medidas']]
+    expresiones = [expresion for _, expresion in config['dimensiones'] + config['medidas']]
+    agrupacion = ', '.join(str(posicion) for posicion in range(2, len(dimensiones) + 3))
+    return (
+        f"INSERT INTO {config['destino']} (granularidad, periodo, {', '.join(dimensiones + medidas)}) "
+        f"SELECT '{granularidad}', strftime('{GRANULARIDADES[granularidad]}', {config['fecha']}), "
+        f"{', '.join(expresiones)} "
+        f"FROM {config['tabla']} "
+        f"WHERE id > ? AND id <= ? AND {config['fecha']} IS NOT NULL "
+        f"GROUP BY {agrupacion} "
+        f"ON CONFLICT (granularidad, periodo, {', '.join(dimensiones)}) DO UPDATE SET "
+        + ', '.join(f"{medida} = {medida} + excluded.{medida}" for medida in medidas)
+    )
+
+
+def _existen_tablas(conexion):
+    return conexion.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (TABLA_ESTADO,)
+    ).first() is not None
+
+
+def ultimo_id(conexion, fuente):
+    """Último id consolidado de la fuente (0 si nunca se consolidó)"""
+    fila = conexion.exec_driver_sql(
+        f"SELECT ultimo_id FROM {TABLA_ESTADO} WHERE fuente = ?", (fuente,)
+    ).first()
+    return fila[0] if fila else 0
+
+
+def consolidar(conexion=None):
+    """
+    Pliega en los rollups las filas crudas nuevas de cada fuente.
+    Devuelve {fuente: filas crudas consolidadas}.
+
+    Seguro con varios workers: el avance del último id es un UPDATE condicionado al
+    valor leído; si otro proceso ya consolidó ese tramo, esta pasada lo omite.
+    """
+    if conexion is None:
+        with get_engine(CHATBOT_DB_PATH).begin() as conn:
+            return consolidar(conn)
+
+    if not _existen_tablas(conexion):
+        return {}
+
+    consolidadas = {}
+    for fuente, config in FUENTES.items():
+        desde = ultimo_id(conexion, fuente)
+        hasta = conexion.exec_driver_sql(f"SELECT COALESCE(MAX(id), 0) FROM {config['tabla']}").scalar()
+        if hasta <= desde:
+            continue
+
+        conexion.exec_driver_sql(
+            f"INSERT OR IGNORE INTO {TABLA_ESTADO} (fuente, ultimo_id) VALUES (?, 0)", (fuente,)
+        )
+        avance = conexion.exec_driver_sql(
+            f"UPDATE {TABLA_ESTADO} SET ultimo_id = ?, fecha_actualizacion = ? "
+            f"WHERE fuente = ? AND ultimo_id = ?",
+            (hasta, datetime.utcnow().isoformat(sep=' '), fuente, desde)
+        )
+        if avance.rowcount == 0:
+            continue
+
+        for granularidad in GRANULARIDADES:
+            conexion.exec_driver_sql(_sql_upsert(fuente, granularidad), (desde, hasta))
+        consolidadas[fuente] = hasta - desde
+    return consolidadas
+
+
+# ==================== CONSULTAS POR RANGO ====================
+
+def _filtro_rango(desde):
+    """
+    Periodos desde 'desde': horas del primer día (parcial) y días completos después.
+    La precisión en el borde del rango es de una hora.
+    """
+    hora_desde = desde.strftime(GRANULARIDADES['hora'])
+    dia_siguiente = (desde + timedelta(days=1)).strftime(GRANULARIDADES['dia'])
+    return (
+        "((granularidad = 'hora' AND periodo >= ? AND periodo < ?) "
+        "OR (granularidad = 'dia' AND periodo >= ?))",
+        (hora_desde, dia_siguiente, dia_siguiente)
+    )
+
+
+def sesiones_por_dia(conexion, desde):
+    """[(fecha 'YYYY-MM-DD', sesiones)] en orden de fecha"""
+    filtro, parametros = _filtro_rango(desde)
+    return conexion.exec_driver_sql(
+        f"SELECT substr(periodo, 1, 10) AS fecha, SUM(sesiones) FROM chatbot_rollup_sesiones "
+        f"WHERE {filtro} GROUP BY fecha HAVING SUM(sesiones) > 0 ORDER BY fecha", parametros
+    ).fetchall()
+
+
+def calificaciones_por_dia(conexion, desde):
+    """[(fecha 'YYYY-MM-DD', promedio de estrellas)] en orden de fecha"""
+    filtro, parametros = _filtro_rango(desde)
+    return conexion.exec_driver_sql(
+        f"SELECT substr(periodo, 1, 10) AS fecha, SUM(suma_estrellas) * 1.0 / SUM(cantidad) "
+        f"FROM chatbot_rollup_calificaciones WHERE {filtro} "
+        f"GROUP BY fecha HAVING SUM(cantidad) > 0 ORDER BY fecha", parametros
+    ).fetchall()
+
+
+def promedio_calificaciones(conexion, desde):
+    """Promedio de estrellas del rango (None si no hubo calificaciones)"""
+    filtro, parametros = _filtro_rango(desde)
+    suma, cantidad = conexion.exec_driver_sql(
+        f"SELECT SUM(suma_estrellas), SUM(cantidad) FROM chatbot_rollup_calificaciones WHERE {filtro}",
+        parametros
+    ).one()
+    return suma / cantidad if cantidad else None
+
+
+def notificaciones_por_tipo(conexion, desde):
+    """[(tipo_notificacion, cantidad)]"""
+    filtro, parametros = _filtro_rango(desde)
+    return conexion.exec_driver_sql(
+        f"SELECT tipo_notificacion, SUM(cantidad) FROM chatbot_rollup_notificaciones "
+        f"WHERE {filtro} GROUP BY tipo_notificacion HAVING SUM(cantidad) > 0 "
+        f"ORDER BY tipo_notificacion", parametros
+    ).fetchall()
+
+
+def mesas_mas_activas(conexion, desde, limite=5):
+    """[(mesa, sesiones)] de mayor a menor"""
+    filtro, parametros = _filtro_rango(desde)
+    return conexion.exec_driver_sql(
+        f"SELECT mesa, SUM(sesiones) AS total FROM chatbot_rollup_sesiones "
+        f"WHERE {filtro} GROUP BY mesa HAVING total > 0 ORDER BY total DESC, mesa LIMIT ?",
+        (*parametros, limite)
+    ).fetchall()
+
+
+# ==================== CALIFICACIONES MODIFICADAS ====================
+# Una calificación se puede actualizar (nuevas estrellas y fecha). Si ya estaba
+# consolidada, se resta del periodo anterior y se suma al nuevo en el mismo flush.
+
+CLAVE_PREVIA = 'rollup_calificacion_previa'
+COLUMNAS_CALIFICACION = ('estrellas', 'fecha_calificacion', 'categoria')
+
+
+def _valores_previos(conexion, estado):
+    valores, faltantes = {}, []
+    for columna in COLUMNAS_CALIFICACION:
+        historial = estado.attrs[columna].history
+        if historial.deleted:
+            valores[columna] = historial.deleted[0]
+        elif historial.unchanged:
+            valores[columna] = historial.unchanged[0]
+        else:
+            faltantes.append(columna)
+    if faltantes:
+        fila = conexion.exec_driver_sql(
+            f"SELECT {', '.join(faltantes)} FROM chatbot_calificaciones WHERE id = ?", (estado.identity[0],)
+        ).first()
+        valores.update(zip(faltantes, fila) if fila else ((columna, None) for columna in faltantes))
+    return valores
+
+
+def _periodo(fecha, granularidad):
+    if isinstance(fecha, str):
+        fecha = datetime.fromisoformat(fecha)
+    return fecha.strftime(GRANULARIDADES[granularidad])
+
+
+def _sumar_calificacion(conexion, valores, signo):
+    if valores['fecha_calificacion'] is None or valores['estrellas'] is None:
+        return
+    for granularidad in GRANULARIDADES:
+        conexion.exec_driver_sql(
+            "INSERT INTO chatbot_rollup_calificaciones "
+            "(granularidad, periodo, categoria, suma_estrellas, cantidad) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (granularidad, periodo, categoria) DO UPDATE SET "
+            "suma_estrellas = suma_estrellas + excluded.suma_estrellas, cantidad = cantidad + excluded.cantidad",
+            (granularidad, _periodo(valores['fecha_calificacion'], granularidad),
+             valores['categoria'] or 'general', signo * valores['estrellas'], signo)
+        )
+
+
+def _antes_de_modificar(mapper, conexion, calificacion):
+    estado = inspect(calificacion)
+    if not _existen_tablas(conexion) or estado.identity[0] > ultimo_id(conexion, 'calificaciones'):
+        return  # Aún no consolidada: la próxima pasada toma el valor final
+    estado.info[CLAVE_PREVIA] = _valores_previos(conexion, estado)
+
+
+def _al_modificar(mapper, conexion, calificacion):
+    estado = inspect(calificacion)
+    previos = estado.info.pop(CLAVE_PREVIA, None)
+    if previos is None:
+        return
+    actuales = {columna: estado.dict.get(columna, previos[columna]) for columna in COLUMNAS_CALIFICACION}
+    if actuales == previos:
+        return
+    _sumar_calificacion(conexion, previos, -1)
+    _sumar_calificacion(conexion, actuales, +1)
+
+
+event.listen(Calificacion, 'before_update', _antes_de_modificar)
+event.listen(Calificacion, 'after_update', _al_modificar)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sumidero Asíncrono de Analytics del Chatbot
+===========================================
+Los endpoints del cliente (sesión, calificación, comentario, notificación) ya no
+insertan la fila de chatbot_analytics en su propia transacción: la encolan aquí y
+responden en cuanto su fila principal está confirmada.
+
+- Cola acotada en memoria (CAPACIDAD_COLA eventos) drenada por un hilo de fondo.
+- El hilo escribe por lotes con executemany cada INTERVALO_ESCRITURA_MS o en cuanto
+  junta TAMANO_LOTE eventos: una sola transacción (un solo bloqueo de escritura de
+  SQLite) por lote en lugar de una por evento.
+- Contrapresión: con la cola llena, registrar() espera hasta ESPERA_COLA_LLENA_S y
+  si sigue llena descarta el evento y lo cuenta; nunca bloquea una petición más que eso.
+- Un lote que falla al escribirse no se reintenta: sus eventos se cuentan como perdidos.
+- Al apagar el proceso (atexit) se escribe lo pendiente.
+
+La fecha del evento se toma al encolar, así que el retraso de escritura no la altera.
+"""
+
+import os
+import queue
+import atexit
+import threading
+import time
+from datetime import datetime
+
+from modulos.backend.menu.database.managers.db_manager import get_engine, CHATBOT_DB_PATH
+
+CAPACIDAD_COLA = 10000
+TAMANO_LOTE = 200
+INTERVALO_ESCRITURA_MS = 500
+ESPERA_COLA_LLENA_S = 0.05
+TIMEOUT_APAGADO_S = 5
+
+# Mismo formato con que SQLAlchemy guarda DateTime en SQLite
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S.%f'
+
+COLUMNAS = ('fecha', 'mesa', 'evento', 'valor_numerico', 'valor_texto', 'metadatos')
+SQL_INSERTAR = (
+    f"INSERT INTO chatbot_analytics ({', '.join(COLUMNAS)}) "
+    f"VALUES ({', '.join('?' for _ in COLUMNAS)})"
+)
+
+
+class SumideroAnalytics:
+    """Cola acotada + hilo escritor por lotes hacia chatbot_analytics"""
+
+    def __init__(self, db_path=CHATBOT_DB_PATH, capacidad=CAPACIDAD_COLA,
+                 tamano_lote=TAMANO_LOTE, intervalo_ms=INTERVALO_ESCRITURA_MS):
+        self.db_path = db_path
+        self.tamano_lote = tamano_lote
+        self.intervalo_s = intervalo_ms / 1000
+        self._cola = queue.Queue(maxsize=capacidad)
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._pid = None
+        self._detenido = threading.Event()
+        self._contadores = {'encolados': 0, 'escritos': 0, 'descartados': 0, 'perdidos': 0,
+                            'lotes': 0, 'errores': 0}
+        self._ultimo_error = None
+
+    # ==================== PRODUCTOR ====================
+
+    def registrar(self, evento, mesa=None, valor_numerico=None, valor_texto=None, metadatos=None, fecha=None):
+        """
+        Encola un evento de analytics. Devuelve False si se descartó por cola llena.
+        metadatos ya serializado (JSON en texto), igual que la columna.
+        """
+        self._asegurar_hilo()
+        fila = (
+            (fecha or datetime.utcnow()).strftime(FORMATO_FECHA),
+            mesa, evento, valor_numerico,
+            valor_texto[:500] if valor_texto else valor_texto,
+            metadatos
+        )
+        try:
+            self._cola.put(fila, timeout=ESPERA_COLA_LLENA_S)
+        except queue.Full:
+            self._contar('descartados')
+            return False
+        self._contar('encolados')
+        return True
+
+    def _contar(self, contador, cantidad=1):
+        with self._lock:
+            self._contadores[contador] += cantidad
+
+    # ==================== ESCRITOR ====================
+
+    def _asegurar_hilo(self):
+        """Arranca el hilo en el primer evento (y de nuevo tras un fork del servidor)"""
+        if self._hilo is not None and self._pid == os.getpid() and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo is not None and self._pid == os.getpid() and self._hilo.is_alive():
+                return
+            self._pid = os.getpid()
+            self._detenido.clear()
+            self._hilo = threading.Thread(target=self._bucle, name='analytics-sink', daemon=True)
+            self._hilo.start()
+
+    def _tomar_lote(self, espera_s, maximo=None):
+        """Hasta 'maximo' eventos (tamano_lote); espera como máximo espera_s por el primero"""
+        maximo = maximo or self.tamano_lote
+        lote = []
+        try:
+            lote.append(self._cola.get(timeout=espera_s) if espera_s else self._cola.get_nowait())
+        except queue.Empty:
+            return lote
+        while len(lote) < maximo:
+            try:
+                lote.append(self._cola.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _escribir(self, lote):
+        try:
+            with get_engine(self.db_path).begin() as conexion:
+                conexion.exec_driver_sql(SQL_INSERTAR, lote)
+            self._contar('escritos', len(lote))
+            self._contar('lotes')
+        except Exception as e:
+            # Se pierde el lote: analytics no debe reintentar indefinidamente contra una base caída
+            self._contar('errores')
+            self._contar('perdidos', len(lote))
+            self._ultimo_error = f"{datetime.utcnow().isoformat()} {e}"
+            print(f"⚠️ Error escribiendo lote de analytics ({len(lote)} eventos): {e}")
+        finally:
+            for _ in lote:
+                self._cola.task_done()
+
+    def _bucle(self):
+        while not self._detenido.is_set():
+            inicio = time.monotonic()
+            lote = self._tomar_lote(self.intervalo_s)
+            # Junta eventos hasta completar el lote o cumplir el intervalo
+            while lote and len(lote) < self.tamano_lote:
+                restante = self.intervalo_s - (time.monotonic() - inicio)
+                if restante <= 0 or self._detenido.is_set():
+                    break
+                lote.extend(self._tomar_lote(min(restante, 0.05), self.tamano_lote - len(lote)))
+            if lote:
+                self._escribir(lote)
+
+    def vaciar(self):
+        """Escribe ya todo lo encolado y espera el lote que el hilo tenga en curso"""
+        while True:
+            lote = self._tomar_lote(0)
+            if not lote:
+                break
+            self._escribir(lote)
+        self._cola.join()
+
+    def detener(self, timeout=TIMEOUT_APAGADO_S):
+        """Detiene el hilo y escribe lo pendiente (registrado en atexit)"""
+        self._detenido.set()
+        if self._hilo is not None and self._pid == os.getpid():
+            self._hilo.join(timeout)
+        self.vaciar()
+
+    def info(self):
+        with self._lock:
+            contadores = dict(self._contadores)
+        return {
+            **contadores,
+            'pendientes': self._cola.qsize(),
+            'capacidad': self._cola.maxsize,
+            'tamano_lote': self.tamano_lote,
+            'intervalo_ms': int(self.intervalo_s * 1000),
+            'hilo_activo': self._hilo is not None and self._hilo.is_alive(),
+            'ultimo_error': self._ultimo_error
+        }
+
+
+# Instancia compartida del proceso
+sumidero_analytics = SumideroAnalytics()
+atexit.register(sumidero_analytics.detener)
@@ -1,8 +1,8 @@
 """API Endpoints para el Backend del Chatbot"""
 
 from flask import Blueprint, request, jsonify
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, func
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import datetime, timedelta
 import json
 import os
@@ -11,14 +11,25 @@ from .models import (
     Sesion, Calificacion, Comentario, NotificacionMesero, 
     Analytics, ConfiguracionChatbot, FondoPersonalizado
 )
+from .analytics_rollups import consolidar, promedio_calificaciones, mesas_mas_activas
+from .analytics_sink import sumidero_analytics
+from .analytics_lote import validar_lote, escribir_lote, fecha_cliente, MAXIMO_EVENTOS_LOTE
+from .latidos_sesion import latidos_sesion
+from .despachador_notificaciones import despachador_notificaciones, NIVELES_PRIORIDAD
+from .idempotencia import idempotente, idempotencia
+from . import eventos_configuracion  # Anuncia en el bus los cambios de configuración y fondos
+from modulos.backend.menu.database.managers.db_manager import get_session, get_session_escritura, CHATBOT_DB_PATH
+from modulos.backend.menu.database.managers.servicio_configuracion import servicio_configuracion
 
 chatbot_api_bp = Blueprint('chatbot_api', __name__, url_prefix='/api/chatbot')
 
 def get_db_session():
-    """Obtener sesión de base de datos"""
-    engine = create_engine('sqlite:///modulos/backend/menu/menu.db')
-    Session = sessionmaker(bind=engine)
-    return Session()
+    """Obtener sesión de base de datos (engine compartido, sesión del request)"""
+    return get_session(CHATBOT_DB_PATH)
+
+def get_db_session_escritura():
+    """Sesión propia que abre sus transacciones con BEGIN IMMEDIATE (verificar y escribir)"""
+    return get_session_escritura(CHATBOT_DB_PATH)
 
 def _guardar_configuracion_fondo(db, tipo, valor, descripcion_valor):
     """Guarda la configuración del fondo en la base de datos"""
@@ -94,17 +105,17 @@ def _crear_nueva_calificacion(db, sesion_id, estrellas, categoria, sesion):
     )
     db.add(calificacion)
     
-    # Registrar analytics
-    analytics = Analytics(
+    # Analytics fuera de la transacción: se encola tras confirmar la calificación
+    analytics = dict(
         mesa=sesion.mesa,
         evento='calificacion',
         valor_numerico=estrellas,
         valor_texto=f'Calificación {categoria}: {estrellas} estrellas',
         metadatos=json.dumps({'categoria': categoria, 'cliente': sesion.nombre_cliente})
     )
-    db.add(analytics)
     
     db.commit()
+    sumidero_analytics.registrar(**analytics)
     
     return {
         'success': True,
@@ -113,6 +124,35 @@ def _crear_nueva_calificacion(db, sesion_id, estrellas, categoria, sesion):
     }
 # ENDPOINTS DE SESIONES
 
+def _upsert_sesion_activa(db, mesa, nombre_cliente, dispositivo, ip_cliente):
+    """
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING sobre el índice único parcial
+    ux_chatbot_sesiones_mesa_activa: crea la sesión activa de la mesa o, si ya existe,
+    registra el reingreso (último acceso y nombre). Sin carrera entre SELECT e INSERT
+    aunque varios teléfonos escaneen el QR a la vez. Devuelve el id de la sesión.
+    """
+    ahora = datetime.utcnow()
+    sentencia = sqlite_insert(Sesion).values(
+        mesa=mesa,
+        nombre_cliente=nombre_cliente,
+        dispositivo=dispositivo,
+        ip_cliente=ip_cliente,
+        fecha_inicio=ahora,
+        fecha_ultimo_acceso=ahora,
+        activa=True
+    )
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=[Sesion.mesa],
+        index_where=Sesion.activa == True,
+        set_={
+            # Un nombre vacío no reemplaza el que ya tenía la sesión
+            'nombre_cliente': func.coalesce(func.nullif(sentencia.excluded.nombre_cliente, ''), Sesion.nombre_cliente),
+            'fecha_ultimo_acceso': sentencia.excluded.fecha_ultimo_acceso
+        }
+    ).returning(Sesion.id)
+    return db.execute(sentencia).scalar_one()
+
+
 @chatbot_api_bp.route('/sesion/iniciar', methods=['POST'])
 def iniciar_sesion():
     """
@@ -135,42 +175,20 @@ def iniciar_sesion():
         
         db = get_db_session()
         
-        # Verificar si ya existe una sesión activa para esta mesa
-        sesion_existente = db.query(Sesion).filter(
-            Sesion.mesa == mesa,
-            Sesion.activa == True
-        ).first()
+        # Crear la sesión o reingresar a la activa de la mesa en una sola sentencia
+        sesion_id = _upsert_sesion_activa(db, mesa, nombre_cliente, dispositivo, ip_cliente)
+        db.commit()
+        latidos_sesion.marcar_conocida(sesion_id)
         
-        if sesion_existente:
-            # Actualizar sesión existente
-            sesion_existente.fecha_ultimo_acceso = datetime.utcnow()
-            if nombre_cliente:
-                sesion_existente.nombre_cliente = nombre_cliente
-            db.commit()
-            sesion_id = sesion_existente.id
-        else:
-            # Crear nueva sesión
-            nueva_sesion = Sesion(
-                mesa=mesa,
-                nombre_cliente=nombre_cliente,
-                dispositivo=dispositivo,
-                ip_cliente=ip_cliente
-            )
-            db.add(nueva_sesion)
-            db.commit()
-            sesion_id = nueva_sesion.id
+        db.close()
         
-        # Registrar analytics
-        analytics = Analytics(
+        # Registrar analytics (escritura diferida por lotes)
+        sumidero_analytics.registrar(
             mesa=mesa,
             evento='acceso',
             valor_texto=f'Sesión iniciada - Cliente: {nombre_cliente or "Anónimo"}',
             metadatos=json.dumps({'dispositivo': dispositivo, 'ip': ip_cliente})
         )
-        db.add(analytics)
-        db.commit()
-        
-        db.close()
         
         return jsonify({
             'success': True,
@@ -211,12 +229,11 @@ def actualizar_sesion(sesion_id):
         
         if 'nombre_cliente' in data:
             sesion.nombre_cliente = data['nombre_cliente']
+            db.commit()
+        db.close()
         
         if data.get('actualizar_ultimo_acceso', True):
-            sesion.fecha_ultimo_acceso = datetime.utcnow()
-        
-        db.commit()
-        db.close()
+            latidos_sesion.registrar(sesion_id)
         
         return jsonify({
             'success': True,
@@ -236,26 +253,30 @@ def actualizar_actividad_sesion(sesion_id):
     Actualiza la actividad de una sesión (última vez activa)
     
     POST /api/chatbot/sesion/<id>/actividad
+    
+    El latido queda en memoria y se vuelca por lotes (latidos_sesion.py); solo el
+    primer latido de una sesión desconocida para este proceso consulta la base.
     """
     try:
-        session = get_db_session()
-        
-        # Buscar la sesión
-        sesion = session.query(Sesion).filter_by(id=sesion_id).first()
-        if not sesion:
-            return jsonify({
-                'success': False,
-                'error': 'Sesión no encontrada'
-            }), 404
-        
-        # Actualizar última actividad
-        sesion.fecha_ultimo_acceso = datetime.utcnow()
-        session.commit()
+        if not latidos_sesion.es_conocida(sesion_id):
+            session = get_db_session()
+            try:
+                existe = session.query(Sesion.id).filter_by(id=sesion_id).first() is not None
+            finally:
+                session.close()
+            if not existe:
+                return jsonify({
+                    'success': False,
+                    'error': 'Sesión no encontrada'
+                }), 404
+            latidos_sesion.marcar_conocida(sesion_id)
+        
+        ultima_actividad = latidos_sesion.registrar(sesion_id)
         
         return jsonify({
             'success': True,
             'sesion_id': sesion_id,
-            'ultima_actividad': sesion.fecha_ultimo_acceso.isoformat(),
+            'ultima_actividad': ultima_actividad.isoformat(),
             'timestamp': datetime.utcnow().isoformat()
         })
         
@@ -264,8 +285,6 @@ def actualizar_actividad_sesion(sesion_id):
             'success': False,
             'error': str(e)
         }), 500
-    finally:
-        session.close()
 
 @chatbot_api_bp.route('/sesion/<int:sesion_id>/cerrar', methods=['POST'])
 def cerrar_sesion(sesion_id):
@@ -289,6 +308,7 @@ def cerrar_sesion(sesion_id):
         sesion.activa = False
         sesion.fecha_ultimo_acceso = datetime.utcnow()
         session.commit()
+        latidos_sesion.descartar(sesion_id)
         
         return jsonify({
             'success': True,
@@ -323,13 +343,15 @@ def obtener_sesion(sesion_id):
                 'error': 'Sesión no encontrada'
             }), 404
         
+        ultimo_acceso = latidos_sesion.ultimo_acceso(sesion.id, sesion.fecha_ultimo_acceso)
+        
         return jsonify({
             'success': True,
             'id': sesion.id,
             'mesa': sesion.mesa,
             'nombre_cliente': sesion.nombre_cliente,
             'fecha_inicio': sesion.fecha_inicio.isoformat() if sesion.fecha_inicio else None,
-            'fecha_ultimo_acceso': sesion.fecha_ultimo_acceso.isoformat() if sesion.fecha_ultimo_acceso else None,
+            'fecha_ultimo_acceso': ultimo_acceso.isoformat() if ultimo_acceso else None,
             'dispositivo': sesion.dispositivo,
             'ip_cliente': sesion.ip_cliente,
             'activa': sesion.activa,
@@ -357,7 +379,12 @@ def validar_sesion(sesion_id):
         if not sesion.activa:
             return jsonify({'success': True, 'valida': False, 'razon': 'Sesión inactiva'})
         
-        return jsonify({'success': True, 'valida': True})
+        ultimo_acceso = latidos_sesion.ultimo_acceso(sesion.id, sesion.fecha_ultimo_acceso)
+        return jsonify({
+            'success': True,
+            'valida': True,
+            'ultima_actividad': ultimo_acceso.isoformat() if ultimo_acceso else None
+        })
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -383,7 +410,7 @@ def obtener_sesiones_activas():
         sesiones_data = []
         for sesion in sesiones_activas:
             tiempo_activo = datetime.utcnow() - sesion.fecha_inicio
-            ultimo_acceso = sesion.fecha_ultimo_acceso or sesion.fecha_inicio
+            ultimo_acceso = latidos_sesion.ultimo_acceso(sesion.id, sesion.fecha_ultimo_acceso) or sesion.fecha_inicio
             tiempo_inactivo = datetime.utcnow() - ultimo_acceso
             
             sesiones_data.append({
@@ -419,16 +446,12 @@ def obtener_timeout_configurado():
     GET /api/chatbot/configuracion/timeout
     """
     try:
-        session = get_db_session()
-        
-        # Obtener configuración de timeout
-        config_timeout = session.query(ConfiguracionChatbot).filter_by(
-            clave='sesion_timeout'
-        ).first()
+        # Configuración servida desde memoria (se invalida al escribir)
+        valor = servicio_configuracion.obtener('chatbot', 'sesion_timeout')
         
         timeout_minutos = 10  # Default
-        if config_timeout and config_timeout.valor.isdigit():
-            timeout_minutos = int(config_timeout.valor)
+        if valor is not None and str(valor).isdigit():
+            timeout_minutos = int(valor)
         
         return jsonify({
             'success': True,
@@ -442,17 +465,17 @@ def obtener_timeout_configurado():
             'success': False,
             'error': str(e)
         }), 500
-    finally:
-        session.close()
 
 # ENDPOINTS DE CALIFICACIONES
 
 @chatbot_api_bp.route('/calificacion', methods=['POST'])
+@idempotente
 def guardar_calificacion():
     """
     Guarda una calificación del cliente
     
     POST /api/chatbot/calificacion
+    Cabecera opcional: Idempotency-Key
     Body: {
         "sesion_id": 123,
         "estrellas": 5,
@@ -559,11 +582,13 @@ def obtener_calificaciones():
 # ENDPOINTS DE COMENTARIOS
 
 @chatbot_api_bp.route('/comentario', methods=['POST'])
+@idempotente
 def guardar_comentario():
     """
     Guarda un comentario del cliente
     
     POST /api/chatbot/comentario
+    Cabecera opcional: Idempotency-Key
     Body: {
         "sesion_id": 123,
         "texto_comentario": "Excelente servicio!",
@@ -600,8 +625,8 @@ def guardar_comentario():
         )
         db.add(comentario)
         
-        # Registrar analytics
-        analytics = Analytics(
+        # Analytics fuera de la transacción: se encola tras confirmar el comentario
+        analytics = dict(
             mesa=sesion.mesa,
             evento='comentario',
             valor_texto=f'Comentario {tipo}: {texto_comentario[:50]}...',
@@ -611,10 +636,10 @@ def guardar_comentario():
                 'cliente': sesion.nombre_cliente
             })
         )
-        db.add(analytics)
         
         db.commit()
         db.close()
+        sumidero_analytics.registrar(**analytics)
         
         return jsonify({
             'success': True,
@@ -631,16 +656,20 @@ def guardar_comentario():
 # ENDPOINTS DE NOTIFICACIONES
 
 @chatbot_api_bp.route('/notificacion/mesero', methods=['POST'])
+@idempotente
 def llamar_mesero():
     """
-    Crea una notificación para llamar al mesero
+    Crea una notificación para llamar al mesero.
+    Una llamada igual (misma sesión y tipo) sin atender de hace menos de
+    VENTANA_LLAMADA_S devuelve la respuesta original sin crear otra fila.
     
     POST /api/chatbot/notificacion/mesero
+    Cabecera opcional: Idempotency-Key
     Body: {
         "sesion_id": 123,
         "tipo_notificacion": "llamar_mesero" | "pedido_especial" | "emergencia",
         "mensaje": "Necesito ayuda con el menú" (opcional),
-        "prioridad": "normal" | "alta" | "urgente"
+        "prioridad": "baja" | "normal" | "alta" | "urgente"
     }
     """
     try:
@@ -656,47 +685,96 @@ def llamar_mesero():
                 'error': 'Se requiere sesion_id'
             }), 400
         
-        db = get_db_session()
-        
-        # Verificar que la sesión existe
-        sesion = db.query(Sesion).filter(Sesion.id == sesion_id).first()
-        if not sesion:
+        if prioridad not in NIVELES_PRIORIDAD:
             return jsonify({
                 'success': False,
-                'error': 'Sesión no encontrada'
-            }), 404
-        
-        # Crear notificación
-        notificacion = NotificacionMesero(
-            sesion_id=sesion_id,
-            tipo_notificacion=tipo_notificacion,
-            mensaje=mensaje,
-            prioridad=prioridad
-        )
-        db.add(notificacion)
-        
-        # Registrar analytics
-        analytics = Analytics(
-            mesa=sesion.mesa,
-            evento='notificacion',
-            valor_texto=f'{tipo_notificacion} - Prioridad: {prioridad}',
-            metadatos=json.dumps({
-                'tipo': tipo_notificacion,
-                'prioridad': prioridad,
-                'mensaje': mensaje,
-                'cliente': sesion.nombre_cliente
-            })
-        )
-        db.add(analytics)
+                'error': f"prioridad debe ser una de: {', '.join(NIVELES_PRIORIDAD)}"
+            }), 400
         
-        db.commit()
-        db.close()
+        # Toques repetidos o reintentos: la respuesta original, sin escribir
+        original = idempotencia.llamada_reciente(sesion_id, tipo_notificacion)
+        if original is not None:
+            idempotencia.contar('llamadas_duplicadas_cache')
+            return _respuesta_llamada_repetida(original)
+        
+        # La primera consulta abre la transacción con BEGIN IMMEDIATE: el lock de escritura
+        # (serializa también entre workers) se toma antes de mirar la ventana, así dos toques
+        # simultáneos no pueden pasar ambos la verificación e insertar
+        db = get_db_session_escritura()
+        try:
+            # Verificar que la sesión existe
+            sesion = db.query(Sesion).filter(Sesion.id == sesion_id).first()
+            if not sesion:
+                db.rollback()
+                return jsonify({
+                    'success': False,
+                    'error': 'Sesión no encontrada'
+                }), 404
+            
+            # La llamada pudo llegar a otro worker: buscarla en la base (índice por sesión)
+            ahora = datetime.utcnow()
+            previa = db.query(NotificacionMesero.id, NotificacionMesero.fecha_notificacion).filter(
+                NotificacionMesero.sesion_id == sesion_id,
+                NotificacionMesero.tipo_notificacion == tipo_notificacion,
+                NotificacionMesero.atendida == False,
+                NotificacionMesero.fecha_notificacion >= ahora - timedelta(seconds=idempotencia.ventana_s)
+            ).order_by(NotificacionMesero.id.desc()).first()
+            if previa:
+                original = {
+                    'success': True,
+                    'mensaje': f'Notificación enviada - Mesa {sesion.mesa}',
+                    'notificacion_id': previa.id,
+                    'timestamp': previa.fecha_notificacion.isoformat()
+                }
+                db.rollback()
+                idempotencia.registrar_llamada(
+                    sesion_id, tipo_notificacion, original,
+                    antiguedad_s=(ahora - previa.fecha_notificacion).total_seconds()
+                )
+                idempotencia.contar('llamadas_duplicadas_base')
+                return _respuesta_llamada_repetida(original)
+            
+            # Crear notificación
+            notificacion = NotificacionMesero(
+                sesion_id=sesion_id,
+                tipo_notificacion=tipo_notificacion,
+                mensaje=mensaje,
+                prioridad=prioridad
+            )
+            db.add(notificacion)
+            db.flush()
+            notificacion_id = notificacion.id
+            
+            # Analytics fuera de la transacción: se encola tras confirmar la notificación
+            mesa = sesion.mesa
+            analytics = dict(
+                mesa=mesa,
+                evento='notificacion',
+                valor_texto=f'{tipo_notificacion} - Prioridad: {prioridad}',
+                metadatos=json.dumps({
+                    'tipo': tipo_notificacion,
+                    'prioridad': prioridad,
+                    'mensaje': mensaje,
+                    'cliente': sesion.nombre_cliente
+                })
+            )
+            
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        sumidero_analytics.registrar(**analytics)
         
-        return jsonify({
+        respuesta = {
             'success': True,
-            'mensaje': f'Notificación enviada - Mesa {sesion.mesa}',
+            'mensaje': f'Notificación enviada - Mesa {mesa}',
+            'notificacion_id': notificacion_id,
             'timestamp': datetime.utcnow().isoformat()
-        })
+        }
+        idempotencia.registrar_llamada(sesion_id, tipo_notificacion, respuesta)
+        return jsonify(respuesta)
         
     except Exception as e:
         return jsonify({
@@ -704,39 +782,26 @@ def llamar_mesero():
             'error': str(e)
         }), 500
 
+def _respuesta_llamada_repetida(original):
+    """Respuesta original de la llamada, marcada como repetición"""
+    respuesta = jsonify(original)
+    respuesta.headers['X-Llamada-Repetida'] = 'true'
+    return respuesta
+
 @chatbot_api_bp.route('/notificaciones/pendientes', methods=['GET'])
 def obtener_notificaciones_pendientes():
     """
-    Obtiene todas las notificaciones pendientes para el personal
+    Obtiene todas las notificaciones pendientes para el personal,
+    en orden de despacho (prioridad envejecida, desde la cola en memoria)
     
     GET /api/chatbot/notificaciones/pendientes
     """
     try:
-        db = get_db_session()
-        
-        notificaciones = db.query(NotificacionMesero, Sesion).join(
-            Sesion, NotificacionMesero.sesion_id == Sesion.id
-        ).filter(
-            NotificacionMesero.atendida == False
-        ).order_by(
-            NotificacionMesero.prioridad.desc(),
-            NotificacionMesero.fecha_notificacion.asc()
-        ).all()
-        
-        resultado = []
-        for notificacion, sesion in notificaciones:
-            resultado.append({
-                'id': notificacion.id,
-                'mesa': sesion.mesa,
-                'cliente': sesion.nombre_cliente or 'Anónimo',
-                'tipo': notificacion.tipo_notificacion,
-                'mensaje': notificacion.mensaje,
-                'prioridad': notificacion.prioridad,
-                'fecha': notificacion.fecha_notificacion.isoformat(),
-                'tiempo_espera': str(datetime.utcnow() - notificacion.fecha_notificacion)
-            })
-        
-        db.close()
+        ahora = datetime.utcnow()
+        resultado = despachador_notificaciones.listar(ahora)
+        for notificacion in resultado:
+            if notificacion['fecha']:
+                notificacion['tiempo_espera'] = str(ahora - datetime.fromisoformat(notificacion['fecha']))
         
         return jsonify({
             'success': True,
@@ -773,6 +838,7 @@ def obtener_resumen_analytics():
         dias = request.args.get('dias', 7, type=int)
         fecha_inicio = datetime.utcnow() - timedelta(days=dias)
         
+        consolidar()
         db = get_db_session()
         
         # Sesiones activas
@@ -781,10 +847,8 @@ def obtener_resumen_analytics():
             Sesion.fecha_ultimo_acceso >= fecha_inicio
         ).count()
         
-        # Calificaciones promedio
-        calificaciones = db.query(func.avg(Calificacion.estrellas)).filter(
-            Calificacion.fecha_calificacion >= fecha_inicio
-        ).scalar()
+        # Calificación promedio y mesas más activas: rollups (consolidados arriba)
+        calificaciones = promedio_calificaciones(db.connection(), fecha_inicio)
         
         # Total de comentarios
         comentarios_total = db.query(Comentario).filter(
@@ -796,15 +860,7 @@ def obtener_resumen_analytics():
             NotificacionMesero.atendida == False
         ).count()
         
-        # Mesas más activas
-        mesas_activas = db.query(
-            Sesion.mesa, 
-            func.count(Sesion.id).label('total_sesiones')
-        ).filter(
-            Sesion.fecha_inicio >= fecha_inicio
-        ).group_by(Sesion.mesa).order_by(
-            func.count(Sesion.id).desc()
-        ).limit(5).all()
+        mesas_activas = mesas_mas_activas(db.connection(), fecha_inicio, limite=5)
         
         db.close()
         
@@ -823,13 +879,86 @@ def obtener_resumen_analytics():
             },
             'timestamp': datetime.utcnow().isoformat()
         })
-        
+
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+@chatbot_api_bp.route('/analytics/lote', methods=['POST'])
+def registrar_lote_analytics():
+    """
+    Registra en una sola transacción los eventos acumulados por el navegador
+
+    POST /api/chatbot/analytics/lote
+    Body: {
+        "sesion_id": 12 (opcional; la mesa se toma de la sesión),
+        "mesa": "5" (si no hay sesión),
+        "ultima_actividad": 1718000000000 (opcional, epoch ms),
+        "eventos": [{"id": "a1b2-1", "evento": "navegacion", "t": 1718000000000,
+                     "valor_texto": "menu", "metadatos": {...}}]
+    }
+    Los eventos inválidos vuelven en 'rechazados'; un id ya registrado cuenta como duplicado.
+    """
+    # force: navigator.sendBeacon envía el JSON como text/plain
+    data = request.get_json(force=True, silent=True)
+    eventos = data.get('eventos') if isinstance(data, dict) else None
+    if not isinstance(eventos, list):
+        return jsonify({
+            'success': False,
+            'error': 'Se requiere un objeto JSON con la lista "eventos"'
+        }), 400
+    if len(eventos) > MAXIMO_EVENTOS_LOTE:
+        return jsonify({
+            'success': False,
+            'error': f'Máximo {MAXIMO_EVENTOS_LOTE} eventos por lote'
+        }), 400
+
+    session = get_db_session()
+    try:
+        ahora = datetime.utcnow()
+
+        sesion = None
+        sesion_id = data.get('sesion_id')
+        if sesion_id is not None and str(sesion_id).isdigit():
+            sesion = session.get(Sesion, int(sesion_id))
+        mesa = sesion.mesa if sesion else (str(data['mesa'])[:20] if data.get('mesa') else None)
+
+        sesion_activa = bool(sesion and sesion.activa)
+
+        filas, rechazados, ultimo_evento = validar_lote(eventos, mesa, ahora)
+        insertados = escribir_lote(session.connection(), filas)
+        session.commit()
+
+        # La actividad del cliente viaja en el lote en lugar de un POST por interacción
+        if sesion_activa:
+            try:
+                actividad = fecha_cliente(data.get('ultima_actividad'), ahora)
+            except ValueError:
+                actividad = ultimo_evento
+            if actividad:
+                latidos_sesion.registrar(int(sesion_id), actividad)
+
+        return jsonify({
+            'success': True,
+            'recibidos': len(eventos),
+            'insertados': insertados,
+            'duplicados': len(filas) - insertados,
+            'rechazados': rechazados,
+            'sesion_activa': sesion_activa,
+            'timestamp': ahora.isoformat()
+        })
+
+    except Exception as e:
+        session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    finally:
+        session.close()
+
 @chatbot_api_bp.route('/estadisticas', methods=['GET'])
 def obtener_estadisticas():
     """Obtiene estadísticas generales del chatbot para el dashboard"""
@@ -1197,15 +1326,10 @@ def obtener_fondos_existentes():
 @chatbot_api_bp.route('/configuracion/menus', methods=['GET'])
 def obtener_configuracion_menus():
     """Obtiene la configuración actual de menús"""
-    session = get_db_session()
     try:
-        def obtener_config(clave, default):
-            config = session.query(ConfiguracionChatbot).filter_by(clave=clave).first()
-            if config:
-                if config.tipo == 'boolean':
-                    return config.valor.lower() == 'true'
-                return config.valor
-            return default
+        # Valores ya tipados según la columna tipo
+        config = servicio_configuracion.valores('chatbot')
+        obtener_config = config.get
         
         configuracion = {
             'menu_principal_activo': obtener_config('menu_principal_activo', True),
@@ -1218,8 +1342,6 @@ def obtener_configuracion_menus():
         
     except Exception as e:
         return jsonify({'success': False, 'error': f'Error obteniendo configuración: {str(e)}'}), 500
-    finally:
-        session.close()
 
 @chatbot_api_bp.route('/configuracion/menus', methods=['POST'])
 def guardar_configuracion_menus():
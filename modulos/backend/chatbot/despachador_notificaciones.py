@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Despachador de Llamadas al Mesero
+=================================
+Cola de prioridad en memoria de las notificaciones pendientes. Las consultas del
+panel (/notificaciones/pendientes, tiempo-real, instantánea del stream) se sirven
+desde aquí en lugar de repetir el JOIN ordenado en SQL en cada consulta.
+
+- Prioridad numérica: baja 0, normal 1, alta 2, urgente 3 (ordenar el texto ponía
+  'normal' por encima de 'alta').
+- Envejecimiento: cada MINUTOS_POR_NIVEL de espera sube un nivel. La clave del heap
+  es fecha - nivel * MINUTOS_POR_NIVEL: como 'ahora' es igual para todas, ordenar
+  por esa clave fija es ordenar por prioridad envejecida, sin reordenar al pasar
+  el tiempo.
+- Listado: además del heap se mantiene el índice ordenado (clave, id) de todas las
+  pendientes (también las asignadas), insertado/quitado con bisect al cambiar;
+  listar() lo recorre tal cual, sin ordenar en cada consulta.
+- Asignación: asignar(mesero) entrega la llamada más prioritaria sin asignar con un
+  UPDATE condicionado (dos meseros nunca reciben la misma, aunque pidan en workers
+  distintos) y la deja en la fila (asignada_a, migración 0013).
+- Al arrancar, y cada INTERVALO_RECONSTRUCCION_S, se reconstruye desde la base;
+  entre tanto se mantiene al día con el tema 'notificaciones' del bus de eventos,
+  que llega desde cualquier worker. Es una copia por worker: si el bus avisa que
+  pudo perder eventos (al_perder_eventos) la próxima consulta reconstruye; un evento
+  que ni siquiera llegó a escribirse en el bus queda corregido, como mucho, en
+  INTERVALO_RECONSTRUCCION_S (una consulta JOIN por minuto y por worker).
+- Tiempo hasta la atención (notificación -> atendida): p50/p95 de las últimas
+  MUESTRAS_ATENCION llamadas.
+"""
+
+import bisect
+import heapq
+import math
+import threading
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from .models import NotificacionMesero, Sesion
+from modulos.backend.menu.database.managers.db_manager import get_engine, CHATBOT_DB_PATH
+from modulos.backend.menu.database.managers.bus_eventos import bus_eventos, publicar_al_confirmar
+
+NIVELES_PRIORIDAD = {'baja': 0, 'normal': 1, 'alta': 2, 'urgente': 3}
+NOMBRES_NIVEL = {nivel: nombre for nombre, nivel in NIVELES_PRIORIDAD.items()}
+NIVEL_MAXIMO = NIVELES_PRIORIDAD['urgente']
+NIVEL_URGENTE = NIVELES_PRIORIDAD['alta']  # 'es_urgente' desde alta (como antes)
+
+MINUTOS_POR_NIVEL = 5
+INTERVALO_RECONSTRUCCION_S = 60
+MUESTRAS_ATENCION = 500
+
+EPOCA = datetime(1970, 1, 1)
+
+
+def nivel_prioridad(prioridad):
+    """Nivel numérico de la prioridad (las desconocidas cuentan como 'normal')"""
+    return NIVELES_PRIORIDAD.get(prioridad, NIVELES_PRIORIDAD['normal'])
+
+
+def clave_despacho(prioridad, fecha):
+    """Clave fija del heap: menor = se atiende antes (ver envejecimiento arriba)"""
+    return (fecha - EPOCA).total_seconds() - nivel_prioridad(prioridad) * MINUTOS_POR_NIVEL * 60
+
+
+def nivel_efectivo(prioridad, fecha, ahora):
+    """Nivel de la prioridad más los niveles ganados esperando (hasta urgente)"""
+    minutos = max(0.0, (ahora - fecha).total_seconds() / 60) if fecha else 0.0
+    return min(NIVEL_MAXIMO, nivel_prioridad(prioridad) + int(minutos // MINUTOS_POR_NIVEL))
+
+
+def percentil(valores_ordenados, q):
+    """Percentil por rango más cercano (None sin valores)"""
+    if not valores_ordenados:
+        return None
+    return valores_ordenados[max(0, math.ceil(q * len(valores_ordenados)) - 1)]
+
+
+def serializar(notificacion, mesa, cliente, ahora=None):
+    """Forma común de una notificación para el panel (tiempo-real, stream y despachador)"""
+    ahora = ahora or datetime.utcnow()
+    fecha = notificacion.fecha_notificacion
+    tiempo_espera = ahora - fecha if fecha else None
+    nivel = nivel_efectivo(notificacion.prioridad, fecha, ahora)
+    return {
+        'id': notificacion.id,
+        'sesion_id': notificacion.sesion_id,
+        'mesa': mesa,
+        'cliente': cliente or 'Anónimo',
+        'tipo': notificacion.tipo_notificacion,
+        'mensaje': notificacion.mensaje,
+        'prioridad': notificacion.prioridad,
+        'prioridad_efectiva': NOMBRES_NIVEL[nivel],
+        'clave_despacho': clave_despacho(notificacion.prioridad, fecha or ahora),
+        'fecha': fecha.isoformat() if fecha else None,
+        'tiempo_espera_minutos': int(tiempo_espera.total_seconds() / 60) if tiempo_espera else 0,
+        'es_urgente': nivel >= NIVEL_URGENTE,
+        'atendida': bool(notificacion.atendida),
+        'atendida_por': notificacion.atendida_por,
+        'fecha_atencion': notificacion.fecha_atencion.isoformat() if notificacion.fecha_atencion else None,
+        'asignada_a': notificacion.asignada_a,
+        'fecha_asignacion': notificacion.fecha_asignacion.isoformat() if notificacion.fecha_asignacion else None
+    }
+
+
+def listar_pendientes(db):
+    """Notificaciones sin atender con mesa y cliente (un JOIN), en orden de despacho"""
+    ahora = datetime.utcnow()
+    filas = db.query(NotificacionMesero, Sesion.mesa, Sesion.nombre_cliente).join(
+        Sesion, NotificacionMesero.sesion_id == Sesion.id
+    ).filter(
+        NotificacionMesero.atendida == False
+    ).all()
+    pendientes = [serializar(notificacion, mesa, cliente, ahora) for notificacion, mesa, cliente in filas]
+    pendientes.sort(key=lambda datos: (datos['clave_despacho'], datos['id']))
+    return pendientes
+
+
+class DespachadorNotificaciones:
+    """Heap de llamadas sin asignar + pendientes por id + muestras de tiempo de atención"""
+
+    def __init__(self, db_path=CHATBOT_DB_PATH):
+        self.db_path = db_path
+        self._pendientes = {}   # id -> datos serializados
+        self._heap = []         # (clave_despacho, id) de las no asignadas
+        self._en_cola = {}      # id -> clave vigente en el heap (las demás entradas están obsoletas)
+        self._orden = []        # (clave_despacho, id) de todas las pendientes, siempre ordenado
+        self._tiempos_atencion = deque(maxlen=MUESTRAS_ATENCION)
+        self._construido = False
+        self._fecha_construccion = None
+        self._lock = threading.Lock()
+        self._contadores = {'reconstrucciones': 0, 'asignadas': 0, 'eventos': 0}
+
+    # ==================== CONSTRUCCIÓN ====================
+
+    def reconstruir(self):
+        """Carga pendientes y tiempos de atención recientes desde la base"""
+        with get_engine(self.db_path).connect() as conexion:
+            db = Session(bind=conexion)
+            try:
+                pendientes = listar_pendientes(db)
+                tiempos = [fila[0] for fila in conexion.exec_driver_sql(
+                    "SELECT (julianday(fecha_atencion) - julianday(fecha_notificacion)) * 86400 "
+                    "FROM chatbot_notificaciones "
+                    "WHERE atendida = 1 AND fecha_atencion IS NOT NULL AND fecha_notificacion IS NOT NULL "
+                    "ORDER BY fecha_atencion DESC LIMIT ?", (MUESTRAS_ATENCION,)
+                ) if fila[0] is not None]
+            finally:
+                db.close()
+
+        with self._lock:
+            self._pendientes, self._heap, self._en_cola, self._orden = {}, [], {}, []
+            for datos in pendientes:
+                self._agregar(datos)
+            self._tiempos_atencion = deque(reversed(tiempos), maxlen=MUESTRAS_ATENCION)
+            self._construido = True
+            self._fecha_construccion = datetime.utcnow()
+            self._contadores['reconstrucciones'] += 1
+
+    def invalidar(self):
+        """La próxima consulta reconstruye desde la base (el bus pudo perder eventos)"""
+        with self._lock:
+            self._construido = False
+
+    def _asegurar(self, ahora):
+        if (not self._construido
+                or (ahora - self._fecha_construccion).total_seconds() > INTERVALO_RECONSTRUCCION_S):
+            self.reconstruir()
+
+    # ==================== COLA (con el lock tomado) ====================
+
+    def _agregar(self, datos):
+        self._pendientes[datos['id']] = datos
+        bisect.insort(self._orden, (datos['clave_despacho'], datos['id']))
+        if not datos.get('asignada_a'):
+            clave = datos['clave_despacho']
+            self._en_cola[datos['id']] = clave
+            heapq.heappush(self._heap, (clave, datos['id']))
+            if len(self._heap) > 2 * len(self._en_cola) + 64:
+                # Demasiadas entradas obsoletas: compactar
+                self._heap = [(clave, notificacion_id) for notificacion_id, clave in self._en_cola.items()]
+                heapq.heapify(self._heap)
+
+    def _quitar(self, notificacion_id):
+        self._en_cola.pop(notificacion_id, None)
+        datos = self._pendientes.pop(notificacion_id, None)
+        if datos is not None:
+            del self._orden[bisect.bisect_left(self._orden, (datos['clave_despacho'], notificacion_id))]
+        return datos
+
+    def _extraer(self):
+        """Saca del heap la llamada sin asignar más prioritaria (None si no hay)"""
+        while self._heap:
+            clave, notificacion_id = heapq.heappop(self._heap)
+            if self._en_cola.get(notificacion_id) == clave:
+                del self._en_cola[notificacion_id]
+                return self._pendientes[notificacion_id]
+        return None
+
+    # ==================== EVENTOS DEL BUS ====================
+
+    def al_cambiar(self, tema, evento):
+        """Suscriptor del tema 'notificaciones' (cambios confirmados en cualquier worker)"""
+        tipo, datos = evento['tipo'], evento['notificacion']
+        with self._lock:
+            if not self._construido:
+                return
+            self._contadores['eventos'] += 1
+            previa = self._quitar(datos['id'])
+            if tipo == 'eliminada':
+                return
+            if datos.get('atendida'):
+                # Solo la primera vez que se ve atendida (la reconstrucción ya trae las anteriores)
+                if previa is not None and datos.get('fecha') and datos.get('fecha_atencion'):
+                    espera = datetime.fromisoformat(datos['fecha_atencion']) - datetime.fromisoformat(datos['fecha'])
+                    self._tiempos_atencion.append(max(0.0, espera.total_seconds()))
+                return
+            self._agregar(datos)
+
+    # ==================== CONSULTAS ====================
+
+    def _vista(self, datos, ahora):
+        """Copia con espera y prioridad envejecida al momento de la consulta"""
+        fecha = datetime.fromisoformat(datos['fecha']) if datos.get('fecha') else None
+        nivel = nivel_efectivo(datos['prioridad'], fecha, ahora)
+        return dict(
+            datos,
+            prioridad_efectiva=NOMBRES_NIVEL[nivel],
+            es_urgente=nivel >= NIVEL_URGENTE,
+            tiempo_espera_minutos=int((ahora - fecha).total_seconds() / 60) if fecha else 0
+        )
+
+    def listar(self, ahora=None):
+        """Pendientes en orden de despacho (mismo orden que el heap; las asignadas incluidas)"""
+        ahora = ahora or datetime.utcnow()
+        self._asegurar(ahora)
+        with self._lock:
+            pendientes = [self._pendientes[notificacion_id] for _, notificacion_id in self._orden]
+        return [self._vista(datos, ahora) for datos in pendientes]
+
+    def asignar(self, mesero, ahora=None):
+        """
+        Asigna al mesero la llamada sin asignar más prioritaria.
+        Devuelve la notificación asignada o None si no queda ninguna.
+        """
+        ahora = ahora or datetime.utcnow()
+        self._asegurar(ahora)
+        while True:
+            with self._lock:
+                datos = self._extraer()
+            if datos is None:
+                return None
+
+            with get_engine(self.db_path).connect() as conexion:
+                db = Session(bind=conexion)
+                try:
+                    # Condicionado: otro worker pudo asignarla o atenderla entre tanto
+                    asignada = db.execute(
+                        update(NotificacionMesero).where(
+                            NotificacionMesero.id == datos['id'],
+                            NotificacionMesero.atendida == False,
+                            NotificacionMesero.asignada_a.is_(None)
+                        ).values(asignada_a=mesero, fecha_asignacion=ahora)
+                    ).rowcount == 1
+                    if asignada:
+                        datos = dict(datos, asignada_a=mesero, fecha_asignacion=ahora.isoformat())
+                        publicar_al_confirmar(db, 'notificaciones', {'tipo': 'actualizada', 'notificacion': datos})
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    with self._lock:
+                        if self._pendientes.get(datos['id']) is datos:
+                            self._en_cola[datos['id']] = datos['clave_despacho']
+                            heapq.heappush(self._heap, (datos['clave_despacho'], datos['id']))
+                    raise
+                finally:
+                    db.close()
+
+            if asignada:
+                with self._lock:
+                    self._contadores['asignadas'] += 1
+                return self._vista(datos, ahora)
+
+    def info(self, ahora=None):
+        ahora = ahora or datetime.utcnow()
+        self._asegurar(ahora)
+        with self._lock:
+            pendientes = list(self._pendientes.values())
+            sin_asignar = len(self._en_cola)
+            tiempos = sorted(self._tiempos_atencion)
+            contadores = dict(self._contadores)
+        por_prioridad = {nombre: 0 for nombre in NIVELES_PRIORIDAD}
+        for datos in pendientes:
+            por_prioridad[self._vista(datos, ahora)['prioridad_efectiva']] += 1
+        p50, p95 = percentil(tiempos, 0.5), percentil(tiempos, 0.95)
+        return {
+            **contadores,
+            'pendientes': len(pendientes),
+            'sin_asignar': sin_asignar,
+            'por_prioridad_efectiva': por_prioridad,
+            'minutos_por_nivel': MINUTOS_POR_NIVEL,
+            'tiempo_atencion': {
+                'muestras': len(tiempos),
+                'p50_segundos': round(p50, 1) if p50 is not None else None,
+                'p95_segundos': round(p95, 1) if p95 is not None else None
+            },
+            'fecha_construccion': self._fecha_construccion.isoformat() if self._fecha_construccion else None
+        }
+
+
+# Instancia compartida del proceso
+despachador_notificaciones = DespachadorNotificaciones()
+bus_eventos.suscribir('notificaciones', despachador_notificaciones.al_cambiar)
+bus_eventos.al_perder_eventos(despachador_notificaciones.invalidar)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Publicación de Cambios de Configuración y Fondos
+================================================
+Listeners del ORM que anuncian en el bus de eventos (al confirmar la transacción)
+los cambios que las cachés de otros workers necesitan conocer:
+
+- chatbot_configuracion: tema 'configuracion' ({'clave', 'valor', 'accion'}); las
+  claves 'fondo_*' van al tema 'fondos'.
+- fondos_personalizados: tema 'fondos' ({'fondo_id', 'accion'}).
+
+El estado del menú en config_menu.json se publica desde guardar_estado_menu().
+"""
+
+from sqlalchemy import event, inspect
+
+from .models import ConfiguracionChatbot, FondoPersonalizado
+from modulos.backend.menu.database.managers.bus_eventos import publicar_al_confirmar
+
+
+def _publicar(objeto, tema, datos):
+    sesion_db = inspect(objeto).session
+    if sesion_db is not None:
+        publicar_al_confirmar(sesion_db, tema, datos)
+
+
+def _cambio_configuracion(accion):
+    def listener(mapper, conexion, config):
+        tema = 'fondos' if config.clave.startswith('fondo_') else 'configuracion'
+        _publicar(config, tema, {
+            'clave': config.clave,
+            'valor': None if accion == 'eliminada' else config.valor,
+            'accion': accion
+        })
+    return listener
+
+
+def _cambio_fondo(accion):
+    def listener(mapper, conexion, fondo):
+        _publicar(fondo, 'fondos', {'fondo_id': fondo.id, 'accion': accion})
+    return listener
+
+
+for _accion, _evento in (('creada', 'after_insert'), ('modificada', 'after_update'), ('eliminada', 'after_delete')):
+    event.listen(ConfiguracionChatbot, _evento, _cambio_configuracion(_accion))
+    event.listen(FondoPersonalizado, _evento, _cambio_fondo(_accion))
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Expiración de Sesiones en el Servidor
+=====================================
+Hasta ahora una sesión solo se cerraba si el navegador llamaba a
+/sesion/<id>/cerrar; los teléfonos que se apagan o cierran la pestaña dejaban
+filas con activa=1 para siempre. Un hilo de fondo barre cada INTERVALO_BARRIDO_S:
+
+- Lee 'sesion_timeout' (minutos) de chatbot_configuracion en cada pasada, así que
+  un cambio desde el dashboard aplica sin reiniciar.
+- Cierra con un solo UPDATE ... RETURNING (índice activa, fecha_ultimo_acceso de la
+  migración 0012) las sesiones cuyo último acceso es anterior al timeout.
+- Antes de barrer vuelca los latidos pendientes del proceso; el margen de
+  INTERVALO_VOLCADO_S cubre los latidos aún no volcados de los otros workers.
+- Turno entre workers de gunicorn: cada hilo intenta renovar/tomar la fila de
+  chatbot_tareas con un UPSERT condicionado; solo quien la obtiene barre. Si ese
+  worker muere, otro toma el turno cuando vence (DURACION_TURNO_S).
+- El resultado de cada pasada queda en chatbot_tareas (última y acumulado) y en
+  el historial del proceso: GET /admin/chatbot/api/sesiones/barrido.
+"""
+
+import os
+import atexit
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from .analytics_sink import FORMATO_FECHA
+from .latidos_sesion import latidos_sesion, INTERVALO_VOLCADO_S
+from modulos.backend.menu.database.managers.db_manager import get_engine, CHATBOT_DB_PATH
+
+TAREA = 'expiracion_sesiones'
+INTERVALO_BARRIDO_S = 60
+DURACION_TURNO_S = 3 * INTERVALO_BARRIDO_S
+TIMEOUT_POR_DEFECTO_MIN = 10
+TAMANO_HISTORIAL = 20
+
+
+def timeout_configurado(conexion):
+    """Minutos de 'sesion_timeout' (el mismo valor que lee /configuracion/timeout)"""
+    fila = conexion.exec_driver_sql(
+        "SELECT valor FROM chatbot_configuracion WHERE clave = 'sesion_timeout'"
+    ).first()
+    if fila and str(fila[0]).isdigit() and int(fila[0]) > 0:
+        return int(fila[0])
+    return TIMEOUT_POR_DEFECTO_MIN
+
+
+def tomar_turno(conexion, propietario, ahora, duracion_s=DURACION_TURNO_S):
+    """
+    Toma o renueva el turno de la tarea: solo si está libre, vencido o ya es nuestro.
+    Devuelve True si este propietario lo tiene.
+    """
+    vence = (ahora + timedelta(seconds=duracion_s)).strftime(FORMATO_FECHA)
+    return conexion.exec_driver_sql(
+        "INSERT INTO chatbot_tareas (tarea, propietario, vence, ultimo_resultado, total) "
+        "VALUES (?, ?, ?, 0, 0) "
+        "ON CONFLICT (tarea) DO UPDATE SET propietario = excluded.propietario, vence = excluded.vence "
+        "WHERE chatbot_tareas.vence < ? OR chatbot_tareas.propietario = excluded.propietario",
+        (TAREA, propietario, vence, ahora.strftime(FORMATO_FECHA))
+    ).rowcount == 1
+
+
+def cerrar_vencidas(conexion, limite):
+    """Cierra las sesiones activas sin acceso desde 'limite'; devuelve sus ids"""
+    limite = limite.strftime(FORMATO_FECHA)
+    return [fila[0] for fila in conexion.exec_driver_sql(
+        "UPDATE chatbot_sesiones SET activa = 0 "
+        "WHERE activa = 1 AND (fecha_ultimo_acceso < ? "
+        "OR (fecha_ultimo_acceso IS NULL AND fecha_inicio < ?)) "
+        "RETURNING id",
+        (limite, limite)
+    )]
+
+
+def estado_tarea(conexion):
+    """Fila de chatbot_tareas del barrido (None si nunca corrió)"""
+    fila = conexion.exec_driver_sql(
+        "SELECT propietario, vence, ultima_ejecucion, ultimo_resultado, total "
+        "FROM chatbot_tareas WHERE tarea = ?", (TAREA,)
+    ).first()
+    return fila._asdict() if fila else None
+
+
+class BarridoSesiones:
+    """Hilo que cierra las sesiones vencidas cuando este worker tiene el turno"""
+
+    def __init__(self, db_path=CHATBOT_DB_PATH, intervalo_s=INTERVALO_BARRIDO_S, latidos=latidos_sesion):
+        self.db_path = db_path
+        self.intervalo_s = intervalo_s
+        self.latidos = latidos
+        self.propietario = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._pid = None
+        self._detenido = threading.Event()
+        self._historial = deque(maxlen=TAMANO_HISTORIAL)
+        self._contadores = {'barridos': 0, 'sin_turno': 0, 'cerradas': 0, 'errores': 0}
+        self._ultimo_error = None
+
+    def barrer(self, ahora=None):
+        """
+        Una pasada. Devuelve {'cerradas', 'timeout_minutos', ...} o None si otro
+        worker tiene el turno.
+        """
+        ahora = ahora or datetime.utcnow()
+        inicio = time.perf_counter()
+        if self.latidos is not None:
+            self.latidos.vaciar()
+
+        with get_engine(self.db_path).begin() as conexion:
+            if not tomar_turno(conexion, self.propietario, ahora, max(DURACION_TURNO_S, 3 * self.intervalo_s)):
+                with self._lock:
+                    self._contadores['sin_turno'] += 1
+                return None
+            timeout_minutos = timeout_configurado(conexion)
+            limite = ahora - timedelta(minutes=timeout_minutos, seconds=INTERVALO_VOLCADO_S)
+            cerradas = cerrar_vencidas(conexion, limite)
+            conexion.exec_driver_sql(
+                "UPDATE chatbot_tareas SET ultima_ejecucion = ?, ultimo_resultado = ?, total = total + ? "
+                "WHERE tarea = ?",
+                (ahora.strftime(FORMATO_FECHA), len(cerradas), len(cerradas), TAREA)
+            )
+
+        if self.latidos is not None:
+            for sesion_id in cerradas:
+                self.latidos.descartar(sesion_id)
+
+        resultado = {
+            'fecha': ahora.isoformat(),
+            'cerradas': len(cerradas),
+            'timeout_minutos': timeout_minutos,
+            'duracion_ms': round((time.perf_counter() - inicio) * 1000, 2)
+        }
+        with self._lock:
+            self._contadores['barridos'] += 1
+            self._contadores['cerradas'] += len(cerradas)
+            self._historial.append(resultado)
+        if cerradas:
+            print(f"🧹 Barrido de sesiones: {len(cerradas)} cerradas por inactividad (timeout {timeout_minutos} min)")
+        return resultado
+
+    # ==================== HILO ====================
+
+    def iniciar(self):
+        """Arranca el hilo de barrido (idempotente; de nuevo tras un fork del servidor)"""
+        if self._hilo is not None and self._pid == os.getpid() and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo is not None and self._pid == os.getpid() and self._hilo.is_alive():
+                return
+            self._pid = os.getpid()
+            self.propietario = f"{socket.gethostname()}:{self._pid}"
+            self._detenido.clear()
+            self._hilo = threading.Thread(target=self._bucle, name='barrido-sesiones', daemon=True)
+            self._hilo.start()
+
+    def _bucle(self):
+        while not self._detenido.is_set():
+            try:
+                self.barrer()
+            except Exception as e:
+                # Base sin tablas todavía o bloqueada: se reintenta en la próxima pasada
+                with self._lock:
+                    self._contadores['errores'] += 1
+                self._ultimo_error = f"{datetime.utcnow().isoformat()} {e}"
+            self._detenido.wait(self.intervalo_s)
+
+    def detener(self):
+        self._detenido.set()
+        if self._hilo is not None and self._pid == os.getpid():
+            self._hilo.join(5)
+
+    def info(self):
+        with self._lock:
+            contadores = dict(self._contadores)
+            historial = list(self._historial)
+        return {
+            **contadores,
+            'propietario': self.propietario,
+            'intervalo_s': self.intervalo_s,
+            'hilo_activo': self._hilo is not None and self._hilo.is_alive(),
+            'historial': historial,
+            'ultimo_error': self._ultimo_error
+        }
+
+
+# Instancia compartida del proceso (main.py la inicia)
+barrido_sesiones = BarridoSesiones()
+atexit.register(barrido_sesiones.detener)
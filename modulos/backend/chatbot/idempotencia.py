@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reintentos Idempotentes en los Endpoints de Escritura del Chatbot
+=================================================================
+Con el Wi-Fi del local los teléfonos reintentan calificaciones, comentarios y
+llamadas al mesero, y los clientes impacientes tocan "llamar mesero" varias veces.
+Cada repetición era una fila y una transacción nuevas.
+
+- Cabecera Idempotency-Key: el decorador @idempotente guarda la respuesta de la
+  primera petición (no las 5xx, que se pueden reintentar) durante TTL_IDEMPOTENCIA_S
+  y la devuelve tal cual a las repeticiones, con la cabecera Idempotent-Replayed.
+  La misma clave con otro cuerpo es un error del cliente (422). Si la original sigue
+  en curso, la repetición espera su resultado (409 si no llega a tiempo).
+- Ventana por (sesión, tipo) para las llamadas al mesero: mientras haya una llamada
+  igual sin atender de menos de VENTANA_LLAMADA_S se devuelve la respuesta original.
+  Se mira primero la caché y, si no está (otro worker la recibió), la base con el
+  índice por sesión. Al atenderse la llamada (tema 'notificaciones' del bus, desde
+  cualquier worker) la ventana se cierra para que el cliente pueda volver a llamar.
+- Ambas cachés están acotadas (TTL + máximo de entradas, se descartan las más
+  viejas) y por worker; los contadores de aciertos se ven en
+  GET /admin/chatbot/api/idempotencia.
+"""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, jsonify, make_response
+
+from modulos.backend.menu.database.managers.bus_eventos import bus_eventos
+
+TTL_IDEMPOTENCIA_S = 24 * 60 * 60
+MAXIMO_CLAVES = 10000
+LARGO_MAXIMO_CLAVE = 200
+ESPERA_EN_CURSO_S = 10
+
+VENTANA_LLAMADA_S = 60
+MAXIMO_LLAMADAS = 5000
+
+
+class CacheTTL:
+    """Diccionario con vencimiento por entrada y tamaño máximo (descarta las más antiguas)"""
+
+    def __init__(self, ttl_s, maximo):
+        self.ttl_s = ttl_s
+        self.maximo = maximo
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.expiradas = 0
+        self.desalojadas = 0
+
+    def obtener(self, clave, ahora=None):
+        ahora = ahora or time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            vence, valor = entrada
+            if vence <= ahora:
+                del self._datos[clave]
+                self.expiradas += 1
+                return None
+            return valor
+
+    def guardar(self, clave, valor, ttl_s=None, ahora=None):
+        ahora = ahora or time.monotonic()
+        with self._lock:
+            self._datos.pop(clave, None)
+            self._datos[clave] = (ahora + (ttl_s or self.ttl_s), valor)
+            # Orden de inserción ≈ orden de vencimiento: se revisan las más antiguas primero
+            while self._datos:
+                primera, (vence, _) = next(iter(self._datos.items()))
+                if vence > ahora and len(self._datos) <= self.maximo:
+                    break
+                del self._datos[primera]
+                if vence <= ahora:
+                    self.expiradas += 1
+                else:
+                    self.desalojadas += 1
+
+    def descartar(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def __len__(self):
+        return len(self._datos)
+
+    def info(self):
+        return {
+            'entradas': len(self._datos),
+            'maximo': self.maximo,
+            'ttl_s': self.ttl_s,
+            'expiradas': self.expiradas,
+            'desalojadas': self.desalojadas
+        }
+
+
+class Idempotencia:
+    """Respuestas guardadas por Idempotency-Key + ventana de llamadas al mesero"""
+
+    def __init__(self, ttl_s=TTL_IDEMPOTENCIA_S, maximo=MAXIMO_CLAVES,
+                 ventana_s=VENTANA_LLAMADA_S, maximo_llamadas=MAXIMO_LLAMADAS):
+        self.respuestas = CacheTTL(ttl_s, maximo)
+        self.llamadas = CacheTTL(ventana_s, maximo_llamadas)
+        self.ventana_s = ventana_s
+        self._en_curso = {}
+        self._lock = threading.Lock()
+        self._contadores = {
+            'claves_guardadas': 0, 'repeticiones_clave': 0, 'claves_en_conflicto': 0,
+            'esperas_en_curso': 0, 'llamadas_duplicadas_cache': 0, 'llamadas_duplicadas_base': 0
+        }
+
+    def contar(self, contador):
+        with self._lock:
+            self._contadores[contador] += 1
+
+    # ==================== IDEMPOTENCY-KEY ====================
+
+    def comenzar(self, clave):
+        """
+        Marca la clave como en curso. Devuelve None si esta petición debe ejecutarse,
+        o el Event de la petición original si ya hay una en curso con esa clave.
+        """
+        with self._lock:
+            evento = self._en_curso.get(clave)
+            if evento is not None:
+                return evento
+            self._en_curso[clave] = threading.Event()
+            return None
+
+    def terminar(self, clave, guardada=None):
+        if guardada is not None:
+            self.respuestas.guardar(clave, guardada)
+            self.contar('claves_guardadas')
+        with self._lock:
+            evento = self._en_curso.pop(clave, None)
+        if evento is not None:
+            evento.set()
+
+    # ==================== VENTANA DE LLAMADAS ====================
+
+    def llamada_reciente(self, sesion_id, tipo):
+        """Respuesta original de una llamada igual dentro de la ventana (o None)"""
+        return self.llamadas.obtener((str(sesion_id), tipo))
+
+    def registrar_llamada(self, sesion_id, tipo, respuesta, antiguedad_s=0):
+        self.llamadas.guardar((str(sesion_id), tipo), respuesta, ttl_s=max(0.001, self.ventana_s - antiguedad_s))
+
+    def al_cambiar_notificacion(self, tema, evento):
+        """Suscriptor del bus: una llamada atendida o eliminada cierra su ventana"""
+        datos = evento['notificacion']
+        if (evento['tipo'] == 'eliminada' or datos.get('atendida')) and datos.get('sesion_id') is not None:
+            self.llamadas.descartar((str(datos['sesion_id']), datos.get('tipo')))
+
+    def info(self):
+        with self._lock:
+            contadores = dict(self._contadores)
+            en_curso = len(self._en_curso)
+        return {
+            **contadores,
+            'en_curso': en_curso,
+            'respuestas': self.respuestas.info(),
+            'ventana_llamadas': {**self.llamadas.info(), 'ventana_s': self.ventana_s}
+        }
+
+
+def _huella_cuerpo():
+    return hashlib.sha256(request.get_data(cache=True) or b'').hexdigest()
+
+
+def _respuesta_guardada(clave, huella):
+    """Respuesta original para repetir, 422 si la clave se usó con otro cuerpo, o None"""
+    guardada = idempotencia.respuestas.obtener(clave)
+    if guardada is None:
+        return None
+    if guardada[0] != huella:
+        idempotencia.contar('claves_en_conflicto')
+        return jsonify({
+            'success': False,
+            'error': 'Idempotency-Key ya usada con otro contenido'
+        }), 422
+    idempotencia.contar('repeticiones_clave')
+    return _reproducir(guardada)
+
+
+def _reproducir(guardada):
+    estado, cuerpo, tipo_contenido = guardada[1:]
+    respuesta = make_response(cuerpo, estado)
+    respuesta.headers['Content-Type'] = tipo_contenido
+    respuesta.headers['Idempotent-Replayed'] = 'true'
+    return respuesta
+
+
+def idempotente(vista):
+    """
+    Decorador para POSTs del chatbot: con Idempotency-Key, una repetición recibe la
+    respuesta original sin volver a ejecutar la vista. Sin la cabecera no cambia nada.
+    """
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        valor = request.headers.get('Idempotency-Key')
+        if not valor:
+            return vista(*args, **kwargs)
+        if len(valor) > LARGO_MAXIMO_CLAVE or not valor.isprintable():
+            return jsonify({
+                'success': False,
+                'error': f'Idempotency-Key inválida (texto imprimible de hasta {LARGO_MAXIMO_CLAVE} caracteres)'
+            }), 400
+
+        clave = (request.path, valor)
+        huella = _huella_cuerpo()
+        respuesta = _respuesta_guardada(clave, huella)
+        if respuesta is not None:
+            return respuesta
+
+        original = idempotencia.comenzar(clave)
+        if original is not None:
+            # La petición original sigue en curso en otro hilo: esperar su respuesta
+            idempotencia.contar('esperas_en_curso')
+            if original.wait(ESPERA_EN_CURSO_S):
+                respuesta = _respuesta_guardada(clave, huella)
+                if respuesta is not None:
+                    return respuesta
+                # La original no dejó respuesta (error 5xx): esta la reintenta
+                original = idempotencia.comenzar(clave)
+            if original is not None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Hay una petición con la misma Idempotency-Key en curso'
+                }), 409
+
+        guardada = None
+        try:
+            respuesta = make_response(vista(*args, **kwargs))
+            if respuesta.status_code < 500 and not respuesta.is_streamed:
+                guardada = (huella, respuesta.status_code, respuesta.get_data(), respuesta.content_type)
+            return respuesta
+        finally:
+            idempotencia.terminar(clave, guardada)
+
+    return envoltura
+
+
+# Instancia compartida del proceso
+idempotencia = Idempotencia()
+bus_eventos.suscribir('notificaciones', idempotencia.al_cambiar_notificacion)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Latidos de Sesión con Escritura Diferida
+========================================
+Cada teléfono abierto reporta actividad (POST /sesion/<id>/actividad, lotes de
+analytics, reingresos por /sesion/iniciar). En lugar de un SELECT + COMMIT sobre
+chatbot_sesiones por latido, el último momento visto de cada sesión se guarda en
+memoria y un hilo de fondo lo vuelca cada INTERVALO_VOLCADO_S con un solo
+executemany de UPDATE en una transacción.
+
+- Solo se conserva el latido más reciente por sesión: mil latidos de una mesa en
+  el intervalo son una fila del UPDATE.
+- El UPDATE nunca retrocede la fecha ni toca sesiones cerradas.
+- Las lecturas del mismo proceso fusionan lo pendiente con ultimo_acceso(); entre
+  workers distintos el desfase máximo es el intervalo de volcado.
+- Si el volcado falla, los latidos vuelven al mapa y se reintentan en el siguiente.
+- Al apagar el proceso (atexit) se vuelca lo pendiente.
+"""
+
+import os
+import atexit
+import threading
+from datetime import datetime
+
+from .analytics_sink import FORMATO_FECHA
+from modulos.backend.menu.database.managers.db_manager import get_engine, CHATBOT_DB_PATH
+
+INTERVALO_VOLCADO_S = 5
+MAXIMO_SESIONES_CONOCIDAS = 10000
+
+SQL_VOLCAR = (
+    "UPDATE chatbot_sesiones SET fecha_ultimo_acceso = ? "
+    "WHERE id = ? AND activa = 1 AND (fecha_ultimo_acceso IS NULL OR fecha_ultimo_acceso < ?)"
+)
+
+
+class LatidosSesion:
+    """Mapa sesion_id -> último latido, volcado por lotes a chatbot_sesiones"""
+
+    def __init__(self, db_path=CHATBOT_DB_PATH, intervalo_s=INTERVALO_VOLCADO_S):
+        self.db_path = db_path
+        self.intervalo_s = intervalo_s
+        self._pendientes = {}
+        # Sesiones que ya se comprobaron en la base: sus latidos no repiten el SELECT
+        self._conocidas = set()
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._pid = None
+        self._detenido = threading.Event()
+        self._contadores = {'latidos': 0, 'volcados': 0, 'filas_volcadas': 0, 'errores': 0}
+        self._ultimo_error = None
+
+    # ==================== LATIDOS ====================
+
+    def registrar(self, sesion_id, fecha=None):
+        """Anota actividad de la sesión (se conserva la más reciente)"""
+        self._asegurar_hilo()
+        fecha = fecha or datetime.utcnow()
+        with self._lock:
+            previa = self._pendientes.get(sesion_id)
+            if previa is None or fecha > previa:
+                self._pendientes[sesion_id] = fecha
+            self._contadores['latidos'] += 1
+        return fecha
+
+    def ultimo_acceso(self, sesion_id, fecha_base):
+        """Último acceso de la sesión: lo guardado en la base o lo pendiente, lo más reciente"""
+        with self._lock:
+            pendiente = self._pendientes.get(sesion_id)
+        if pendiente is None:
+            return fecha_base
+        return max(pendiente, fecha_base) if fecha_base else pendiente
+
+    def es_conocida(self, sesion_id):
+        with self._lock:
+            return sesion_id in self._conocidas
+
+    def marcar_conocida(self, sesion_id):
+        with self._lock:
+            if len(self._conocidas) >= MAXIMO_SESIONES_CONOCIDAS:
+                self._conocidas.clear()
+            self._conocidas.add(sesion_id)
+
+    def descartar(self, sesion_id):
+        """La sesión se cerró: su latido pendiente ya no importa"""
+        with self._lock:
+            self._pendientes.pop(sesion_id, None)
+            self._conocidas.discard(sesion_id)
+
+    # ==================== VOLCADO ====================
+
+    def _asegurar_hilo(self):
+        """Arranca el hilo en el primer latido (y de nuevo tras un fork del servidor)"""
+        if self._hilo is not None and self._pid == os.getpid() and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo is not None and self._pid == os.getpid() and self._hilo.is_alive():
+                return
+            if self._pid != os.getpid():
+                # El hijo de un fork no hereda el hilo; las sesiones conocidas siguen valiendo
+                self._pendientes = {}
+            self._pid = os.getpid()
+            self._detenido.clear()
+            self._hilo = threading.Thread(target=self._bucle, name='latidos-sesion', daemon=True)
+            self._hilo.start()
+
+    def _bucle(self):
+        while not self._detenido.wait(self.intervalo_s):
+            self.vaciar()
+
+    def vaciar(self):
+        """Vuelca ya los latidos pendientes; devuelve cuántas sesiones se actualizaron"""
+        with self._lock:
+            lote, self._pendientes = self._pendientes, {}
+        if not lote:
+            return 0
+
+        filas = []
+        for sesion_id, fecha in lote.items():
+            texto = fecha.strftime(FORMATO_FECHA)
+            filas.append((texto, sesion_id, texto))
+        try:
+            with get_engine(self.db_path).begin() as conexion:
+                actualizadas = conexion.exec_driver_sql(SQL_VOLCAR, filas).rowcount
+        except Exception as e:
+            # Devolver al mapa sin pisar latidos más nuevos llegados mientras tanto
+            with self._lock:
+                for sesion_id, fecha in lote.items():
+                    previa = self._pendientes.get(sesion_id)
+                    if previa is None or fecha > previa:
+                        self._pendientes[sesion_id] = fecha
+                self._contadores['errores'] += 1
+            self._ultimo_error = f"{datetime.utcnow().isoformat()} {e}"
+            print(f"⚠️ Error volcando latidos de sesión ({len(lote)} sesiones): {e}")
+            return 0
+
+        with self._lock:
+            self._contadores['volcados'] += 1
+            self._contadores['filas_volcadas'] += len(filas)
+        return actualizadas
+
+    def detener(self):
+        """Detiene el hilo y vuelca lo pendiente (registrado en atexit)"""
+        self._detenido.set()
+        if self._hilo is not None and self._pid == os.getpid():
+            self._hilo.join(self.intervalo_s)
+        self.vaciar()
+
+    def info(self):
+        with self._lock:
+            contadores = dict(self._contadores)
+            pendientes = len(self._pendientes)
+        return {
+            **contadores,
+            'pendientes': pendientes,
+            'intervalo_s': self.intervalo_s,
+            'hilo_activo': self._hilo is not None and self._hilo.is_alive(),
+            'ultimo_error': self._ultimo_error
+        }
+
+
+# Instancia compartida del proceso
+latidos_sesion = LatidosSesion()
+atexit.register(latidos_sesion.detener)
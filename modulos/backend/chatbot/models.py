@@ -6,7 +6,7 @@ Modelos SQLAlchemy para el Backend del Chatbot
 Define todas las tablas necesarias para el sistema del chatbot.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, Boolean, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -17,6 +17,14 @@ class Sesion(Base):
     Tabla para trackear sesiones de usuarios en el chatbot
     """
     __tablename__ = 'chatbot_sesiones'
+    # Índices declarados también en las migraciones 0003, 0012 y 0014 (mismo nombre)
+    __table_args__ = (
+        Index('ix_chatbot_sesiones_mesa_activa', 'mesa', 'activa'),
+        # Una sola sesión activa por mesa: destino del ON CONFLICT de iniciar_sesion
+        Index('ux_chatbot_sesiones_mesa_activa', 'mesa', unique=True, sqlite_where=text('activa = 1')),
+        Index('ix_chatbot_sesiones_fecha_inicio', 'fecha_inicio'),
+        Index('ix_chatbot_sesiones_activa_acceso', 'activa', 'fecha_ultimo_acceso'),
+    )
     
     id = Column(Integer, primary_key=True)
     mesa = Column(String(20), nullable=False)  # Mesa o "barra"
@@ -37,6 +45,10 @@ class Calificacion(Base):
     Tabla para almacenar calificaciones de 1 a 5 estrellas
     """
     __tablename__ = 'chatbot_calificaciones'
+    __table_args__ = (
+        Index('ix_chatbot_calificaciones_fecha', 'fecha_calificacion'),
+        Index('ix_chatbot_calificaciones_sesion', 'sesion_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     sesion_id = Column(Integer, ForeignKey('chatbot_sesiones.id'), nullable=False)
@@ -52,6 +64,10 @@ class Comentario(Base):
     Tabla para comentarios y sugerencias de los clientes
     """
     __tablename__ = 'chatbot_comentarios'
+    __table_args__ = (
+        Index('ix_chatbot_comentarios_fecha', 'fecha_comentario'),
+        Index('ix_chatbot_comentarios_sesion', 'sesion_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     sesion_id = Column(Integer, ForeignKey('chatbot_sesiones.id'), nullable=False)
@@ -68,6 +84,11 @@ class NotificacionMesero(Base):
     Tabla para notificaciones al personal (llamar mesero, etc.)
     """
     __tablename__ = 'chatbot_notificaciones'
+    __table_args__ = (
+        Index('ix_chatbot_notificaciones_pendientes', 'atendida', 'prioridad', 'fecha_notificacion'),
+        Index('ix_chatbot_notificaciones_fecha', 'fecha_notificacion'),
+        Index('ix_chatbot_notificaciones_sesion', 'sesion_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     sesion_id = Column(Integer, ForeignKey('chatbot_sesiones.id'), nullable=False)
@@ -78,6 +99,8 @@ class NotificacionMesero(Base):
     atendida_por = Column(String(100))  # Nombre del mesero/staff que atendió
     fecha_atencion = Column(DateTime)
     prioridad = Column(String(20), default='normal')  # 'baja', 'normal', 'alta', 'urgente'
+    asignada_a = Column(String(100))  # Mesero al que el despachador asignó la llamada (migración 0013)
+    fecha_asignacion = Column(DateTime)
     
     # Relación
     sesion = relationship("Sesion", back_populates="notificaciones")
@@ -87,6 +110,10 @@ class Analytics(Base):
     Tabla para métricas y analytics del chatbot
     """
     __tablename__ = 'chatbot_analytics'
+    __table_args__ = (
+        Index('ix_chatbot_analytics_fecha', 'fecha'),
+        Index('ux_chatbot_analytics_id_cliente', 'id_cliente', unique=True),
+    )
     
     id = Column(Integer, primary_key=True)
     fecha = Column(DateTime, default=datetime.utcnow)
@@ -95,7 +122,64 @@ class Analytics(Base):
     valor_numerico = Column(Float)  # Para calificaciones, tiempo de sesión, etc.
     valor_texto = Column(String(500))  # Para tracking de acciones específicas
     metadatos = Column(Text)  # JSON con datos adicionales
-    
+    id_cliente = Column(String(64))  # Id del evento generado en el navegador (lotes idempotentes)
+
+# ==================== ROLLUPS DE ANALYTICS ====================
+# Agregados por hora y por día que consolida analytics_rollups.py (ver migración 0010).
+# granularidad: 'hora' (periodo 'YYYY-MM-DD HH:00') o 'dia' (periodo 'YYYY-MM-DD')
+
+class RollupSesiones(Base):
+    """Sesiones iniciadas por mesa y periodo"""
+    __tablename__ = 'chatbot_rollup_sesiones'
+
+    granularidad = Column(String(4), primary_key=True)
+    periodo = Column(String(16), primary_key=True)
+    mesa = Column(String(20), primary_key=True)
+    sesiones = Column(Integer, nullable=False, default=0)
+
+class RollupCalificaciones(Base):
+    """Suma y cantidad de estrellas por categoría y periodo"""
+    __tablename__ = 'chatbot_rollup_calificaciones'
+
+    granularidad = Column(String(4), primary_key=True)
+    periodo = Column(String(16), primary_key=True)
+    categoria = Column(String(50), primary_key=True)
+    suma_estrellas = Column(Integer, nullable=False, default=0)
+    cantidad = Column(Integer, nullable=False, default=0)
+
+class RollupNotificaciones(Base):
+    """Notificaciones por tipo, prioridad y periodo"""
+    __tablename__ = 'chatbot_rollup_notificaciones'
+
+    granularidad = Column(String(4), primary_key=True)
+    periodo = Column(String(16), primary_key=True)
+    tipo_notificacion = Column(String(50), primary_key=True)
+    prioridad = Column(String(20), primary_key=True)
+    cantidad = Column(Integer, nullable=False, default=0)
+
+class RollupEstado(Base):
+    """Último id consolidado de cada tabla fuente"""
+    __tablename__ = 'chatbot_rollup_estado'
+
+    fuente = Column(String(50), primary_key=True)
+    ultimo_id = Column(Integer, nullable=False, default=0)
+    fecha_actualizacion = Column(DateTime)
+
+class TareaChatbot(Base):
+    """
+    Turno de las tareas de fondo entre workers (ver expiracion_sesiones.py):
+    solo el propietario con el turno vigente la ejecuta, y queda el resultado
+    de la última pasada para consultarlo desde cualquier worker
+    """
+    __tablename__ = 'chatbot_tareas'
+
+    tarea = Column(String(50), primary_key=True)
+    propietario = Column(String(100), nullable=False)  # host:pid del worker
+    vence = Column(DateTime, nullable=False)  # Fin del turno si no se renueva
+    ultima_ejecucion = Column(DateTime)
+    ultimo_resultado = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+
 class ConfiguracionChatbot(Base):
     """
     Tabla para configuraciones del chatbot
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Notificaciones al Mesero en Vivo (Server-Sent Events)
+=====================================================
+Los paneles del personal dejaban de consultar cada pocos segundos el JOIN de
+notificaciones pendientes: GET /admin/chatbot/api/notificaciones/stream mantiene
+abierta una respuesta text/event-stream y empuja cada cambio apenas se confirma.
+
+- Publicación: listeners del ORM sobre NotificacionMesero dejan los cambios del
+  flush ('nueva', 'atendida', 'actualizada') en el tema 'notificaciones' del bus de
+  eventos, que los publica en el after_commit (un rollback los descarta) y los
+  entrega al canal de cada worker. Cualquier endpoint que modifique notificaciones
+  queda cubierto sin llamar a nada.
+- Canal: historial circular de los últimos CAPACIDAD_HISTORIAL eventos con id
+  creciente y una Condition; cada suscriptor lee del historial a su ritmo, así que
+  un cliente lento no frena a los demás ni acumula memoria.
+- Reanudación: el id de evento es '<época del proceso>-<número>'. Con Last-Event-ID
+  de este mismo proceso y aún en el historial se envía solo lo que faltó; si no
+  (el navegador reconectó a otro worker, reinicio o demasiado atraso) se envía una
+  instantánea 'pendientes'.
+- Latido (comentario SSE) cada LATIDO_S para mantener viva la conexión y detectar
+  clientes caídos; cada respuesta dura a lo sumo DURACION_MAXIMA_S y el navegador
+  reconecta solo con su Last-Event-ID.
+- Cada stream abierto ocupa un hilo del worker de gunicorn (gthread) hasta
+  DURACION_MAXIMA_S. El cupo por worker se deriva de los hilos configurados
+  (GUNICORN_THREADS, la misma variable que usa render.yaml en --threads) dejando
+  HILOS_LIBRES para el menú, la API del chatbot y el propio 503 + Retry-After.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from flask import Response, jsonify, stream_with_context
+from sqlalchemy import event, inspect
+
+from .models import NotificacionMesero
+from .despachador_notificaciones import serializar
+from modulos.backend.menu.database.managers.bus_eventos import bus_eventos, publicar_al_confirmar
+
+CAPACIDAD_HISTORIAL = 500
+HILOS_WORKER = int(os.environ.get('GUNICORN_THREADS', '32'))
+HILOS_LIBRES = 8
+MAXIMO_SUSCRIPTORES = max(0, min(20, HILOS_WORKER - HILOS_LIBRES))
+LATIDO_S = 15
+DURACION_MAXIMA_S = 600
+REINTENTO_MS = 3000
+
+
+class LimiteSuscriptores(Exception):
+    """No quedan conexiones SSE disponibles en este worker"""
+
+
+class CanalNotificaciones:
+    """Historial circular de eventos + Condition para despertar a los suscriptores"""
+
+    def __init__(self, capacidad=CAPACIDAD_HISTORIAL, maximo_suscriptores=MAXIMO_SUSCRIPTORES):
+        self.epoca = f"{time.time_ns():x}{os.getpid():x}"
+        self.maximo_suscriptores = maximo_suscriptores
+        self._eventos = deque(maxlen=capacidad)
+        self._numero = 0
+        self._suscriptores = 0
+        self._publicados = 0
+        self._condicion = threading.Condition()
+
+    # ==================== PUBLICACIÓN ====================
+
+    def publicar(self, tipo, datos):
+        """Agrega el evento al historial y despierta a todos los suscriptores"""
+        with self._condicion:
+            self._numero += 1
+            self._eventos.append((self._numero, tipo, json.dumps(datos, ensure_ascii=False)))
+            self._publicados += 1
+            self._condicion.notify_all()
+            return self.id_evento(self._numero)
+
+    # ==================== LECTURA ====================
+
+    def id_evento(self, numero):
+        return f"{self.epoca}-{numero}"
+
+    def numero_desde_id(self, id_evento):
+        """Número del Last-Event-ID si es de este proceso; None si hay que mandar instantánea"""
+        epoca, _, numero = (id_evento or '').rpartition('-')
+        if epoca != self.epoca or not numero.isdigit():
+            return None
+        return int(numero)
+
+    def numero_actual(self):
+        with self._condicion:
+            return self._numero
+
+    def _desde(self, numero):
+        """Eventos posteriores a 'numero' o None si ya salieron del historial"""
+        if numero > self._numero:
+            return None
+        primero = self._eventos[0][0] if self._eventos else self._numero + 1
+        if numero < primero - 1:
+            return None
+        return [evento for evento in self._eventos if evento[0] > numero]
+
+    def esperar(self, numero, timeout):
+        """
+        Bloquea hasta que haya eventos después de 'numero' o venza el timeout.
+        Devuelve la lista (vacía si venció) o None si el suscriptor se quedó atrás.
+        """
+        with self._condicion:
+            self._condicion.wait_for(lambda: self._numero != numero, timeout)
+            return self._desde(numero)
+
+    # ==================== SUSCRIPTORES ====================
+
+    def suscribir(self):
+        with self._condicion:
+            if self._suscriptores >= self.maximo_suscriptores:
+                raise LimiteSuscriptores(f'Máximo {self.maximo_suscriptores} conexiones por worker')
+            self._suscriptores += 1
+
+    def desuscribir(self):
+        with self._condicion:
+            self._suscriptores = max(0, self._suscriptores - 1)
+
+    def info(self):
+        with self._condicion:
+            return {
+                'suscriptores': self._suscriptores,
+                'maximo_suscriptores': self.maximo_suscriptores,
+                'publicados': self._publicados,
+                'ultimo_id': self.id_evento(self._numero),
+                'en_historial': len(self._eventos)
+            }
+
+
+def formatear_evento(id_evento, tipo, datos):
+    """Bloque SSE (datos ya serializados en JSON, una sola línea)"""
+    return f"id: {id_evento}\nevent: {tipo}\ndata: {datos}\n\n"
+
+
+def flujo(canal, ultimo_id, instantanea, latido_s=LATIDO_S, duracion_s=DURACION_MAXIMA_S):
+    """
+    Generador de la respuesta SSE.
+    instantanea() devuelve la lista de pendientes para el evento 'pendientes'.
+    """
+    def enviar_instantanea():
+        numero = canal.numero_actual()
+        datos = json.dumps({'notificaciones': instantanea()}, ensure_ascii=False)
+        return numero, formatear_evento(canal.id_evento(numero), 'pendientes', datos)
+
+    yield f"retry: {REINTENTO_MS}\n\n"
+    numero = canal.numero_desde_id(ultimo_id)
+    if numero is None or canal.esperar(numero, 0) is None:
+        numero, bloque = enviar_instantanea()
+        yield bloque
+
+    fin = time.monotonic() + duracion_s
+    while time.monotonic() < fin:
+        eventos = canal.esperar(numero, min(latido_s, max(0.0, fin - time.monotonic())))
+        if eventos is None:
+            numero, bloque = enviar_instantanea()
+            yield bloque
+        elif not eventos:
+            yield ": latido\n\n"
+        else:
+            for numero, tipo, datos in eventos:
+                yield formatear_evento(canal.id_evento(numero), tipo, datos)
+
+
+def responder_stream(canal, ultimo_id, instantanea):
+    """Respuesta text/event-stream, o 503 + Retry-After si el cupo del worker está lleno"""
+    try:
+        canal.suscribir()
+    except LimiteSuscriptores as e:
+        respuesta = jsonify({
+            'success': False,
+            'error': str(e)
+        })
+        respuesta.headers['Retry-After'] = '10'
+        return respuesta, 503
+
+    respuesta = Response(
+        stream_with_context(flujo(canal, ultimo_id, instantanea)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # Libera el cupo al cerrar la respuesta, haya empezado o no el generador
+    respuesta.call_on_close(canal.desuscribir)
+    return respuesta
+
+
+# ==================== PUBLICACIÓN DESDE EL ORM ====================
+
+def _anotar(conexion, notificacion, tipo):
+    sesion_db = inspect(notificacion).session
+    if sesion_db is None:
+        return
+    fila = conexion.exec_driver_sql(
+        "SELECT mesa, nombre_cliente FROM chatbot_sesiones WHERE id = ?", (notificacion.sesion_id,)
+    ).first()
+    mesa, cliente = fila if fila else (None, None)
+    publicar_al_confirmar(sesion_db, 'notificaciones', {
+        'tipo': tipo, 'notificacion': serializar(notificacion, mesa, cliente)
+    })
+
+
+def _al_insertar(mapper, conexion, notificacion):
+    _anotar(conexion, notificacion, 'nueva')
+
+
+def _al_modificar(mapper, conexion, notificacion):
+    historial = inspect(notificacion).attrs.atendida.history
+    _anotar(conexion, notificacion, 'atendida' if True in historial.added else 'actualizada')
+
+
+def _al_borrar(mapper, conexion, notificacion):
+    sesion_db = inspect(notificacion).session
+    if sesion_db is not None:
+        publicar_al_confirmar(sesion_db, 'notificaciones', {
+            'tipo': 'eliminada', 'notificacion': {'id': notificacion.id}
+        })
+
+
+def _al_publicar(tema, datos):
+    """Suscriptor del bus: llegan los cambios confirmados en cualquier worker"""
+    canal_notificaciones.publicar(datos['tipo'], datos['notificacion'])
+
+
+# Instancia compartida del proceso
+canal_notificaciones = CanalNotificaciones()
+
+event.listen(NotificacionMesero, 'after_insert', _al_insertar)
+event.listen(NotificacionMesero, 'after_update', _al_modificar)
+event.listen(NotificacionMesero, 'after_delete', _al_borrar)
+bus_eventos.suscribir('notificaciones', _al_publicar)
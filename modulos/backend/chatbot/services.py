@@ -6,9 +6,9 @@ Servicios y Utilidades para el Backend del Chatbot
 Funciones de migración, inicialización y utilidades.
 """
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
 from .models import Base, ConfiguracionChatbot, CONFIGURACIONES_DEFAULT
+from modulos.backend.menu.database.managers.db_manager import get_engine, get_session_factory
 import json
 import os
 
@@ -24,7 +24,7 @@ def crear_tablas_chatbot():
             'menu.db'
         )
         
-        engine = create_engine(f'sqlite:///{db_path}')
+        engine = get_engine(db_path)
         
         # Crear todas las tablas del chatbot
         Base.metadata.create_all(engine, checkfirst=True)
@@ -47,9 +47,7 @@ def inicializar_configuracion_default():
             'menu.db'
         )
         
-        engine = create_engine(f'sqlite:///{db_path}')
-        Session = sessionmaker(bind=engine)
-        db = Session()
+        db = get_session_factory(db_path)()
         
         # Insertar configuraciones por defecto si no existen
         configuraciones_insertadas = 0
@@ -98,7 +96,7 @@ def verificar_estado_backend():
                 'configuraciones': 0
             }
         
-        engine = create_engine(f'sqlite:///{db_path}')
+        engine = get_engine(db_path)
         
         # Verificar tablas del chatbot
         with engine.connect() as conn:
@@ -108,8 +106,7 @@ def verificar_estado_backend():
             tablas_chatbot = [row[0] for row in result]
         
         # Verificar configuraciones
-        Session = sessionmaker(bind=engine)
-        db = Session()
+        db = get_session_factory(db_path)()
         
         total_configuraciones = db.query(ConfiguracionChatbot).count()
         
@@ -1007,9 +1007,11 @@ function aplicarFiltros() {
     window.dashboard && window.dashboard.mostrarNotificacion('🔍 Filtros aplicados', 'info');
 }
 
-function marcarTodasLeidas() {
+async function marcarTodasLeidas() {
     console.log('✅ Marcando todas las notificaciones como leídas...');
-    // Implementar lógica aquí
+    const ids = [...notificacionesEnVivo.pendientes.keys()];
+    // Cada atención llega de vuelta por el stream como evento 'atendida'
+    await Promise.all(ids.map(id => notificacionesEnVivo.atender(id)));
     window.dashboard && window.dashboard.mostrarNotificacion('✅ Notificaciones marcadas como leídas', 'success');
 }
 
@@ -1111,4 +1113,110 @@ async function resetearFondo() {
         console.error('❌ Error restableciendo fondo:', error);
         alert(`❌ Error al restablecer fondo: ${error.message}\n\nIntenta nuevamente o contacta al administrador.`);
     }
-}
\ No newline at end of file
+}
+
+// ===============================================
+// 🔔 NOTIFICACIONES EN VIVO (Server-Sent Events)
+// ===============================================
+// El servidor empuja cada llamada al mesero apenas se guarda; EventSource
+// reconecta solo y reenvía Last-Event-ID para recibir lo que faltó.
+
+const notificacionesEnVivo = {
+    pendientes: new Map(),
+    fuente: null,
+
+    conectar() {
+        if (!window.EventSource || !document.getElementById('lista-notificaciones')) return;
+
+        this.fuente = new EventSource('/admin/chatbot/api/notificaciones/stream');
+
+        this.fuente.addEventListener('pendientes', (e) => {
+            const datos = JSON.parse(e.data);
+            this.pendientes = new Map(datos.notificaciones.map(n => [n.id, n]));
+            this.render();
+        });
+
+        this.fuente.addEventListener('nueva', (e) => {
+            const notificacion = JSON.parse(e.data);
+            this.pendientes.set(notificacion.id, notificacion);
+            this.render();
+            window.dashboard && window.dashboard.mostrarNotificacion(
+                `🔔 Mesa ${notificacion.mesa}: ${notificacion.mensaje || notificacion.tipo}`,
+                notificacion.es_urgente ? 'error' : 'info'
+            );
+        });
+
+        this.fuente.addEventListener('actualizada', (e) => {
+            const notificacion = JSON.parse(e.data);
+            if (notificacion.atendida) {
+                this.pendientes.delete(notificacion.id);
+            } else {
+                this.pendientes.set(notificacion.id, notificacion);
+            }
+            this.render();
+        });
+
+        ['atendida', 'eliminada'].forEach(tipo => {
+            this.fuente.addEventListener(tipo, (e) => {
+                this.pendientes.delete(JSON.parse(e.data).id);
+                this.render();
+            });
+        });
+
+        this.fuente.onerror = () => console.warn('⚠️ Stream de notificaciones interrumpido, reconectando...');
+    },
+
+    render() {
+        const contenedor = document.getElementById('lista-notificaciones');
+        const contador = document.getElementById('notificaciones-pendientes');
+        const filtro = document.getElementById('filtro-prioridad');
+        if (contador) contador.textContent = this.pendientes.size;
+        if (!contenedor) return;
+
+        const prioridad = filtro ? filtro.value : '';
+        const visibles = [...this.pendientes.values()]
+            .filter(n => !prioridad || n.prioridad_efectiva === prioridad)
+            .sort((a, b) => (a.clave_despacho - b.clave_despacho) || (a.id - b.id));  // mismo orden que el despachador
+
+        if (!visibles.length) {
+            contenedor.innerHTML = '<div class="loading-message">✅ Sin notificaciones pendientes</div>';
+            return;
+        }
+
+        contenedor.innerHTML = visibles.map(n => `
+            <div class="notification-card ${n.es_urgente ? 'urgente' : ''}" data-id="${n.id}">
+                <div class="notification-info">
+                    <strong>Mesa ${n.mesa}</strong> · ${n.cliente}
+                    <span class="notification-priority">${n.prioridad_efectiva}</span>
+                    <p>${n.mensaje || n.tipo}</p>
+                    ${n.asignada_a ? `<small>👤 ${n.asignada_a}</small>` : ''}
+                    <small>${new Date(n.fecha + 'Z').toLocaleTimeString()}</small>
+                </div>
+                <button class="btn-primary" onclick="notificacionesEnVivo.atender(${n.id})">
+                    <i class="fas fa-check"></i> Atender
+                </button>
+            </div>
+        `).join('');
+    },
+
+    async atender(id) {
+        try {
+            const response = await fetch(`/admin/chatbot/api/notificacion/${id}/atender`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ atendida_por: 'Dashboard' })
+            });
+            if (!response.ok) {
+                console.error('❌ Error atendiendo notificación:', response.status);
+            }
+        } catch (error) {
+            console.error('❌ Error de conexión:', error);
+        }
+    }
+};
+
+document.addEventListener('DOMContentLoaded', function() {
+    notificacionesEnVivo.conectar();
+    const filtro = document.getElementById('filtro-prioridad');
+    if (filtro) filtro.addEventListener('change', () => notificacionesEnVivo.render());
+});
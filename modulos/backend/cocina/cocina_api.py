@@ -4,20 +4,28 @@ API especializada para obtener datos de recetas desde el libro de recetas
 """
 
 from flask import Blueprint, jsonify, request
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
 from modulos.backend.menu.database.base import Base
 from modulos.backend.menu.database.models.producto import Producto
 from modulos.backend.menu.database.models.ingrediente import Ingrediente
 from modulos.backend.menu.database.models.categoria import Categoria
+from modulos.backend.menu.database.managers.db_manager import get_engine, get_session_factory
+from modulos.backend.menu.database.managers.lectura_catalogo import (
+    leer_resumen_recetas, leer_resumen_recetas_campos, serializar,
+    parsear_campos, parsear_inclusiones, CAMPOS_RECETA_RESUMEN, INCLUSIONES_RECETA
+)
+from modulos.backend.menu.database.managers.busqueda_catalogo import buscar_ids, AMBITO_COCINA
+from modulos.backend.menu.database.managers.estadisticas_incrementales import leer_global, leer_por_categoria
 import os
 
-# Crear engine de base de datos
+# Engine compartido de base de datos
 DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'menu', 'database', 'menu.db')
-engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
+engine = get_engine(DB_PATH)
 
-# Crear sesión de base de datos
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sesión con alcance de request
+SessionLocal = get_session_factory(DB_PATH)
+
+# Máximo de resultados de la búsqueda por relevancia
+LIMITE_BUSQUEDA = 100
 
 # Crear blueprint para API de cocina
 cocina_api_bp = Blueprint('cocina_api', __name__, url_prefix='/api/cocina')
@@ -35,19 +43,16 @@ def dashboard_cocina():
     """Dashboard con estadísticas de cocina"""
     db = get_db()
     try:
-        # Estadísticas básicas
-        total_productos = db.query(Producto).count()
-        productos_preparados = db.query(Producto).filter(Producto.tipo_producto == 'preparado').count()
-        productos_simples = db.query(Producto).filter(Producto.tipo_producto == 'simple').count()
-        total_categorias = db.query(Categoria).count()
+        # Estadísticas básicas (fila global de catalogo_estadisticas)
+        totales = leer_global(db.connection())
         
         return jsonify({
             'success': True,
             'dashboard': {
-                'total_productos': total_productos,
-                'productos_preparados': productos_preparados,
-                'productos_simples': productos_simples,
-                'total_categorias': total_categorias
+                'total_productos': totales['productos'],
+                'productos_preparados': totales['preparados'],
+                'productos_simples': totales['simples'],
+                'total_categorias': totales['categorias']
             }
         })
     except Exception as e:
@@ -57,33 +62,19 @@ def dashboard_cocina():
 
 @cocina_api_bp.route('/recetas', methods=['GET'])
 def obtener_recetas():
-    """Obtiene todas las recetas de productos preparados"""
+    """Obtiene todas las recetas de productos preparados (?fields= para limitar los campos)"""
+    try:
+        campos = parsear_campos(request.args.get('fields'), CAMPOS_RECETA_RESUMEN)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
     db = get_db()
     try:
-        # Obtener solo productos preparados que tienen recetas
-        productos_preparados = db.query(Producto).filter(
-            Producto.tipo_producto == 'preparado'
-        ).all()
-        
-        recetas = []
-        for producto in productos_preparados:
-            # Obtener categoría
-            categoria = db.query(Categoria).filter(Categoria.id == producto.categoria_id).first()
-            categoria_nombre = categoria.nombre if categoria else "Sin categoría"
-            
-            receta = {
-                'id': producto.id,
-                'nombre': producto.nombre,
-                'descripcion': producto.descripcion,
-                'imagen_url': producto.imagen_url,
-                'categoria': categoria_nombre,
-                'tiempo_preparacion': producto.tiempo_preparacion,
-                'precio': float(producto.precio) if producto.precio else 0,
-                'disponible': producto.disponible,
-                'tiene_ingredientes': len(producto.ingredientes) > 0,
-                'total_ingredientes': len(producto.ingredientes)
-            }
-            recetas.append(receta)
+        # Productos preparados con categoría y conteo de ingredientes en una sola consulta
+        if campos is None:
+            recetas = serializar(leer_resumen_recetas(db.connection()))
+        else:
+            recetas = leer_resumen_recetas_campos(db.connection(), campos)
         
         return jsonify({
             'success': True,
@@ -101,7 +92,12 @@ def obtener_recetas():
 
 @cocina_api_bp.route('/receta/<int:producto_id>', methods=['GET'])
 def obtener_detalle_receta(producto_id):
-    """Obtiene el detalle completo de una receta específica"""
+    """Obtiene el detalle completo de una receta específica (?include= vacío omite los ingredientes)"""
+    try:
+        incluir = parsear_inclusiones(request.args.get('include'), INCLUSIONES_RECETA, INCLUSIONES_RECETA)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
     db = get_db()
     try:
         # Obtener producto preparado
@@ -122,7 +118,7 @@ def obtener_detalle_receta(producto_id):
         
         # Obtener ingredientes
         ingredientes = []
-        for ingrediente in producto.ingredientes:
+        for ingrediente in (producto.ingredientes if 'ingredientes' in incluir else []):
             ingredientes.append({
                 'id': ingrediente.id,
                 'nombre': ingrediente.nombre,
@@ -142,10 +138,11 @@ def obtener_detalle_receta(producto_id):
             'tiempo_preparacion': producto.tiempo_preparacion,
             'instrucciones_preparacion': producto.instrucciones_preparacion,
             'notas_cocina': producto.notas_cocina,
-            'ingredientes': ingredientes,
-            'total_ingredientes': len(ingredientes),
             'disponible': producto.disponible
         }
+        if 'ingredientes' in incluir:
+            receta_completa['ingredientes'] = ingredientes
+            receta_completa['total_ingredientes'] = len(ingredientes)
         
         return jsonify({
             'success': True,
@@ -162,7 +159,7 @@ def obtener_detalle_receta(producto_id):
 
 @cocina_api_bp.route('/buscar', methods=['GET'])
 def buscar_recetas():
-    """Busca recetas por nombre o categoría"""
+    """Busca recetas por nombre, descripción, instrucciones, ingredientes o categoría (por relevancia)"""
     db = get_db()
     try:
         termino = request.args.get('q', '').strip()
@@ -174,42 +171,28 @@ def buscar_recetas():
                 'mensaje': 'Proporciona un término de búsqueda'
             })
         
-        # Buscar en productos preparados
-        productos = db.query(Producto).filter(
-            Producto.tipo_producto == 'preparado',
-            Producto.nombre.ilike(f'%{termino}%')
-        ).all()
-        
-        # También buscar por categoría
-        categorias = db.query(Categoria).filter(
-            Categoria.nombre.ilike(f'%{termino}%')
-        ).all()
-        
-        productos_por_categoria = []
-        for categoria in categorias:
-            productos_cat = db.query(Producto).filter(
-                Producto.categoria_id == categoria.id,
-                Producto.tipo_producto == 'preparado'
-            ).all()
-            productos_por_categoria.extend(productos_cat)
-        
-        # Combinar resultados sin duplicados
-        todos_productos = list(set(productos + productos_por_categoria))
+        # Índice de texto completo (incluye nombres de ingredientes y de la categoría),
+        # más las correcciones por trigramas si el término trae errores de tipeo
+        conexion = db.connection()
+        encontrados = buscar_ids(
+            conexion, termino, Producto.tipo_producto == 'preparado',
+            ambito=AMBITO_COCINA, limite=LIMITE_BUSQUEDA
+        )
+        resumenes = {
+            resumen.id: resumen
+            for resumen in leer_resumen_recetas(conexion, Producto.id.in_([id_ for id_, _, _, _ in encontrados]))
+        }
         
         recetas = []
-        for producto in todos_productos:
-            categoria = db.query(Categoria).filter(Categoria.id == producto.categoria_id).first()
-            categoria_nombre = categoria.nombre if categoria else "Sin categoría"
-            
-            receta = {
-                'id': producto.id,
-                'nombre': producto.nombre,
-                'descripcion': producto.descripcion,
-                'imagen_url': producto.imagen_url,
-                'categoria': categoria_nombre,
-                'tiempo_preparacion': producto.tiempo_preparacion,
-                'total_ingredientes': len(producto.ingredientes)
-            }
+        for producto_id, relevancia, fragmento, similitud in encontrados:
+            resumen = resumenes.get(producto_id)
+            if resumen is None:
+                continue
+            receta = resumen.to_dict()
+            receta['relevancia'] = relevancia
+            receta['fragmento'] = fragmento
+            if similitud is not None:
+                receta['similitud'] = similitud
             recetas.append(receta)
         
         return jsonify({
@@ -232,24 +215,18 @@ def obtener_estadisticas():
     """Obtiene estadísticas básicas para el dashboard"""
     db = get_db()
     try:
-        total_recetas = db.query(Producto).filter(Producto.tipo_producto == 'preparado').count()
-        recetas_disponibles = db.query(Producto).filter(
-            Producto.tipo_producto == 'preparado',
-            Producto.disponible == True
-        ).count()
-        
-        total_ingredientes = db.query(Ingrediente).count()
-        
-        categorias_con_recetas = db.query(Categoria).join(Producto).filter(
-            Producto.tipo_producto == 'preparado'
-        ).distinct().count()
+        conexion = db.connection()
+        totales = leer_global(conexion)
+        categorias_con_recetas = sum(
+            1 for categoria in leer_por_categoria(conexion) if categoria['preparados'] > 0
+        )
         
         return jsonify({
             'success': True,
             'estadisticas': {
-                'total_recetas': total_recetas,
-                'recetas_disponibles': recetas_disponibles,
-                'total_ingredientes': total_ingredientes,
+                'total_recetas': totales['preparados'],
+                'recetas_disponibles': totales['preparados_disponibles'],
+                'total_ingredientes': totales['ingredientes'],
                 'categorias_activas': categorias_con_recetas
             }
         })
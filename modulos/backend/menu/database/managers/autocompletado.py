@@ -0,0 +1,379 @@
+"""
+⌨️ AUTOCOMPLETADO DEL CATÁLOGO
+Responsabilidad única: sugerencias por prefijo (productos, recetas, categorías e
+ingredientes) servidas desde memoria, sin consultar SQLite en cada tecla.
+
+- Un trie por tipo de sugerencia sobre el texto normalizado (sin tildes, casefold).
+  Cada nombre se indexa desde cada una de sus palabras ("lat" sugiere "Café Latte"),
+  con más peso si el prefijo coincide con el inicio del nombre.
+- Cada nodo guarda sus mejores LIMITE_MAXIMO sugerencias ya ordenadas: responder es
+  recorrer tantos nodos como letras tenga el prefijo.
+- Al confirmar una escritura del catálogo en este proceso se aplican los cambios de
+  catalogo_cambios desde el último seq y solo se recalculan los nodos afectados.
+  Las escrituras de otros workers se incorporan en segundo plano cada
+  INTERVALO_SINCRONIZACION_S, mientras se sigue respondiendo con el trie actual.
+"""
+
+import math
+import time
+import heapq
+import threading
+from sqlalchemy import select
+
+from modulos.backend.menu.database.models.producto import Producto
+from modulos.backend.menu.database.models.ingrediente import Ingrediente
+from modulos.backend.menu.database.managers.db_manager import get_engine, MENU_DB_PATH
+from modulos.backend.menu.database.managers import catalogo_version
+from modulos.backend.menu.database.managers.cambios_catalogo import leer_cambios, LIMITE_MAXIMO as LIMITE_CAMBIOS
+from modulos.backend.menu.database.managers.lectura_catalogo import leer_categorias
+from modulos.backend.menu.database.managers.busqueda_trigramas import normalizar
+
+TIPO_PRODUCTO = 'producto'
+TIPO_RECETA = 'receta'
+TIPO_CATEGORIA = 'categoria'
+TIPO_INGREDIENTE = 'ingrediente'
+TIPOS = (TIPO_PRODUCTO, TIPO_RECETA, TIPO_CATEGORIA, TIPO_INGREDIENTE)
+
+# Pesos de ranking: tipo de sugerencia + bonos
+PESOS_TIPO = {TIPO_PRODUCTO: 3.0, TIPO_RECETA: 3.0, TIPO_CATEGORIA: 2.0, TIPO_INGREDIENTE: 1.0}
+BONO_INICIO = 1.0          # el prefijo coincide con el inicio del nombre, no con una palabra interna
+BONO_DISPONIBLE = 0.5      # productos y recetas disponibles antes que los agotados
+BONO_FRECUENCIA_MAX = 1.0  # ingredientes usados en muchas recetas
+
+LIMITE_POR_DEFECTO = 8
+LIMITE_MAXIMO = 20
+# Letras indexadas como nodos; prefijos más largos se filtran en el último nodo
+PROFUNDIDAD_MAXIMA = 16
+INTERVALO_SINCRONIZACION_S = 30
+
+_TABLAS = ('productos', 'categorias', 'ingredientes')
+_CAMPOS_PRODUCTO = ('id', 'nombre', 'tipo_producto', 'disponible')
+
+
+class _Nodo:
+    __slots__ = ('hijos', 'entradas', 'mejores')
+
+    def __init__(self):
+        self.hijos = {}       # letra -> _Nodo
+        self.entradas = {}    # clave -> (orden, termino) de los términos que terminan aquí
+        self.mejores = ()     # ((orden, clave), ...) del subárbol, ordenadas
+
+
+class Trie:
+    """Trie de prefijos con las mejores sugerencias precalculadas en cada nodo"""
+
+    def __init__(self):
+        self._raiz = _Nodo()
+        self._datos = {}      # clave -> diccionario que se entrega al cliente
+        self._terminos = {}   # clave -> [términos indexados]
+
+    def __len__(self):
+        return len(self._datos)
+
+    def _camino(self, termino, crear=False):
+        nodo = self._raiz
+        camino = [nodo]
+        for letra in termino[:PROFUNDIDAD_MAXIMA]:
+            siguiente = nodo.hijos.get(letra)
+            if siguiente is None:
+                if not crear:
+                    return None
+                siguiente = nodo.hijos[letra] = _Nodo()
+            nodo = siguiente
+            camino.append(nodo)
+        return camino
+
+    @staticmethod
+    def _recalcular_nodo(nodo):
+        candidatos = {}
+        for clave, (orden, _) in nodo.entradas.items():
+            candidatos[clave] = orden
+        for hijo in nodo.hijos.values():
+            for orden, clave in hijo.mejores:
+                if clave not in candidatos or orden < candidatos[clave]:
+                    candidatos[clave] = orden
+        nodo.mejores = tuple(heapq.nsmallest(
+            LIMITE_MAXIMO, ((orden, clave) for clave, orden in candidatos.items())
+        ))
+
+    def _recalcular_camino(self, camino):
+        for nodo in reversed(camino):
+            self._recalcular_nodo(nodo)
+
+    def recalcular_todo(self):
+        """Recalcula todos los nodos (tras una carga masiva con recalcular=False)"""
+        pendientes = [(self._raiz, False)]
+        while pendientes:
+            nodo, hijos_listos = pendientes.pop()
+            if hijos_listos:
+                self._recalcular_nodo(nodo)
+            else:
+                pendientes.append((nodo, True))
+                pendientes.extend((hijo, False) for hijo in nodo.hijos.values())
+
+    def insertar(self, clave, datos, terminos, recalcular=True):
+        """
+        Indexa (o reemplaza) la sugerencia 'clave' bajo cada (termino, peso).
+        recalcular=False en cargas masivas: llamar luego a recalcular_todo().
+        """
+        self.quitar(clave, recalcular=recalcular)
+        self._datos[clave] = datos
+        self._terminos[clave] = []
+        for termino, peso in terminos:
+            camino = self._camino(termino, crear=True)
+            orden = (-peso, len(termino), termino, clave)
+            anterior = camino[-1].entradas.get(clave)
+            if anterior is None or orden < anterior[0]:
+                camino[-1].entradas[clave] = (orden, termino)
+            self._terminos[clave].append(termino)
+            if recalcular:
+                self._recalcular_camino(camino)
+
+    def quitar(self, clave, recalcular=True):
+        self._datos.pop(clave, None)
+        for termino in self._terminos.pop(clave, ()):
+            camino = self._camino(termino)
+            if camino is None:
+                continue
+            camino[-1].entradas.pop(clave, None)
+            # Poda de nodos que quedaron vacíos, desde la hoja hacia la raíz
+            profundidad = len(camino) - 1
+            while profundidad > 0 and not camino[profundidad].hijos and not camino[profundidad].entradas:
+                del camino[profundidad - 1].hijos[termino[profundidad - 1]]
+                profundidad -= 1
+            if recalcular:
+                self._recalcular_camino(camino[:profundidad + 1])
+
+    def buscar(self, prefijo, limite=LIMITE_POR_DEFECTO):
+        """[(orden, datos)] de las mejores sugerencias que empiezan por 'prefijo' (normalizado)"""
+        camino = self._camino(prefijo)
+        if camino is None:
+            return []
+        nodo = camino[-1]
+        if len(prefijo) <= PROFUNDIDAD_MAXIMA:
+            mejores = nodo.mejores[:limite]
+        else:
+            # Copia en una sola operación: el hilo de sincronización puede estar modificándolo
+            entradas = tuple(nodo.entradas.items())
+            mejores = sorted(
+                (orden, clave) for clave, (orden, termino) in entradas if termino.startswith(prefijo)
+            )[:limite]
+        resultado = []
+        for orden, clave in mejores:
+            datos = self._datos.get(clave)
+            if datos is not None:
+                resultado.append((orden, datos))
+        return resultado
+
+
+def terminos_de(texto, peso):
+    """Términos indexados para un nombre: desde cada palabra, con bono para el inicio"""
+    palabras = normalizar(texto).split()
+    return [
+        (' '.join(palabras[i:]), peso + (BONO_INICIO if i == 0 else 0))
+        for i in range(len(palabras))
+        if len(palabras[i]) > 1 or i == 0
+    ]
+
+
+class Autocompletado:
+    """Tries del catálogo del proceso, sincronizados con catalogo_cambios"""
+
+    def __init__(self):
+        self._tries = {tipo: Trie() for tipo in TIPOS}
+        self._ingredientes = {}        # ingrediente_id -> nombre normalizado
+        self._usos_ingrediente = {}    # nombre normalizado -> [texto, total]
+        self._seq = None
+        self._version = None
+        self._construido = False
+        self._lock = threading.Lock()
+        self._ultima_sincronizacion = 0.0
+        self._sincronizando = False
+        self.reconstrucciones = 0
+        self.cambios_aplicados = 0
+
+    # ---- Escritura -------------------------------------------------------------
+
+    def _indexar_producto(self, tries, datos, recalcular=True):
+        clave = ('p', datos['id'])
+        tipo = TIPO_RECETA if datos.get('tipo_producto') == 'preparado' else TIPO_PRODUCTO
+        otro = TIPO_PRODUCTO if tipo == TIPO_RECETA else TIPO_RECETA
+        tries[otro].quitar(clave, recalcular=recalcular)
+        peso = PESOS_TIPO[tipo] + (BONO_DISPONIBLE if datos.get('disponible') is not False else 0)
+        tries[tipo].insertar(
+            clave, {'texto': datos['nombre'], 'tipo': tipo, 'id': datos['id']},
+            terminos_de(datos['nombre'], peso), recalcular=recalcular
+        )
+
+    def _indexar_categoria(self, tries, datos, recalcular=True):
+        clave = ('c', datos['id'])
+        if not datos.get('activa', True):
+            tries[TIPO_CATEGORIA].quitar(clave, recalcular=recalcular)
+            return
+        tries[TIPO_CATEGORIA].insertar(
+            clave, {'texto': datos['nombre'], 'tipo': TIPO_CATEGORIA, 'id': datos['id']},
+            terminos_de(datos['nombre'], PESOS_TIPO[TIPO_CATEGORIA]), recalcular=recalcular
+        )
+
+    def _reindexar_ingrediente(self, tries, nombre, recalcular=True):
+        """Los ingredientes se sugieren por nombre, una vez, con el total de recetas que lo usan"""
+        clave = ('i', nombre)
+        uso = self._usos_ingrediente.get(nombre)
+        if not uso or uso[1] <= 0:
+            self._usos_ingrediente.pop(nombre, None)
+            tries[TIPO_INGREDIENTE].quitar(clave, recalcular=recalcular)
+            return
+        texto, total = uso
+        peso = PESOS_TIPO[TIPO_INGREDIENTE] + min(BONO_FRECUENCIA_MAX, 0.25 * math.log2(total))
+        tries[TIPO_INGREDIENTE].insertar(
+            clave, {'texto': texto, 'tipo': TIPO_INGREDIENTE, 'id': None, 'total': total},
+            terminos_de(texto, peso), recalcular=recalcular
+        )
+
+    def _cambiar_ingrediente(self, ingrediente_id, texto):
+        """Actualiza los contadores; devuelve los nombres normalizados a reindexar"""
+        afectados = set()
+        anterior = self._ingredientes.pop(ingrediente_id, None)
+        if anterior is not None and anterior in self._usos_ingrediente:
+            self._usos_ingrediente[anterior][1] -= 1
+            afectados.add(anterior)
+        nombre = normalizar(texto) if texto else ''
+        if nombre:
+            self._ingredientes[ingrediente_id] = nombre
+            uso = self._usos_ingrediente.setdefault(nombre, [texto, 0])
+            uso[1] += 1
+            afectados.add(nombre)
+        return afectados
+
+    def _reconstruir(self, conexion):
+        # Cursor fijado antes de leer: lo confirmado después se aplica en la próxima sincronización
+        cambios = leer_cambios(conexion, None)
+        version = catalogo_version.leer_version(conexion) if cambios is None else None
+
+        tries = {tipo: Trie() for tipo in TIPOS}
+        self._ingredientes = {}
+        self._usos_ingrediente = {}
+        for fila in conexion.execute(
+            select(Producto.id, Producto.nombre, Producto.tipo_producto, Producto.disponible)
+        ):
+            self._indexar_producto(tries, fila._asdict(), recalcular=False)
+        for categoria in leer_categorias(conexion):
+            self._indexar_categoria(tries, categoria.to_dict(), recalcular=False)
+        for ingrediente_id, nombre in conexion.execute(select(Ingrediente.id, Ingrediente.nombre)):
+            self._cambiar_ingrediente(ingrediente_id, nombre)
+        for nombre in list(self._usos_ingrediente):
+            self._reindexar_ingrediente(tries, nombre, recalcular=False)
+        for trie in tries.values():
+            trie.recalcular_todo()
+
+        # Las consultas en curso terminan con los tries anteriores
+        self._tries = tries
+        self._seq = cambios['cursor'] if cambios else None
+        self._version = version['version'] if version else None
+        self._construido = True
+        self.reconstrucciones += 1
+
+    def _aplicar(self, cambios):
+        for cambio in cambios:
+            tabla, registro_id, datos = cambio['tabla'], cambio['id'], cambio['datos']
+            borrado = cambio['operacion'] == 'delete'
+            if tabla == 'productos':
+                if borrado:
+                    for tipo in (TIPO_PRODUCTO, TIPO_RECETA):
+                        self._tries[tipo].quitar(('p', registro_id))
+                else:
+                    self._indexar_producto(self._tries, datos)
+            elif tabla == 'categorias':
+                if borrado:
+                    self._tries[TIPO_CATEGORIA].quitar(('c', registro_id))
+                else:
+                    self._indexar_categoria(self._tries, datos)
+            else:
+                for nombre in self._cambiar_ingrediente(registro_id, None if borrado else datos['nombre']):
+                    self._reindexar_ingrediente(self._tries, nombre)
+        self.cambios_aplicados += len(cambios)
+
+    def _aplicar_pendientes(self, conexion):
+        """Aplica catalogo_cambios desde el último seq. False si hace falta reconstruir."""
+        if self._seq is None:
+            version = catalogo_version.leer_version(conexion)
+            return version is None or version['version'] == self._version
+        while True:
+            resultado = leer_cambios(
+                conexion, self._seq, limite=LIMITE_CAMBIOS,
+                tablas=_TABLAS, campos_producto=_CAMPOS_PRODUCTO
+            )
+            if resultado is None or resultado['reiniciar']:
+                return False
+            self._aplicar(resultado['cambios'])
+            self._seq = resultado['cursor']
+            if not resultado['hay_mas']:
+                return True
+
+    def sincronizar(self):
+        """Pone los tries al día con la base (única parte que consulta SQLite)"""
+        with self._lock:
+            try:
+                with get_engine(MENU_DB_PATH).connect() as conexion:
+                    if not self._construido or not self._aplicar_pendientes(conexion):
+                        self._reconstruir(conexion)
+                self._ultima_sincronizacion = time.time()
+            finally:
+                self._sincronizando = False
+
+    def _sincronizar_en_segundo_plano(self):
+        if self._sincronizando:
+            return
+        self._sincronizando = True
+
+        def tarea():
+            try:
+                self.sincronizar()
+            except Exception as e:
+                print(f"⚠️ Error sincronizando el autocompletado: {e}")
+
+        threading.Thread(target=tarea, name='autocompletado-sync', daemon=True).start()
+
+    def al_cambiar_catalogo(self, tablas):
+        """Suscriptor de catalogo_version: aplica de inmediato lo que este proceso confirmó"""
+        if self._construido and set(tablas) & set(_TABLAS):
+            self.sincronizar()
+
+    # ---- Lectura ---------------------------------------------------------------
+
+    def sugerir(self, texto, tipos=None, limite=LIMITE_POR_DEFECTO):
+        """
+        Sugerencias para el prefijo 'texto': [{'texto', 'tipo', 'id'[, 'total']}]
+        ordenadas por peso. Solo la primera llamada del proceso espera a la base.
+        """
+        if not self._construido:
+            self.sincronizar()
+        elif time.time() - self._ultima_sincronizacion > INTERVALO_SINCRONIZACION_S:
+            self._sincronizar_en_segundo_plano()
+
+        prefijo = normalizar(texto)
+        if not prefijo:
+            return []
+        limite = max(1, min(limite, LIMITE_MAXIMO))
+
+        tries = self._tries
+        candidatos = []
+        for tipo in (tipos or TIPOS):
+            candidatos.extend(tries[tipo].buscar(prefijo, limite))
+        candidatos.sort(key=lambda candidato: candidato[0])
+        return [dict(datos) for _, datos in candidatos[:limite]]
+
+    def info(self):
+        """Estado de los tries para depuración"""
+        return {
+            'construido': self._construido,
+            'seq': self._seq,
+            'entradas': {tipo: len(trie) for tipo, trie in self._tries.items()},
+            'reconstrucciones': self.reconstrucciones,
+            'cambios_aplicados': self.cambios_aplicados
+        }
+
+
+# Instancia única del proceso, al día con los commits del catálogo
+autocompletado = Autocompletado()
+catalogo_version.suscribir(autocompletado.al_cambiar_catalogo)
@@ -0,0 +1,315 @@
+"""
+📡 BUS DE EVENTOS ENTRE WORKERS
+Responsabilidad única: publicar/suscribir por tema para que una escritura hecha en un
+worker de gunicorn llegue a los suscriptores (streams, cachés) de todos los demás.
+
+Temas: 'notificaciones', 'catalogo', 'configuracion', 'fondos'.
+
+- Backend 'memoria': entrega solo dentro del proceso (un único worker, scripts).
+- Backend 'sqlite' (por defecto): además de la entrega local inmediata, cada evento se
+  agrega a una tabla secuencial en su propio archivo (bus_eventos.db, nunca las tablas
+  principales). Un hilo por worker (main.py lo inicia) mira PRAGMA data_version cada
+  INTERVALO_LECTURA_S (no cuesta I/O mientras nadie escriba) y, cuando cambia, lee los
+  eventos posteriores a su cursor que publicaron otros procesos.
+- Los eventos se conservan RETENCION_S; al arrancar, el cursor empieza en el último id
+  (un worker nuevo no repite el pasado: sus cachés se construyen desde la base).
+- Huecos: los ids son consecutivos (un INSERT por transacción), así que si el lector
+  encuentra un salto (se atrasó más que RETENCION_S y la limpieza borró eventos) o tuvo
+  que reposicionarse sin cursor, avisa a los registrados con al_perder_eventos() para
+  que reconstruyan sus cachés desde la base en lugar de seguir con datos viejos.
+- Los callbacks reciben (tema, datos) y deben ser rápidos: los remotos corren en el
+  hilo del bus, en orden de publicación.
+- Los cambios del ORM se publican con publicar_al_confirmar(): quedan en la sesión y
+  salen en el after_commit; un rollback los descarta.
+
+Se elige con la variable de entorno BUS_EVENTOS ('sqlite' o 'memoria').
+"""
+
+import os
+import json
+import time
+import atexit
+import socket
+import threading
+from collections import defaultdict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+
+from modulos.backend.menu.database.managers.db_manager import get_engine, DATABASE_DIR
+
+TEMAS = ('notificaciones', 'catalogo', 'configuracion', 'fondos')
+
+BUS_DB_PATH = os.path.join(DATABASE_DIR, 'bus_eventos.db')
+INTERVALO_LECTURA_S = 0.02
+RETENCION_S = 300
+INTERVALO_LIMPIEZA_S = 60
+LIMITE_LECTURA = 500
+
+CLAVE_PENDIENTES = 'bus_eventos_pendientes'
+
+
+class BusMemoria:
+    """Suscriptores por tema dentro del proceso"""
+
+    nombre = 'memoria'
+
+    def __init__(self):
+        self._suscriptores = defaultdict(list)
+        self._al_perder = []
+        self._lock = threading.Lock()
+        self._contadores = {'publicados': 0, 'entregados': 0, 'recibidos_remotos': 0, 'errores_callback': 0}
+
+    def suscribir(self, tema, callback):
+        """Registra callback(tema, datos) para el tema (idempotente)"""
+        if tema not in TEMAS:
+            raise ValueError(f"Tema desconocido: {tema}")
+        with self._lock:
+            if callback not in self._suscriptores[tema]:
+                self._suscriptores[tema].append(callback)
+
+    def al_perder_eventos(self, callback):
+        """Registra callback() para cuando este worker pudo perder eventos remotos (idempotente)"""
+        with self._lock:
+            if callback not in self._al_perder:
+                self._al_perder.append(callback)
+
+    def publicar(self, tema, datos):
+        """Entrega el evento a los suscriptores del proceso"""
+        if tema not in TEMAS:
+            raise ValueError(f"Tema desconocido: {tema}")
+        with self._lock:
+            self._contadores['publicados'] += 1
+        self._entregar(tema, datos)
+
+    def _entregar(self, tema, datos):
+        with self._lock:
+            callbacks = list(self._suscriptores.get(tema, ()))
+        for callback in callbacks:
+            try:
+                callback(tema, datos)
+            except Exception as e:
+                with self._lock:
+                    self._contadores['errores_callback'] += 1
+                print(f"⚠️ Error en suscriptor del bus ({tema}): {e}")
+        with self._lock:
+            self._contadores['entregados'] += len(callbacks)
+
+    def iniciar(self):
+        pass
+
+    def detener(self):
+        pass
+
+    def info(self):
+        with self._lock:
+            return {
+                'backend': self.nombre,
+                **self._contadores,
+                'suscriptores': {tema: len(callbacks) for tema, callbacks in self._suscriptores.items()}
+            }
+
+
+class BusSQLite(BusMemoria):
+    """Entrega local + tabla secuencial compartida que leen los demás workers"""
+
+    nombre = 'sqlite'
+
+    def __init__(self, db_path=BUS_DB_PATH, intervalo_s=INTERVALO_LECTURA_S, retencion_s=RETENCION_S):
+        super().__init__()
+        self.db_path = db_path
+        self.intervalo_s = intervalo_s
+        self.retencion_s = retencion_s
+        self.origen = None
+        self._cursor = None
+        self._tabla_lista = False
+        self._ultima_limpieza = 0
+        self._hilo = None
+        self._pid = None
+        self._detenido = threading.Event()
+        self._contadores.update({'escritos': 0, 'errores_escritura': 0, 'lecturas': 0, 'errores_lectura': 0, 'huecos': 0})
+        self._ultimo_error = None
+
+    # ==================== PUBLICACIÓN ====================
+
+    def publicar(self, tema, datos):
+        """Entrega local inmediata y registro para los otros workers (sin lanzar excepción)"""
+        super().publicar(tema, datos)
+        self.iniciar()
+        ahora = time.time()
+        try:
+            with get_engine(self.db_path).begin() as conexion:
+                self._preparar_tabla(conexion)
+                conexion.exec_driver_sql(
+                    "INSERT INTO bus_eventos (tema, origen, datos, fecha) VALUES (?, ?, ?, ?)",
+                    (tema, self.origen, json.dumps(datos, ensure_ascii=False, default=str), ahora)
+                )
+                if ahora - self._ultima_limpieza > INTERVALO_LIMPIEZA_S:
+                    self._ultima_limpieza = ahora
+                    conexion.exec_driver_sql(
+                        "DELETE FROM bus_eventos WHERE fecha < ?", (ahora - self.retencion_s,)
+                    )
+            with self._lock:
+                self._contadores['escritos'] += 1
+        except Exception as e:
+            # Los demás workers se enteran igual al releer la base (versión del catálogo, instantáneas)
+            with self._lock:
+                self._contadores['errores_escritura'] += 1
+            self._ultimo_error = f"{time.strftime('%Y-%m-%dT%H:%M:%S')} {e}"
+            print(f"⚠️ Error escribiendo evento '{tema}' en el bus: {e}")
+
+    def _preparar_tabla(self, conexion):
+        if self._tabla_lista:
+            return
+        conexion.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS bus_eventos ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, tema TEXT NOT NULL, origen TEXT NOT NULL, "
+            "datos TEXT NOT NULL, fecha REAL NOT NULL)"
+        )
+        conexion.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_bus_eventos_fecha ON bus_eventos (fecha)")
+        self._tabla_lista = True
+
+    # ==================== LECTURA (HILO) ====================
+
+    def iniciar(self):
+        """Arranca el lector (idempotente; de nuevo tras un fork del servidor, con otro origen)"""
+        if self._hilo is not None and self._pid == os.getpid() and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo is not None and self._pid == os.getpid() and self._hilo.is_alive():
+                return
+            self._pid = os.getpid()
+            self.origen = f"{socket.gethostname()}:{self._pid}"
+            self._cursor = None
+            try:
+                with get_engine(self.db_path).begin() as conexion:
+                    self._preparar_tabla(conexion)
+                    self._cursor = conexion.exec_driver_sql("SELECT COALESCE(MAX(id), 0) FROM bus_eventos").scalar()
+            except Exception as e:
+                # El hilo reintenta posicionarse
+                self._ultimo_error = f"{time.strftime('%Y-%m-%dT%H:%M:%S')} {e}"
+            self._detenido.clear()
+            self._hilo = threading.Thread(target=self._bucle, name='bus-eventos', daemon=True)
+            self._hilo.start()
+
+    def _bucle(self):
+        conexion = None
+        version = None
+        while not self._detenido.is_set():
+            try:
+                if conexion is None:
+                    conexion = get_engine(self.db_path).raw_connection()
+                    with get_engine(self.db_path).begin() as preparacion:
+                        self._preparar_tabla(preparacion)
+                    version = None
+                cursor = conexion.cursor()
+                try:
+                    if self._cursor is None:
+                        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM bus_eventos")
+                        self._cursor = cursor.fetchone()[0]
+                        # iniciar() no pudo posicionarse: lo publicado entre tanto no se verá
+                        self._reportar_hueco()
+                    cursor.execute("PRAGMA data_version")
+                    actual = cursor.fetchone()[0]
+                    if actual != version:
+                        version = actual
+                        self._leer(cursor)
+                finally:
+                    cursor.close()
+            except Exception as e:
+                with self._lock:
+                    self._contadores['errores_lectura'] += 1
+                self._ultimo_error = f"{time.strftime('%Y-%m-%dT%H:%M:%S')} {e}"
+                if conexion is not None:
+                    conexion.invalidate()
+                    conexion = None
+                self._detenido.wait(1)
+            self._detenido.wait(self.intervalo_s)
+        if conexion is not None:
+            conexion.close()
+
+    def _leer(self, cursor):
+        """Entrega los eventos de otros procesos posteriores al cursor"""
+        while True:
+            cursor.execute(
+                "SELECT id, tema, origen, datos FROM bus_eventos WHERE id > ? ORDER BY id LIMIT ?",
+                (self._cursor, LIMITE_LECTURA)
+            )
+            filas = cursor.fetchall()
+            with self._lock:
+                self._contadores['lecturas'] += 1
+            if filas and filas[0][0] > self._cursor + 1:
+                self._reportar_hueco()
+            for evento_id, tema, origen, datos in filas:
+                self._cursor = evento_id
+                if origen == self.origen:
+                    continue
+                with self._lock:
+                    self._contadores['recibidos_remotos'] += 1
+                self._entregar(tema, json.loads(datos))
+            if len(filas) < LIMITE_LECTURA:
+                return
+
+    def _reportar_hueco(self):
+        with self._lock:
+            self._contadores['huecos'] += 1
+            callbacks = list(self._al_perder)
+        print(f"⚠️ Bus de eventos: posibles eventos perdidos (cursor {self._cursor})")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                with self._lock:
+                    self._contadores['errores_callback'] += 1
+                print(f"⚠️ Error en aviso de eventos perdidos: {e}")
+
+    def detener(self):
+        self._detenido.set()
+        if self._hilo is not None and self._pid == os.getpid():
+            self._hilo.join(2)
+
+    def info(self):
+        datos = super().info()
+        datos.update({
+            'origen': self.origen,
+            'cursor': self._cursor,
+            'intervalo_s': self.intervalo_s,
+            'retencion_s': self.retencion_s,
+            'hilo_activo': self._hilo is not None and self._hilo.is_alive(),
+            'ultimo_error': self._ultimo_error
+        })
+        return datos
+
+
+def crear_bus(backend=None):
+    """Instancia el backend indicado (o el de BUS_EVENTOS)"""
+    backend = backend or os.environ.get('BUS_EVENTOS', 'sqlite')
+    if backend == 'memoria':
+        return BusMemoria()
+    if backend == 'sqlite':
+        return BusSQLite()
+    raise ValueError(f"Backend de bus desconocido: {backend}")
+
+
+# ==================== PUBLICACIÓN DESDE EL ORM ====================
+
+def publicar_al_confirmar(sesion_db, tema, datos):
+    """Deja el evento en la sesión ORM; se publica solo si la transacción confirma"""
+    sesion_db.info.setdefault(CLAVE_PENDIENTES, []).append((tema, datos))
+
+
+def _publicar_pendientes(sesion_db):
+    for tema, datos in sesion_db.info.pop(CLAVE_PENDIENTES, ()):
+        bus_eventos.publicar(tema, datos)
+
+
+def _descartar_pendientes(sesion_db):
+    sesion_db.info.pop(CLAVE_PENDIENTES, None)
+
+
+# Instancia compartida del proceso
+bus_eventos = crear_bus()
+atexit.register(bus_eventos.detener)
+
+event.listen(OrmSession, 'after_commit', _publicar_pendientes)
+event.listen(OrmSession, 'after_soft_rollback', lambda sesion_db, previa: _descartar_pendientes(sesion_db))
@@ -0,0 +1,243 @@
+"""
+🔎 BÚSQUEDA DE TEXTO COMPLETO EN EL CATÁLOGO
+Responsabilidad única: consultas sobre el índice FTS5 productos_fts (migración 0007).
+
+- Cada palabra del usuario se busca como prefijo ("caf" encuentra "Café Latte") y sin
+  distinguir tildes; todas las palabras deben aparecer (AND).
+- Orden por relevancia bm25, con más peso para el nombre que para las instrucciones.
+- Fragmento con las coincidencias resaltadas en <mark>, escapado para insertarlo como HTML.
+- Si la base no tiene el índice (SQLite sin FTS5 o migración pendiente) se usa LIKE.
+- Las palabras con errores de tipeo ("capuchino", "cerbeza") no coinciden en FTS5: se
+  corrigen con el índice de trigramas (busqueda_trigramas.py) y esos productos se
+  agregan después de las coincidencias exactas, ordenados por similitud.
+"""
+
+import re
+import html
+from sqlalchemy import select, func, or_, table, column, literal_column
+
+from modulos.backend.menu.database.models.producto import Producto
+from modulos.backend.menu.database.models.categoria import Categoria
+from modulos.backend.menu.database.managers.db_manager import get_engine, MENU_DB_PATH
+from modulos.backend.menu.database.managers.lectura_catalogo import (
+    select_productos, serializar_productos, leer_categorias
+)
+from modulos.backend.menu.database.managers.busqueda_trigramas import buscador_aproximado, normalizar
+
+TABLA_FTS = 'productos_fts'
+
+# Columnas del índice y su peso en bm25 (mismo orden que en la migración)
+PESOS_COLUMNAS = (
+    ('nombre', 10.0),
+    ('codigo', 8.0),
+    ('descripcion', 4.0),
+    ('instrucciones', 1.0),
+    ('ingredientes', 3.0),
+    ('categoria', 2.0),
+)
+
+AMBITO_ADMIN = 'admin'
+AMBITO_COCINA = 'cocina'
+AMBITO_MENU = 'menu'
+
+# Columnas donde busca cada ámbito: el menú público no busca (ni muestra) texto de cocina
+COLUMNAS_POR_AMBITO = {
+    AMBITO_ADMIN: None,
+    AMBITO_COCINA: None,
+    AMBITO_MENU: ('nombre', 'descripcion', 'ingredientes', 'categoria'),
+}
+
+# Columnas equivalentes para el respaldo con LIKE
+_COLUMNAS_LIKE = {
+    'nombre': Producto.nombre,
+    'codigo': Producto.codigo,
+    'descripcion': Producto.descripcion,
+    'instrucciones': Producto.instrucciones_preparacion,
+}
+
+# Productos corregidos por trigramas que se consideran como máximo por búsqueda
+LIMITE_APROXIMADOS = 100
+
+_INICIO_MARCA = '\x02'
+_FIN_MARCA = '\x03'
+_PALABRAS_FRAGMENTO = 12
+
+_fts = table(TABLA_FTS, column('rowid'))
+_fts_tabla = literal_column(TABLA_FTS)
+_fts_disponible = False
+
+
+def fts_disponible(conexion=None):
+    """True si la base tiene el índice productos_fts (se recuerda una vez encontrado)"""
+    global _fts_disponible
+    if _fts_disponible:
+        return True
+    if conexion is None:
+        with get_engine(MENU_DB_PATH).connect() as conn:
+            return fts_disponible(conn)
+    _fts_disponible = conexion.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (TABLA_FTS,)
+    ).first() is not None
+    return _fts_disponible
+
+
+def consulta_fts(texto, columnas=None):
+    """
+    Texto libre del usuario -> expresión MATCH segura: cada palabra entre comillas y
+    como prefijo, opcionalmente restringida a 'columnas'. None si no hay palabras.
+    """
+    terminos = re.findall(r'\w+', texto or '')
+    if not terminos:
+        return None
+    expresion = ' '.join(f'"{termino}"*' for termino in terminos)
+    if columnas:
+        return f"{{{' '.join(columnas)}}} : ({expresion})"
+    return expresion
+
+
+def productos_aproximados(texto, conexion=None, limite=LIMITE_APROXIMADOS):
+    """
+    [(producto_id, similitud)] para las palabras de 'texto' que necesitan corrección
+    (vacío si todas existen en el catálogo: esas las resuelve FTS5/LIKE).
+    """
+    if conexion is None:
+        with get_engine(MENU_DB_PATH).connect() as conn:
+            return productos_aproximados(texto, conn, limite)
+    return buscador_aproximado.buscar_productos(conexion, texto, limite, solo_corregidas=True)
+
+
+def _condicion_exacta(texto, columnas=None):
+    """Subconsulta al índice FTS5 o, sin índice, LIKE sobre las columnas propias y el nombre normalizado"""
+    if fts_disponible():
+        expresion = consulta_fts(texto, columnas)
+        if expresion is None:
+            return Producto.id.is_(None)
+        return Producto.id.in_(select(_fts.c.rowid).where(_fts_tabla.op('MATCH')(expresion)))
+
+    patron = f"%{texto}%"
+    columnas_like = [_COLUMNAS_LIKE[nombre] for nombre in (columnas or _COLUMNAS_LIKE) if nombre in _COLUMNAS_LIKE]
+    return or_(
+        Producto.nombre_normalizado.like(f"%{normalizar(texto)}%"),
+        *(columna.ilike(patron) for columna in columnas_like)
+    )
+
+
+def condicion_texto(texto, columnas=None):
+    """
+    Condición WHERE sobre productos para usar junto a otros filtros (p. ej. el listado
+    paginado): coincidencias exactas (FTS5 o LIKE) más los productos corregidos por trigramas.
+    """
+    condicion = _condicion_exacta(texto, columnas)
+    aproximados = productos_aproximados(texto)
+    if aproximados:
+        condicion = or_(condicion, Producto.id.in_([producto_id for producto_id, _ in aproximados]))
+    return condicion
+
+
+def _fragmento(valor):
+    """Escapa el fragmento de snippet() y convierte las marcas en <mark>"""
+    if not valor:
+        return None
+    return html.escape(valor).replace(_INICIO_MARCA, '<mark>').replace(_FIN_MARCA, '</mark>')
+
+
+def _buscar_exactos(conexion, texto, condiciones, columnas, campos, limite):
+    """Coincidencias de FTS5 (o LIKE) por relevancia: (resultados, motor)"""
+    if not fts_disponible(conexion):
+        consulta = select_productos(campos=campos)\
+            .where(_condicion_exacta(texto, columnas), *condiciones)\
+            .order_by(Producto.nombre, Producto.id)\
+            .limit(limite)
+        resultados = serializar_productos(conexion.execute(consulta), campos)
+        for resultado in resultados:
+            resultado['relevancia'] = None
+            resultado['fragmento'] = None
+        return resultados, 'like'
+
+    expresion = consulta_fts(texto, columnas)
+    if expresion is None:
+        return [], 'fts5'
+
+    rango = func.bm25(_fts_tabla, *(peso for _, peso in PESOS_COLUMNAS)).label('rango')
+    fragmento = func.snippet(
+        _fts_tabla, -1, _INICIO_MARCA, _FIN_MARCA, '…', _PALABRAS_FRAGMENTO
+    ).label('fragmento')
+
+    consulta = select_productos(rango, fragmento, campos=campos)\
+        .join(_fts, _fts.c.rowid == Producto.id)\
+        .where(_fts_tabla.op('MATCH')(expresion), *condiciones)\
+        .order_by(rango, Producto.id)\
+        .limit(limite)
+    filas = conexion.execute(consulta).all()
+
+    resultados = serializar_productos((fila[:-2] for fila in filas), campos)
+    for resultado, fila in zip(resultados, filas):
+        # bm25 es negativo (menor = mejor); se expone positivo para que mayor = más relevante
+        resultado['relevancia'] = round(-fila[-2], 6)
+        resultado['fragmento'] = _fragmento(fila[-1])
+    return resultados, 'fts5'
+
+
+def _buscar_aproximados(conexion, texto, condiciones, campos, excluidos, limite):
+    """Productos corregidos por trigramas que cumplen 'condiciones', por similitud"""
+    similitudes = {
+        producto_id: similitud
+        for producto_id, similitud in productos_aproximados(texto, conexion)
+        if producto_id not in excluidos
+    }
+    if not similitudes:
+        return []
+
+    consulta = select_productos(campos=campos).where(Producto.id.in_(list(similitudes)), *condiciones)
+    resultados = serializar_productos(conexion.execute(consulta), campos)
+    resultados.sort(key=lambda resultado: (-similitudes[resultado['id']], resultado['id']))
+    for resultado in resultados[:limite]:
+        resultado['relevancia'] = None
+        resultado['fragmento'] = None
+        resultado['similitud'] = similitudes[resultado['id']]
+    return resultados[:limite]
+
+
+def buscar_productos(conexion, texto, *condiciones, ambito=AMBITO_ADMIN, campos=None, limite=20):
+    """
+    Productos que coinciden con 'texto' ordenados por relevancia.
+    Devuelve (resultados, motor): cada resultado es el diccionario del producto (o solo
+    'campos') más 'relevancia' y 'fragmento'; motor es 'fts5' o 'like', con '+trigramas'
+    si se agregaron productos corregidos (estos traen 'similitud' en lugar de relevancia).
+    """
+    columnas = COLUMNAS_POR_AMBITO.get(ambito)
+    resultados, motor = _buscar_exactos(conexion, texto, condiciones, columnas, campos, limite)
+
+    if len(resultados) < limite:
+        aproximados = _buscar_aproximados(
+            conexion, texto, condiciones, campos,
+            {resultado['id'] for resultado in resultados}, limite - len(resultados)
+        )
+        if aproximados:
+            resultados.extend(aproximados)
+            motor += '+trigramas'
+    return resultados, motor
+
+
+def buscar_ids(conexion, texto, *condiciones, ambito=AMBITO_ADMIN, limite=50):
+    """
+    Ids de productos por relevancia con su fragmento: [(id, relevancia, fragmento, similitud)]
+    (similitud solo en los corregidos por trigramas, None en las coincidencias exactas)
+    """
+    resultados, _ = buscar_productos(
+        conexion, texto, *condiciones, ambito=ambito, campos=('id',), limite=limite
+    )
+    return [(r['id'], r['relevancia'], r['fragmento'], r.get('similitud')) for r in resultados]
+
+
+def buscar_categorias(conexion, texto, limite=5):
+    """Categorías activas parecidas a 'texto' (con o sin errores), con su 'similitud'"""
+    similitudes = dict(buscador_aproximado.buscar_categorias(conexion, texto, limite))
+    if not similitudes:
+        return []
+    categorias = [
+        dict(categoria.to_dict(), similitud=similitudes[categoria.id])
+        for categoria in leer_categorias(conexion, Categoria.id.in_(list(similitudes)))
+    ]
+    categorias.sort(key=lambda categoria: (-categoria['similitud'], categoria['id']))
+    return categorias
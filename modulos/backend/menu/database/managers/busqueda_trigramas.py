@@ -0,0 +1,342 @@
+"""
+🔤 BÚSQUEDA APROXIMADA POR TRIGRAMAS
+Responsabilidad única: encontrar productos y categorías aunque el usuario escriba
+sin tildes, con mayúsculas distintas o con una o dos letras equivocadas
+("capuchino" -> "Capuccino", "cerbesa" -> "Cerveza").
+
+- Texto normalizado (sin tildes, casefold) en las columnas sombra productos.nombre_normalizado
+  y categorias.titulo_normalizado (migración 0008), mantenidas por el ORM.
+- Índice en memoria del proceso: vocabulario de palabras -> trigramas -> documentos.
+  Cada palabra de la consulta que existe (o es prefijo de una palabra existente) se
+  usa tal cual; solo las que no existen se corrigen con los trigramas compartidos y la
+  distancia de edición (máximo 1 error hasta 5 letras, 2 desde 6).
+- Un producto también se encuentra por las palabras de su categoría, con menos peso.
+- Se mantiene al día aplicando catalogo_cambios (migración 0006) desde el último seq
+  leído; sin ese registro se reconstruye cuando cambia catalogo_version.
+"""
+
+import re
+import heapq
+import threading
+import unicodedata
+from collections import defaultdict
+from sqlalchemy import select, event
+
+from modulos.backend.menu.database.models.producto import Producto
+from modulos.backend.menu.database.models.categoria import Categoria
+from modulos.backend.menu.database.managers import catalogo_version
+from modulos.backend.menu.database.managers.cambios_catalogo import leer_cambios, LIMITE_MAXIMO
+
+# Peso de una coincidencia en la categoría frente a una en el nombre del producto
+PESO_CATEGORIA = 0.5
+# Palabras del vocabulario consideradas por cada palabra de la consulta
+MAX_CANDIDATAS = 50
+LONGITUD_MINIMA = 2
+
+_TABLAS_INDICE = ('productos', 'categorias')
+_CAMPOS_CAMBIOS = ('id', 'nombre', 'categoria_id')
+
+
+def normalizar(texto):
+    """'Café  Con LECHE!' -> 'cafe con leche' (sin tildes, casefold, solo palabras)"""
+    if not texto:
+        return ''
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    sin_tildes = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(re.findall(r'\w+', sin_tildes.casefold()))
+
+
+def trigramas(palabra):
+    """Trigramas de la palabra con relleno ('  caf', ' ca', 'caf', 'af ') como pg_trgm"""
+    relleno = f"  {palabra} "
+    return frozenset(relleno[i:i + 3] for i in range(len(relleno) - 2))
+
+
+def errores_permitidos(palabra):
+    """Errores tolerados según la longitud: las palabras cortas deben ser exactas"""
+    if len(palabra) < 4:
+        return 0
+    return 1 if len(palabra) < 6 else 2
+
+
+def distancia_edicion(a, b, maximo):
+    """
+    Distancia de Damerau-Levenshtein (transposiciones adyacentes) acotada:
+    devuelve maximo + 1 en cuanto se sabe que la supera.
+    """
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    anterior_2 = None
+    anterior = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        actual = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            costo = 0 if a[i - 1] == b[j - 1] else 1
+            actual[j] = min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + costo)
+            if (anterior_2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                actual[j] = min(actual[j], anterior_2[j - 2] + 1)
+        if min(actual) > maximo:
+            return maximo + 1
+        anterior_2, anterior = anterior, actual
+    return anterior[-1]
+
+
+class IndiceTrigramas:
+    """Documentos (id -> palabras con peso) indexados por palabra y por trigrama de palabra"""
+
+    def __init__(self):
+        self._trigramas = {}                        # palabra -> trigramas
+        self._por_trigrama = defaultdict(set)       # trigrama -> palabras
+        self._documentos = defaultdict(dict)        # palabra -> {documento: peso}
+        self._palabras = {}                         # documento -> {palabra: peso}
+
+    def __len__(self):
+        return len(self._palabras)
+
+    def agregar(self, documento, campos):
+        """Indexa (o reindexa) 'documento' con [(texto_normalizado, peso), ...]"""
+        self.quitar(documento)
+        pesos = {}
+        for texto, peso in campos:
+            for palabra in (texto or '').split():
+                if len(palabra) >= LONGITUD_MINIMA and peso > pesos.get(palabra, 0):
+                    pesos[palabra] = peso
+        self._palabras[documento] = pesos
+        for palabra, peso in pesos.items():
+            if palabra not in self._trigramas:
+                self._trigramas[palabra] = trigramas(palabra)
+                for trigrama in self._trigramas[palabra]:
+                    self._por_trigrama[trigrama].add(palabra)
+            self._documentos[palabra][documento] = peso
+
+    def quitar(self, documento):
+        for palabra in self._palabras.pop(documento, ()):
+            documentos = self._documentos[palabra]
+            documentos.pop(documento, None)
+            if not documentos:
+                # Palabra sin documentos: sale del vocabulario para no sugerirla
+                del self._documentos[palabra]
+                for trigrama in self._trigramas.pop(palabra):
+                    self._por_trigrama[trigrama].discard(palabra)
+
+    def palabras_similares(self, palabra):
+        """
+        ({palabra_del_vocabulario: similitud 0..1}, corregida) para una palabra de la
+        consulta: la propia palabra y las que empiezan por ella o, si no hay ninguna
+        (corregida=True), las que están a la menor distancia de edición permitida.
+        """
+        propios = trigramas(palabra)
+        maximo = errores_permitidos(palabra)
+        # Lema de q-gramas: cada error destruye como mucho 3 trigramas
+        minimo_comunes = max(1, len(propios) - 3 * maximo)
+
+        comunes = defaultdict(int)
+        for trigrama in propios:
+            for candidata in self._por_trigrama.get(trigrama, ()):
+                comunes[candidata] += 1
+
+        exactas = {}
+        for candidata, n in comunes.items():
+            # Un prefijo comparte todos los trigramas salvo el de cierre ('af ')
+            if n >= len(propios) - 1 and candidata.startswith(palabra):
+                exactas[candidata] = 1.0 if candidata == palabra else 0.6 + 0.4 * len(palabra) / len(candidata)
+        if exactas or maximo == 0:
+            return _mejores(exactas), False
+
+        corregidas = {}
+        mejor_distancia = maximo
+        for candidata, n in comunes.items():
+            if n < minimo_comunes:
+                continue
+            distancia = distancia_edicion(palabra, candidata, mejor_distancia)
+            if distancia > mejor_distancia:
+                continue
+            if distancia < mejor_distancia:
+                mejor_distancia = distancia
+                corregidas = {}
+            # Desempate entre correcciones igual de cercanas: proporción de trigramas comunes
+            jaccard = n / (len(propios) + len(self._trigramas[candidata]) - n)
+            corregidas[candidata] = (1 - distancia / max(len(palabra), len(candidata))) * (0.9 + 0.1 * jaccard)
+        return _mejores(corregidas), True
+
+    def buscar(self, texto, limite=20, solo_corregidas=False):
+        """
+        [(documento, similitud)] que contienen todas las palabras de 'texto' (o sus
+        correcciones). solo_corregidas: vacío si ninguna palabra necesitó corrección,
+        para complementar una búsqueda exacta sin repetir sus resultados.
+        """
+        palabras = [p for p in dict.fromkeys(normalizar(texto).split()) if len(p) >= LONGITUD_MINIMA]
+        if not palabras:
+            return []
+
+        similares_por_palabra = [self.palabras_similares(palabra) for palabra in palabras]
+        if solo_corregidas and not any(corregida for _, corregida in similares_por_palabra):
+            return []
+
+        puntajes_por_palabra = []
+        for similares, _ in similares_por_palabra:
+            puntajes = {}
+            for similar, similitud in similares.items():
+                for documento, peso in self._documentos[similar].items():
+                    puntaje = similitud * peso
+                    if puntaje > puntajes.get(documento, 0):
+                        puntajes[documento] = puntaje
+            if not puntajes:
+                return []
+            puntajes_por_palabra.append(puntajes)
+
+        puntajes_por_palabra.sort(key=len)
+        base, resto = puntajes_por_palabra[0], puntajes_por_palabra[1:]
+        totales = {}
+        for documento, puntaje in base.items():
+            for puntajes in resto:
+                otro = puntajes.get(documento)
+                if otro is None:
+                    break
+                puntaje += otro
+            else:
+                totales[documento] = puntaje / len(palabras)
+
+        mejores = heapq.nlargest(limite, totales.items(), key=lambda item: (item[1], -item[0]))
+        return [(documento, round(similitud, 4)) for documento, similitud in mejores]
+
+
+def _mejores(similitudes):
+    if len(similitudes) <= MAX_CANDIDATAS:
+        return similitudes
+    return dict(heapq.nlargest(MAX_CANDIDATAS, similitudes.items(), key=lambda item: item[1]))
+
+
+class BuscadorAproximado:
+    """Índices de productos y categorías del proceso, sincronizados con la base"""
+
+    def __init__(self):
+        self.productos = IndiceTrigramas()
+        self.categorias = IndiceTrigramas()
+        self._productos = {}    # producto_id -> (nombre_normalizado, categoria_id)
+        self._titulos = {}      # categoria_id -> titulo_normalizado
+        self._seq = None
+        self._version = None
+        self._construido = False
+        self._sucio = True
+        self._lock = threading.Lock()
+        self.reconstrucciones = 0
+        self.cambios_aplicados = 0
+
+    def invalidar(self, tablas=None):
+        """Suscriptor de catalogo_version (solo se usa si no hay registro de cambios)"""
+        if tablas is None or set(tablas) & set(_TABLAS_INDICE):
+            self._sucio = True
+
+    def _indexar_producto(self, producto_id, nombre, categoria_id):
+        self._productos[producto_id] = (nombre, categoria_id)
+        self.productos.agregar(producto_id, [
+            (nombre, 1.0), (self._titulos.get(categoria_id), PESO_CATEGORIA)
+        ])
+
+    def _indexar_categoria(self, categoria_id, titulo):
+        anterior = self._titulos.get(categoria_id)
+        self._titulos[categoria_id] = titulo
+        self.categorias.agregar(categoria_id, [(titulo, 1.0)])
+        if anterior is not None and anterior != titulo:
+            for producto_id, (nombre, de_categoria) in list(self._productos.items()):
+                if de_categoria == categoria_id:
+                    self._indexar_producto(producto_id, nombre, categoria_id)
+
+    def _reconstruir(self, conexion):
+        # Cursor fijado antes de leer: lo confirmado después se aplica en la próxima búsqueda
+        cambios = leer_cambios(conexion, None)
+        version = catalogo_version.leer_version(conexion) if cambios is None else None
+
+        self.productos = IndiceTrigramas()
+        self.categorias = IndiceTrigramas()
+        self._productos = {}
+        self._titulos = {}
+        # Las filas escritas fuera del ORM pueden traer la columna sombra vacía
+        for categoria_id, titulo, normalizado in conexion.execute(
+            select(Categoria.id, Categoria.titulo, Categoria.titulo_normalizado)
+        ):
+            self._indexar_categoria(categoria_id, normalizado or normalizar(titulo))
+        for producto_id, nombre, normalizado, categoria_id in conexion.execute(
+            select(Producto.id, Producto.nombre, Producto.nombre_normalizado, Producto.categoria_id)
+        ):
+            self._indexar_producto(producto_id, normalizado or normalizar(nombre), categoria_id)
+
+        self._seq = cambios['cursor'] if cambios else None
+        self._version = version['version'] if version else None
+        self._construido = True
+        self._sucio = False
+        self.reconstrucciones += 1
+
+    def _aplicar(self, cambios):
+        for cambio in cambios:
+            if cambio['tabla'] == 'categorias':
+                if cambio['operacion'] == 'delete':
+                    self._titulos.pop(cambio['id'], None)
+                    self.categorias.quitar(cambio['id'])
+                else:
+                    self._indexar_categoria(cambio['id'], normalizar(cambio['datos']['nombre']))
+            elif cambio['operacion'] == 'delete':
+                self._productos.pop(cambio['id'], None)
+                self.productos.quitar(cambio['id'])
+            else:
+                datos = cambio['datos']
+                self._indexar_producto(datos['id'], normalizar(datos['nombre']), datos['categoria_id'])
+        self.cambios_aplicados += len(cambios)
+
+    def _sincronizar(self, conexion):
+        if self._construido and self._seq is not None:
+            resultado = leer_cambios(
+                conexion, self._seq, limite=LIMITE_MAXIMO,
+                tablas=_TABLAS_INDICE, campos_producto=_CAMPOS_CAMBIOS
+            )
+            if resultado is not None and not resultado['reiniciar'] and not resultado['hay_mas']:
+                self._aplicar(resultado['cambios'])
+                self._seq = resultado['cursor']
+                return
+        elif self._construido and not self._sucio:
+            version = catalogo_version.leer_version(conexion)
+            if version is None or version['version'] == self._version:
+                return
+        self._reconstruir(conexion)
+
+    def buscar_productos(self, conexion, texto, limite=50, solo_corregidas=False):
+        """[(producto_id, similitud)] ordenados de más a menos parecido"""
+        with self._lock:
+            self._sincronizar(conexion)
+            return self.productos.buscar(texto, limite, solo_corregidas)
+
+    def buscar_categorias(self, conexion, texto, limite=10):
+        """[(categoria_id, similitud)] ordenados de más a menos parecido"""
+        with self._lock:
+            self._sincronizar(conexion)
+            return self.categorias.buscar(texto, limite)
+
+    def info(self):
+        """Estado del índice para depuración"""
+        return {
+            'productos': len(self.productos),
+            'categorias': len(self.categorias),
+            'seq': self._seq,
+            'reconstrucciones': self.reconstrucciones,
+            'cambios_aplicados': self.cambios_aplicados
+        }
+
+
+def _normalizar_producto(mapper, connection, producto):
+    producto.nombre_normalizado = normalizar(producto.nombre)
+
+
+def _normalizar_categoria(mapper, connection, categoria):
+    categoria.titulo_normalizado = normalizar(categoria.titulo)
+
+
+# Columnas sombra al día en cada alta/modificación hecha con el ORM
+for _evento in ('before_insert', 'before_update'):
+    event.listen(Producto, _evento, _normalizar_producto)
+    event.listen(Categoria, _evento, _normalizar_categoria)
+
+# Instancia única del proceso
+buscador_aproximado = BuscadorAproximado()
+catalogo_version.suscribir(buscador_aproximado.invalidar)
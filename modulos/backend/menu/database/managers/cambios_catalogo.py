@@ -0,0 +1,119 @@
+"""
+🔄 CAMBIOS DEL CATÁLOGO (SINCRONIZACIÓN INCREMENTAL)
+Responsabilidad única: leer el registro catalogo_cambios para que los clientes
+(tablets de cocina, menú) apliquen solo lo que cambió desde su último cursor.
+
+- Los triggers de la migración 0006 anotan cada alta/modificación/borrado con un seq
+  creciente; el registro guarda solo el último cambio de cada registro del catálogo.
+- Las altas y modificaciones se devuelven como 'upsert' con los datos actuales del
+  registro; los borrados como 'delete' (tombstone, sin datos).
+- El cursor es el último seq entregado. Sincronizar desde 0 equivale a una carga completa.
+"""
+
+from sqlalchemy import select, func, table, column
+
+from modulos.backend.menu.database.models.producto import Producto
+from modulos.backend.menu.database.models.categoria import Categoria
+from modulos.backend.menu.database.models.subcategoria import Subcategoria
+from modulos.backend.menu.database.models.ingrediente import Ingrediente
+from modulos.backend.menu.database.managers.lectura_catalogo import (
+    select_productos, serializar_productos, serializar,
+    leer_categorias, leer_subcategorias, leer_ingredientes
+)
+
+TABLA_CAMBIOS = 'catalogo_cambios'
+TABLAS_SINCRONIZABLES = ('categorias', 'subcategorias', 'productos', 'ingredientes')
+
+OPERACION_UPSERT = 'upsert'
+OPERACION_DELETE = 'delete'
+
+LIMITE_POR_DEFECTO = 500
+LIMITE_MAXIMO = 2000
+
+_cambios = table(
+    TABLA_CAMBIOS,
+    column('seq'), column('tabla'), column('registro_id'), column('operacion'), column('fecha')
+)
+
+
+def _existe_registro(conexion):
+    return conexion.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (TABLA_CAMBIOS,)
+    ).first() is not None
+
+
+def _leer_datos(conexion, tabla, ids, campos_producto):
+    """Datos actuales de los registros indicados: {id: diccionario}"""
+    if tabla == 'productos':
+        consulta = select_productos(campos=campos_producto).where(Producto.id.in_(ids))
+        datos = serializar_productos(conexion.execute(consulta), campos_producto)
+    elif tabla == 'categorias':
+        datos = serializar(leer_categorias(conexion, Categoria.id.in_(ids), solo_activas=False))
+    elif tabla == 'subcategorias':
+        datos = serializar(leer_subcategorias(conexion, Subcategoria.id.in_(ids), solo_activas=False))
+    else:
+        datos = serializar(leer_ingredientes(conexion, Ingrediente.id.in_(ids)))
+    return {registro['id']: registro for registro in datos}
+
+
+def ultimo_seq(conexion):
+    """Último número de secuencia registrado (0 si el registro está vacío)"""
+    return conexion.execute(select(func.coalesce(func.max(_cambios.c.seq), 0))).scalar()
+
+
+def leer_cambios(conexion, desde, limite=LIMITE_POR_DEFECTO, tablas=None, campos_producto=None):
+    """
+    Cambios con seq > desde, en orden. Devuelve
+    {'cambios': [...], 'cursor': seq, 'hay_mas': bool, 'reiniciar': bool}
+    o None si el registro de cambios aún no existe. Con desde=None solo se
+    informa el cursor actual.
+
+    'reiniciar' indica que el cursor del cliente es posterior al último seq (base
+    restaurada desde un backup): debe descartar su copia y sincronizar desde 0.
+    """
+    if not _existe_registro(conexion):
+        return None
+
+    tablas = tablas or TABLAS_SINCRONIZABLES
+    # Tope fijado antes de leer: lo que se confirme después llega en la próxima consulta
+    tope = ultimo_seq(conexion)
+    if desde is None:
+        return {'cambios': [], 'cursor': tope, 'hay_mas': False, 'reiniciar': False}
+    if desde > tope:
+        return {'cambios': [], 'cursor': tope, 'hay_mas': False, 'reiniciar': True}
+
+    filas = conexion.execute(
+        select(_cambios.c.seq, _cambios.c.tabla, _cambios.c.registro_id, _cambios.c.operacion, _cambios.c.fecha)
+        .where(_cambios.c.seq > desde, _cambios.c.seq <= tope, _cambios.c.tabla.in_(tablas))
+        .order_by(_cambios.c.seq)
+        .limit(limite + 1)
+    ).all()
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+
+    ids_por_tabla = {}
+    for fila in filas:
+        if fila.operacion == OPERACION_UPSERT:
+            ids_por_tabla.setdefault(fila.tabla, []).append(fila.registro_id)
+    datos_por_tabla = {
+        tabla: _leer_datos(conexion, tabla, ids, campos_producto)
+        for tabla, ids in ids_por_tabla.items()
+    }
+
+    cambios = []
+    for fila in filas:
+        datos = datos_por_tabla.get(fila.tabla, {}).get(fila.registro_id)
+        # Un upsert cuyo registro ya no existe fue borrado después del tope: su tombstone
+        # llegará en la próxima consulta, mientras tanto se informa como borrado
+        operacion = fila.operacion if datos is not None else OPERACION_DELETE
+        cambios.append({
+            'seq': fila.seq,
+            'tabla': fila.tabla,
+            'id': fila.registro_id,
+            'operacion': operacion,
+            'fecha': fila.fecha,
+            'datos': datos
+        })
+
+    cursor = filas[-1].seq if hay_mas else tope
+    return {'cambios': cambios, 'cursor': cursor, 'hay_mas': hay_mas, 'reiniciar': False}
@@ -0,0 +1,130 @@
+"""
+🔢 VERSIÓN DEL CATÁLOGO
+Responsabilidad única: saber cuándo cambió el catálogo (productos, categorías,
+subcategorías, ingredientes) sin recorrer las tablas.
+
+- Cada flush del ORM que toca una tabla del catálogo incrementa su contador en
+  catalogo_version dentro de la misma transacción (visible para todos los workers).
+- Tras el commit se publica el tema 'catalogo' en el bus de eventos: los suscriptores
+  (p. ej. el snapshot del menú) se invalidan al instante en este worker y, a las pocas
+  decenas de ms, en los demás, sin esperar a releer la versión.
+"""
+
+import itertools
+import threading
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+
+from modulos.backend.menu.database.managers.db_manager import get_engine, MENU_DB_PATH
+from modulos.backend.menu.database.managers.bus_eventos import bus_eventos
+
+TABLA_VERSION = 'catalogo_version'
+TABLAS_CATALOGO = ('productos', 'categorias', 'subcategorias', 'ingredientes')
+
+_suscriptores = []
+_tabla_disponible = False
+_hooks_instalados = False
+_lock = threading.Lock()
+
+
+def suscribir(callback):
+    """Registra un callback(tablas) que se llama tras cada commit que modifica el catálogo (en cualquier worker)"""
+    if callback not in _suscriptores:
+        _suscriptores.append(callback)
+
+
+def _verificar_tabla(conexion):
+    """La tabla la crea la migración 0004; sin ella los contadores se omiten"""
+    global _tabla_disponible
+    if not _tabla_disponible:
+        _tabla_disponible = conexion.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (TABLA_VERSION,)
+        ).first() is not None
+    return _tabla_disponible
+
+
+def _tablas_modificadas(session):
+    tablas = set()
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        tabla = getattr(obj, '__tablename__', None)
+        if tabla in TABLAS_CATALOGO:
+            tablas.add(tabla)
+    return tablas
+
+
+def _al_flush(session, flush_context):
+    tablas = _tablas_modificadas(session)
+    if not tablas:
+        return
+    session.info.setdefault('catalogo_modificado', set()).update(tablas)
+
+    conexion = session.connection()
+    if not _verificar_tabla(conexion):
+        return
+    ahora = datetime.utcnow().isoformat(sep=' ')
+    conexion.exec_driver_sql(
+        f"UPDATE {TABLA_VERSION} SET version = version + 1, fecha_actualizacion = ? WHERE tabla = ?",
+        [(ahora, tabla) for tabla in tablas]
+    )
+
+
+def _al_commit(session):
+    tablas = session.info.pop('catalogo_modificado', None)
+    if not tablas:
+        return
+    bus_eventos.publicar('catalogo', {'tablas': sorted(tablas)})
+
+
+def _notificar(tema, datos):
+    """Suscriptor del bus: reparte el cambio entre los callbacks del proceso"""
+    tablas = set(datos['tablas'])
+    for callback in list(_suscriptores):
+        try:
+            callback(tablas)
+        except Exception as e:
+            print(f"⚠️ Error notificando cambio de catálogo: {e}")
+
+
+def _al_rollback(session):
+    session.info.pop('catalogo_modificado', None)
+
+
+def instalar_hooks():
+    """Instala (una sola vez) los listeners de flush/commit sobre todas las sesiones ORM"""
+    global _hooks_instalados
+    if _hooks_instalados:
+        return
+    with _lock:
+        if _hooks_instalados:
+            return
+        event.listen(OrmSession, 'after_flush', _al_flush)
+        event.listen(OrmSession, 'after_commit', _al_commit)
+        event.listen(OrmSession, 'after_soft_rollback', lambda session, previous: _al_rollback(session))
+        bus_eventos.suscribir('catalogo', _notificar)
+        _hooks_instalados = True
+
+
+def leer_version(conexion=None):
+    """
+    Versión actual del catálogo: {'version': suma de contadores, 'fecha': última modificación,
+    'tablas': {tabla: contador}, 'fechas': {tabla: fecha}}. Devuelve None si la tabla aún no existe.
+    """
+    if conexion is None:
+        with get_engine(MENU_DB_PATH).connect() as conn:
+            return leer_version(conn)
+
+    if not _verificar_tabla(conexion):
+        return None
+    filas = conexion.exec_driver_sql(
+        f"SELECT tabla, version, fecha_actualizacion FROM {TABLA_VERSION}"
+    ).fetchall()
+    return {
+        'version': sum(fila[1] for fila in filas),
+        'fecha': max((fila[2] for fila in filas if fila[2]), default=None),
+        'tablas': {fila[0]: fila[1] for fila in filas},
+        'fechas': {fila[0]: fila[2] for fila in filas}
+    }
+
+
+instalar_hooks()
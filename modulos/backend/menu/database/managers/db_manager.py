@@ -0,0 +1,296 @@
+"""
+🗃️ REGISTRO CENTRAL DE ENGINES Y SESIONES
+Responsabilidad única: un engine con pool por archivo de base de datos para todo el proceso,
+y sesiones con alcance de request que se liberan al terminar cada petición.
+
+Cada conexión nueva recibe el perfil de concurrencia SQLite (WAL, busy_timeout, caché, mmap)
+para que varios workers de gunicorn lean mientras otro escribe sin "database is locked".
+
+Uso en los blueprints:
+    from modulos.backend.menu.database.managers.db_manager import get_engine, get_session_factory
+    engine = get_engine()
+    Session = get_session_factory()
+"""
+
+import os
+import time
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, scoped_session
+
+# Rutas absolutas de las bases de datos del sistema (independientes del directorio de trabajo)
+DATABASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+MENU_DB_PATH = os.path.join(DATABASE_DIR, 'menu.db')
+CHATBOT_DB_PATH = os.path.join(os.path.dirname(DATABASE_DIR), 'menu.db')
+
+# Configuración del pool (por worker de gunicorn)
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+POOL_MAX_OVERFLOW = int(os.environ.get('DB_POOL_MAX_OVERFLOW', 10))
+POOL_TIMEOUT = 30
+
+# Perfil de concurrencia SQLite aplicado a cada conexión nueva (el orden importa:
+# busy_timeout primero para que el cambio a WAL espere en lugar de fallar)
+SQLITE_PRAGMAS = [
+    ('busy_timeout', int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))),
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('cache_size', -16000),                  # ≈ 16 MB por conexión (valor negativo = KiB)
+    ('mmap_size', 64 * 1024 * 1024),         # 64 MB mapeados en memoria
+    ('temp_store', 'MEMORY'),
+    ('wal_autocheckpoint', 1000),            # checkpoint automático cada ~1000 páginas
+    ('journal_size_limit', 32 * 1024 * 1024) # el WAL se recorta a 32 MB tras cada checkpoint
+]
+
+# Política de checkpoint: al devolver una conexión al pool, como máximo una vez por intervalo
+CHECKPOINT_INTERVALO_S = int(os.environ.get('SQLITE_CHECKPOINT_INTERVAL_S', 60))
+CHECKPOINT_PASIVO_BYTES = 4 * 1024 * 1024     # WAL > 4 MB  → checkpoint PASSIVE (no bloquea)
+CHECKPOINT_TRUNCATE_BYTES = 64 * 1024 * 1024  # WAL > 64 MB → checkpoint TRUNCATE
+
+_engines = {}
+_sesiones = {}
+_engines_escritura = {}
+_sesiones_escritura = {}
+_checkpoints = {}
+_revisiones_wal = {}
+_lock = threading.Lock()
+
+
+def _normalizar_ruta(db_path):
+    """Normaliza la ruta para que el mismo archivo siempre use la misma clave"""
+    return os.path.normcase(os.path.abspath(db_path))
+
+
+def _aplicar_pragmas(dbapi_connection, connection_record):
+    """Hook de conexión: aplica el perfil SQLite a cada conexión física nueva"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, valor in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}={valor}")
+    finally:
+        cursor.close()
+
+
+def _ruta_wal(clave):
+    return f"{clave}-wal"
+
+
+def _ejecutar_checkpoint_dbapi(dbapi_connection, clave, modo):
+    """Ejecuta PRAGMA wal_checkpoint(modo) sobre una conexión DBAPI y registra el resultado"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA wal_checkpoint({modo})")
+        ocupado, frames_log, frames_copiados = cursor.fetchone()
+    finally:
+        cursor.close()
+
+    resultado = {
+        'modo': modo,
+        'fecha': time.time(),
+        'ocupado': bool(ocupado),
+        'frames_log': frames_log,
+        'frames_copiados': frames_copiados,
+        'lag_frames': max(frames_log - frames_copiados, 0) if frames_log >= 0 else 0
+    }
+    _checkpoints[clave] = resultado
+    return resultado
+
+
+def _politica_checkpoint(clave):
+    """Devuelve el listener 'checkin' que aplica la política de checkpoint del archivo"""
+    def _al_devolver(dbapi_connection, connection_record):
+        if dbapi_connection is None:
+            return
+        ahora = time.time()
+        if ahora - _revisiones_wal.get(clave, 0) < CHECKPOINT_INTERVALO_S:
+            return
+        _revisiones_wal[clave] = ahora
+        try:
+            tamano_wal = os.path.getsize(_ruta_wal(clave))
+        except OSError:
+            tamano_wal = 0
+
+        if tamano_wal >= CHECKPOINT_TRUNCATE_BYTES:
+            modo = 'TRUNCATE'
+        elif tamano_wal >= CHECKPOINT_PASIVO_BYTES:
+            modo = 'PASSIVE'
+        else:
+            # WAL pequeño: basta con el autocheckpoint de SQLite
+            return
+        try:
+            _ejecutar_checkpoint_dbapi(dbapi_connection, clave, modo)
+        except Exception as e:
+            print(f"⚠️ Error en checkpoint WAL ({modo}) de {clave}: {e}")
+    return _al_devolver
+
+
+def get_engine(db_path=MENU_DB_PATH):
+    """
+    Devuelve el engine compartido para el archivo indicado, creándolo la primera vez.
+    """
+    clave = _normalizar_ruta(db_path)
+    engine = _engines.get(clave)
+    if engine is not None:
+        return engine
+
+    with _lock:
+        engine = _engines.get(clave)
+        if engine is None:
+            engine = create_engine(
+                f'sqlite:///{clave}',
+                echo=False,
+                pool_size=POOL_SIZE,
+                max_overflow=POOL_MAX_OVERFLOW,
+                pool_timeout=POOL_TIMEOUT,
+                connect_args={'check_same_thread': False}
+            )
+            event.listen(engine, 'connect', _aplicar_pragmas)
+            event.listen(engine, 'checkin', _politica_checkpoint(clave))
+            _engines[clave] = engine
+    return engine
+
+
+def get_session_factory(db_path=MENU_DB_PATH):
+    """
+    Devuelve la fábrica de sesiones (scoped_session) del archivo indicado.
+    Dentro de un mismo request/hilo siempre entrega la misma sesión.
+    """
+    clave = _normalizar_ruta(db_path)
+    factory = _sesiones.get(clave)
+    if factory is not None:
+        return factory
+
+    # Listeners de versión y estadísticas del catálogo (import diferido: dependen de este módulo)
+    from modulos.backend.menu.database.managers.catalogo_version import instalar_hooks
+    from modulos.backend.menu.database.managers.estadisticas_incrementales import instalar_listeners
+    instalar_hooks()
+    instalar_listeners()
+
+    engine = get_engine(clave)
+    with _lock:
+        factory = _sesiones.get(clave)
+        if factory is None:
+            factory = scoped_session(sessionmaker(bind=engine))
+            _sesiones[clave] = factory
+    return factory
+
+
+def get_session(db_path=MENU_DB_PATH):
+    """Atajo: sesión del request actual para el archivo indicado"""
+    return get_session_factory(db_path)()
+
+
+def _desactivar_transaccion_implicita(dbapi_connection, connection_record):
+    """Hook de conexión: pysqlite deja de emitir su propio BEGIN diferido"""
+    dbapi_connection.isolation_level = None
+
+
+def _comenzar_inmediato(conn):
+    """Hook 'begin': la transacción toma el lock de escritura antes de la primera consulta"""
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def get_session_escritura(db_path=MENU_DB_PATH):
+    """
+    Sesión nueva (no ligada al request) cuyas transacciones empiezan con BEGIN IMMEDIATE:
+    verificar-y-escribir queda serializado entre hilos y workers. Usa su propio engine
+    para no alterar las conexiones del pool compartido; quien la abre la cierra.
+    """
+    clave = _normalizar_ruta(db_path)
+    factory = _sesiones_escritura.get(clave)
+    if factory is None:
+        with _lock:
+            factory = _sesiones_escritura.get(clave)
+            if factory is None:
+                engine = create_engine(
+                    f'sqlite:///{clave}',
+                    echo=False,
+                    pool_size=POOL_SIZE,
+                    max_overflow=POOL_MAX_OVERFLOW,
+                    pool_timeout=POOL_TIMEOUT,
+                    connect_args={'check_same_thread': False}
+                )
+                event.listen(engine, 'connect', _aplicar_pragmas)
+                event.listen(engine, 'connect', _desactivar_transaccion_implicita)
+                event.listen(engine, 'begin', _comenzar_inmediato)
+                event.listen(engine, 'checkin', _politica_checkpoint(clave))
+                _engines_escritura[clave] = engine
+                factory = sessionmaker(bind=engine)
+                _sesiones_escritura[clave] = factory
+    return factory()
+
+
+def remove_sessions(exception=None):
+    """Cierra y descarta las sesiones del request/hilo actual en todos los archivos"""
+    for factory in list(_sesiones.values()):
+        try:
+            factory.remove()
+        except Exception as e:
+            print(f"⚠️ Error liberando sesión: {e}")
+
+
+def ejecutar_checkpoint(db_path=MENU_DB_PATH, modo='PASSIVE'):
+    """Fuerza un checkpoint del WAL (PASSIVE, FULL, RESTART o TRUNCATE)"""
+    modo = modo.upper()
+    if modo not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+        raise ValueError(f"Modo de checkpoint inválido: {modo}")
+    clave = _normalizar_ruta(db_path)
+    conexion = get_engine(clave).raw_connection()
+    try:
+        return _ejecutar_checkpoint_dbapi(conexion.dbapi_connection, clave, modo)
+    finally:
+        conexion.close()
+
+
+def obtener_estado_wal(db_path=MENU_DB_PATH):
+    """
+    Estado del WAL de un archivo: modo de journal, tamaño, frames pendientes
+    y resultado/antigüedad del último checkpoint.
+    """
+    clave = _normalizar_ruta(db_path)
+    with get_engine(clave).connect() as conn:
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+        page_size = conn.exec_driver_sql("PRAGMA page_size").scalar()
+
+    try:
+        tamano_wal = os.path.getsize(_ruta_wal(clave))
+    except OSError:
+        tamano_wal = 0
+    # Cabecera WAL de 32 bytes + (24 bytes de cabecera + página) por frame
+    frames_wal = max((tamano_wal - 32) // (page_size + 24), 0) if tamano_wal else 0
+
+    ultimo = dict(_checkpoints.get(clave, {}))
+    if ultimo.get('fecha'):
+        ultimo['segundos_desde'] = round(time.time() - ultimo['fecha'], 1)
+
+    return {
+        'base_datos': clave,
+        'journal_mode': journal_mode,
+        'wal_bytes': tamano_wal,
+        'wal_mb': round(tamano_wal / (1024 * 1024), 2),
+        'wal_frames': frames_wal,
+        'ultimo_checkpoint': ultimo or None,
+        'politica': {
+            'intervalo_s': CHECKPOINT_INTERVALO_S,
+            'pasivo_bytes': CHECKPOINT_PASIVO_BYTES,
+            'truncate_bytes': CHECKPOINT_TRUNCATE_BYTES
+        }
+    }
+
+
+def listar_bases_datos():
+    """Rutas de los archivos con engine activo en este proceso"""
+    return list(_engines.keys())
+
+
+def dispose_engines():
+    """Cierra todos los pools (útil tras un fork o en scripts de mantenimiento)"""
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        for engine in _engines_escritura.values():
+            engine.dispose()
+
+
+def init_app(app):
+    """Registra la liberación de sesiones al final de cada request"""
+    app.teardown_appcontext(remove_sessions)
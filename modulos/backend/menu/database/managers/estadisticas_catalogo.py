@@ -0,0 +1,132 @@
+"""
+📊 AGREGADOS DEL CATÁLOGO
+Responsabilidad única: métricas del catálogo calculadas por SQLite en una sola pasada.
+
+- Conteos condicionales con SUM(CASE ...) y precios con AVG/MIN/MAX en la misma consulta,
+  sin cargar filas de Producto en Python.
+- Métricas por categoría con un GROUP BY por tabla unido a categorias: el número de
+  consultas no depende de cuántas categorías existan.
+"""
+
+from sqlalchemy import select, func, case, and_, or_
+
+from modulos.backend.menu.database.models.producto import Producto
+from modulos.backend.menu.database.models.categoria import Categoria
+from modulos.backend.menu.database.models.subcategoria import Subcategoria
+from modulos.backend.menu.database.models.ingrediente import Ingrediente
+
+_productos = Producto.__table__
+_categorias = Categoria.__table__
+_subcategorias = Subcategoria.__table__
+_ingredientes = Ingrediente.__table__
+
+_CON_PRECIO = and_(_productos.c.precio.isnot(None), _productos.c.precio > 0)
+
+
+def _contar_si(condicion):
+    """SUM(CASE WHEN condicion THEN 1 ELSE 0 END)"""
+    return func.coalesce(func.sum(case((condicion, 1), else_=0)), 0)
+
+
+def _texto_vacio(columna):
+    return or_(columna.is_(None), columna == '')
+
+
+def _redondear(valor):
+    return round(float(valor), 2) if valor is not None else 0.0
+
+
+def agregados_productos(conexion):
+    """
+    Métricas de toda la tabla productos en una consulta:
+    totales por estado, tipo y completitud de datos, y precios (solo precio > 0).
+    """
+    fila = conexion.execute(select(
+        func.count().label('total'),
+        _contar_si(_productos.c.disponible == True).label('disponibles'),
+        _contar_si(_productos.c.tipo_producto == 'simple').label('simples'),
+        _contar_si(_productos.c.tipo_producto == 'preparado').label('preparados'),
+        _contar_si(~_texto_vacio(_productos.c.imagen_url)).label('con_imagen'),
+        _contar_si(~_texto_vacio(_productos.c.codigo)).label('con_codigo'),
+        _contar_si(_productos.c.categoria_id.is_(None)).label('sin_categoria'),
+        _contar_si(or_(_productos.c.precio.is_(None), _productos.c.precio <= 0)).label('sin_precio'),
+        _contar_si(_texto_vacio(_productos.c.nombre)).label('sin_nombre'),
+        _contar_si(_CON_PRECIO).label('con_precio'),
+        func.avg(case((_CON_PRECIO, _productos.c.precio))).label('precio_promedio'),
+        func.min(case((_CON_PRECIO, _productos.c.precio))).label('precio_minimo'),
+        func.max(case((_CON_PRECIO, _productos.c.precio))).label('precio_maximo'),
+    )).one()
+
+    agregados = fila._asdict()
+    for clave in ('precio_promedio', 'precio_minimo', 'precio_maximo'):
+        agregados[clave] = _redondear(agregados[clave])
+    return agregados
+
+
+def totales_tablas(conexion):
+    """Conteos de las tablas del catálogo en una consulta (subconsultas escalares)"""
+    def contar(tabla, *condiciones):
+        return select(func.count()).select_from(tabla).where(*condiciones).scalar_subquery()
+
+    fila = conexion.execute(select(
+        contar(_categorias).label('categorias'),
+        contar(_subcategorias).label('subcategorias'),
+        contar(_subcategorias, _subcategorias.c.categoria_id.is_(None)).label('subcategorias_huerfanas'),
+        contar(_ingredientes).label('ingredientes'),
+    )).one()
+    return fila._asdict()
+
+
+def agregados_por_categoria(conexion):
+    """
+    Una fila por categoría (orden por id) con total de productos, disponibles, precio
+    promedio y total de subcategorías: GROUP BY de productos y de subcategorías unidos
+    a categorias en una sola consulta.
+    """
+    por_productos = select(
+        _productos.c.categoria_id,
+        func.count().label('total_productos'),
+        _contar_si(_productos.c.disponible == True).label('productos_activos'),
+        func.avg(case((_CON_PRECIO, _productos.c.precio))).label('precio_promedio'),
+    ).where(_productos.c.categoria_id.isnot(None))\
+        .group_by(_productos.c.categoria_id).subquery()
+
+    por_subcategorias = select(
+        _subcategorias.c.categoria_id,
+        func.count().label('total_subcategorias'),
+    ).where(_subcategorias.c.categoria_id.isnot(None))\
+        .group_by(_subcategorias.c.categoria_id).subquery()
+
+    consulta = select(
+        _categorias.c.id,
+        _categorias.c.titulo,
+        _categorias.c.activa,
+        func.coalesce(por_productos.c.total_productos, 0).label('total_productos'),
+        func.coalesce(por_productos.c.productos_activos, 0).label('productos_activos'),
+        por_productos.c.precio_promedio,
+        func.coalesce(por_subcategorias.c.total_subcategorias, 0).label('total_subcategorias'),
+    ).select_from(
+        _categorias
+        .outerjoin(por_productos, por_productos.c.categoria_id == _categorias.c.id)
+        .outerjoin(por_subcategorias, por_subcategorias.c.categoria_id == _categorias.c.id)
+    ).order_by(_categorias.c.id)
+
+    categorias = []
+    for fila in conexion.execute(consulta):
+        categoria = fila._asdict()
+        categoria['precio_promedio'] = _redondear(categoria['precio_promedio'])
+        categorias.append(categoria)
+    return categorias
+
+
+def productos_mas_caros(conexion, limite=5):
+    """Top de productos por precio con el nombre de su categoría (un JOIN, sin cargas perezosas)"""
+    consulta = select(
+        _productos.c.id, _productos.c.nombre, _productos.c.precio,
+        _categorias.c.titulo.label('categoria')
+    ).select_from(
+        _productos.outerjoin(_categorias, _categorias.c.id == _productos.c.categoria_id)
+    ).where(_productos.c.precio.isnot(None))\
+        .order_by(_productos.c.precio.desc(), _productos.c.id)\
+        .limit(limite)
+    return [fila._asdict() for fila in conexion.execute(consulta)]
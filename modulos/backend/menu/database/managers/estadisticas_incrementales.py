@@ -0,0 +1,378 @@
+"""
+📈 ESTADÍSTICAS INCREMENTALES DEL CATÁLOGO
+Responsabilidad única: mantener la tabla catalogo_estadisticas al día para que los
+dashboards lean contadores ya calculados en lugar de recontar el catálogo.
+
+- Una fila global (categoria_id = 0) y una fila por categoría con los contadores de
+  productos, subcategorías, categorías e ingredientes.
+- Los listeners after_insert/after_update/after_delete del ORM sobre Producto,
+  Categoria, Subcategoria e Ingrediente aplican el delta de cada registro dentro de
+  la misma transacción del flush (un UPSERT por fila afectada).
+- Las escrituras que no pasan por el ORM (SQL crudo, query.update/delete masivos)
+  no se ven: reconstruir() recalcula la tabla completa desde las fuentes
+  (python migrar_db.py --reconstruir-estadisticas o POST /estadisticas/reconstruir).
+"""
+
+from datetime import datetime
+from sqlalchemy import event, inspect
+
+from modulos.backend.menu.database.models.producto import Producto
+from modulos.backend.menu.database.models.categoria import Categoria
+from modulos.backend.menu.database.models.subcategoria import Subcategoria
+from modulos.backend.menu.database.models.ingrediente import Ingrediente
+
+TABLA_ESTADISTICAS = 'catalogo_estadisticas'
+FILA_GLOBAL = 0
+
+CONTADORES = (
+    'productos', 'disponibles', 'no_disponibles', 'simples', 'preparados',
+    'preparados_disponibles', 'con_imagen', 'con_codigo', 'con_precio', 'suma_precios',
+    'sin_nombre', 'sin_categoria', 'categorias', 'categorias_activas', 'subcategorias',
+    'ingredientes'
+)
+
+# ============================================================================
+# 📐 APORTE DE CADA REGISTRO
+# Cada fuente define, por contador, la expresión SQL (para reconstruir) y su
+# equivalente en Python (para los deltas del ORM). Deben coincidir exactamente.
+# ============================================================================
+
+def _texto(valor):
+    return valor is not None and valor != ''
+
+
+def _precio_valido(valor):
+    return valor is not None and valor > 0
+
+
+def _sql_si(condicion):
+    return f"CASE WHEN {condicion} THEN 1 ELSE 0 END"
+
+
+_APORTES_PRODUCTO = {
+    'productos': ('1', lambda v: 1),
+    'disponibles': (_sql_si("disponible = 1"), lambda v: int(v['disponible'] == True)),
+    'no_disponibles': (_sql_si("disponible = 0"), lambda v: int(v['disponible'] == False)),
+    'simples': (_sql_si("tipo_producto = 'simple'"), lambda v: int(v['tipo_producto'] == 'simple')),
+    'preparados': (_sql_si("tipo_producto = 'preparado'"), lambda v: int(v['tipo_producto'] == 'preparado')),
+    'preparados_disponibles': (
+        _sql_si("tipo_producto = 'preparado' AND disponible = 1"),
+        lambda v: int(v['tipo_producto'] == 'preparado' and v['disponible'] == True)
+    ),
+    'con_imagen': (_sql_si("imagen_url IS NOT NULL AND imagen_url <> ''"), lambda v: int(_texto(v['imagen_url']))),
+    'con_codigo': (_sql_si("codigo IS NOT NULL AND codigo <> ''"), lambda v: int(_texto(v['codigo']))),
+    'con_precio': (_sql_si("precio > 0"), lambda v: int(_precio_valido(v['precio']))),
+    'suma_precios': (
+        "CASE WHEN precio > 0 THEN precio ELSE 0 END",
+        lambda v: float(v['precio']) if _precio_valido(v['precio']) else 0.0
+    ),
+    'sin_nombre': (_sql_si("nombre IS NULL OR nombre = ''"), lambda v: int(not _texto(v['nombre']))),
+    'sin_categoria': (_sql_si("categoria_id IS NULL"), lambda v: int(v['categoria_id'] is None)),
+}
+
+_APORTES_CATEGORIA = {
+    'categorias': ('1', lambda v: 1),
+    'categorias_activas': (_sql_si("activa = 1"), lambda v: int(v['activa'] == True)),
+}
+
+_APORTES_SUBCATEGORIA = {
+    'subcategorias': ('1', lambda v: 1),
+}
+
+_APORTES_INGREDIENTE = {
+    'ingredientes': ('1', lambda v: 1),
+}
+
+# modelo -> (tabla, columnas que se leen, aportes, ¿se reparte por categoría?)
+FUENTES = {
+    Producto: ('productos', ('disponible', 'tipo_producto', 'imagen_url', 'codigo', 'precio',
+                             'nombre', 'categoria_id'), _APORTES_PRODUCTO, True),
+    Categoria: ('categorias', ('activa',), _APORTES_CATEGORIA, False),
+    Subcategoria: ('subcategorias', ('categoria_id',), _APORTES_SUBCATEGORIA, True),
+    Ingrediente: ('ingredientes', (), _APORTES_INGREDIENTE, False),
+}
+
+
+def _aporte(aportes, valores):
+    return {contador: calcular(valores) for contador, (_sql, calcular) in aportes.items()}
+
+
+def _filas_de(valores, por_categoria):
+    """Filas de catalogo_estadisticas a las que suma un registro"""
+    if por_categoria and valores.get('categoria_id') is not None:
+        return (FILA_GLOBAL, valores['categoria_id'])
+    return (FILA_GLOBAL,)
+
+
+# ============================================================================
+# 🧮 RECÁLCULO COMPLETO
+# ============================================================================
+
+def _select_aportes(tabla, aportes, por_categoria):
+    expresiones = ', '.join(aportes.get(contador, ('0',))[0] + f" AS {contador}" for contador in CONTADORES)
+    consultas = [f"SELECT {FILA_GLOBAL} AS categoria_id, {expresiones} FROM {tabla}"]
+    if por_categoria:
+        consultas.append(
+            f"SELECT categoria_id, {expresiones} FROM {tabla} WHERE categoria_id IS NOT NULL"
+        )
+    return consultas
+
+
+def sql_recalculo():
+    """SELECT con una fila por categoria_id (0 = global) calculada desde las tablas fuente"""
+    consultas = [f"SELECT {FILA_GLOBAL} AS categoria_id, " + ', '.join(f"0 AS {c}" for c in CONTADORES)]
+    for tabla, _columnas, aportes, por_categoria in FUENTES.values():
+        consultas.extend(_select_aportes(tabla, aportes, por_categoria))
+    sumas = ', '.join(f"SUM({contador}) AS {contador}" for contador in CONTADORES)
+    return (
+        f"SELECT categoria_id, {sumas} FROM ({' UNION ALL '.join(consultas)}) "
+        f"GROUP BY categoria_id"
+    )
+
+
+def sql_reconstruir():
+    """Sentencias (en orden) que reemplazan el contenido de la tabla por el recálculo"""
+    columnas = ', '.join(CONTADORES)
+    return (
+        f"DELETE FROM {TABLA_ESTADISTICAS}",
+        f"INSERT INTO {TABLA_ESTADISTICAS} (categoria_id, {columnas}, fecha_actualizacion) "
+        f"SELECT categoria_id, {columnas}, CURRENT_TIMESTAMP FROM ({sql_recalculo()})"
+    )
+
+
+_tabla_disponible = {}
+
+
+def existe_tabla_estadisticas(conexion):
+    return conexion.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (TABLA_ESTADISTICAS,)
+    ).first() is not None
+
+
+def _tabla_lista(conexion):
+    """
+    Cacheado por archivo una vez encontrada: sin la tabla (base sin migrar) los deltas
+    se omiten y la lectura recalcula desde las tablas fuente
+    """
+    clave = conexion.engine.url.database
+    if not _tabla_disponible.get(clave):
+        _tabla_disponible[clave] = existe_tabla_estadisticas(conexion)
+    return _tabla_disponible[clave]
+
+
+def reconstruir(conexion):
+    """
+    Recalcula catalogo_estadisticas desde cero (reparación de desvíos).
+    Devuelve el número de filas escritas; el commit queda a cargo de quien llama.
+    """
+    for sentencia in sql_reconstruir():
+        resultado = conexion.exec_driver_sql(sentencia)
+    return resultado.rowcount
+
+
+def diferencias(conexion, tolerancia=0.01):
+    """
+    Compara la tabla con un recálculo: {categoria_id: {contador: (tabla, real)}}.
+    Vacío si los contadores incrementales están al día.
+    """
+    columnas = ', '.join(CONTADORES)
+    guardadas = {
+        fila[0]: dict(zip(CONTADORES, fila[1:]))
+        for fila in conexion.exec_driver_sql(f"SELECT categoria_id, {columnas} FROM {TABLA_ESTADISTICAS}")
+    }
+    reales = {
+        fila[0]: dict(zip(CONTADORES, fila[1:]))
+        for fila in conexion.exec_driver_sql(sql_recalculo())
+    }
+
+    desvios = {}
+    for categoria_id in set(guardadas) | set(reales):
+        guardada = guardadas.get(categoria_id, {})
+        real = reales.get(categoria_id, {})
+        distintos = {
+            contador: (guardada.get(contador) or 0, real.get(contador) or 0)
+            for contador in CONTADORES
+            if abs((guardada.get(contador) or 0) - (real.get(contador) or 0)) > tolerancia
+        }
+        if distintos:
+            desvios[categoria_id] = distintos
+    return desvios
+
+
+# ============================================================================
+# 📖 LECTURA
+# ============================================================================
+
+def _origen(conexion):
+    """La tabla si la creó la migración 0009; si no, el recálculo como subconsulta"""
+    return TABLA_ESTADISTICAS if _tabla_lista(conexion) else f"({sql_recalculo()})"
+
+
+def _completar(fila):
+    estadisticas = {contador: fila.get(contador) or 0 for contador in CONTADORES}
+    estadisticas['suma_precios'] = float(estadisticas['suma_precios'])
+    estadisticas['precio_promedio'] = (
+        round(estadisticas['suma_precios'] / estadisticas['con_precio'], 2)
+        if estadisticas['con_precio'] else 0.0
+    )
+    return estadisticas
+
+
+def leer_global(conexion):
+    """Contadores de todo el catálogo (una fila) más precio_promedio"""
+    fila = conexion.exec_driver_sql(
+        f"SELECT * FROM {_origen(conexion)} WHERE categoria_id = ?", (FILA_GLOBAL,)
+    ).mappings().first()
+    return _completar(dict(fila) if fila else {})
+
+
+def leer_por_categoria(conexion):
+    """Una entrada por categoría existente (orden por id): id, titulo, activa y sus contadores"""
+    filas = conexion.exec_driver_sql(f"""
+        SELECT c.id, c.titulo, c.activa, e.*
+        FROM categorias c
+        LEFT JOIN {_origen(conexion)} e ON e.categoria_id = c.id
+        ORDER BY c.id
+    """).mappings()
+
+    categorias = []
+    for fila in filas:
+        categoria = _completar(fila)
+        categoria.update(
+            id=fila['id'], titulo=fila['titulo'],
+            activa=bool(fila['activa']) if fila['activa'] is not None else None
+        )
+        categorias.append(categoria)
+    return categorias
+
+
+# ============================================================================
+# 🎧 LISTENERS DEL ORM
+# ============================================================================
+
+_listeners_instalados = False
+
+CLAVE_PREVIOS = 'estadisticas_previas'
+
+
+def _valores_previos(conexion, estado, tabla, columnas):
+    """
+    Valores de las columnas antes del flush según el historial de atributos.
+    Si alguno no estaba cargado (objeto expirado) se lee de la fila, que aún no cambió.
+    """
+    valores, faltantes = {}, []
+    for columna in columnas:
+        historial = estado.attrs[columna].history
+        if historial.deleted:
+            valores[columna] = historial.deleted[0]
+        elif historial.unchanged:
+            valores[columna] = historial.unchanged[0]
+        else:
+            faltantes.append(columna)
+
+    if faltantes:
+        fila = conexion.exec_driver_sql(
+            f"SELECT {', '.join(faltantes)} FROM {tabla} WHERE id = ?", (estado.identity[0],)
+        ).first()
+        valores.update(zip(faltantes, fila) if fila else ((columna, None) for columna in faltantes))
+    return valores
+
+
+def _valores_actuales(estado, columnas, previos=None):
+    """Valores tras el flush; lo no cargado conserva el valor previo"""
+    previos = previos or {}
+    return {columna: estado.dict.get(columna, previos.get(columna)) for columna in columnas}
+
+
+def _aplicar(conexion, deltas):
+    """deltas: {categoria_id: {contador: delta}} -> un UPSERT por fila con cambios"""
+    ahora = datetime.utcnow().isoformat(sep=' ')
+    for categoria_id, delta in deltas.items():
+        delta = {contador: valor for contador, valor in delta.items() if valor}
+        if not delta:
+            continue
+        columnas = list(delta)
+        conexion.exec_driver_sql(
+            f"INSERT INTO {TABLA_ESTADISTICAS} (categoria_id, {', '.join(columnas)}, fecha_actualizacion) "
+            f"VALUES (?, {', '.join('?' for _ in columnas)}, ?) "
+            f"ON CONFLICT(categoria_id) DO UPDATE SET "
+            + ', '.join(f"{columna} = {columna} + excluded.{columna}" for columna in columnas)
+            + ", fecha_actualizacion = excluded.fecha_actualizacion",
+            (categoria_id, *delta.values(), ahora)
+        )
+
+
+def _acumular(deltas, filas, aporte, signo):
+    for fila in filas:
+        destino = deltas.setdefault(fila, {})
+        for contador, valor in aporte.items():
+            destino[contador] = destino.get(contador, 0) + signo * valor
+
+
+def _al_insertar(mapper, conexion, objetivo):
+    if not _tabla_lista(conexion):
+        return
+    _tabla, columnas, aportes, por_categoria = FUENTES[mapper.class_]
+    valores = _valores_actuales(inspect(objetivo), columnas)
+    deltas = {}
+    _acumular(deltas, _filas_de(valores, por_categoria), _aporte(aportes, valores), +1)
+    _aplicar(conexion, deltas)
+
+
+def _antes_de_modificar(mapper, conexion, objetivo):
+    if not _tabla_lista(conexion):
+        return
+    tabla, columnas, _aportes, _por_categoria = FUENTES[mapper.class_]
+    if columnas:
+        estado = inspect(objetivo)
+        estado.info[CLAVE_PREVIOS] = _valores_previos(conexion, estado, tabla, columnas)
+
+
+def _al_modificar(mapper, conexion, objetivo):
+    estado = inspect(objetivo)
+    previos = estado.info.pop(CLAVE_PREVIOS, None)
+    if previos is None:
+        return
+    _tabla, columnas, aportes, por_categoria = FUENTES[mapper.class_]
+    actuales = _valores_actuales(estado, columnas, previos)
+    if actuales == previos:
+        return
+    deltas = {}
+    _acumular(deltas, _filas_de(previos, por_categoria), _aporte(aportes, previos), -1)
+    _acumular(deltas, _filas_de(actuales, por_categoria), _aporte(aportes, actuales), +1)
+    _aplicar(conexion, deltas)
+
+
+def _antes_de_borrar(mapper, conexion, objetivo):
+    if not _tabla_lista(conexion):
+        return
+    tabla, columnas, _aportes, _por_categoria = FUENTES[mapper.class_]
+    estado = inspect(objetivo)
+    estado.info[CLAVE_PREVIOS] = _valores_previos(conexion, estado, tabla, columnas)
+
+
+def _al_borrar(mapper, conexion, objetivo):
+    previos = inspect(objetivo).info.pop(CLAVE_PREVIOS, None)
+    if previos is None:
+        return
+    _tabla, _columnas, aportes, por_categoria = FUENTES[mapper.class_]
+    deltas = {}
+    _acumular(deltas, _filas_de(previos, por_categoria), _aporte(aportes, previos), -1)
+    _aplicar(conexion, deltas)
+
+
+def instalar_listeners():
+    """Registra (una sola vez) los listeners de mapper sobre los modelos del catálogo"""
+    global _listeners_instalados
+    if _listeners_instalados:
+        return
+    for modelo in FUENTES:
+        event.listen(modelo, 'after_insert', _al_insertar)
+        event.listen(modelo, 'before_update', _antes_de_modificar)
+        event.listen(modelo, 'after_update', _al_modificar)
+        event.listen(modelo, 'before_delete', _antes_de_borrar)
+        event.listen(modelo, 'after_delete', _al_borrar)
+    _listeners_instalados = True
+
+
+instalar_listeners()
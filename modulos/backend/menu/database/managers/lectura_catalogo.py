@@ -0,0 +1,467 @@
+"""
+📖 CAPA DE LECTURA DEL CATÁLOGO (SIN ORM)
+Responsabilidad única: listados de solo lectura con SQLAlchemy Core.
+
+- Se seleccionan solo las columnas que viajan en el JSON (con JOIN para los nombres de
+  categoría/subcategoría) en lugar de hidratar objetos ORM y sus relaciones.
+- Cada fila se copia a un registro compacto con __slots__ y se serializa en bloque.
+- Los diccionarios resultantes son idénticos a los de producto_to_dict, categoria_to_dict,
+  subcategoria_to_dict y receta_to_dict, así que los endpoints mantienen su contrato.
+- Proyecciones (?fields=): con una lista de campos, el SELECT trae solo esas columnas
+  (y hace los JOIN solo si se piden nombres de relaciones) y el JSON solo esas claves.
+"""
+
+from collections import defaultdict
+from sqlalchemy import select, func
+
+from modulos.backend.menu.database.models.producto import Producto
+from modulos.backend.menu.database.models.categoria import Categoria
+from modulos.backend.menu.database.models.subcategoria import Subcategoria
+from modulos.backend.menu.database.models.ingrediente import Ingrediente
+
+_productos = Producto.__table__
+_categorias = Categoria.__table__
+_subcategorias = Subcategoria.__table__
+_ingredientes = Ingrediente.__table__
+
+
+# ===== REGISTROS =====
+
+class ProductoFila:
+    """Producto de solo lectura (mismas claves que producto_to_dict)"""
+    __slots__ = (
+        'id', 'codigo', 'nombre', 'precio', 'descripcion', 'imagen_url',
+        'categoria_id', 'categoria_nombre', 'subcategoria_id', 'subcategoria_nombre',
+        'disponible', 'tiempo_preparacion', 'instrucciones_preparacion', 'notas_cocina',
+        'tipo_producto'
+    )
+
+    def __init__(self, id, codigo, nombre, precio, descripcion, imagen_url,
+                 categoria_id, categoria_nombre, subcategoria_id, subcategoria_nombre,
+                 disponible, tiempo_preparacion, instrucciones_preparacion, notas_cocina,
+                 tipo_producto):
+        self.id = id
+        self.codigo = codigo
+        self.nombre = nombre
+        self.precio = float(precio) if precio else 0.0
+        self.descripcion = descripcion
+        self.imagen_url = imagen_url
+        self.categoria_id = categoria_id
+        self.categoria_nombre = categoria_nombre
+        self.subcategoria_id = subcategoria_id
+        self.subcategoria_nombre = subcategoria_nombre
+        self.disponible = disponible
+        self.tiempo_preparacion = tiempo_preparacion
+        self.instrucciones_preparacion = instrucciones_preparacion
+        self.notas_cocina = notas_cocina
+        self.tipo_producto = tipo_producto
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'codigo': self.codigo,
+            'nombre': self.nombre,
+            'precio': self.precio,
+            'descripcion': self.descripcion,
+            'imagen_url': self.imagen_url,
+            'categoria_id': self.categoria_id,
+            'categoria_nombre': self.categoria_nombre,
+            'subcategoria_id': self.subcategoria_id,
+            'subcategoria_nombre': self.subcategoria_nombre,
+            'disponible': self.disponible,
+            'tiempo_preparacion': self.tiempo_preparacion,
+            'instrucciones_preparacion': self.instrucciones_preparacion,
+            'notas_cocina': self.notas_cocina,
+            'tipo_producto': self.tipo_producto
+        }
+
+
+class CategoriaFila:
+    """Categoría de solo lectura (mismas claves que categoria_to_dict)"""
+    __slots__ = ('id', 'codigo', 'titulo', 'descripcion', 'activa', 'icono', 'orden')
+
+    def __init__(self, id, codigo, titulo, descripcion, activa, icono, orden):
+        self.id = id
+        self.codigo = codigo
+        self.titulo = titulo
+        self.descripcion = descripcion
+        self.activa = activa
+        self.icono = icono
+        self.orden = orden
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'codigo': self.codigo,
+            'nombre': self.titulo,
+            'descripcion': self.descripcion,
+            'activa': self.activa,
+            'icono': self.icono,
+            'orden': self.orden
+        }
+
+
+class SubcategoriaFila:
+    """Subcategoría de solo lectura (mismas claves que subcategoria_to_dict)"""
+    __slots__ = ('id', 'nombre', 'descripcion', 'icono', 'codigo', 'categoria_id',
+                 'categoria_nombre', 'orden', 'activa')
+
+    def __init__(self, id, nombre, descripcion, icono, codigo, categoria_id,
+                 categoria_nombre, orden, activa):
+        self.id = id
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.icono = icono or '🏷️'
+        self.codigo = codigo
+        self.categoria_id = categoria_id
+        self.categoria_nombre = categoria_nombre
+        self.orden = orden
+        self.activa = activa
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'nombre': self.nombre,
+            'descripcion': self.descripcion,
+            'icono': self.icono,
+            'codigo': self.codigo,
+            'categoria_id': self.categoria_id,
+            'categoria_nombre': self.categoria_nombre,
+            'orden': self.orden,
+            'activa': self.activa
+        }
+
+
+class RecetaResumenFila:
+    """Receta para listados de cocina: datos del producto + conteo de ingredientes"""
+    __slots__ = ('id', 'nombre', 'descripcion', 'imagen_url', 'categoria', 'tiempo_preparacion',
+                 'precio', 'disponible', 'total_ingredientes')
+
+    def __init__(self, id, nombre, descripcion, imagen_url, categoria, tiempo_preparacion,
+                 precio, disponible, total_ingredientes):
+        self.id = id
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.imagen_url = imagen_url
+        self.categoria = categoria or 'Sin categoría'
+        self.tiempo_preparacion = tiempo_preparacion
+        self.precio = float(precio) if precio else 0
+        self.disponible = disponible
+        self.total_ingredientes = total_ingredientes or 0
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'nombre': self.nombre,
+            'descripcion': self.descripcion,
+            'imagen_url': self.imagen_url,
+            'categoria': self.categoria,
+            'tiempo_preparacion': self.tiempo_preparacion,
+            'precio': self.precio,
+            'disponible': self.disponible,
+            'tiene_ingredientes': self.total_ingredientes > 0,
+            'total_ingredientes': self.total_ingredientes
+        }
+
+
+class IngredienteFila:
+    """Ingrediente de solo lectura"""
+    __slots__ = ('id', 'producto_id', 'nombre', 'cantidad', 'unidad', 'costo', 'obligatorio', 'activo')
+
+    def __init__(self, id, producto_id, nombre, cantidad, unidad, costo, obligatorio, activo):
+        self.id = id
+        self.producto_id = producto_id
+        self.nombre = nombre
+        self.cantidad = cantidad or ''
+        self.unidad = unidad or 'ud'
+        self.costo = float(costo or 0.0)
+        self.obligatorio = obligatorio if obligatorio is not None else True
+        self.activo = activo if activo is not None else True
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'producto_id': self.producto_id,
+            'nombre': self.nombre,
+            'cantidad': self.cantidad,
+            'unidad': self.unidad,
+            'costo': self.costo,
+            'obligatorio': self.obligatorio,
+            'activo': self.activo
+        }
+
+
+def serializar(filas):
+    """Serialización en bloque de una lista de registros"""
+    return [fila.to_dict() for fila in filas]
+
+
+# ===== PROYECCIONES (?fields= / ?include=) =====
+
+_COLUMNAS_PRODUCTO = {
+    'id': _productos.c.id,
+    'codigo': _productos.c.codigo,
+    'nombre': _productos.c.nombre,
+    'precio': _productos.c.precio,
+    'descripcion': _productos.c.descripcion,
+    'imagen_url': _productos.c.imagen_url,
+    'categoria_id': _productos.c.categoria_id,
+    'categoria_nombre': _categorias.c.titulo.label('categoria_nombre'),
+    'subcategoria_id': _productos.c.subcategoria_id,
+    'subcategoria_nombre': _subcategorias.c.nombre.label('subcategoria_nombre'),
+    'disponible': _productos.c.disponible,
+    'tiempo_preparacion': _productos.c.tiempo_preparacion,
+    'instrucciones_preparacion': _productos.c.instrucciones_preparacion,
+    'notas_cocina': _productos.c.notas_cocina,
+    'tipo_producto': _productos.c.tipo_producto
+}
+
+CAMPOS_PRODUCTO = ProductoFila.__slots__
+
+# Texto de uso interno de cocina: no viaja al menú público
+CAMPOS_SOLO_COCINA = ('instrucciones_preparacion', 'notas_cocina')
+CAMPOS_PRODUCTO_PUBLICO = tuple(campo for campo in CAMPOS_PRODUCTO if campo not in CAMPOS_SOLO_COCINA)
+
+CAMPOS_RECETA_RESUMEN = RecetaResumenFila.__slots__[:-1] + ('tiene_ingredientes', 'total_ingredientes')
+
+CAMPOS_RECETA = CAMPOS_PRODUCTO + (
+    'es_especial', 'popularidad', 'fecha_creacion', 'fecha_actualizacion', 'total_ingredientes'
+)
+
+INCLUSIONES_RECETA = ('ingredientes',)
+
+
+def parsear_campos(valor, disponibles):
+    """
+    Interpreta ?fields=a,b,c. Devuelve None si no se pidió proyección o una tupla en el
+    orden de 'disponibles' que siempre incluye 'id'. Lanza ValueError ante campos desconocidos.
+    """
+    if valor is None:
+        return None
+    pedidos = {campo.strip() for campo in valor.split(',') if campo.strip()}
+    desconocidos = sorted(pedidos - set(disponibles))
+    if desconocidos:
+        raise ValueError(f"Campos no válidos: {', '.join(desconocidos)}. Disponibles: {', '.join(disponibles)}")
+    return tuple(campo for campo in disponibles if campo == 'id' or campo in pedidos)
+
+
+def parsear_inclusiones(valor, disponibles, por_defecto=()):
+    """Interpreta ?include=a,b (relaciones embebidas). Sin el parámetro se usa por_defecto"""
+    if valor is None:
+        return set(por_defecto)
+    pedidas = {relacion.strip() for relacion in valor.split(',') if relacion.strip()}
+    desconocidas = sorted(pedidas - set(disponibles))
+    if desconocidas:
+        raise ValueError(f"Relaciones no válidas: {', '.join(desconocidas)}. Disponibles: {', '.join(disponibles)}")
+    return pedidas
+
+
+def proyectar(filas, campos, valores_defecto=None):
+    """Filas Core -> diccionarios con solo los campos pedidos, normalizados como en to_dict"""
+    valores_defecto = [(campo, valor) for campo, valor in (valores_defecto or {}).items() if campo in campos]
+    con_precio = 'precio' in campos
+    resultado = []
+    for fila in filas:
+        datos = dict(zip(campos, fila))
+        if con_precio:
+            datos['precio'] = float(datos['precio']) if datos['precio'] else 0.0
+        for campo, valor in valores_defecto:
+            datos[campo] = datos[campo] or valor
+        resultado.append(datos)
+    return resultado
+
+
+# ===== CONSULTAS =====
+
+def select_productos(*columnas_extra, campos=None):
+    """
+    SELECT de las columnas de ProductoFila (o solo de 'campos') con los nombres de categoría
+    y subcategoría. Las columnas extra (p. ej. la clave de orden del keyset) se agregan al
+    final de cada fila.
+    """
+    campos = campos or CAMPOS_PRODUCTO
+    origen = _productos
+    if 'categoria_nombre' in campos:
+        origen = origen.outerjoin(_categorias, _productos.c.categoria_id == _categorias.c.id)
+    if 'subcategoria_nombre' in campos:
+        origen = origen.outerjoin(_subcategorias, _productos.c.subcategoria_id == _subcategorias.c.id)
+    return select(
+        *(_COLUMNAS_PRODUCTO[campo] for campo in campos), *columnas_extra
+    ).select_from(origen)
+
+
+def serializar_productos(filas, campos=None):
+    """Filas de select_productos -> diccionarios (todas las claves o solo 'campos')"""
+    if campos is None:
+        return serializar(ProductoFila(*fila) for fila in filas)
+    return proyectar(filas, campos)
+
+
+def leer_productos(conexion, *condiciones, orden=None):
+    """Lista de ProductoFila que cumplen las condiciones"""
+    consulta = select_productos().where(*condiciones)
+    consulta = consulta.order_by(*(orden if orden is not None else (_productos.c.id,)))
+    return [ProductoFila(*fila) for fila in conexion.execute(consulta)]
+
+
+def leer_productos_campos(conexion, campos, *condiciones, orden=None):
+    """Productos como diccionarios con solo los campos indicados"""
+    consulta = select_productos(campos=campos).where(*condiciones)
+    consulta = consulta.order_by(*(orden if orden is not None else (_productos.c.id,)))
+    return proyectar(conexion.execute(consulta), campos)
+
+
+def leer_categorias(conexion, *condiciones, solo_activas=True):
+    """Lista de CategoriaFila (por defecto solo activas)"""
+    consulta = select(
+        _categorias.c.id, _categorias.c.codigo, _categorias.c.titulo, _categorias.c.descripcion,
+        _categorias.c.activa, _categorias.c.icono, _categorias.c.orden
+    ).where(*condiciones).order_by(_categorias.c.id)
+    if solo_activas:
+        consulta = consulta.where(_categorias.c.activa == True)
+    return [CategoriaFila(*fila) for fila in conexion.execute(consulta)]
+
+
+def leer_subcategorias(conexion, *condiciones, solo_activas=True):
+    """Lista de SubcategoriaFila con el nombre de su categoría"""
+    consulta = select(
+        _subcategorias.c.id, _subcategorias.c.nombre, _subcategorias.c.descripcion,
+        _subcategorias.c.icono, _subcategorias.c.codigo, _subcategorias.c.categoria_id,
+        _categorias.c.titulo, _subcategorias.c.orden, _subcategorias.c.activa
+    ).select_from(
+        _subcategorias.outerjoin(_categorias, _subcategorias.c.categoria_id == _categorias.c.id)
+    ).where(*condiciones).order_by(_subcategorias.c.id)
+    if solo_activas:
+        consulta = consulta.where(_subcategorias.c.activa == True)
+    return [SubcategoriaFila(*fila) for fila in conexion.execute(consulta)]
+
+
+def leer_ingredientes(conexion, *condiciones):
+    """Lista de IngredienteFila que cumplen las condiciones"""
+    consulta = select(
+        _ingredientes.c.id, _ingredientes.c.producto_id, _ingredientes.c.nombre,
+        _ingredientes.c.cantidad, _ingredientes.c.unidad, _ingredientes.c.costo,
+        _ingredientes.c.obligatorio, _ingredientes.c.activo
+    ).where(*condiciones).order_by(_ingredientes.c.id)
+    return [IngredienteFila(*fila) for fila in conexion.execute(consulta)]
+
+
+def _conteo_ingredientes():
+    return select(
+        _ingredientes.c.producto_id, func.count(_ingredientes.c.id).label('total')
+    ).group_by(_ingredientes.c.producto_id).subquery()
+
+
+def leer_resumen_recetas(conexion, *condiciones):
+    """Recetas (productos preparados) con categoría y número de ingredientes en una consulta"""
+    conteo = _conteo_ingredientes()
+
+    consulta = select(
+        _productos.c.id, _productos.c.nombre, _productos.c.descripcion, _productos.c.imagen_url,
+        _categorias.c.titulo, _productos.c.tiempo_preparacion, _productos.c.precio,
+        _productos.c.disponible, conteo.c.total
+    ).select_from(
+        _productos
+        .outerjoin(_categorias, _productos.c.categoria_id == _categorias.c.id)
+        .outerjoin(conteo, conteo.c.producto_id == _productos.c.id)
+    ).where(
+        _productos.c.tipo_producto == 'preparado', *condiciones
+    ).order_by(_productos.c.id)
+    return [RecetaResumenFila(*fila) for fila in conexion.execute(consulta)]
+
+
+def leer_resumen_recetas_campos(conexion, campos, *condiciones):
+    """
+    Proyección de leer_resumen_recetas: la categoría y el conteo de ingredientes
+    solo se consultan si se piden.
+    """
+    con_conteo = 'total_ingredientes' in campos or 'tiene_ingredientes' in campos
+    columnas = [campo for campo in campos if campo not in ('tiene_ingredientes', 'total_ingredientes')]
+    origen = _productos
+    seleccion = []
+    for campo in columnas:
+        if campo == 'categoria':
+            origen = origen.outerjoin(_categorias, _productos.c.categoria_id == _categorias.c.id)
+            seleccion.append(_categorias.c.titulo)
+        else:
+            seleccion.append(_productos.c[campo])
+    if con_conteo:
+        conteo = _conteo_ingredientes()
+        origen = origen.outerjoin(conteo, conteo.c.producto_id == _productos.c.id)
+        seleccion.append(conteo.c.total)
+        columnas.append('total_ingredientes')
+
+    consulta = select(*seleccion).select_from(origen).where(
+        _productos.c.tipo_producto == 'preparado', *condiciones
+    ).order_by(_productos.c.id)
+    recetas = proyectar(conexion.execute(consulta), columnas,
+                        {'categoria': 'Sin categoría', 'total_ingredientes': 0})
+    for receta in recetas:
+        if 'tiene_ingredientes' in campos:
+            receta['tiene_ingredientes'] = receta['total_ingredientes'] > 0
+        if 'total_ingredientes' not in campos:
+            receta.pop('total_ingredientes', None)
+    return recetas
+
+
+_VALORES_DEFECTO_RECETA = {
+    'descripcion': '', 'imagen_url': '', 'categoria_nombre': 'Sin categoría', 'subcategoria_nombre': '',
+    'tiempo_preparacion': '', 'instrucciones_preparacion': '', 'notas_cocina': '', 'tipo_producto': 'preparado'
+}
+_CONSTANTES_RECETA = {'es_especial': False, 'popularidad': 0}
+
+
+def leer_recetas_completas(conexion, *condiciones, campos=None, incluir_ingredientes=True):
+    """
+    Recetas con la forma de receta_to_dict: producto + lista de ingredientes.
+    Dos consultas en total (productos y todos sus ingredientes), sin importar cuántas recetas haya.
+    Con 'campos' solo se leen esas columnas; sin incluir_ingredientes la lista no se consulta.
+    """
+    campos = campos or CAMPOS_RECETA
+    campos_producto = tuple(campo for campo in campos if campo in _COLUMNAS_PRODUCTO)
+    fechas = tuple(campo for campo in ('fecha_creacion', 'fecha_actualizacion') if campo in campos)
+
+    consulta = select_productos(*(_productos.c[fecha] for fecha in fechas), campos=campos_producto)\
+        .where(_productos.c.tipo_producto == 'preparado', *condiciones)\
+        .order_by(_productos.c.id)
+    recetas = proyectar(conexion.execute(consulta), campos_producto + fechas, _VALORES_DEFECTO_RECETA)
+    constantes = [(campo, valor) for campo, valor in _CONSTANTES_RECETA.items() if campo in campos]
+    for receta in recetas:
+        receta.update(constantes)
+
+    con_total = 'total_ingredientes' in campos
+    if not recetas or not (incluir_ingredientes or con_total):
+        return recetas
+
+    ids = [receta['id'] for receta in recetas]
+    if incluir_ingredientes:
+        ingredientes_por_producto = defaultdict(list)
+        for fila in conexion.execute(
+            select(
+                _ingredientes.c.producto_id, _ingredientes.c.id, _ingredientes.c.nombre,
+                _ingredientes.c.cantidad, _ingredientes.c.unidad, _ingredientes.c.obligatorio,
+                _ingredientes.c.costo
+            ).where(_ingredientes.c.producto_id.in_(ids)).order_by(_ingredientes.c.id)
+        ):
+            ingredientes_por_producto[fila[0]].append({
+                'id': fila[1],
+                'nombre': fila[2],
+                'cantidad': fila[3] or '',
+                'unidad': fila[4] or 'ud',
+                'notas': '',
+                'obligatorio': fila[5] if fila[5] is not None else True,
+                'costo': float(fila[6] or 0.0)
+            })
+        for receta in recetas:
+            receta['ingredientes'] = ingredientes_por_producto.get(receta['id'], [])
+            if con_total:
+                receta['total_ingredientes'] = len(receta['ingredientes'])
+    else:
+        totales = dict(conexion.execute(
+            select(_ingredientes.c.producto_id, func.count(_ingredientes.c.id))
+            .where(_ingredientes.c.producto_id.in_(ids))
+            .group_by(_ingredientes.c.producto_id)
+        ).all())
+        for receta in recetas:
+            receta['total_ingredientes'] = totales.get(receta['id'], 0)
+    return recetas
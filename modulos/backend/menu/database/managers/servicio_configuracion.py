@@ -0,0 +1,253 @@
+"""
+⚙️ SERVICIO DE CONFIGURACIÓN EN MEMORIA
+Responsabilidad única: servir desde memoria, ya tipada, la configuración que hoy vive en
+tres lugares y se leía en cada request:
+
+- 'chatbot': tabla chatbot_configuracion (base del chatbot), convertida según su columna tipo.
+- 'sistema': tabla configuracion_sistema (base del menú), menú propio/externo de /menu/.
+- 'menu': config_menu.json, estado del intercambio proyecto/treinta.
+
+Cada fuente es un diccionario que se reemplaza entero al recargar (los lectores nunca ven
+una carga a medias) y lleva su versión; el servicio tiene una versión global que sube con
+cualquier cambio. Una lectura es una búsqueda en un diccionario. Se invalida:
+
+- Al escribir: los temas 'configuracion' y 'fondos' del bus de eventos (publicados al
+  confirmar, también desde los otros workers) marcan las fuentes para recargar.
+- Por cambios externos (sqlite3 a mano, un JSON editado): como mucho cada
+  INTERVALO_REVALIDACION_S, en la misma lectura, se compara PRAGMA data_version de cada
+  base (sin leer tablas) y el mtime/tamaño del archivo.
+
+config_menu.json se escribe con escribir_json_atomico(): archivo temporal en la misma
+carpeta + fsync + os.replace, así un lector nunca encuentra el JSON a medio escribir.
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from types import MappingProxyType
+
+from modulos.backend.menu.database.managers.db_manager import get_engine, MENU_DB_PATH, CHATBOT_DB_PATH
+from modulos.backend.menu.database.managers.bus_eventos import bus_eventos
+
+CONFIG_MENU_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config_menu.json')
+INTERVALO_REVALIDACION_S = 1.0
+
+# Tipos de las claves de configuracion_sistema (la tabla no tiene columna tipo)
+TIPOS_SISTEMA = {
+    'redirect_automatico': 'boolean'
+}
+
+
+def convertir_valor(valor, tipo):
+    """Texto guardado -> valor tipado ('integer', 'boolean', 'json'); si no convierte, queda el texto"""
+    try:
+        if tipo == 'integer':
+            return int(valor)
+        if tipo == 'boolean':
+            return str(valor).lower() == 'true'
+        if tipo == 'json':
+            return json.loads(valor)
+    except (TypeError, ValueError):
+        pass
+    return valor
+
+
+def escribir_json_atomico(ruta, datos):
+    """Reemplaza el archivo de una vez: nunca queda un JSON truncado a la vista de otro proceso"""
+    carpeta = os.path.dirname(ruta) or '.'
+    descriptor, temporal = tempfile.mkstemp(prefix='.' + os.path.basename(ruta) + '.', suffix='.tmp', dir=carpeta)
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as archivo:
+            json.dump(datos, archivo, indent=2, ensure_ascii=False)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+class FuenteConfiguracion:
+    """Una fuente: cómo cargarla y cómo saber si cambió por fuera"""
+
+    def __init__(self, nombre, cargar, firma):
+        self.nombre = nombre
+        self.cargar = cargar
+        self.firma = firma
+        self.valores = MappingProxyType({})
+        self.version = 0
+        self.recargas = 0
+        self.errores = 0
+        self.ultimo_error = None
+        self.firma_cargada = None
+        self.revisada = 0
+        # Generación pedida (sube al invalidar) vs generación cargada
+        self.generacion = 1
+        self.generacion_cargada = 0
+
+
+class ServicioConfiguracion:
+    """Configuración tipada y versionada de las tres fuentes"""
+
+    def __init__(self, menu_db=MENU_DB_PATH, chatbot_db=CHATBOT_DB_PATH,
+                 config_menu=CONFIG_MENU_PATH, intervalo_s=INTERVALO_REVALIDACION_S):
+        self.menu_db = menu_db
+        self.chatbot_db = chatbot_db
+        self.config_menu = config_menu
+        self.intervalo_s = intervalo_s
+        self.version = 0
+        self._lock = threading.Lock()
+        self._conexiones = {}
+        self._pid = os.getpid()
+        self._fuentes = {
+            'chatbot': FuenteConfiguracion('chatbot', self._cargar_chatbot, lambda: self._version_base(self.chatbot_db)),
+            'sistema': FuenteConfiguracion('sistema', self._cargar_sistema, lambda: self._version_base(self.menu_db)),
+            'menu': FuenteConfiguracion('menu', self._cargar_menu, self._firma_archivo),
+        }
+
+    # ==================== LECTURA ====================
+
+    def valores(self, fuente):
+        """Mapa tipado de solo lectura de la fuente"""
+        datos = self._fuentes[fuente]
+        if datos.generacion_cargada != datos.generacion or time.monotonic() - datos.revisada >= self.intervalo_s:
+            self._revalidar(datos)
+        return datos.valores
+
+    def obtener(self, fuente, clave, defecto=None):
+        return self.valores(fuente).get(clave, defecto)
+
+    def instantanea(self):
+        """Todas las fuentes con la versión global (para depurar o exponer)"""
+        return {
+            'version': self.version,
+            'fuentes': {nombre: dict(self.valores(nombre)) for nombre in self._fuentes}
+        }
+
+    # ==================== INVALIDACIÓN ====================
+
+    def invalidar(self, *fuentes):
+        """La próxima lectura de estas fuentes (todas si no se indica) recarga"""
+        for nombre in fuentes or tuple(self._fuentes):
+            self._fuentes[nombre].generacion += 1
+
+    def al_cambiar(self, tema, datos):
+        """Suscriptor del bus: 'configuracion' (tabla del chatbot y config_menu.json) y 'fondos'"""
+        if tema == 'fondos':
+            self.invalidar('chatbot')
+        else:
+            self.invalidar('chatbot', 'menu')
+
+    def _revalidar(self, datos):
+        with self._lock:
+            if os.getpid() != self._pid:
+                # Proceso hijo (fork del servidor): las conexiones retenidas son del padre
+                self._pid = os.getpid()
+                self._conexiones = {}
+                self.invalidar()
+            pedida = datos.generacion
+            try:
+                firma = datos.firma()
+            except Exception as e:
+                firma = None
+                self._registrar_error(datos, e)
+            datos.revisada = time.monotonic()
+            if pedida == datos.generacion_cargada and firma is not None and firma == datos.firma_cargada:
+                return
+            try:
+                nuevos = datos.cargar()
+            except Exception as e:
+                # Se conservan los últimos valores buenos; se reintenta en la próxima revisión
+                self._registrar_error(datos, e)
+                datos.firma_cargada = None
+                datos.generacion_cargada = pedida
+                return
+            datos.recargas += 1
+            if nuevos != datos.valores:
+                datos.valores = MappingProxyType(nuevos)
+                datos.version += 1
+                self.version += 1
+            datos.firma_cargada = firma
+            datos.generacion_cargada = pedida
+
+    def _registrar_error(self, datos, error):
+        datos.errores += 1
+        datos.ultimo_error = f"{time.strftime('%Y-%m-%dT%H:%M:%S')} {error}"
+        print(f"⚠️ Error cargando configuración '{datos.nombre}': {error}")
+
+    # ==================== FIRMAS DE CAMBIO ====================
+
+    def _version_base(self, db_path):
+        """PRAGMA data_version de una conexión retenida: cambia cuando otra conexión confirma"""
+        conexion = self._conexiones.get(db_path)
+        if conexion is None:
+            conexion = get_engine(db_path).raw_connection()
+            self._conexiones[db_path] = conexion
+        cursor = conexion.cursor()
+        try:
+            cursor.execute("PRAGMA data_version")
+            return cursor.fetchone()[0]
+        except Exception:
+            self._conexiones.pop(db_path, None)
+            conexion.invalidate()
+            raise
+        finally:
+            cursor.close()
+
+    def _firma_archivo(self):
+        try:
+            estado = os.stat(self.config_menu)
+        except FileNotFoundError:
+            return 'sin_archivo'
+        return (estado.st_mtime_ns, estado.st_size)
+
+    # ==================== CARGA ====================
+
+    def _cargar_chatbot(self):
+        with get_engine(self.chatbot_db).connect() as conexion:
+            filas = conexion.exec_driver_sql("SELECT clave, valor, tipo FROM chatbot_configuracion").fetchall()
+        return {clave: convertir_valor(valor, tipo) for clave, valor, tipo in filas}
+
+    def _cargar_sistema(self):
+        with get_engine(self.menu_db).connect() as conexion:
+            filas = conexion.exec_driver_sql("SELECT clave, valor FROM configuracion_sistema").fetchall()
+        return {clave: convertir_valor(valor, TIPOS_SISTEMA.get(clave)) for clave, valor in filas}
+
+    def _cargar_menu(self):
+        if not os.path.exists(self.config_menu):
+            return {}
+        with open(self.config_menu, 'r', encoding='utf-8') as archivo:
+            return json.load(archivo)
+
+    # ==================== ESCRITURA ====================
+
+    def escribir_menu(self, datos):
+        """Escribe config_menu.json de forma atómica; las lecturas de este worker lo ven en seguida"""
+        escribir_json_atomico(self.config_menu, datos)
+        self.invalidar('menu')
+
+    def info(self):
+        return {
+            'version': self.version,
+            'intervalo_revalidacion_s': self.intervalo_s,
+            'fuentes': {
+                nombre: {
+                    'version': datos.version,
+                    'claves': len(datos.valores),
+                    'recargas': datos.recargas,
+                    'errores': datos.errores,
+                    'ultimo_error': datos.ultimo_error,
+                    'pendiente_recarga': datos.generacion_cargada != datos.generacion
+                }
+                for nombre, datos in self._fuentes.items()
+            }
+        }
+
+
+# Instancia compartida del proceso
+servicio_configuracion = ServicioConfiguracion()
+bus_eventos.suscribir('configuracion', servicio_configuracion.al_cambiar)
+bus_eventos.suscribir('fondos', servicio_configuracion.al_cambiar)
@@ -0,0 +1,2 @@
+# Migraciones versionadas de las bases SQLite (ver runner.py)
+from .runner import ejecutar_migraciones, migrar_base_datos, estado_migraciones, descubrir_migraciones
@@ -0,0 +1,46 @@
+"""
+🧰 Utilidades compartidas por los scripts de migración (SQL crudo sobre sqlite3)
+"""
+
+
+class PrerrequisitoFaltante(RuntimeError):
+    """La migración necesita tablas que no existen: se aborta el lote y no se registra"""
+
+
+def existe_tabla(conn, tabla):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (tabla,)
+    ).fetchone() is not None
+
+
+def requerir_tablas(conn, *tablas):
+    """
+    El runner crea las tablas de los modelos antes de migrar; si aun así falta alguna,
+    la migración no puede aplicarse (ni quedar registrada como aplicada).
+    """
+    faltantes = [tabla for tabla in tablas if not existe_tabla(conn, tabla)]
+    if faltantes:
+        raise PrerrequisitoFaltante(f"Faltan las tablas {', '.join(faltantes)}")
+
+
+def columnas_tabla(conn, tabla):
+    return [fila[1] for fila in conn.execute(f"PRAGMA table_info({tabla})")]
+
+
+def agregar_columna(conn, tabla, columna, tipo):
+    """ALTER TABLE ADD COLUMN solo si la columna no existe todavía"""
+    if columna in columnas_tabla(conn, tabla):
+        return False
+    conn.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}")
+    return True
+
+
+def crear_indice(conn, nombre, tabla, columnas, unico=False, donde=None):
+    """
+    Crea el índice si no existe (la tabla tiene que existir).
+    donde: condición de un índice parcial (ej. "activa = 1").
+    """
+    requerir_tablas(conn, tabla)
+    tipo = "UNIQUE INDEX" if unico else "INDEX"
+    condicion = f" WHERE {donde}" if donde else ""
+    conn.execute(f"CREATE {tipo} IF NOT EXISTS {nombre} ON {tabla} ({', '.join(columnas)}){condicion}")
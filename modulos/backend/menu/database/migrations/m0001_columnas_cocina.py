@@ -0,0 +1,38 @@
+"""
+Migración 0001 - Columnas de cocina y tabla de ingredientes
+Incorpora al historial versionado lo que antes hacía migrar_db.py (28/07/2025).
+"""
+
+from .comun import existe_tabla, requerir_tablas, agregar_columna
+
+VERSION = 1
+BASE = 'menu'
+DESCRIPCION = 'Columnas instrucciones_preparacion, notas_cocina y codigo en productos; tabla ingredientes'
+
+
+def aplicar(conn):
+    requerir_tablas(conn, 'productos')
+    for columna, tipo in [
+        ('instrucciones_preparacion', 'TEXT'),
+        ('notas_cocina', 'TEXT'),
+        ('codigo', 'VARCHAR(20)')
+    ]:
+        if agregar_columna(conn, 'productos', columna, tipo):
+            print(f"   ✅ Columna agregada: productos.{columna}")
+
+    if not existe_tabla(conn, 'ingredientes'):
+        conn.execute("""
+            CREATE TABLE ingredientes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                producto_id INTEGER NOT NULL,
+                nombre VARCHAR(100) NOT NULL,
+                cantidad VARCHAR(50),
+                unidad VARCHAR(20),
+                costo FLOAT DEFAULT 0.0,
+                obligatorio BOOLEAN DEFAULT 1,
+                activo BOOLEAN DEFAULT 1,
+                codigo VARCHAR(20),
+                FOREIGN KEY (producto_id) REFERENCES productos (id)
+            )
+        """)
+        print("   ✅ Tabla ingredientes creada")
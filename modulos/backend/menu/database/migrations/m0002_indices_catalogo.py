@@ -0,0 +1,25 @@
+"""
+Migración 0002 - Índices del catálogo
+Filtros habituales del menú, cocina y administración: categoría/subcategoría,
+disponibilidad y tipo de producto; ingredientes por producto.
+"""
+
+from .comun import crear_indice
+
+VERSION = 2
+BASE = 'menu'
+DESCRIPCION = 'Índices compuestos de productos, subcategorias e ingredientes'
+
+INDICES = [
+    ('ix_productos_categoria_disponible', 'productos', ['categoria_id', 'disponible']),
+    ('ix_productos_subcategoria_disponible', 'productos', ['subcategoria_id', 'disponible']),
+    ('ix_productos_tipo_disponible', 'productos', ['tipo_producto', 'disponible']),
+    ('ix_subcategorias_categoria', 'subcategorias', ['categoria_id']),
+    ('ix_ingredientes_producto', 'ingredientes', ['producto_id']),
+]
+
+
+def aplicar(conn):
+    for nombre, tabla, columnas in INDICES:
+        crear_indice(conn, nombre, tabla, columnas)
+    conn.execute("ANALYZE")
@@ -0,0 +1,30 @@
+"""
+Migración 0003 - Índices del chatbot
+Sesiones activas por mesa, cola de notificaciones pendientes y columnas de fecha
+usadas por los gráficos de analytics (/admin/chatbot/api/analytics/graficos).
+"""
+
+from .comun import crear_indice
+
+VERSION = 3
+BASE = 'chatbot'
+DESCRIPCION = 'Índices de sesiones, notificaciones y fechas de analytics'
+
+INDICES = [
+    ('ix_chatbot_sesiones_mesa_activa', 'chatbot_sesiones', ['mesa', 'activa']),
+    ('ix_chatbot_sesiones_fecha_inicio', 'chatbot_sesiones', ['fecha_inicio']),
+    ('ix_chatbot_notificaciones_pendientes', 'chatbot_notificaciones', ['atendida', 'prioridad', 'fecha_notificacion']),
+    ('ix_chatbot_notificaciones_fecha', 'chatbot_notificaciones', ['fecha_notificacion']),
+    ('ix_chatbot_notificaciones_sesion', 'chatbot_notificaciones', ['sesion_id']),
+    ('ix_chatbot_calificaciones_fecha', 'chatbot_calificaciones', ['fecha_calificacion']),
+    ('ix_chatbot_calificaciones_sesion', 'chatbot_calificaciones', ['sesion_id']),
+    ('ix_chatbot_comentarios_fecha', 'chatbot_comentarios', ['fecha_comentario']),
+    ('ix_chatbot_comentarios_sesion', 'chatbot_comentarios', ['sesion_id']),
+    ('ix_chatbot_analytics_fecha', 'chatbot_analytics', ['fecha']),
+]
+
+
+def aplicar(conn):
+    for nombre, tabla, columnas in INDICES:
+        crear_indice(conn, nombre, tabla, columnas)
+    conn.execute("ANALYZE")
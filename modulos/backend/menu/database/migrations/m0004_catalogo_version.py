@@ -0,0 +1,26 @@
+"""
+Migración 0004 - Contadores de versión del catálogo
+Una fila por tabla del catálogo; el ORM la incrementa en cada escritura
+(ver managers/catalogo_version.py).
+"""
+
+VERSION = 4
+BASE = 'menu'
+DESCRIPCION = 'Tabla catalogo_version con un contador por tabla del catálogo'
+
+TABLAS_CATALOGO = ('productos', 'categorias', 'subcategorias', 'ingredientes')
+
+
+def aplicar(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS catalogo_version (
+            tabla VARCHAR(50) PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            fecha_actualizacion DATETIME
+        )
+    """)
+    conn.executemany(
+        "INSERT OR IGNORE INTO catalogo_version (tabla, version, fecha_actualizacion) "
+        "VALUES (?, 1, CURRENT_TIMESTAMP)",
+        [(tabla,) for tabla in TABLAS_CATALOGO]
+    )
@@ -0,0 +1,24 @@
+"""
+Migración 0005 - Índices para ordenar y paginar productos por cursor
+Cada índice termina en id para que el desempate del keyset también use el índice.
+"""
+
+from .comun import requerir_tablas, crear_indice
+
+VERSION = 5
+BASE = 'menu'
+DESCRIPCION = 'Índices (nombre, precio, fecha_actualizacion) + id en productos; fecha_actualizacion sin NULL'
+
+
+def aplicar(conn):
+    requerir_tablas(conn, 'productos')
+    # Productos antiguos sin fecha_actualizacion: se toma la de creación
+    conn.execute("""
+        UPDATE productos
+        SET fecha_actualizacion = COALESCE(fecha_creacion, CURRENT_TIMESTAMP)
+        WHERE fecha_actualizacion IS NULL
+    """)
+
+    crear_indice(conn, 'ix_productos_nombre_lower', 'productos', ['lower(nombre)', 'id'])
+    crear_indice(conn, 'ix_productos_precio', 'productos', ['precio', 'id'])
+    crear_indice(conn, 'ix_productos_fecha_actualizacion', 'productos', ['fecha_actualizacion', 'id'])
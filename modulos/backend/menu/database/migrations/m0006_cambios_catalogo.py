@@ -0,0 +1,67 @@
+"""
+Migración 0006 - Registro de cambios del catálogo para sincronización incremental
+Triggers en productos, categorias, subcategorias e ingredientes anotan cada alta,
+modificación y borrado en catalogo_cambios con un número de secuencia creciente
+(ver managers/cambios_catalogo.py y GET /menu-admin/api/cambios).
+
+El registro se mantiene compacto: una sola fila por registro del catálogo, que se
+reemplaza (con un seq nuevo) en cada cambio. Los borrados quedan como 'delete'.
+"""
+
+from .comun import requerir_tablas
+
+VERSION = 6
+BASE = 'menu'
+DESCRIPCION = 'Tabla catalogo_cambios con triggers de alta/modificación/borrado'
+
+TABLAS_CATALOGO = ('categorias', 'subcategorias', 'productos', 'ingredientes')
+
+
+def _registrar(tabla, registro, operacion, condicion='1'):
+    # DELETE + INSERT explícitos: un INSERT OR REPLACE dentro del trigger heredaría
+    # el ON CONFLICT de la sentencia externa (p. ej. INSERT OR IGNORE) y no se anotaría
+    return f"""
+            DELETE FROM catalogo_cambios WHERE tabla = '{tabla}' AND registro_id = {registro} AND {condicion};
+            INSERT INTO catalogo_cambios (tabla, registro_id, operacion)
+                SELECT '{tabla}', {registro}, '{operacion}' WHERE {condicion};"""
+
+
+def aplicar(conn):
+    requerir_tablas(conn, *TABLAS_CATALOGO)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS catalogo_cambios (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabla VARCHAR(50) NOT NULL,
+            registro_id INTEGER NOT NULL,
+            operacion VARCHAR(10) NOT NULL,
+            fecha DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_catalogo_cambios_registro "
+        "ON catalogo_cambios (tabla, registro_id)"
+    )
+
+    for tabla in TABLAS_CATALOGO:
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS tr_{tabla}_cambios_insert AFTER INSERT ON {tabla}
+            BEGIN {_registrar(tabla, 'NEW.id', 'upsert')}
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS tr_{tabla}_cambios_update AFTER UPDATE ON {tabla}
+            BEGIN {_registrar(tabla, 'OLD.id', 'delete', 'OLD.id <> NEW.id')}
+            {_registrar(tabla, 'NEW.id', 'upsert')}
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS tr_{tabla}_cambios_delete AFTER DELETE ON {tabla}
+            BEGIN {_registrar(tabla, 'OLD.id', 'delete')}
+            END
+        """)
+
+        # Punto de partida: todo lo existente es un alta para un cliente que sincroniza desde 0
+        conn.execute(f"""
+            INSERT OR IGNORE INTO catalogo_cambios (tabla, registro_id, operacion)
+            SELECT '{tabla}', id, 'upsert' FROM {tabla} ORDER BY id
+        """)
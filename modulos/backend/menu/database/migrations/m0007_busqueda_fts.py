@@ -0,0 +1,105 @@
+"""
+Migración 0007 - Índice de texto completo (FTS5) del catálogo
+Tabla virtual productos_fts (rowid = productos.id) con nombre, código, descripción,
+instrucciones de preparación, nombres de ingredientes y título de la categoría.
+Los triggers la mantienen al día ante cualquier escritura (ver managers/busqueda_catalogo.py).
+
+Si el SQLite del sistema no trae FTS5 la migración no crea nada y la búsqueda
+sigue funcionando con LIKE.
+"""
+
+import sqlite3
+
+from .comun import requerir_tablas
+
+VERSION = 7
+BASE = 'menu'
+DESCRIPCION = 'Tabla virtual productos_fts (FTS5) con triggers de sincronización'
+
+# remove_diacritics 2: "cafe" encuentra "Café"; prefix: índices para búsquedas "caf*" cortas
+COLUMNAS_FTS = 'nombre, codigo, descripcion, instrucciones, ingredientes, categoria'
+OPCIONES_FTS = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+
+_INGREDIENTES_DE = "(SELECT group_concat(nombre, ' ') FROM ingredientes WHERE producto_id = {producto})"
+_CATEGORIA_DE = "(SELECT titulo FROM categorias WHERE id = {categoria})"
+
+
+def _insertar_producto(registro):
+    return f"""
+            INSERT INTO productos_fts (rowid, {COLUMNAS_FTS})
+            VALUES ({registro}.id, {registro}.nombre, {registro}.codigo, {registro}.descripcion,
+                    {registro}.instrucciones_preparacion,
+                    {_INGREDIENTES_DE.format(producto=f'{registro}.id')},
+                    {_CATEGORIA_DE.format(categoria=f'{registro}.categoria_id')});"""
+
+
+def _actualizar_ingredientes(producto):
+    return f"""
+            UPDATE productos_fts SET ingredientes = {_INGREDIENTES_DE.format(producto=producto)}
+            WHERE rowid = {producto};"""
+
+
+def aplicar(conn):
+    # Los triggers referencian las tres tablas
+    requerir_tablas(conn, 'productos', 'ingredientes', 'categorias')
+
+    try:
+        conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts USING fts5({COLUMNAS_FTS}, {OPCIONES_FTS})")
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ FTS5 no disponible en este SQLite ({e}); la búsqueda usará LIKE")
+        return
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tr_productos_fts_insert AFTER INSERT ON productos
+        BEGIN {_insertar_producto('NEW')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tr_productos_fts_update
+        AFTER UPDATE OF id, nombre, codigo, descripcion, instrucciones_preparacion, categoria_id ON productos
+        BEGIN
+            DELETE FROM productos_fts WHERE rowid = OLD.id; {_insertar_producto('NEW')}
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tr_productos_fts_delete AFTER DELETE ON productos
+        BEGIN
+            DELETE FROM productos_fts WHERE rowid = OLD.id;
+        END
+    """)
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tr_ingredientes_fts_insert AFTER INSERT ON ingredientes
+        BEGIN {_actualizar_ingredientes('NEW.producto_id')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tr_ingredientes_fts_update
+        AFTER UPDATE OF nombre, producto_id ON ingredientes
+        BEGIN {_actualizar_ingredientes('OLD.producto_id')} {_actualizar_ingredientes('NEW.producto_id')}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tr_ingredientes_fts_delete AFTER DELETE ON ingredientes
+        BEGIN {_actualizar_ingredientes('OLD.producto_id')}
+        END
+    """)
+
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tr_categorias_fts_update AFTER UPDATE OF titulo ON categorias
+        BEGIN
+            UPDATE productos_fts SET categoria = NEW.titulo
+            WHERE rowid IN (SELECT id FROM productos WHERE categoria_id = NEW.id);
+        END
+    """)
+
+    # Carga inicial del índice con el catálogo existente
+    conn.execute("DELETE FROM productos_fts")
+    conn.execute(f"""
+        INSERT INTO productos_fts (rowid, {COLUMNAS_FTS})
+        SELECT p.id, p.nombre, p.codigo, p.descripcion, p.instrucciones_preparacion,
+               (SELECT group_concat(i.nombre, ' ') FROM ingredientes i WHERE i.producto_id = p.id),
+               c.titulo
+        FROM productos p
+        LEFT JOIN categorias c ON c.id = p.categoria_id
+    """)
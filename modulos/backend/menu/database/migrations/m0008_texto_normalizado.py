@@ -0,0 +1,41 @@
+"""
+Migración 0008 - Columnas sombra con texto normalizado para la búsqueda aproximada
+productos.nombre_normalizado y categorias.titulo_normalizado: sin tildes y en
+minúsculas (casefold), base del índice de trigramas de managers/busqueda_trigramas.py.
+
+El ORM las recalcula en cada alta/modificación. Si una escritura por SQL crudo cambia
+el nombre sin tocar la columna sombra, un trigger la deja en NULL para que el índice
+la recalcule en lugar de usar un valor obsoleto.
+"""
+
+from .comun import requerir_tablas, agregar_columna, crear_indice
+from modulos.backend.menu.database.managers.busqueda_trigramas import normalizar
+
+VERSION = 8
+BASE = 'menu'
+DESCRIPCION = 'Columnas nombre_normalizado / titulo_normalizado para búsqueda tolerante a errores'
+
+COLUMNAS_SOMBRA = (
+    ('productos', 'nombre', 'nombre_normalizado', 'VARCHAR(100)'),
+    ('categorias', 'titulo', 'titulo_normalizado', 'VARCHAR'),
+)
+
+
+def aplicar(conn):
+    conn.create_function('normalizar_texto', 1, normalizar, deterministic=True)
+
+    requerir_tablas(conn, *(tabla for tabla, _, _, _ in COLUMNAS_SOMBRA))
+    for tabla, origen, sombra, tipo in COLUMNAS_SOMBRA:
+        if agregar_columna(conn, tabla, sombra, tipo):
+            print(f"   ✅ Columna agregada: {tabla}.{sombra}")
+        conn.execute(f"UPDATE {tabla} SET {sombra} = normalizar_texto({origen})")
+        crear_indice(conn, f"ix_{tabla}_{sombra}", tabla, [sombra])
+
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS tr_{tabla}_{sombra}
+            AFTER UPDATE OF {origen} ON {tabla}
+            WHEN NEW.{origen} IS NOT OLD.{origen} AND NEW.{sombra} IS OLD.{sombra}
+            BEGIN
+                UPDATE {tabla} SET {sombra} = NULL WHERE id = NEW.id;
+            END
+        """)
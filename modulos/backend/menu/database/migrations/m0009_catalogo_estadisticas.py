@@ -0,0 +1,34 @@
+"""
+Migración 0009 - Contadores del catálogo mantenidos de forma incremental
+Tabla catalogo_estadisticas: una fila global (categoria_id = 0) y una por categoría.
+Los listeners del ORM de managers/estadisticas_incrementales.py aplican los deltas en
+cada escritura; aquí solo se crea la tabla y se carga el estado actual.
+"""
+
+from .comun import requerir_tablas
+from modulos.backend.menu.database.managers.estadisticas_incrementales import (
+    TABLA_ESTADISTICAS, CONTADORES, sql_reconstruir
+)
+
+VERSION = 9
+BASE = 'menu'
+DESCRIPCION = 'Tabla catalogo_estadisticas con contadores globales y por categoría'
+
+TABLAS_FUENTE = ('productos', 'categorias', 'subcategorias', 'ingredientes')
+
+
+def aplicar(conn):
+    requerir_tablas(conn, *TABLAS_FUENTE)
+    contadores = ',\n            '.join(
+        f"{contador} {'REAL' if contador == 'suma_precios' else 'INTEGER'} NOT NULL DEFAULT 0"
+        for contador in CONTADORES
+    )
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLA_ESTADISTICAS} (
+            categoria_id INTEGER PRIMARY KEY,
+            {contadores},
+            fecha_actualizacion DATETIME
+        )
+    """)
+    for sentencia in sql_reconstruir():
+        conn.execute(sentencia)
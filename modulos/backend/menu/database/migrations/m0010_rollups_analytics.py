@@ -0,0 +1,43 @@
+"""
+Migración 0010 - Rollups por hora y por día de las analytics del chatbot
+Tablas de agregados de sesiones, calificaciones y notificaciones más el último id
+consolidado de cada fuente (ver modulos/backend/chatbot/analytics_rollups.py).
+
+Las tablas quedan vacías: la primera consulta de analytics consolida toda la historia.
+"""
+
+VERSION = 10
+BASE = 'chatbot'
+DESCRIPCION = 'Tablas chatbot_rollup_* (agregados por hora y día) y chatbot_rollup_estado'
+
+TABLAS = {
+    'chatbot_rollup_sesiones': """
+        granularidad VARCHAR(4) NOT NULL,
+        periodo VARCHAR(16) NOT NULL,
+        mesa VARCHAR(20) NOT NULL,
+        sesiones INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (granularidad, periodo, mesa)""",
+    'chatbot_rollup_calificaciones': """
+        granularidad VARCHAR(4) NOT NULL,
+        periodo VARCHAR(16) NOT NULL,
+        categoria VARCHAR(50) NOT NULL,
+        suma_estrellas INTEGER NOT NULL DEFAULT 0,
+        cantidad INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (granularidad, periodo, categoria)""",
+    'chatbot_rollup_notificaciones': """
+        granularidad VARCHAR(4) NOT NULL,
+        periodo VARCHAR(16) NOT NULL,
+        tipo_notificacion VARCHAR(50) NOT NULL,
+        prioridad VARCHAR(20) NOT NULL,
+        cantidad INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (granularidad, periodo, tipo_notificacion, prioridad)""",
+    'chatbot_rollup_estado': """
+        fuente VARCHAR(50) NOT NULL PRIMARY KEY,
+        ultimo_id INTEGER NOT NULL DEFAULT 0,
+        fecha_actualizacion DATETIME""",
+}
+
+
+def aplicar(conn):
+    for tabla, columnas in TABLAS.items():
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {tabla} ({columnas}\n    )")
@@ -0,0 +1,18 @@
+"""
+Migración 0011 - Id de cliente en chatbot_analytics
+Los eventos que llegan por POST /api/chatbot/analytics/lote traen un id generado en
+el navegador; el índice único hace idempotente el reenvío de un lote (las filas
+escritas por el servidor lo dejan en NULL, que no choca en un índice único).
+"""
+
+from .comun import requerir_tablas, agregar_columna, crear_indice
+
+VERSION = 11
+BASE = 'chatbot'
+DESCRIPCION = 'Columna id_cliente e índice único en chatbot_analytics'
+
+
+def aplicar(conn):
+    requerir_tablas(conn, 'chatbot_analytics')
+    agregar_columna(conn, 'chatbot_analytics', 'id_cliente', 'VARCHAR(64)')
+    crear_indice(conn, 'ux_chatbot_analytics_id_cliente', 'chatbot_analytics', ['id_cliente'], unico=True)
@@ -0,0 +1,26 @@
+"""
+Migración 0012 - Expiración de sesiones en el servidor
+Índice (activa, fecha_ultimo_acceso) para el UPDATE masivo que cierra las sesiones
+vencidas y tabla chatbot_tareas con el turno entre workers de las tareas de fondo
+(ver modulos/backend/chatbot/expiracion_sesiones.py).
+"""
+
+from .comun import requerir_tablas, crear_indice
+
+VERSION = 12
+BASE = 'chatbot'
+DESCRIPCION = 'Índice de sesiones activas por último acceso y tabla chatbot_tareas'
+
+
+def aplicar(conn):
+    requerir_tablas(conn, 'chatbot_sesiones')
+    crear_indice(conn, 'ix_chatbot_sesiones_activa_acceso', 'chatbot_sesiones', ['activa', 'fecha_ultimo_acceso'])
+    conn.execute("""CREATE TABLE IF NOT EXISTS chatbot_tareas (
+        tarea VARCHAR(50) NOT NULL PRIMARY KEY,
+        propietario VARCHAR(100) NOT NULL,
+        vence DATETIME NOT NULL,
+        ultima_ejecucion DATETIME,
+        ultimo_resultado INTEGER NOT NULL DEFAULT 0,
+        total INTEGER NOT NULL DEFAULT 0
+    )""")
+    conn.execute("ANALYZE chatbot_sesiones")
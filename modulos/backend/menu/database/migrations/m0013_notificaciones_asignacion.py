@@ -0,0 +1,18 @@
+"""
+Migración 0013 - Asignación de notificaciones al personal
+El despachador de llamadas (chatbot/despachador_notificaciones.py) asigna cada
+llamada pendiente a un mesero; la asignación queda en la fila para que cualquier
+worker reconstruya la cola desde la base al arrancar.
+"""
+
+from .comun import requerir_tablas, agregar_columna
+
+VERSION = 13
+BASE = 'chatbot'
+DESCRIPCION = 'Columnas asignada_a y fecha_asignacion en chatbot_notificaciones'
+
+
+def aplicar(conn):
+    requerir_tablas(conn, 'chatbot_notificaciones')
+    agregar_columna(conn, 'chatbot_notificaciones', 'asignada_a', 'VARCHAR(100)')
+    agregar_columna(conn, 'chatbot_notificaciones', 'fecha_asignacion', 'DATETIME')
@@ -0,0 +1,27 @@
+"""
+Migración 0014 - Una sola sesión activa por mesa
+Índice único parcial (mesa) WHERE activa = 1: iniciar_sesion pasa a ser un único
+INSERT ... ON CONFLICT DO UPDATE ... RETURNING y varios teléfonos escaneando el QR
+de la misma mesa ya no pueden crear sesiones activas duplicadas.
+Antes de crear el índice se cierran los duplicados existentes (queda la más reciente).
+"""
+
+from .comun import requerir_tablas, crear_indice
+
+VERSION = 14
+BASE = 'chatbot'
+DESCRIPCION = 'Índice único parcial de sesión activa por mesa'
+
+
+def aplicar(conn):
+    requerir_tablas(conn, 'chatbot_sesiones')
+    cerradas = conn.execute("""
+        UPDATE chatbot_sesiones SET activa = 0
+        WHERE activa = 1 AND id NOT IN (
+            SELECT MAX(id) FROM chatbot_sesiones WHERE activa = 1 GROUP BY mesa
+        )
+    """).rowcount
+    if cerradas:
+        print(f"   🧹 {cerradas} sesiones activas duplicadas cerradas")
+    crear_indice(conn, 'ux_chatbot_sesiones_mesa_activa', 'chatbot_sesiones', ['mesa'],
+                 unico=True, donde='activa = 1')
@@ -0,0 +1,206 @@
+"""
+🧭 MOTOR DE MIGRACIONES VERSIONADAS
+Responsabilidad única: aplicar, en orden y una sola vez, los scripts mNNNN_*.py de este paquete.
+
+- Cada base de datos registra lo aplicado en la tabla schema_migraciones.
+- Solo hacia adelante: no existen migraciones de reversa; un cambio se corrige con otra versión.
+- Seguro con varios workers: todo el lote corre dentro de BEGIN IMMEDIATE, que en SQLite
+  es un bloqueo de escritura entre procesos. El worker que llega segundo espera, relee la
+  tabla y encuentra todo aplicado.
+- Antes de migrar se crean, dentro del mismo bloqueo, las tablas de los modelos que falten
+  (lo que haría create_all). Así una base nueva o vacía recibe todas las migraciones de
+  verdad; una migración cuyas tablas aun así faltan lanza PrerrequisitoFaltante y el lote
+  se revierte sin registrarla.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import pkgutil
+import importlib
+from datetime import datetime
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateTable, CreateIndex
+
+from modulos.backend.menu.database.managers.db_manager import MENU_DB_PATH, CHATBOT_DB_PATH
+from .comun import existe_tabla
+
+# Archivo físico de cada base lógica referenciada por las migraciones
+BASES_DATOS = {
+    'menu': MENU_DB_PATH,
+    'chatbot': CHATBOT_DB_PATH
+}
+
+# Módulos con los modelos de cada base (comparten el Base declarativo)
+MODELOS = {
+    'menu': (
+        'modulos.backend.menu.database.models.categoria',
+        'modulos.backend.menu.database.models.subcategoria',
+        'modulos.backend.menu.database.models.producto',
+        'modulos.backend.menu.database.models.ingrediente'
+    ),
+    'chatbot': ('modulos.backend.chatbot.models',)
+}
+
+TABLA_MIGRACIONES = 'schema_migraciones'
+PATRON_MIGRACION = re.compile(r'^m(\d{4})_\w+$')
+TIMEOUT_BLOQUEO_S = 60
+
+
+def descubrir_migraciones():
+    """Carga los módulos mNNNN_*.py del paquete ordenados por versión"""
+    paquete = importlib.import_module(__package__)
+    migraciones = []
+    versiones = set()
+
+    for info in pkgutil.iter_modules(paquete.__path__):
+        if not PATRON_MIGRACION.match(info.name):
+            continue
+        modulo = importlib.import_module(f"{__package__}.{info.name}")
+        if modulo.VERSION in versiones:
+            raise ValueError(f"Versión de migración duplicada: {modulo.VERSION} ({info.name})")
+        if modulo.BASE not in BASES_DATOS:
+            raise ValueError(f"Base de datos desconocida en {info.name}: {modulo.BASE}")
+        versiones.add(modulo.VERSION)
+        migraciones.append(modulo)
+
+    return sorted(migraciones, key=lambda m: m.VERSION)
+
+
+def _conectar(db_path):
+    # isolation_level=None: las transacciones se controlan explícitamente con BEGIN IMMEDIATE
+    conn = sqlite3.connect(db_path, timeout=TIMEOUT_BLOQUEO_S, isolation_level=None)
+    conn.execute(f"PRAGMA busy_timeout={TIMEOUT_BLOQUEO_S * 1000}")
+    return conn
+
+
+def _crear_tabla_migraciones(conn):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {TABLA_MIGRACIONES} (
+            version INTEGER PRIMARY KEY,
+            nombre VARCHAR(100) NOT NULL,
+            descripcion TEXT,
+            fecha_aplicacion DATETIME NOT NULL,
+            duracion_ms INTEGER
+        )
+    """)
+
+
+def _tablas_modelos(base):
+    """Tablas declaradas por los modelos de la base, en orden de dependencias"""
+    from modulos.backend.menu.database.base import Base
+    for nombre in MODELOS[base]:
+        importlib.import_module(nombre)
+    propias = {mapper.local_table for mapper in Base.registry.mappers
+               if mapper.class_.__module__ in MODELOS[base]}
+    return [tabla for tabla in Base.metadata.sorted_tables if tabla in propias]
+
+
+def _crear_tablas_modelos(conn, base):
+    """create_all sobre la conexión del lote: tablas faltantes de los modelos con sus índices"""
+    dialecto = sqlite.dialect()
+    creadas = []
+    for tabla in _tablas_modelos(base):
+        if existe_tabla(conn, tabla.name):
+            continue
+        conn.execute(str(CreateTable(tabla).compile(dialect=dialecto)))
+        for indice in tabla.indexes:
+            conn.execute(str(CreateIndex(indice).compile(dialect=dialecto)))
+        creadas.append(tabla.name)
+    if creadas:
+        print(f"   ✅ Tablas creadas desde los modelos en '{base}': {creadas}")
+
+
+def _versiones_aplicadas(conn):
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (TABLA_MIGRACIONES,)
+    ).fetchone()
+    if not existe:
+        return set()
+    return {fila[0] for fila in conn.execute(f"SELECT version FROM {TABLA_MIGRACIONES}")}
+
+
+def migrar_base_datos(base, migraciones=None):
+    """
+    Aplica las migraciones pendientes de una base lógica ('menu' o 'chatbot').
+    Devuelve la lista de versiones aplicadas en esta llamada.
+    """
+    db_path = BASES_DATOS[base]
+    if migraciones is None:
+        migraciones = descubrir_migraciones()
+    propias = [m for m in migraciones if m.BASE == base]
+
+    conn = _conectar(db_path)
+    aplicadas_ahora = []
+    try:
+        # Bloqueo de escritura entre procesos: los demás workers esperan aquí
+        conn.execute("BEGIN IMMEDIATE")
+        _crear_tabla_migraciones(conn)
+        aplicadas = _versiones_aplicadas(conn)
+
+        desconocidas = aplicadas - {m.VERSION for m in migraciones}
+        if desconocidas and max(desconocidas) > max((m.VERSION for m in migraciones), default=0):
+            print(f"⚠️ Migraciones '{base}': la base tiene versiones más nuevas que el código "
+                  f"({sorted(desconocidas)}); no se aplica nada")
+            conn.execute("ROLLBACK")
+            return []
+
+        _crear_tablas_modelos(conn, base)
+        for migracion in propias:
+            if migracion.VERSION in aplicadas:
+                continue
+            nombre = migracion.__name__.rsplit('.', 1)[-1]
+            inicio = time.perf_counter()
+            print(f"🔧 Aplicando migración {nombre} en '{base}'...")
+            migracion.aplicar(conn)
+            duracion_ms = int((time.perf_counter() - inicio) * 1000)
+            conn.execute(
+                f"INSERT INTO {TABLA_MIGRACIONES} (version, nombre, descripcion, fecha_aplicacion, duracion_ms) "
+                f"VALUES (?, ?, ?, ?, ?)",
+                (migracion.VERSION, nombre, migracion.DESCRIPCION, datetime.utcnow().isoformat(), duracion_ms)
+            )
+            aplicadas_ahora.append(migracion.VERSION)
+
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    if aplicadas_ahora:
+        print(f"✅ Migraciones '{base}' aplicadas: {aplicadas_ahora}")
+    return aplicadas_ahora
+
+
+def ejecutar_migraciones():
+    """Aplica las migraciones pendientes de todas las bases. Pensado para el arranque."""
+    migraciones = descubrir_migraciones()
+    resultado = {}
+    for base in BASES_DATOS:
+        resultado[base] = migrar_base_datos(base, migraciones)
+    return resultado
+
+
+def estado_migraciones():
+    """Versiones aplicadas y pendientes por base de datos"""
+    migraciones = descubrir_migraciones()
+    estado = {}
+    for base, db_path in BASES_DATOS.items():
+        propias = [m for m in migraciones if m.BASE == base]
+        aplicadas = set()
+        if os.path.exists(db_path):
+            conn = sqlite3.connect(db_path)
+            try:
+                aplicadas = _versiones_aplicadas(conn)
+            finally:
+                conn.close()
+        estado[base] = {
+            'base_datos': db_path,
+            'aplicadas': sorted(aplicadas),
+            'pendientes': [m.VERSION for m in propias if m.VERSION not in aplicadas]
+        }
+    return estado
@@ -7,6 +7,7 @@ class Categoria(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)  # Cambio a Integer para consistencia
     codigo = Column(String(20), unique=True, nullable=True)  # Código único alfanumérico
     titulo = Column(String, nullable=False)  # Campo real en la base de datos
+    titulo_normalizado = Column(String, index=True)  # Sin tildes ni mayúsculas (búsqueda aproximada)
     descripcion = Column(Text)
     icono = Column(String)
     orden = Column(Integer)
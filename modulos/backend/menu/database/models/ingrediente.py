@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 # CORRIGIENDO: Usar la Base centralizada
 from modulos.backend.menu.database.base import Base
 
 class Ingrediente(Base):
     __tablename__ = 'ingredientes'
+    __table_args__ = (Index('ix_ingredientes_producto', 'producto_id'),)
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     codigo = Column(String(20), unique=True, nullable=True)  # Código único alfanumérico
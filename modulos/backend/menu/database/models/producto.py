@@ -1,14 +1,25 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey, Text, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from modulos.backend.menu.database.base import Base
 
 class Producto(Base):
     __tablename__ = 'productos'
+    # Índices declarados también en las migraciones 0002, 0005 y 0008 (mismo nombre)
+    __table_args__ = (
+        Index('ix_productos_categoria_disponible', 'categoria_id', 'disponible'),
+        Index('ix_productos_subcategoria_disponible', 'subcategoria_id', 'disponible'),
+        Index('ix_productos_tipo_disponible', 'tipo_producto', 'disponible'),
+        Index('ix_productos_nombre_lower', text('lower(nombre)'), 'id'),
+        Index('ix_productos_precio', 'precio', 'id'),
+        Index('ix_productos_fecha_actualizacion', 'fecha_actualizacion', 'id'),
+        Index('ix_productos_nombre_normalizado', 'nombre_normalizado'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     codigo = Column(String(20), unique=True, nullable=True)  # Código único alfanumérico
     nombre = Column(String(100), nullable=False)
+    nombre_normalizado = Column(String(100))  # Sin tildes ni mayúsculas (búsqueda aproximada)
     descripcion = Column(String(500))
     precio = Column(Float, nullable=False)
     categoria_id = Column(Integer, ForeignKey('categorias.id'))
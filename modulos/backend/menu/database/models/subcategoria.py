@@ -1,9 +1,10 @@
-from sqlalchemy import Column, String, Integer, Boolean, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from modulos.backend.menu.database.base import Base
 
 class Subcategoria(Base):
     __tablename__ = 'subcategorias'
+    __table_args__ = (Index('ix_subcategorias_categoria', 'categoria_id'),)
     id = Column(Integer, primary_key=True, autoincrement=True)  # Cambio a Integer
     codigo = Column(String(20), unique=True, nullable=True)  # Código único alfanumérico
     nombre = Column(String, nullable=False)
@@ -0,0 +1,53 @@
+"""
+⌨️ ENDPOINT DE AUTOCOMPLETADO DEL CATÁLOGO
+Responsabilidad única: sugerencias por prefijo mientras se escribe, desde el trie en
+memoria (managers/autocompletado.py), sin consultar la base en cada tecla.
+
+GET /menu-admin/api/autocompletar/?q=<prefijo>
+    tipos: producto,receta,categoria,ingrediente (por defecto todos)
+    limite (máx. 20)
+"""
+
+from flask import Blueprint, request, jsonify
+from modulos.backend.menu.database.managers.autocompletado import (
+    autocompletado, TIPOS, LIMITE_POR_DEFECTO, LIMITE_MAXIMO
+)
+from modulos.backend.menu.endpoints.parametros import to_int_or_none
+
+# Blueprint específico para autocompletado
+autocompletar_bp = Blueprint('autocompletar', __name__, url_prefix='/autocompletar')
+
+
+@autocompletar_bp.route('/', methods=['GET'])
+def autocompletar():
+    """
+    ⌨️ SUGERENCIAS POR PREFIJO
+    Cada sugerencia: {texto, tipo, id} (los ingredientes traen 'total' de recetas en lugar de id)
+    """
+    termino = request.args.get('q', '')
+
+    tipos = None
+    if request.args.get('tipos'):
+        tipos = tuple(tipo.strip() for tipo in request.args['tipos'].split(',') if tipo.strip())
+        desconocidos = [tipo for tipo in tipos if tipo not in TIPOS]
+        if desconocidos:
+            return jsonify({
+                'success': False,
+                'error': f"Tipos no válidos: {', '.join(desconocidos)}. Opciones: {', '.join(TIPOS)}"
+            }), 400
+
+    limite = to_int_or_none(request.args.get('limite')) or LIMITE_POR_DEFECTO
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+
+    try:
+        sugerencias = autocompletado.sugerir(termino, tipos=tipos, limite=limite)
+        return jsonify({
+            'success': True,
+            'sugerencias': sugerencias,
+            'total': len(sugerencias),
+            'termino': termino
+        })
+
+    except Exception as e:
+        print(f"❌ Error en autocompletado: {e}")
+        return jsonify({'success': False, 'error': f'Error en autocompletado: {str(e)}'}), 500
@@ -4,8 +4,6 @@ Responsabilidad única: Respaldos, exportación y restauración de datos
 """
 
 from flask import Blueprint, request, jsonify, render_template, send_file, make_response
-from sqlalchemy import create_engine, func
-from sqlalchemy.orm import sessionmaker
 import os
 import json
 import tempfile
@@ -18,13 +16,15 @@ from modulos.backend.menu.database.models.producto import Producto
 from modulos.backend.menu.database.models.categoria import Categoria
 from modulos.backend.menu.database.models.subcategoria import Subcategoria
 from modulos.backend.menu.database.models.ingrediente import Ingrediente
+from modulos.backend.menu.database.managers.db_manager import get_engine, get_session_factory
+from modulos.backend.menu.database.managers.estadisticas_incrementales import leer_global
 
 backup_bp = Blueprint('backup', __name__)
 
 # Configuración de base de datos (igual que estadísticas)
 DB_PATH = os.path.join(os.path.dirname(__file__), '../database/menu.db')
-engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
-Session = sessionmaker(bind=engine)
+engine = get_engine(DB_PATH)
+Session = get_session_factory(DB_PATH)
 
 # Función helper para obtener sesión
 def get_db_session():
@@ -50,19 +50,19 @@ def info_sistema():
     ℹ️ INFORMACIÓN DEL SISTEMA PARA BACKUP
     Proporciona estadísticas básicas antes del backup
     """
+    session = get_db_session()
     try:
-        session = get_db_session()
-        
-        # Contar registros
+        # Contadores ya calculados (una fila de catalogo_estadisticas)
+        totales = leer_global(session.connection())
         info = {
             'timestamp': datetime.now().isoformat(),
             'base_datos': {
-                'total_productos': session.query(func.count(Producto.id)).scalar() or 0,
-                'productos_activos': session.query(func.count(Producto.id)).filter(Producto.disponible == True).scalar() or 0,
-                'total_categorias': session.query(func.count(Categoria.id)).scalar() or 0,
-                'categorias_activas': session.query(func.count(Categoria.id)).filter(Categoria.activa == True).scalar() or 0,
-                'total_subcategorias': session.query(func.count(Subcategoria.id)).scalar() or 0,
-                'total_ingredientes': session.query(func.count(Ingrediente.id)).scalar() or 0
+                'total_productos': totales['productos'],
+                'productos_activos': totales['disponibles'],
+                'total_categorias': totales['categorias'],
+                'categorias_activas': totales['categorias_activas'],
+                'total_subcategorias': totales['subcategorias'],
+                'total_ingredientes': totales['ingredientes']
             },
             'archivos': {
                 'ruta_base_datos': os.path.join(os.path.dirname(__file__), '..', 'database', 'menu.db'),
@@ -71,13 +71,11 @@ def info_sistema():
                 'carpeta_uploads_existe': os.path.exists(os.path.join(os.path.dirname(__file__), '..', 'static', 'uploads'))
             },
             'estimacion_tamaños': {
-                'productos_mb': round((session.query(func.count(Producto.id)).scalar() or 0) * 0.001, 2),
-                'estimado_backup_mb': round((session.query(func.count(Producto.id)).scalar() or 0) * 0.005, 2)
+                'productos_mb': round(totales['productos'] * 0.001, 2),
+                'estimado_backup_mb': round(totales['productos'] * 0.005, 2)
             }
         }
         
-        session.close()
-        
         return jsonify(info)
         
     except Exception as e:
@@ -86,6 +84,8 @@ def info_sistema():
             'mensaje': f'Error al obtener información del sistema: {str(e)}',
             'timestamp': datetime.now().isoformat()
         }), 500
+    finally:
+        session.close()
 
 @backup_bp.route('/exportar-json', methods=['GET'])
 def exportar_json():
@@ -0,0 +1,111 @@
+"""
+🔎 ENDPOINT DE BÚSQUEDA UNIFICADA DEL CATÁLOGO
+Responsabilidad única: búsqueda por relevancia (FTS5 + bm25) para administración,
+cocina y menú público.
+
+GET /menu-admin/api/buscar/?q=<texto>
+    ambito: admin (por defecto) | cocina | menu
+        menu: solo productos disponibles, sin campos ni coincidencias en texto de cocina
+    Filtros opcionales: categoria_id, subcategoria_id, tipo_producto, disponible
+    limite (máx. 100) y fields= (proyección de productos)
+    Tolera errores de tipeo: los productos corregidos llegan al final con 'similitud'.
+    Incluye además las categorías activas parecidas al término ('categorias').
+"""
+
+from flask import Blueprint, request, jsonify
+import os
+from sqlalchemy import or_
+from modulos.backend.menu.database.models.producto import Producto
+from modulos.backend.menu.database.managers.db_manager import get_engine, get_session_factory
+from modulos.backend.menu.database.managers.lectura_catalogo import (
+    parsear_campos, CAMPOS_PRODUCTO, CAMPOS_PRODUCTO_PUBLICO
+)
+from modulos.backend.menu.database.managers.busqueda_catalogo import (
+    buscar_productos, buscar_categorias, COLUMNAS_POR_AMBITO, AMBITO_ADMIN, AMBITO_MENU
+)
+from modulos.backend.menu.endpoints.parametros import to_int_or_none
+
+# Configuración de base de datos
+DB_PATH = os.path.join(os.path.dirname(__file__), '../database', 'menu.db')
+engine = get_engine(DB_PATH)
+Session = get_session_factory(DB_PATH)
+
+# Blueprint específico para búsqueda
+busqueda_bp = Blueprint('busqueda', __name__, url_prefix='/buscar')
+
+LIMITE_POR_DEFECTO = 20
+LIMITE_MAXIMO = 100
+LIMITE_CATEGORIAS = 5
+
+
+def condiciones_busqueda(args, ambito):
+    """Filtros estructurados que acompañan al texto"""
+    condiciones = []
+    categoria_id = to_int_or_none(args.get('categoria_id'))
+    if categoria_id is not None:
+        condiciones.append(Producto.categoria_id == categoria_id)
+    subcategoria_id = to_int_or_none(args.get('subcategoria_id'))
+    if subcategoria_id is not None:
+        condiciones.append(Producto.subcategoria_id == subcategoria_id)
+    if args.get('tipo_producto'):
+        condiciones.append(Producto.tipo_producto == args['tipo_producto'])
+
+    if ambito == AMBITO_MENU:
+        condiciones.append(or_(Producto.disponible == True, Producto.disponible.is_(None)))
+    elif args.get('disponible') is not None:
+        condiciones.append(Producto.disponible == (args['disponible'].lower() in ('1', 'true', 'si', 'sí')))
+    return condiciones
+
+
+@busqueda_bp.route('/', methods=['GET'])
+def buscar():
+    """
+    🔎 BÚSQUEDA POR RELEVANCIA
+    Cada resultado: campos del producto + relevancia (mayor = mejor) + fragmento con <mark>
+    (o similitud 0..1 si se encontró corrigiendo errores de tipeo)
+    """
+    termino = request.args.get('q', '').strip()
+    if not termino:
+        return jsonify({'success': False, 'error': 'Proporciona un término de búsqueda (q)'}), 400
+
+    ambito = request.args.get('ambito', AMBITO_ADMIN)
+    if ambito not in COLUMNAS_POR_AMBITO:
+        return jsonify({
+            'success': False,
+            'error': f"Ámbito no válido: {ambito}. Opciones: {', '.join(COLUMNAS_POR_AMBITO)}"
+        }), 400
+
+    # El menú público solo puede pedir campos públicos
+    disponibles = CAMPOS_PRODUCTO_PUBLICO if ambito == AMBITO_MENU else CAMPOS_PRODUCTO
+    try:
+        campos = parsear_campos(request.args.get('fields'), disponibles)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if campos is None and ambito == AMBITO_MENU:
+        campos = CAMPOS_PRODUCTO_PUBLICO
+
+    limite = to_int_or_none(request.args.get('limite')) or LIMITE_POR_DEFECTO
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+
+    session = Session()
+    try:
+        conexion = session.connection()
+        resultados, motor = buscar_productos(
+            conexion, termino, *condiciones_busqueda(request.args, ambito),
+            ambito=ambito, campos=campos, limite=limite
+        )
+        return jsonify({
+            'success': True,
+            'resultados': resultados,
+            'total': len(resultados),
+            'categorias': buscar_categorias(conexion, termino, LIMITE_CATEGORIAS),
+            'termino_busqueda': termino,
+            'ambito': ambito,
+            'motor': motor
+        })
+
+    except Exception as e:
+        print(f"❌ Error en búsqueda: {e}")
+        return jsonify({'success': False, 'error': f'Error en búsqueda: {str(e)}'}), 500
+    finally:
+        session.close()
@@ -0,0 +1,91 @@
+"""
+🏷️ GET CONDICIONAL (ETag / Last-Modified) PARA EL CATÁLOGO
+Responsabilidad única: responder 304 cuando el catálogo no cambió desde la última descarga.
+
+La validación usa solo catalogo_version (una consulta Core de pocas filas), de modo que
+un If-None-Match vigente se resuelve sin cargar el ORM ni ejecutar la vista.
+"""
+
+import zlib
+from datetime import datetime, timezone
+from functools import wraps
+from flask import request, make_response
+
+from modulos.backend.menu.database.managers import catalogo_version
+
+
+def _parsear_fecha(valor):
+    if not valor:
+        return None
+    try:
+        fecha = datetime.fromisoformat(str(valor))
+    except ValueError:
+        return None
+    # Las fechas del catálogo se guardan en UTC; HTTP trabaja con segundos enteros
+    return fecha.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def calcular_validadores(tablas):
+    """
+    Devuelve (etag, last_modified) de las tablas indicadas para la URL actual,
+    o (None, None) si la versión del catálogo no está disponible.
+    """
+    version = catalogo_version.leer_version()
+    if version is None:
+        return None, None
+
+    contadores = '.'.join(str(version['tablas'].get(tabla, 0)) for tabla in tablas)
+    # La query string forma parte del recurso (filtros, paginación, proyecciones)
+    variante = zlib.crc32(request.query_string) if request.query_string else 0
+    etag = f"cat-{contadores}-{variante:x}"
+
+    fechas = [_parsear_fecha(version['fechas'].get(tabla)) for tabla in tablas]
+    fechas = [fecha for fecha in fechas if fecha]
+    return etag, max(fechas) if fechas else None
+
+
+def respuesta_condicional(*tablas):
+    """
+    Decorador para GETs del catálogo: agrega ETag fuerte + Last-Modified y responde
+    304 Not Modified si el cliente ya tiene la versión vigente.
+    Los métodos distintos de GET/HEAD pasan sin modificar.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return vista(*args, **kwargs)
+
+            try:
+                etag, last_modified = calcular_validadores(tablas)
+            except Exception as e:
+                print(f"⚠️ No se pudo calcular la versión del catálogo: {e}")
+                etag, last_modified = None, None
+
+            if etag is None:
+                return vista(*args, **kwargs)
+
+            if request.if_none_match:
+                no_modificado = request.if_none_match.contains(etag)
+            else:
+                no_modificado = (
+                    last_modified is not None
+                    and request.if_modified_since is not None
+                    and last_modified <= request.if_modified_since
+                )
+
+            if no_modificado:
+                response = make_response('', 304)
+            else:
+                response = make_response(vista(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Los navegadores guardan la copia pero revalidan siempre con el servidor
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return envoltura
+    return decorador
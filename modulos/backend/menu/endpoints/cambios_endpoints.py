@@ -0,0 +1,84 @@
+"""
+🔄 ENDPOINT DE SINCRONIZACIÓN INCREMENTAL DEL CATÁLOGO
+Responsabilidad única: feed de altas/modificaciones/borrados desde un cursor.
+
+GET /menu-admin/api/cambios/?desde=<cursor>
+    Sin 'desde' devuelve solo el cursor actual (punto de partida tras una carga completa).
+    desde=0 entrega todo el catálogo como altas.
+    Parámetros opcionales: limite, tablas=productos,categorias,... y fields= (proyección de productos)
+"""
+
+from flask import Blueprint, request, jsonify
+import os
+from modulos.backend.menu.database.managers.db_manager import get_engine, get_session_factory
+from modulos.backend.menu.database.managers.lectura_catalogo import parsear_campos, CAMPOS_PRODUCTO
+from modulos.backend.menu.database.managers.cambios_catalogo import (
+    leer_cambios, TABLAS_SINCRONIZABLES, LIMITE_POR_DEFECTO, LIMITE_MAXIMO
+)
+from modulos.backend.menu.endpoints.parametros import to_int_or_none
+
+# Configuración de base de datos
+DB_PATH = os.path.join(os.path.dirname(__file__), '../database', 'menu.db')
+engine = get_engine(DB_PATH)
+Session = get_session_factory(DB_PATH)
+
+# Blueprint específico para el feed de cambios
+cambios_bp = Blueprint('cambios', __name__, url_prefix='/cambios')
+
+
+@cambios_bp.route('/', methods=['GET'])
+def listar_cambios():
+    """
+    📥 CAMBIOS DEL CATÁLOGO DESDE UN CURSOR
+    Cada cambio: {seq, tabla, id, operacion: 'upsert'|'delete', fecha, datos}
+    """
+    desde_param = request.args.get('desde')
+    desde = to_int_or_none(desde_param)
+    if desde_param is not None and (desde is None or desde < 0):
+        return jsonify({'success': False, 'error': 'El parámetro desde debe ser un cursor numérico'}), 400
+
+    limite = to_int_or_none(request.args.get('limite')) or LIMITE_POR_DEFECTO
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+
+    tablas = None
+    if request.args.get('tablas'):
+        tablas = tuple(tabla.strip() for tabla in request.args['tablas'].split(',') if tabla.strip())
+        desconocidas = [tabla for tabla in tablas if tabla not in TABLAS_SINCRONIZABLES]
+        if desconocidas:
+            return jsonify({
+                'success': False,
+                'error': f"Tablas no válidas: {', '.join(desconocidas)}. Opciones: {', '.join(TABLAS_SINCRONIZABLES)}"
+            }), 400
+
+    try:
+        campos = parsear_campos(request.args.get('fields'), CAMPOS_PRODUCTO)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    session = Session()
+    try:
+        resultado = leer_cambios(
+            session.connection(), desde, limite=limite, tablas=tablas, campos_producto=campos
+        )
+
+        if resultado is None:
+            return jsonify({
+                'success': False,
+                'error': 'Registro de cambios no disponible: ejecute las migraciones'
+            }), 503
+
+        return jsonify({
+            'success': True,
+            'cambios': resultado['cambios'],
+            'total': len(resultado['cambios']),
+            'desde': desde,
+            'cursor': resultado['cursor'],
+            'hay_mas': resultado['hay_mas'],
+            'reiniciar': resultado['reiniciar']
+        })
+
+    except Exception as e:
+        print(f"❌ Error leyendo cambios del catálogo: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        session.close()
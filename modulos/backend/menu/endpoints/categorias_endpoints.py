@@ -4,18 +4,19 @@ Responsabilidad única: CRUD completo de categorías y subcategorías + Sistema
 """
 
 from flask import Blueprint, request, jsonify
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
 import os
 import re
 from modulos.backend.menu.database.models.categoria import Categoria
 from modulos.backend.menu.database.models.subcategoria import Subcategoria
 from modulos.backend.menu.endpoints.subcategorias_endpoints import subcategoria_to_dict
+from modulos.backend.menu.database.managers.db_manager import get_engine, get_session_factory
+from modulos.backend.menu.endpoints.cache_http import respuesta_condicional
+from modulos.backend.menu.database.managers.lectura_catalogo import leer_categorias, serializar
 
 # Configuración de base de datos
 DB_PATH = os.path.join(os.path.dirname(__file__), '../database', 'menu.db')
-engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
-Session = sessionmaker(bind=engine)
+engine = get_engine(DB_PATH)
+Session = get_session_factory(DB_PATH)
 
 # Blueprint específico para categorías
 categorias_bp = Blueprint('categorias', __name__, url_prefix='/categorias')
@@ -187,6 +188,7 @@ def previsualizar_icono():
         return jsonify({'error': str(e)}), 500
 
 @categorias_bp.route('/', methods=['GET', 'POST'])
+@respuesta_condicional('categorias')
 def manejar_categorias():
     """
     📋 MANEJAR CATEGORÍAS - GET: Listar | POST: Crear
@@ -196,8 +198,7 @@ def manejar_categorias():
         try:
             session = Session()
             
-            categorias = session.query(Categoria).filter(Categoria.activa == True).all()
-            categorias_dict = [categoria_to_dict(categoria) for categoria in categorias]
+            categorias_dict = serializar(leer_categorias(session.connection()))
             session.close()
             
             return jsonify({
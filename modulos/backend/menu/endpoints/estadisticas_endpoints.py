@@ -1,27 +1,31 @@
 """
 📊 ENDPOINT ESPECÍFICO PARA ESTADÍSTICAS
 Responsabilidad única: Métricas, reportes y análisis del sistema de menú
+
+Las métricas salen de la capa de agregados (managers/estadisticas_catalogo.py): cada
+endpoint hace un número fijo de consultas, sin importar cuántas categorías existan.
+El resumen (consultado periódicamente por los dashboards) lee los contadores
+incrementales de managers/estadisticas_incrementales.py.
 """
 
 from flask import Blueprint, request, jsonify
-from sqlalchemy import create_engine, func
-from sqlalchemy.orm import sessionmaker
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
+from modulos.backend.menu.database.managers.db_manager import get_engine, get_session_factory
+from modulos.backend.menu.database.managers.estadisticas_catalogo import (
+    agregados_productos, agregados_por_categoria, totales_tablas, productos_mas_caros
+)
+from modulos.backend.menu.database.managers.estadisticas_incrementales import (
+    leer_global, leer_por_categoria, reconstruir, diferencias, existe_tabla_estadisticas
+)
 
 # Blueprint específico para estadísticas
 estadisticas_bp = Blueprint('estadisticas', __name__)
 
 # Configuración de base de datos
 DB_PATH = os.path.join(os.path.dirname(__file__), '../database/menu.db')
-engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
-Session = sessionmaker(bind=engine)
-
-# Importar modelos
-from modulos.backend.menu.database.models.producto import Producto
-from modulos.backend.menu.database.models.categoria import Categoria
-from modulos.backend.menu.database.models.subcategoria import Subcategoria
-from modulos.backend.menu.database.models.ingrediente import Ingrediente
+engine = get_engine(DB_PATH)
+Session = get_session_factory(DB_PATH)
 
 @estadisticas_bp.route('/test', methods=['GET'])
 def test_endpoint():
@@ -32,72 +36,46 @@ def test_endpoint():
         'blueprint': 'estadisticas'
     })
 
+def porcentaje(parte, total):
+    return round((parte / total) * 100, 1) if total > 0 else 0
+
 @estadisticas_bp.route('/', methods=['GET'])
 @estadisticas_bp.route('/general', methods=['GET'])
 def obtener_estadisticas_generales():
     """
     📊 ESTADÍSTICAS GENERALES DEL SISTEMA
-    Devuelve métricas principales del menú
+    Devuelve métricas principales del menú (3 consultas)
     """
+    session = Session()
     try:
-        session = Session()
-        
-        # Estadísticas básicas
-        total_productos = session.query(Producto).count()
-        total_categorias = session.query(Categoria).count()
-        total_subcategorias = session.query(Subcategoria).count()
-        total_ingredientes = session.query(Ingrediente).count()
-        
-        # Productos por estado
-        productos_activos = session.query(Producto).filter(Producto.disponible == True).count()
-        productos_inactivos = total_productos - productos_activos
-        
-        # Precios
-        productos_con_precio = session.query(Producto).filter(
-            Producto.precio.isnot(None), 
-            Producto.precio > 0
-        ).all()
-        
-        if productos_con_precio:
-            precios = [float(p.precio) for p in productos_con_precio]
-            precio_promedio = round(sum(precios) / len(precios), 2)
-            precio_minimo = round(min(precios), 2)
-            precio_maximo = round(max(precios), 2)
-        else:
-            precio_promedio = precio_minimo = precio_maximo = 0.0
-        
-        # Productos por categoría
-        productos_por_categoria = []
-        categorias = session.query(Categoria).all()
-        for categoria in categorias:
-            count = session.query(Producto).filter(Producto.categoria_id == categoria.id).count()
-            productos_por_categoria.append({
-                'categoria': categoria.titulo,
-                'total': count
-            })
-        
-        session.close()
+        conexion = session.connection()
+        totales = totales_tablas(conexion)
+        productos = agregados_productos(conexion)
+        categorias = agregados_por_categoria(conexion)
         
         estadisticas = {
             'resumen': {
-                'total_productos': total_productos,
-                'total_categorias': total_categorias,
-                'total_subcategorias': total_subcategorias,
-                'total_ingredientes': total_ingredientes,
-                'productos_activos': productos_activos,
-                'productos_inactivos': productos_inactivos
+                'total_productos': productos['total'],
+                'total_categorias': totales['categorias'],
+                'total_subcategorias': totales['subcategorias'],
+                'total_ingredientes': totales['ingredientes'],
+                'productos_activos': productos['disponibles'],
+                'productos_inactivos': productos['total'] - productos['disponibles']
             },
             'precios': {
-                'promedio': precio_promedio,
-                'minimo': precio_minimo,
-                'maximo': precio_maximo,
-                'productos_con_precio': len(productos_con_precio)
+                'promedio': productos['precio_promedio'],
+                'minimo': productos['precio_minimo'],
+                'maximo': productos['precio_maximo'],
+                'productos_con_precio': productos['con_precio']
             },
             'distribucion': {
-                'por_categoria': productos_por_categoria
+                'por_categoria': [
+                    {'categoria': categoria['titulo'], 'total': categoria['total_productos']}
+                    for categoria in categorias
+                ]
             },
             'timestamp': datetime.now().isoformat(),
-            'mensaje': f'Estadísticas generadas para {total_productos} productos'
+            'mensaje': f"Estadísticas generadas para {productos['total']} productos"
         }
         
         return jsonify(estadisticas)
@@ -105,68 +83,46 @@ def obtener_estadisticas_generales():
     except Exception as e:
         print(f"❌ Error obteniendo estadísticas generales: {e}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        session.close()
 
 @estadisticas_bp.route('/productos', methods=['GET'])
 def obtener_estadisticas_productos():
     """
     🛒 ESTADÍSTICAS ESPECÍFICAS DE PRODUCTOS
-    Análisis detallado por tipo, estado y características
+    Análisis detallado por tipo, estado y características (2 consultas)
     """
+    session = Session()
     try:
-        session = Session()
-        
-        # Productos por tipo
-        productos_simple = session.query(Producto).filter(
-            Producto.tipo_producto == 'simple'
-        ).count()
-        productos_preparado = session.query(Producto).filter(
-            Producto.tipo_producto == 'preparado'
-        ).count()
-        
-        # Productos con imágenes
-        productos_con_imagen = session.query(Producto).filter(
-            Producto.imagen_url.isnot(None),
-            Producto.imagen_url != ''
-        ).count()
-        productos_sin_imagen = session.query(Producto).filter(
-            (Producto.imagen_url.is_(None)) | (Producto.imagen_url == '')
-        ).count()
-        
-        # Productos con código
-        productos_con_codigo = session.query(Producto).filter(
-            Producto.codigo.isnot(None),
-            Producto.codigo != ''
-        ).count()
-        
-        # Top productos por precio
-        productos_caros = session.query(Producto).filter(
-            Producto.precio.isnot(None)
-        ).order_by(Producto.precio.desc()).limit(5).all()
-        
-        top_caros = []
-        for producto in productos_caros:
-            top_caros.append({
-                'id': producto.id,
-                'nombre': producto.nombre,
-                'precio': float(producto.precio) if producto.precio else 0,
-                'categoria': producto.categoria.titulo if producto.categoria else 'Sin categoría'
-            })
-        
-        session.close()
+        conexion = session.connection()
+        productos = agregados_productos(conexion)
+        top_caros = [
+            {
+                'id': producto['id'],
+                'nombre': producto['nombre'],
+                'precio': float(producto['precio']) if producto['precio'] else 0,
+                'categoria': producto['categoria'] or 'Sin categoría'
+            }
+            for producto in productos_mas_caros(conexion, limite=5)
+        ]
+        
+        con_imagen = productos['con_imagen']
+        sin_imagen = productos['total'] - con_imagen
+        total_tipados = productos['simples'] + productos['preparados']
         
         estadisticas = {
             'por_tipo': {
-                'simple': productos_simple,
-                'preparado': productos_preparado
+                'simple': productos['simples'],
+                'preparado': productos['preparados']
             },
             'imagenes': {
-                'con_imagen': productos_con_imagen,
-                'sin_imagen': productos_sin_imagen,
-                'porcentaje_con_imagen': round((productos_con_imagen / (productos_con_imagen + productos_sin_imagen)) * 100, 1) if (productos_con_imagen + productos_sin_imagen) > 0 else 0
+                'con_imagen': con_imagen,
+                'sin_imagen': sin_imagen,
+                'porcentaje_con_imagen': porcentaje(con_imagen, con_imagen + sin_imagen)
             },
             'codificacion': {
-                'con_codigo': productos_con_codigo,
-                'porcentaje_codificado': round((productos_con_codigo / (productos_simple + productos_preparado)) * 100, 1) if (productos_simple + productos_preparado) > 0 else 0
+                'con_codigo': productos['con_codigo'],
+                'porcentaje_codificado': porcentaje(productos['con_codigo'], total_tipados)
             },
             'top_precios': top_caros,
             'timestamp': datetime.now().isoformat()
@@ -177,63 +133,33 @@ def obtener_estadisticas_productos():
     except Exception as e:
         print(f"❌ Error obteniendo estadísticas de productos: {e}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        session.close()
 
 @estadisticas_bp.route('/categorias', methods=['GET'])
 def obtener_estadisticas_categorias():
     """
     📂 ESTADÍSTICAS DE CATEGORÍAS Y SUBCATEGORÍAS
-    Análisis de la estructura jerárquica del menú
+    Análisis de la estructura jerárquica del menú (1 consulta)
     """
+    session = Session()
     try:
-        session = Session()
-        
-        # Estadísticas por categoría
-        categorias_stats = []
-        categorias = session.query(Categoria).all()
-        
-        for categoria in categorias:
-            # Contar productos en esta categoría
-            total_productos = session.query(Producto).filter(
-                Producto.categoria_id == categoria.id
-            ).count()
-            
-            # Contar productos activos
-            productos_activos = session.query(Producto).filter(
-                Producto.categoria_id == categoria.id,
-                Producto.disponible == True
-            ).count()
-            
-            # Contar subcategorías
-            total_subcategorias = session.query(Subcategoria).filter(
-                Subcategoria.categoria_id == categoria.id
-            ).count()
-            
-            # Precio promedio en la categoría
-            productos_con_precio = session.query(Producto).filter(
-                Producto.categoria_id == categoria.id,
-                Producto.precio.isnot(None),
-                Producto.precio > 0
-            ).all()
-            
-            precio_promedio = 0
-            if productos_con_precio:
-                precio_promedio = round(sum(float(p.precio) for p in productos_con_precio) / len(productos_con_precio), 2)
-            
-            categorias_stats.append({
-                'id': categoria.id,
-                'nombre': categoria.titulo,
-                'total_productos': total_productos,
-                'productos_activos': productos_activos,
-                'total_subcategorias': total_subcategorias,
-                'precio_promedio': precio_promedio,
-                'activa': getattr(categoria, 'activa', True)
-            })
+        categorias_stats = [
+            {
+                'id': categoria['id'],
+                'nombre': categoria['titulo'],
+                'total_productos': categoria['total_productos'],
+                'productos_activos': categoria['productos_activos'],
+                'total_subcategorias': categoria['total_subcategorias'],
+                'precio_promedio': categoria['precio_promedio'],
+                'activa': categoria['activa'] if categoria['activa'] is not None else True
+            }
+            for categoria in agregados_por_categoria(session.connection())
+        ]
         
         # Ordenar por total de productos
         categorias_stats.sort(key=lambda x: x['total_productos'], reverse=True)
         
-        session.close()
-        
         estadisticas = {
             'total_categorias': len(categorias_stats),
             'categorias': categorias_stats,
@@ -246,58 +172,44 @@ def obtener_estadisticas_categorias():
     except Exception as e:
         print(f"❌ Error obteniendo estadísticas de categorías: {e}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        session.close()
 
 @estadisticas_bp.route('/salud', methods=['GET'])
 @estadisticas_bp.route('/health', methods=['GET'])
 def verificar_salud_sistema():
     """
     🏥 VERIFICACIÓN DE SALUD DEL SISTEMA
-    Diagnóstico de integridad de datos
+    Diagnóstico de integridad de datos (3 consultas)
     """
+    session = Session()
     try:
-        session = Session()
+        conexion = session.connection()
+        productos = agregados_productos(conexion)
+        totales = totales_tablas(conexion)
+        categorias = agregados_por_categoria(conexion)
         problemas = []
         
         # Verificar productos sin categoría
-        productos_sin_categoria = session.query(Producto).filter(
-            Producto.categoria_id.is_(None)
-        ).count()
-        if productos_sin_categoria > 0:
-            problemas.append(f"{productos_sin_categoria} productos sin categoría asignada")
+        if productos['sin_categoria'] > 0:
+            problemas.append(f"{productos['sin_categoria']} productos sin categoría asignada")
         
         # Verificar productos sin precio
-        productos_sin_precio = session.query(Producto).filter(
-            (Producto.precio.is_(None)) | (Producto.precio <= 0)
-        ).count()
-        if productos_sin_precio > 0:
-            problemas.append(f"{productos_sin_precio} productos sin precio válido")
+        if productos['sin_precio'] > 0:
+            problemas.append(f"{productos['sin_precio']} productos sin precio válido")
         
         # Verificar productos sin nombre
-        productos_sin_nombre = session.query(Producto).filter(
-            (Producto.nombre.is_(None)) | (Producto.nombre == '')
-        ).count()
-        if productos_sin_nombre > 0:
-            problemas.append(f"{productos_sin_nombre} productos sin nombre")
+        if productos['sin_nombre'] > 0:
+            problemas.append(f"{productos['sin_nombre']} productos sin nombre")
         
         # Verificar categorías sin productos
-        categorias_vacias = []
-        categorias = session.query(Categoria).all()
-        for categoria in categorias:
-            count = session.query(Producto).filter(Producto.categoria_id == categoria.id).count()
-            if count == 0:
-                categorias_vacias.append(categoria.titulo)
-        
+        categorias_vacias = [categoria['titulo'] for categoria in categorias if categoria['total_productos'] == 0]
         if categorias_vacias:
             problemas.append(f"{len(categorias_vacias)} categorías sin productos: {', '.join(categorias_vacias)}")
         
         # Verificar integridad de subcategorías
-        subcategorias_huerfanas = session.query(Subcategoria).filter(
-            Subcategoria.categoria_id.is_(None)
-        ).count()
-        if subcategorias_huerfanas > 0:
-            problemas.append(f"{subcategorias_huerfanas} subcategorías sin categoría padre")
-        
-        session.close()
+        if totales['subcategorias_huerfanas'] > 0:
+            problemas.append(f"{totales['subcategorias_huerfanas']} subcategorías sin categoría padre")
         
         # Determinar estado general
         if not problemas:
@@ -327,66 +239,45 @@ def verificar_salud_sistema():
     except Exception as e:
         print(f"❌ Error en verificación de salud: {e}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        session.close()
 
 @estadisticas_bp.route('/resumen', methods=['GET'])
 def obtener_resumen_completo():
     """
     📋 RESUMEN EJECUTIVO COMPLETO
-    Dashboard principal con todas las métricas clave
+    Dashboard principal con todas las métricas clave: lee los contadores incrementales
+    de catalogo_estadisticas (fila global + una por categoría), sin recontar productos
     """
+    session = Session()
     try:
-        session = Session()
-        
-        # Métricas básicas
-        total_productos = session.query(Producto).count()
-        total_categorias = session.query(Categoria).count()
-        productos_activos = session.query(Producto).filter(Producto.disponible == True).count()
-        
-        # Precios
-        productos_con_precio = session.query(Producto).filter(
-            Producto.precio.isnot(None), Producto.precio > 0
-        ).all()
-        precio_promedio = 0
-        if productos_con_precio:
-            precio_promedio = round(sum(float(p.precio) for p in productos_con_precio) / len(productos_con_precio), 2)
-        
-        # Categoría más popular
-        categoria_mas_productos = session.query(
-            Categoria.titulo, func.count(Producto.id).label('total')
-        ).join(Producto).group_by(Categoria.id).order_by(func.count(Producto.id).desc()).first()
+        conexion = session.connection()
+        totales = leer_global(conexion)
+        categorias = leer_por_categoria(conexion)
         
-        # Completitud de datos
-        productos_con_imagen = session.query(Producto).filter(
-            Producto.imagen_url.isnot(None), Producto.imagen_url != ''
-        ).count()
-        productos_con_codigo = session.query(Producto).filter(
-            Producto.codigo.isnot(None), Producto.codigo != ''
-        ).count()
+        # Categoría más popular (solo entre las que tienen productos)
+        con_productos = [categoria for categoria in categorias if categoria['productos'] > 0]
+        categoria_mas_productos = max(con_productos, key=lambda c: c['productos'], default=None)
         
-        # Cálculos de porcentajes
-        porcentaje_activos = round((productos_activos / total_productos) * 100, 1) if total_productos > 0 else 0
-        porcentaje_con_imagen = round((productos_con_imagen / total_productos) * 100, 1) if total_productos > 0 else 0
-        porcentaje_con_codigo = round((productos_con_codigo / total_productos) * 100, 1) if total_productos > 0 else 0
-        
-        session.close()
+        total_productos = totales['productos']
         
         resumen = {
             'metricas_principales': {
                 'total_productos': total_productos,
-                'total_categorias': total_categorias,
-                'productos_activos': productos_activos,
-                'porcentaje_activos': porcentaje_activos,
-                'precio_promedio': precio_promedio
+                'total_categorias': totales['categorias'],
+                'productos_activos': totales['disponibles'],
+                'porcentaje_activos': porcentaje(totales['disponibles'], total_productos),
+                'precio_promedio': totales['precio_promedio']
             },
             'completitud_datos': {
-                'productos_con_imagen': productos_con_imagen,
-                'porcentaje_con_imagen': porcentaje_con_imagen,
-                'productos_con_codigo': productos_con_codigo,
-                'porcentaje_con_codigo': porcentaje_con_codigo
+                'productos_con_imagen': totales['con_imagen'],
+                'porcentaje_con_imagen': porcentaje(totales['con_imagen'], total_productos),
+                'productos_con_codigo': totales['con_codigo'],
+                'porcentaje_con_codigo': porcentaje(totales['con_codigo'], total_productos)
             },
             'categoria_destacada': {
-                'nombre': categoria_mas_productos[0] if categoria_mas_productos else 'N/A',
-                'total_productos': categoria_mas_productos[1] if categoria_mas_productos else 0
+                'nombre': categoria_mas_productos['titulo'] if categoria_mas_productos else 'N/A',
+                'total_productos': categoria_mas_productos['productos'] if categoria_mas_productos else 0
             },
             'timestamp': datetime.now().isoformat(),
             'version': '1.0.0'
@@ -397,3 +288,40 @@ def obtener_resumen_completo():
     except Exception as e:
         print(f"❌ Error obteniendo resumen completo: {e}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        session.close()
+
+@estadisticas_bp.route('/reconstruir', methods=['POST'])
+def reconstruir_estadisticas():
+    """
+    🔧 RECONSTRUIR CONTADORES
+    Recalcula catalogo_estadisticas desde las tablas fuente (reparación de desvíos
+    causados por escrituras fuera del ORM) e informa qué contadores estaban desviados
+    """
+    session = Session()
+    try:
+        conexion = session.connection()
+        if not existe_tabla_estadisticas(conexion):
+            return jsonify({
+                'success': False,
+                'error': 'La tabla catalogo_estadisticas no existe: ejecuta python migrar_db.py'
+            }), 404
+        
+        desvios = diferencias(conexion)
+        filas = reconstruir(conexion)
+        session.commit()
+        
+        return jsonify({
+            'success': True,
+            'filas': filas,
+            'filas_corregidas': len(desvios),
+            'desvios': {str(categoria_id): contadores for categoria_id, contadores in desvios.items()},
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        session.rollback()
+        print(f"❌ Error reconstruyendo estadísticas: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        session.close()
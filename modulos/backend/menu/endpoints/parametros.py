@@ -0,0 +1,15 @@
+"""
+🔢 PARÁMETROS DE LOS ENDPOINTS DEL CATÁLOGO
+Responsabilidad única: convertir de forma segura los parámetros de query/JSON
+que comparten los blueprints del catálogo.
+"""
+
+
+def to_int_or_none(val):
+    """Convierte un valor a entero o None de forma segura"""
+    if val is None or val == '':
+        return None
+    try:
+        return int(val)
+    except (TypeError, ValueError):
+        return None
@@ -4,17 +4,28 @@ Responsabilidad única: CRUD completo de productos
 """
 
 from flask import Blueprint, request, jsonify
-from sqlalchemy.orm import sessionmaker, joinedload
-from sqlalchemy import create_engine
+from sqlalchemy import select, func, or_, and_, String, type_coerce
+from sqlalchemy.orm import joinedload
+from collections import OrderedDict
+import base64
+import json
+import threading
 from modulos.backend.menu.database.models.producto import Producto
-from modulos.backend.menu.database.models.categoria import Categoria  
 from modulos.backend.menu.database.models.subcategoria import Subcategoria
 from modulos.backend.menu.database.base import Base
+from modulos.backend.menu.database.managers.db_manager import get_engine, get_session_factory
+from modulos.backend.menu.database.managers import catalogo_version
+from modulos.backend.menu.database.managers.lectura_catalogo import (
+    select_productos, serializar_productos, parsear_campos, CAMPOS_PRODUCTO
+)
+from modulos.backend.menu.database.managers.busqueda_catalogo import condicion_texto
+from modulos.backend.menu.database.managers.estadisticas_incrementales import leer_global, leer_por_categoria
+from modulos.backend.menu.endpoints.cache_http import respuesta_condicional
+from modulos.backend.menu.endpoints.parametros import to_int_or_none
 
-# Configuración de base de datos
-DATABASE_URL = 'sqlite:///modulos/backend/menu/database/menu.db'
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
+# Configuración de base de datos (engine compartido del proceso)
+engine = get_engine()
+Session = get_session_factory()
 
 # Blueprint específico para productos
 productos_bp = Blueprint('productos', __name__, url_prefix='/productos')
@@ -37,15 +48,6 @@ def to_bool(val):
     except:
         return True
 
-def to_int_or_none(val):
-    """Convierte un valor a entero o None de forma segura"""
-    if val is None or val == '':
-        return None
-    try:
-        return int(val)
-    except:
-        return None
-
 def producto_to_dict(producto):
     """Convierte un objeto Producto a diccionario para JSON"""
     
@@ -76,31 +78,196 @@ def producto_to_dict(producto):
         'tipo_producto': producto.tipo_producto
     }
 
+# --- LISTADO: FILTROS, ORDEN Y PAGINACIÓN POR CURSOR (KEYSET) ---
+
+# Claves de orden permitidas (?orden=precio | ?orden=-precio para descendente)
+ORDENES_PRODUCTOS = {
+    'id': Producto.id,
+    'nombre': func.lower(Producto.nombre),
+    'precio': Producto.precio,
+    # Se compara el texto tal como está guardado: SQLite mezcla formatos con y sin microsegundos
+    'fecha_actualizacion': type_coerce(Producto.fecha_actualizacion, String)
+}
+LIMITE_MAXIMO = 200
+
+# Totales por combinación de filtros, válidos mientras no cambie la versión de productos
+_cache_totales = OrderedDict()
+_CACHE_TOTALES_MAX = 256
+_lock_totales = threading.Lock()
+
+def codificar_cursor(valor, id_producto):
+    """Cursor opaco con el valor de la clave de orden y el id del último producto entregado"""
+    crudo = json.dumps([valor, id_producto]).encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+def decodificar_cursor(cursor):
+    """Inverso de codificar_cursor; lanza ValueError si el cursor no es válido"""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valor, id_producto = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return valor, int(id_producto)
+    except Exception:
+        raise ValueError('Cursor inválido')
+
+def filtros_productos(args):
+    """Traduce los parámetros del request a condiciones SQL (y una firma para la caché de totales)"""
+    condiciones = []
+    firma = []
+
+    categoria_id = to_int_or_none(args.get('categoria_id'))
+    if categoria_id is not None:
+        condiciones.append(Producto.categoria_id == categoria_id)
+        firma.append(('categoria_id', categoria_id))
+
+    subcategoria_id = to_int_or_none(args.get('subcategoria_id'))
+    if subcategoria_id is not None:
+        condiciones.append(Producto.subcategoria_id == subcategoria_id)
+        firma.append(('subcategoria_id', subcategoria_id))
+
+    if args.get('disponible', '') != '':
+        disponible = to_bool(args.get('disponible'))
+        condiciones.append(Producto.disponible == disponible)
+        firma.append(('disponible', disponible))
+
+    tipo_producto = (args.get('tipo_producto') or '').strip()
+    if tipo_producto:
+        condiciones.append(Producto.tipo_producto == tipo_producto)
+        firma.append(('tipo_producto', tipo_producto))
+
+    texto = (args.get('q') or args.get('texto') or '').strip()
+    if texto:
+        # Índice FTS5 (prefijos, sin tildes) en lugar de LIKE '%texto%' sobre toda la tabla,
+        # más los productos corregidos por trigramas si hay errores de tipeo
+        condiciones.append(condicion_texto(texto, ('nombre', 'codigo', 'descripcion')))
+        firma.append(('q', texto.lower()))
+
+    return condiciones, tuple(firma)
+
+def condicion_cursor(expr, valor, ultimo_id, descendente):
+    """Condición keyset 'después de (valor, id)'. SQLite ordena los NULL primero en ASC."""
+    if not descendente:
+        if valor is None:
+            return or_(and_(expr.is_(None), Producto.id > ultimo_id), expr.isnot(None))
+        return or_(expr > valor, and_(expr == valor, Producto.id > ultimo_id))
+    if valor is None:
+        return and_(expr.is_(None), Producto.id < ultimo_id)
+    return or_(expr < valor, and_(expr == valor, Producto.id < ultimo_id), expr.is_(None))
+
+def contar_productos(conexion, condiciones, firma):
+    """Total filtrado servido desde caché mientras la versión de productos no cambie"""
+    version = None
+    try:
+        info = catalogo_version.leer_version(conexion)
+        if info is not None:
+            version = info['tablas'].get('productos')
+    except Exception as e:
+        print(f"⚠️ Versión de catálogo no disponible para la caché de totales: {e}")
+
+    clave = (version, firma)
+    if version is not None:
+        with _lock_totales:
+            if clave in _cache_totales:
+                _cache_totales.move_to_end(clave)
+                return _cache_totales[clave]
+
+    total = conexion.execute(select(func.count(Producto.id)).where(*condiciones)).scalar()
+
+    if version is not None:
+        with _lock_totales:
+            _cache_totales[clave] = total
+            while len(_cache_totales) > _CACHE_TOTALES_MAX:
+                _cache_totales.popitem(last=False)
+    return total
+
 @productos_bp.route('/', methods=['GET'])
 @productos_bp.route('/api', methods=['GET'])
+@respuesta_condicional('productos', 'categorias', 'subcategorias')
 def listar_productos():
     """
-    📋 LISTAR TODOS LOS PRODUCTOS
-    Devuelve lista completa con información de categorías
+    📋 LISTAR PRODUCTOS
+    Filtros: categoria_id, subcategoria_id, disponible, tipo_producto, q (texto)
+    Orden: ?orden=nombre|precio|fecha_actualizacion|id (prefijo '-' = descendente)
+    Paginación por cursor: ?limite=N&cursor=<siguiente_cursor de la página anterior>
+    Sin limite ni cursor devuelve la lista completa (compatibilidad con el menú y la carga masiva)
+    Proyección: ?fields=nombre,precio,... (el id siempre se incluye)
     """
     try:
+        try:
+            campos = parsear_campos(request.args.get('fields'), CAMPOS_PRODUCTO)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        orden = (request.args.get('orden') or 'id').strip()
+        descendente = orden.startswith('-')
+        campo_orden = orden.lstrip('-')
+        if campo_orden not in ORDENES_PRODUCTOS:
+            return jsonify({
+                'success': False,
+                'error': f"Orden no válido: {campo_orden}. Opciones: {', '.join(ORDENES_PRODUCTOS)}"
+            }), 400
+        expr = ORDENES_PRODUCTOS[campo_orden]
+
+        cursor = request.args.get('cursor')
+        limite = to_int_or_none(request.args.get('limite'))
+        paginado = limite is not None or bool(cursor)
+        if paginado:
+            limite = max(1, min(limite or 50, LIMITE_MAXIMO))
+
+        condiciones, firma = filtros_productos(request.args)
+
         session = Session()
-        
-        # Eager loading para evitar N+1 queries
-        productos = session.query(Producto)\
-            .options(joinedload(Producto.categoria))\
-            .options(joinedload(Producto.subcategoria))\
-            .all()
-        
-        productos_data = [producto_to_dict(producto) for producto in productos]
-        
+        conexion = session.connection()
+
+        # Lectura sin ORM: columnas justas + clave de orden al final de cada fila
+        consulta = select_productos(expr.label('clave_orden'), campos=campos).where(*condiciones)
+
+        if cursor:
+            try:
+                valor, ultimo_id = decodificar_cursor(cursor)
+            except ValueError as e:
+                session.close()
+                return jsonify({'success': False, 'error': str(e)}), 400
+            consulta = consulta.where(condicion_cursor(expr, valor, ultimo_id, descendente))
+
+        if descendente:
+            consulta = consulta.order_by(expr.desc(), Producto.id.desc())
+        else:
+            consulta = consulta.order_by(expr.asc(), Producto.id.asc())
+
+        if paginado:
+            consulta = consulta.limit(limite + 1)
+        filas = conexion.execute(consulta).all()
+        hay_mas = paginado and len(filas) > limite
+        if paginado:
+            filas = filas[:limite]
+
+        productos_data = serializar_productos((fila[:-1] for fila in filas), campos)
+
+        if paginado:
+            total = contar_productos(conexion, condiciones, firma)
+        else:
+            total = len(productos_data)
+
+        siguiente_cursor = None
+        if hay_mas and filas:
+            siguiente_cursor = codificar_cursor(filas[-1][-1], filas[-1][0])
+
         session.close()
-        
-        return jsonify({
+
+        respuesta = {
             'success': True,
             'productos': productos_data,
-            'total': len(productos_data)
-        })
+            'total': total
+        }
+        if paginado:
+            respuesta.update({
+                'limite': limite,
+                'orden': orden,
+                'cursor': cursor,
+                'siguiente_cursor': siguiente_cursor,
+                'hay_mas': hay_mas
+            })
+        return jsonify(respuesta)
         
     except Exception as e:
         print(f"❌ Error listando productos: {e}")
@@ -165,9 +332,9 @@ def crear_producto():
         # 🚨 VALIDACIÓN ANTI-DUPLICADOS
         nombre_producto = datos['nombre'].strip()
         
-        # Verificar si ya existe un producto con el mismo nombre
+        # Verificar si ya existe un producto con el mismo nombre (usa ix_productos_nombre_lower)
         producto_existente = session.query(Producto).filter(
-            Producto.nombre.ilike(f'%{nombre_producto}%')
+            func.lower(Producto.nombre) == func.lower(nombre_producto)
         ).first()
         
         if producto_existente:
@@ -278,7 +445,7 @@ def actualizar_producto(id_producto):
             
             # Verificar que no exista otro producto con el mismo nombre (excluyendo el actual)
             producto_existente = session.query(Producto).filter(
-                Producto.nombre.ilike(nombre_nuevo),
+                func.lower(Producto.nombre) == func.lower(nombre_nuevo),
                 Producto.id != id_producto
             ).first()
             
@@ -393,29 +560,26 @@ def obtener_productos_categoria(categoria_id):
 def obtener_estadisticas_productos():
     """
     📊 ESTADÍSTICAS DE PRODUCTOS
-    Devuelve métricas generales de productos
+    Devuelve métricas generales de productos (contadores de catalogo_estadisticas)
     """
+    session = Session()
     try:
-        from sqlalchemy import func
-        session = Session()
-        
-        total = session.query(Producto).count()
-        disponibles = session.query(Producto).filter_by(disponible=True).count()
-        no_disponibles = session.query(Producto).filter_by(disponible=False).count()
-        por_categoria = session.query(
-            Categoria.titulo,
-            func.count(Producto.id).label('cantidad')
-        ).outerjoin(Producto).group_by(Categoria.id).all()
-        
-        session.close()
+        conexion = session.connection()
+        totales = leer_global(conexion)
+        por_categoria = leer_por_categoria(conexion)
         
         return jsonify({
-            'total': total,
-            'disponibles': disponibles,
-            'no_disponibles': no_disponibles,
-            'por_categoria': [{'nombre': cat[0], 'cantidad': cat[1]} for cat in por_categoria]
+            'total': totales['productos'],
+            'disponibles': totales['disponibles'],
+            'no_disponibles': totales['no_disponibles'],
+            'por_categoria': [
+                {'nombre': categoria['titulo'], 'cantidad': categoria['productos']}
+                for categoria in por_categoria
+            ]
         })
         
     except Exception as e:
         print(f"❌ Error obteniendo estadísticas de productos: {e}")
         return jsonify({'error': f'Error interno del servidor: {str(e)}'}), 500
+    finally:
+        session.close()
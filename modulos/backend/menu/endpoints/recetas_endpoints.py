@@ -5,8 +5,7 @@ Conecta con guardar_receta() del sistema principal
 """
 
 from flask import Blueprint, request, jsonify
-from sqlalchemy.orm import sessionmaker, joinedload
-from sqlalchemy import create_engine
+from sqlalchemy.orm import joinedload
 import os
 import traceback
 
@@ -14,11 +13,19 @@ import traceback
 from ..database.models.producto import Producto
 from ..database.models.categoria import Categoria
 from ..database.models.ingrediente import Ingrediente
+from modulos.backend.menu.database.managers.db_manager import get_engine, get_session_factory
+from modulos.backend.menu.database.managers.lectura_catalogo import (
+    leer_recetas_completas, parsear_campos, parsear_inclusiones, CAMPOS_RECETA, INCLUSIONES_RECETA
+)
+from modulos.backend.menu.database.managers.busqueda_catalogo import buscar_ids, AMBITO_COCINA
+
+# Máximo de resultados de la búsqueda por relevancia
+LIMITE_BUSQUEDA = 100
 
 # Configuración de base de datos
 DB_PATH = os.path.join(os.path.dirname(__file__), '../database/menu.db')
-engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
-Session = sessionmaker(bind=engine)
+engine = get_engine(DB_PATH)
+Session = get_session_factory(DB_PATH)
 
 # Crear blueprint para recetas
 recetas_bp = Blueprint('recetas', __name__)
@@ -89,21 +96,34 @@ def receta_to_dict(producto):
     
     return receta_dict
 
+def proyeccion_recetas(args):
+    """
+    Campos e inclusiones pedidos. Sin ?fields= ni ?include= se devuelve la receta completa
+    con ingredientes; con ?fields= los ingredientes solo se embeben si se piden en ?include=.
+    """
+    campos = parsear_campos(args.get('fields'), CAMPOS_RECETA)
+    por_defecto = INCLUSIONES_RECETA if campos is None else ()
+    incluir = parsear_inclusiones(args.get('include'), INCLUSIONES_RECETA, por_defecto)
+    return campos, incluir
+
 @recetas_bp.route('/', methods=['GET'])
 @recetas_bp.route('/api/recetas', methods=['GET'])
 def obtener_recetas():
-    """Obtener todas las recetas (productos de tipo 'preparado')"""
+    """
+    Obtener todas las recetas (productos de tipo 'preparado')
+    Proyección: ?fields=nombre,precio,... e ?include=ingredientes
+    """
+    try:
+        campos, incluir = proyeccion_recetas(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
     session = Session()
     try:
-        # Filtrar solo productos de tipo 'preparado' que son recetas
-        recetas = session.query(Producto)\
-                        .options(joinedload(Producto.categoria))\
-                        .options(joinedload(Producto.subcategoria))\
-                        .options(joinedload(Producto.ingredientes))\
-                        .filter(Producto.tipo_producto == 'preparado')\
-                        .all()
-        
-        recetas_data = [receta_to_dict(r) for r in recetas]
+        # Productos de tipo 'preparado' con sus ingredientes (lectura sin ORM, dos consultas)
+        recetas_data = leer_recetas_completas(
+            session.connection(), campos=campos, incluir_ingredientes='ingredientes' in incluir
+        )
         
         return jsonify({
             'success': True,
@@ -126,18 +146,20 @@ def obtener_recetas():
 @recetas_bp.route('/<int:receta_id>', methods=['GET'])
 @recetas_bp.route('/api/recetas/<int:receta_id>', methods=['GET'])
 def obtener_receta(receta_id):
-    """Obtener una receta específica con todos sus detalles"""
+    """Obtener una receta específica con todos sus detalles (admite ?fields= e ?include=)"""
+    try:
+        campos, incluir = proyeccion_recetas(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
     session = Session()
     try:
-        receta = session.query(Producto)\
-                       .options(joinedload(Producto.categoria))\
-                       .options(joinedload(Producto.subcategoria))\
-                       .options(joinedload(Producto.ingredientes))\
-                       .filter(Producto.id == receta_id)\
-                       .filter(Producto.tipo_producto == 'preparado')\
-                       .first()
+        recetas = leer_recetas_completas(
+            session.connection(), Producto.id == receta_id,
+            campos=campos, incluir_ingredientes='ingredientes' in incluir
+        )
         
-        if not receta:
+        if not recetas:
             return jsonify({
                 'success': False,
                 'error': 'Receta no encontrada'
@@ -145,7 +167,7 @@ def obtener_receta(receta_id):
         
         return jsonify({
             'success': True,
-            'receta': receta_to_dict(receta)
+            'receta': recetas[0]
         })
         
     except Exception as e:
@@ -466,33 +488,40 @@ def buscar_recetas():
                 'error': 'Se requiere un término de búsqueda o categoría'
             }), 400
         
-        query = session.query(Producto)\
-                      .options(joinedload(Producto.categoria))\
-                      .options(joinedload(Producto.subcategoria))\
-                      .options(joinedload(Producto.ingredientes))\
-                      .filter(Producto.tipo_producto == 'preparado')
-        
-        # Filtrar por término de búsqueda
-        if termino:
-            query = query.filter(
-                Producto.nombre.ilike(f'%{termino}%') |
-                Producto.descripcion.ilike(f'%{termino}%') |
-                Producto.instrucciones_preparacion.ilike(f'%{termino}%')
-            )
+        condiciones = []
         
         # Filtrar por categoría
         if categoria_id:
             try:
                 categoria_id = int(categoria_id)
-                query = query.filter(Producto.categoria_id == categoria_id)
+                condiciones.append(Producto.categoria_id == categoria_id)
             except ValueError:
                 return jsonify({
                     'success': False,
                     'error': 'ID de categoría inválido'
                 }), 400
         
-        recetas = query.all()
-        recetas_data = [receta_to_dict(r) for r in recetas]
+        conexion = session.connection()
+        if termino:
+            # Índice FTS5: nombre, descripción, instrucciones e ingredientes, ordenado por relevancia;
+            # los términos con errores de tipeo se corrigen con el índice de trigramas
+            encontrados = buscar_ids(
+                conexion, termino, Producto.tipo_producto == 'preparado', *condiciones,
+                ambito=AMBITO_COCINA, limite=LIMITE_BUSQUEDA
+            )
+            por_id = {
+                receta['id']: receta
+                for receta in leer_recetas_completas(conexion, Producto.id.in_([id_ for id_, _, _, _ in encontrados]))
+            }
+            recetas_data = []
+            for receta_id, relevancia, fragmento, similitud in encontrados:
+                if receta_id in por_id:
+                    por_id[receta_id].update(relevancia=relevancia, fragmento=fragmento)
+                    if similitud is not None:
+                        por_id[receta_id]['similitud'] = similitud
+                    recetas_data.append(por_id[receta_id])
+        else:
+            recetas_data = leer_recetas_completas(conexion, *condiciones)
         
         return jsonify({
             'success': True,
@@ -7,17 +7,17 @@ y relación con categorías padre
 """
 
 from flask import Blueprint, request, jsonify
-from sqlalchemy.orm import sessionmaker, joinedload
-from sqlalchemy import create_engine
+from sqlalchemy.orm import joinedload
 import os
 import re
 from modulos.backend.menu.database.models.categoria import Categoria
 from modulos.backend.menu.database.models.subcategoria import Subcategoria
+from modulos.backend.menu.database.managers.db_manager import get_engine, get_session_factory
 
 # Configuración de base de datos
 DB_PATH = os.path.join(os.path.dirname(__file__), '../database', 'menu.db')
-engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
-Session = sessionmaker(bind=engine)
+engine = get_engine(DB_PATH)
+Session = get_session_factory(DB_PATH)
 
 # Blueprint específico para subcategorías
 subcategorias_bp = Blueprint('subcategorias', __name__, url_prefix='/subcategorias')
@@ -7,21 +7,26 @@ NOTA: Todo el código CRUD se migró a archivos específicos modulares
 ✅ PRODUCTOS -> endpoints/productos_endpoints.py (COMPLETO)
 ✅ CATEGORÍAS -> endpoints/categorias_endpoints.py (COMPLETO)  
 ✅ IMÁGENES -> endpoints/imagenes_endpoints.py (COMPLETO)
-🔄 ESTADÍSTICAS -> Por migrar
+✅ CAMBIOS (sincronización incremental) -> endpoints/cambios_endpoints.py
+✅ BÚSQUEDA (FTS5 por relevancia) -> endpoints/busqueda_endpoints.py
+✅ AUTOCOMPLETADO (trie en memoria) -> endpoints/autocompletar_endpoints.py
+✅ ESTADÍSTICAS (agregados en una pasada) -> endpoints/estadisticas_endpoints.py
 🔄 BACKUP -> Por migrar
 
 🌐 COORDINADOR: menu_admin_modular.py gestiona todos los módulos
 """
 
 from flask import Blueprint, render_template, request, jsonify
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
 import os
+from modulos.backend.menu.database.managers.db_manager import get_engine, get_session_factory
+from modulos.backend.menu.database.managers.bus_eventos import bus_eventos
+from modulos.backend.menu.database.managers.servicio_configuracion import servicio_configuracion, CONFIG_MENU_PATH
 
 # Configuración de base de datos
 DB_PATH = os.path.join(os.path.dirname(__file__), 'database', 'menu.db')
-engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
-Session = sessionmaker(bind=engine)
+engine = get_engine(DB_PATH)
+Session = get_session_factory(DB_PATH)
 
 # Importar modelos para compatibilidad
 from modulos.backend.menu.database.models.producto import Producto
@@ -34,6 +39,10 @@ from datetime import datetime
 from modulos.backend.menu.endpoints.productos_endpoints import productos_bp
 from modulos.backend.menu.endpoints.categorias_endpoints import categorias_bp
 from modulos.backend.menu.endpoints.imagenes_endpoints import imagenes_bp
+from modulos.backend.menu.endpoints.cambios_endpoints import cambios_bp
+from modulos.backend.menu.endpoints.busqueda_endpoints import busqueda_bp
+from modulos.backend.menu.endpoints.autocompletar_endpoints import autocompletar_bp
+from modulos.backend.menu.endpoints.estadisticas_endpoints import estadisticas_bp
 
 # --- FUNCIONES HELPER ELIMINADAS - YA EXISTEN EN MÓDULOS ESPECIALIZADOS ---
 
@@ -50,6 +59,10 @@ menu_admin_bp = Blueprint(
 menu_admin_bp.register_blueprint(productos_bp, url_prefix='/api/productos')
 menu_admin_bp.register_blueprint(categorias_bp, url_prefix='/api/categorias')
 menu_admin_bp.register_blueprint(imagenes_bp, url_prefix='/api/imagenes')
+menu_admin_bp.register_blueprint(cambios_bp, url_prefix='/api/cambios')
+menu_admin_bp.register_blueprint(busqueda_bp, url_prefix='/api/buscar')
+menu_admin_bp.register_blueprint(autocompletar_bp, url_prefix='/api/autocompletar')
+menu_admin_bp.register_blueprint(estadisticas_bp, url_prefix='/api/estadisticas')
 
 # ===== RUTAS PRINCIPALES DE TEMPLATES =====
 
@@ -80,32 +93,26 @@ def admin_backup():
 
 # ===== SISTEMA DE INTERCAMBIO DE MENÚS =====
 
-# Archivo de configuración para estado del menú
-CONFIG_FILE = os.path.join(os.path.dirname(__file__), 'config_menu.json')
+# Archivo de configuración para estado del menú (lo lee y escribe el servicio de configuración)
+CONFIG_FILE = CONFIG_MENU_PATH
 
 def obtener_estado_menu():
     """Obtiene el estado actual del menú (proyecto o treinta)"""
     try:
-        import json
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                return config.get('menu_activo', 'proyecto')  # Default: proyecto
-        return 'proyecto'  # Si no existe archivo, usar proyecto por defecto
+        return servicio_configuracion.obtener('menu', 'menu_activo', 'proyecto')  # Default: proyecto
     except:
         return 'proyecto'
 
 def guardar_estado_menu(nuevo_estado):
-    """Guarda el nuevo estado del menú"""
+    """Guarda el nuevo estado del menú (escritura atómica del JSON)"""
     try:
-        import json
         config = {
             'menu_activo': nuevo_estado,
             'fecha_cambio': datetime.now().isoformat(),
             'descripcion': 'proyecto' if nuevo_estado == 'proyecto' else 'treinta'
         }
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        servicio_configuracion.escribir_menu(config)
+        bus_eventos.publicar('configuracion', {'clave': 'menu_activo', 'valor': nuevo_estado, 'accion': 'modificada'})
         return True
     except Exception as e:
         print(f"Error guardando estado del menú: {e}")
@@ -175,8 +182,8 @@ def buscar_imagenes_fallback(query):
 # - productos_endpoints.py → /api/productos/* - CRUD completo de productos migrado ✅
 # - categorias_endpoints.py → /api/categorias/* - CRUD completo de categorías migrado ✅
 # - imagenes_endpoints.py → /api/imagenes/* - Búsqueda de imágenes MIGRADO ✅
+# - estadisticas_endpoints.py → /api/estadisticas/* - Reportes y analytics ✅
 # ⏳ Próximos endpoints por migrar:
-# - estadisticas_endpoints.py → /api/estadisticas/* - Reportes y analytics
 # - backup_endpoints.py → /api/backup/* - Gestión de backups
 
 # --- FUNCIÓN TEMPORAL DE BÚSQUEDA DE IMÁGENES ---
@@ -0,0 +1,127 @@
+"""
+📸 SNAPSHOT MATERIALIZADO DEL MENÚ PÚBLICO
+Responsabilidad única: servir /menu/api/menu-completo desde un JSON ya serializado en memoria.
+
+- Se construye en el propio proceso (categorías activas, subcategorías activas y productos
+  disponibles) con la capa de lectura sin ORM, que produce los mismos diccionarios que
+  las APIs de administración, sin los campos de uso interno de cocina.
+- Se invalida al instante cuando este proceso confirma una escritura del catálogo y, para
+  escrituras hechas en otros workers, comparando la versión de catalogo_version.
+- Stale-while-revalidate: si la base está ocupada o otro hilo ya está reconstruyendo,
+  se entrega el último snapshot en lugar de esperar.
+"""
+
+import json
+import time
+import threading
+from sqlalchemy import or_
+from sqlalchemy.exc import OperationalError
+
+from modulos.backend.menu.database.models.producto import Producto
+from modulos.backend.menu.database.managers.db_manager import get_engine, MENU_DB_PATH, SQLITE_PRAGMAS
+from modulos.backend.menu.database.managers import catalogo_version
+from modulos.backend.menu.database.managers.lectura_catalogo import (
+    leer_productos_campos, leer_categorias, leer_subcategorias, serializar, CAMPOS_PRODUCTO_PUBLICO
+)
+
+# Espera máxima ante un bloqueo al revalidar; pasado este tiempo se sirve el snapshot anterior
+BUSY_TIMEOUT_REVALIDACION_MS = 250
+BUSY_TIMEOUT_NORMAL_MS = dict(SQLITE_PRAGMAS)['busy_timeout']
+
+ESTADO_FRESCO = 'fresco'
+ESTADO_RECONSTRUIDO = 'reconstruido'
+ESTADO_OBSOLETO = 'obsoleto'
+
+
+class MenuSnapshot:
+    """JSON del menú completo con su versión de catálogo"""
+
+    def __init__(self):
+        self._json = None
+        self._version = None
+        self._fecha_construccion = None
+        self._sucio = True
+        self._lock = threading.Lock()
+        self.reconstrucciones = 0
+        self.servidos_obsoletos = 0
+
+    def invalidar(self, tablas=None):
+        """Marca el snapshot para reconstrucción en la próxima lectura"""
+        self._sucio = True
+
+    def _construir(self, conexion, version):
+        productos_data = leer_productos_campos(
+            conexion, CAMPOS_PRODUCTO_PUBLICO,
+            or_(Producto.disponible == True, Producto.disponible.is_(None))
+        )
+        datos = {
+            'success': True,
+            'categorias': serializar(leer_categorias(conexion)),
+            'subcategorias': serializar(leer_subcategorias(conexion)),
+            'productos': productos_data,
+            'total': len(productos_data),
+            'version': version['version'] if version else None
+        }
+        return json.dumps(datos, ensure_ascii=False, default=str).encode('utf-8')
+
+    def obtener(self):
+        """
+        Devuelve (json_bytes, estado). estado: 'fresco', 'reconstruido' u 'obsoleto'.
+        Solo lanza excepción si nunca se pudo construir un snapshot.
+        """
+        engine = get_engine(MENU_DB_PATH)
+        try:
+            with engine.connect() as conexion:
+                conexion.exec_driver_sql(f"PRAGMA busy_timeout={BUSY_TIMEOUT_REVALIDACION_MS}")
+                try:
+                    version = catalogo_version.leer_version(conexion)
+                    vigente = (
+                        self._json is not None
+                        and not self._sucio
+                        and version is not None
+                        and self._version == version['version']
+                    )
+                    if vigente:
+                        return self._json, ESTADO_FRESCO
+
+                    # Single-flight: si otro hilo ya reconstruye, servir lo que hay
+                    if not self._lock.acquire(blocking=self._json is None):
+                        self.servidos_obsoletos += 1
+                        return self._json, ESTADO_OBSOLETO
+                    try:
+                        self._sucio = False
+                        self._json = self._construir(conexion, version)
+                        self._version = version['version'] if version else None
+                        self._fecha_construccion = time.time()
+                        self.reconstrucciones += 1
+                        return self._json, ESTADO_RECONSTRUIDO
+                    except Exception:
+                        self._sucio = True
+                        raise
+                    finally:
+                        self._lock.release()
+                finally:
+                    conexion.exec_driver_sql(f"PRAGMA busy_timeout={BUSY_TIMEOUT_NORMAL_MS}")
+        except OperationalError as e:
+            if self._json is None:
+                raise
+            print(f"⚠️ Base ocupada al revalidar el menú, se sirve el snapshot anterior: {e}")
+            self.servidos_obsoletos += 1
+            return self._json, ESTADO_OBSOLETO
+
+    def info(self):
+        """Estado del snapshot para depuración"""
+        return {
+            'construido': self._json is not None,
+            'version': self._version,
+            'bytes': len(self._json) if self._json else 0,
+            'segundos_desde_construccion': round(time.time() - self._fecha_construccion, 1)
+                if self._fecha_construccion else None,
+            'reconstrucciones': self.reconstrucciones,
+            'servidos_obsoletos': self.servidos_obsoletos
+        }
+
+
+# Instancia única del proceso, invalidada por los commits del catálogo
+menu_snapshot = MenuSnapshot()
+catalogo_version.suscribir(menu_snapshot.invalidar)
@@ -15,6 +15,15 @@ class GestorProductos {
         this.subcategorias = [];
         this.productoActual = null;
         
+        // Paginación por cursor: el servidor filtra, ordena y entrega páginas
+        this.paginacion = {
+            limite: 48,
+            siguienteCursor: null,
+            total: 0
+        };
+        this.temporizadorBusqueda = null;
+        this.sugerencias = [];
+        
         this.inicializar();
     }
 
@@ -38,21 +47,47 @@ class GestorProductos {
     }
 
     /**
-     * CONEXIÓN A BASE DE DATOS - Cargar productos
+     * FILTROS - Parámetros de consulta a partir de los controles de la pestaña
+     */
+    construirParametros(cursor = null) {
+        const params = new URLSearchParams();
+        params.set('limite', this.paginacion.limite);
+        
+        const valores = {
+            q: document.getElementById('buscar-productos')?.value.trim(),
+            categoria_id: document.getElementById('filtro-categoria')?.value,
+            disponible: document.getElementById('filtro-disponibilidad')?.value,
+            tipo_producto: document.getElementById('filtro-tipo')?.value,
+            orden: document.getElementById('ordenar-productos')?.value
+        };
+        Object.entries(valores).forEach(([clave, valor]) => {
+            if (valor) params.set(clave, valor);
+        });
+        
+        if (cursor) params.set('cursor', cursor);
+        return params;
+    }
+
+    /**
+     * CONEXIÓN A BASE DE DATOS - Cargar productos (primera página o siguiente)
      */
-    async cargarProductos() {
+    async cargarProductos(reiniciar = true) {
         try {
-            const response = await fetch(`${this.baseURL}/productos/`);
+            const cursor = reiniciar ? null : this.paginacion.siguienteCursor;
+            const response = await fetch(`${this.baseURL}/productos/?${this.construirParametros(cursor)}`);
             if (!response.ok) {
                 throw new Error(`HTTP ${response.status}: ${response.statusText}`);
             }
             
             const data = await response.json();
-            this.productos = data.productos || data; // Maneja tanto {productos: []} como [] directamente
+            const pagina = data.productos || data; // Maneja tanto {productos: []} como [] directamente
+            this.productos = reiniciar ? pagina : this.productos.concat(pagina);
+            this.paginacion.siguienteCursor = data.siguiente_cursor || null;
+            this.paginacion.total = data.total ?? this.productos.length;
             this.renderizarProductos();
             this.actualizarEstadisticas();
             
-            console.log(`✅ ${this.productos.length} productos cargados desde BD`);
+            console.log(`✅ ${this.productos.length}/${this.paginacion.total} productos cargados desde BD`);
         } catch (error) {
             console.error('❌ Error cargando productos:', error);
             this.mostrarNotificacion('Error al cargar productos desde la base de datos', 'error');
@@ -312,7 +347,18 @@ class GestorProductos {
             </div>
         `).join('');
         
-        contenedor.innerHTML = productosHTML;
+        const botonMas = this.paginacion.siguienteCursor ? `
+            <div class="col-12 text-center mb-4">
+                <button type="button" class="btn btn-outline-primary" id="btn-cargar-mas-productos">
+                    <i class="fas fa-chevron-down"></i> Cargar más (${this.productos.length} de ${this.paginacion.total})
+                </button>
+            </div>
+        ` : '';
+        
+        contenedor.innerHTML = productosHTML + botonMas;
+        document.getElementById('btn-cargar-mas-productos')?.addEventListener('click', () => {
+            this.cargarProductos(false);
+        });
     }
 
     /**
@@ -330,6 +376,27 @@ class GestorProductos {
             option.textContent = categoria.titulo || categoria.nombre;
             select.appendChild(option);
         });
+        
+        this.poblarFiltroCategorias();
+    }
+
+    /**
+     * INTERFAZ - Poblar filtro de categorías del listado
+     */
+    poblarFiltroCategorias() {
+        const filtro = document.getElementById('filtro-categoria');
+        if (!filtro) return;
+        
+        const seleccionada = filtro.value;
+        filtro.innerHTML = '<option value="">Todas las categorías</option>';
+        
+        this.categorias.forEach(categoria => {
+            const option = document.createElement('option');
+            option.value = categoria.id;
+            option.textContent = categoria.titulo || categoria.nombre;
+            filtro.appendChild(option);
+        });
+        filtro.value = seleccionada;
     }
 
     /**
@@ -387,6 +454,64 @@ class GestorProductos {
         document.getElementById('btn-buscar-imagenes')?.addEventListener('click', () => {
             this.buscarImagenesWeb();
         });
+        
+        // Búsqueda: cada tecla solo pide sugerencias al trie en memoria; el listado se
+        // recarga al elegir una sugerencia, con Enter, al salir del campo o al vaciarlo
+        const buscador = document.getElementById('buscar-productos');
+        buscador?.addEventListener('input', () => {
+            clearTimeout(this.temporizadorBusqueda);
+            const termino = buscador.value.trim();
+            if (!termino || this.sugerencias.includes(termino)) {
+                this.cargarProductos();
+                return;
+            }
+            this.temporizadorBusqueda = setTimeout(() => this.cargarSugerencias(termino), 120);
+        });
+        buscador?.addEventListener('keydown', (e) => {
+            if (e.key === 'Enter') {
+                e.preventDefault();
+                this.cargarProductos();
+            }
+        });
+        ['buscar-productos', 'filtro-categoria', 'filtro-disponibilidad', 'filtro-tipo', 'ordenar-productos'].forEach(id => {
+            document.getElementById(id)?.addEventListener('change', () => this.cargarProductos());
+        });
+    }
+
+    /**
+     * BÚSQUEDA - Sugerencias de autocompletado para el buscador del listado
+     */
+    async cargarSugerencias(termino) {
+        try {
+            const response = await fetch(`${this.baseURL}/autocompletar/?q=${encodeURIComponent(termino)}&tipos=producto,receta&limite=8`);
+            const data = await response.json();
+            if (!data.success) return;
+
+            this.sugerencias = data.sugerencias.map(sugerencia => sugerencia.texto);
+            const lista = document.getElementById('sugerencias-productos');
+            if (!lista) return;
+            lista.replaceChildren(...data.sugerencias.map(sugerencia => {
+                const opcion = document.createElement('option');
+                opcion.value = sugerencia.texto;
+                opcion.label = sugerencia.tipo;
+                return opcion;
+            }));
+        } catch (error) {
+            console.warn('Autocompletado no disponible:', error);
+        }
+    }
+
+    /**
+     * FILTROS - Restablecer controles y recargar primera página
+     */
+    limpiarFiltros() {
+        ['buscar-productos', 'filtro-categoria', 'filtro-disponibilidad', 'filtro-tipo'].forEach(id => {
+            const elemento = document.getElementById(id);
+            if (elemento) elemento.value = '';
+        });
+        const orden = document.getElementById('ordenar-productos');
+        if (orden) orden.value = 'nombre';
+        this.cargarProductos();
     }
 
     /**
@@ -650,10 +775,20 @@ class GestorProductos {
     /**
      * UTILIDADES - Actualizar estadísticas del dashboard
      */
-    actualizarEstadisticas() {
-        const totalProductos = this.productos.length;
-        const productosActivos = this.productos.filter(p => p.disponible).length;
-        const categorias = [...new Set(this.productos.map(p => p.categoria_id))].length;
+    async actualizarEstadisticas() {
+        // Con paginación el listado no contiene todos los productos: los totales vienen del servidor
+        let totalProductos = this.paginacion.total;
+        let productosActivos = this.productos.filter(p => p.disponible).length;
+        try {
+            const response = await fetch(`${this.baseURL}/productos/stats`);
+            if (response.ok) {
+                const stats = await response.json();
+                totalProductos = stats.total ?? totalProductos;
+                productosActivos = stats.disponibles ?? productosActivos;
+            }
+        } catch (error) {
+            console.warn('⚠️ No se pudieron obtener estadísticas de productos:', error);
+        }
         
         // Actualizar solo si los elementos existen
         const elementoTotal = document.getElementById('stat-productos-total');
@@ -688,6 +823,7 @@ document.addEventListener('DOMContentLoaded', () => {
 window.abrirModalNuevoProducto = () => window.gestorProductos?.abrirModalNuevoProducto();
 window.editarProducto = (id) => window.gestorProductos?.abrirModalEditarProducto(id);
 window.eliminarProducto = (id, nombre) => window.gestorProductos?.eliminarProducto(id, nombre);
+window.limpiarFiltros = () => window.gestorProductos?.limpiarFiltros();
 
 // Marcar como cargado
 window.GestorProductos = GestorProductos;
@@ -1,7 +1,7 @@
 from flask import Blueprint, render_template, send_from_directory
 from modulos.backend.chatbot.models import ConfiguracionChatbot, FondoPersonalizado
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from modulos.backend.menu.database.managers.db_manager import get_session, CHATBOT_DB_PATH
+from modulos.backend.menu.database.managers.servicio_configuracion import servicio_configuracion
 import os
 
 # Solo definimos el blueprint, no una nueva app Flask
@@ -13,29 +13,26 @@ chatbot_bp = Blueprint(
 )
 
 def get_db_session():
-    """Obtener sesión de base de datos"""
-    engine = create_engine('sqlite:///modulos/backend/menu/menu.db')
-    Session = sessionmaker(bind=engine)
-    return Session()
+    """Obtener sesión de base de datos (engine compartido, sesión del request)"""
+    return get_session(CHATBOT_DB_PATH)
 
 @chatbot_bp.route('/')
 def chatbot():
     # CARGAR CONFIGURACIÓN ACTUAL DE LA BASE DE DATOS
     try:
-        db = get_db_session()
-        
         # Buscar configuración de fondo simplificada
         fondo_css = ""
         
-        # Buscar configuración por clave-valor
-        config_tipo = db.query(ConfiguracionChatbot).filter_by(clave='fondo_tipo').first()
-        config_valor = db.query(ConfiguracionChatbot).filter_by(clave='fondo_valor').first()
+        # Configuración clave-valor servida desde memoria (se invalida al cambiar el fondo)
+        config = servicio_configuracion.valores('chatbot')
+        fondo_tipo = config.get('fondo_tipo')
+        fondo_valor = config.get('fondo_valor')
         
-        if config_tipo and config_valor:
-            if config_tipo.valor == 'color':
-                fondo_css = f"background-color: {config_valor.valor} !important; background-image: none !important;"
+        if fondo_tipo and fondo_valor is not None:
+            if fondo_tipo == 'color':
+                fondo_css = f"background-color: {fondo_valor} !important; background-image: none !important;"
                     
-            elif config_tipo.valor == 'imagen':
+            elif fondo_tipo == 'imagen':
                 # Convertir ID a URL de archivo estático
                 try:
                     import os
@@ -66,7 +63,7 @@ def chatbot():
                         fondo_css = "background-color: #000000;"
                     else:
                         # Convertir ID a archivo
-                        fondo_id = int(config_valor.valor)
+                        fondo_id = int(fondo_valor)
                         if 1 <= fondo_id <= len(archivos_imagen):
                             archivo_path = archivos_imagen[fondo_id - 1]
                             nombre_archivo = os.path.basename(archivo_path) 
@@ -81,8 +78,6 @@ def chatbot():
                     print(f"⚠️ Error aplicando fondo: {e} - Usando fondo negro por defecto")
                     fondo_css = "background-color: #000000;"
         
-        db.close()
-        
         # Si no se configuró ningún fondo, usar negro por defecto
         if not fondo_css:
             print("🖤 Sin configuración de fondo - Usando fondo negro por defecto")
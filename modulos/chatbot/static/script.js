@@ -40,7 +40,6 @@ function actualizarEnlacesMenu() {
     // También actualizar otros enlaces que pueden necesitar el nombre
     const base = "/modulos";
     document.getElementById("btn-cancionero").href = `/modulos/cancionero/index.html?${parametros}`;
-    document.getElementById("btn-mesero").href = `${base}/mesero/index.html?${parametros}`;
     document.getElementById("btn-karaoke").href = `${base}/karaoke/index.html?${parametros}`;
     document.getElementById("btn-opiniones").href = `${base}/opiniones/index.html?${parametros}`;
 }
@@ -88,7 +87,7 @@ async function crearSesionBackend(mesa, nombre) {
         
         if (response.ok) {
             const sesion = await response.json();
-            sessionStorage.setItem("sesionId", sesion.id);
+            sessionStorage.setItem("sesionId", sesion.sesion_id);
             console.log('✅ Sesión creada en backend:', sesion);
         } else {
             console.error('❌ Error creando sesión:', response.status);
@@ -98,23 +97,182 @@ async function crearSesionBackend(mesa, nombre) {
     }
 }
 
-// Nueva función para actualizar actividad de sesión
-async function actualizarActividadSesion() {
+/* ======================================================
+   🔁 ENVÍOS CON REINTENTO (Idempotency-Key)
+   Con el Wi-Fi del local una petición puede perderse o cortarse a medias.
+   Cada acción (calificar, comentar, llamar al mesero) genera una clave y la
+   repite en todos sus reintentos: el servidor devuelve la respuesta original
+   en lugar de guardar dos veces. Se reintentan los errores de red y los 5xx.
+   ====================================================== */
+async function enviarConReintentos(url, cuerpo, intentos = 3) {
+    const claveIdempotencia = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`;
+    let response = null;
+    for (let intento = 0; intento < intentos; intento++) {
+        try {
+            response = await fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Idempotency-Key': claveIdempotencia
+                },
+                body: JSON.stringify(cuerpo)
+            });
+            if (response.status < 500) return response;
+        } catch (error) {
+            console.error(`❌ Error enviando a ${url}:`, error);
+        }
+        if (intento < intentos - 1) {
+            await new Promise(resolve => setTimeout(resolve, 1000 * (intento + 1)));
+        }
+    }
+    return response;
+}
+
+// Comentario del cliente (botón ENVIAR de la sección de comentarios)
+async function enviarComentario() {
+    const campo = document.getElementById("comentario");
+    const texto = campo.value.trim();
     const sesionId = sessionStorage.getItem("sesionId");
-    if (!sesionId) return;
+    if (!texto) {
+        alert("Por favor, escribe tu comentario.");
+        return;
+    }
+    if (!sesionId) {
+        console.warn('⚠️ No hay sesión activa para guardar el comentario');
+        return;
+    }
     
-    try {
-        await fetch(`/api/chatbot/sesion/${sesionId}/actividad`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            }
-        });
-    } catch (error) {
-        console.error('❌ Error actualizando actividad:', error);
+    const response = await enviarConReintentos('/api/chatbot/comentario', {
+        sesion_id: sesionId,
+        texto_comentario: texto,
+        tipo: 'general'
+    });
+    if (response && response.ok) {
+        campo.value = '';
+        alert('¡Gracias por tu comentario!');
+    } else {
+        console.error('❌ Error guardando comentario:', response ? response.status : 'sin conexión');
+        alert('No pudimos enviar tu comentario, inténtalo de nuevo.');
     }
 }
 
+// Llamada al mesero: tocar varias veces no crea llamadas repetidas (ventana del servidor)
+async function llamarMesero(evento) {
+    if (evento) evento.preventDefault();
+    const sesionId = sessionStorage.getItem("sesionId");
+    if (!sesionId) {
+        console.warn('⚠️ No hay sesión activa para llamar al mesero');
+        return;
+    }
+    
+    const response = await enviarConReintentos('/api/chatbot/notificacion/mesero', {
+        sesion_id: sesionId,
+        tipo_notificacion: 'llamar_mesero',
+        prioridad: 'normal'
+    });
+    if (response && response.ok) {
+        alert('🔔 Un mesero va en camino a tu mesa.');
+    } else {
+        console.error('❌ Error llamando al mesero:', response ? response.status : 'sin conexión');
+        alert('No pudimos llamar al mesero, inténtalo de nuevo.');
+    }
+}
+
+/* ======================================================
+   📊 BUFFER DE ANALYTICS DEL CLIENTE
+   Acumula eventos y la última actividad y los envía juntos a
+   /api/chatbot/analytics/lote cada INTERVALO_MS y al ocultar la pestaña,
+   en lugar de un fetch por interacción.
+   ====================================================== */
+const analyticsBuffer = (() => {
+    const URL_LOTE = '/api/chatbot/analytics/lote';
+    const INTERVALO_MS = 15000;
+    const MAXIMO_LOTE = 500;     // MAXIMO_EVENTOS_LOTE del backend
+    const MAXIMO_BUFFER = 2000;  // Sin conexión se conservan los más recientes
+    // Ids únicos por pestaña: un lote reenviado no duplica filas en el backend
+    const prefijo = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`;
+    let contador = 0;
+    let eventos = [];
+    let ultimaActividad = null;
+    let enviando = false;
+
+    function registrar(evento, datos = {}) {
+        eventos.push({ id: `${prefijo}-${++contador}`, evento, t: Date.now(), ...datos });
+        if (eventos.length > MAXIMO_BUFFER) eventos.splice(0, eventos.length - MAXIMO_BUFFER);
+        if (eventos.length >= MAXIMO_LOTE) enviar();
+    }
+
+    function marcarActividad() {
+        ultimaActividad = Date.now();
+    }
+
+    function tomarLote() {
+        if (!eventos.length && !ultimaActividad) return null;
+        const lote = {
+            sesion_id: sessionStorage.getItem("sesionId"),
+            mesa: sessionStorage.getItem("mesa") || new URLSearchParams(window.location.search).get("mesa"),
+            ultima_actividad: ultimaActividad,
+            eventos: eventos.splice(0, MAXIMO_LOTE)
+        };
+        ultimaActividad = null;
+        return lote;
+    }
+
+    function devolverLote(lote) {
+        eventos = lote.eventos.concat(eventos).slice(-MAXIMO_BUFFER);
+        ultimaActividad = ultimaActividad || lote.ultima_actividad;
+    }
+
+    async function enviar() {
+        if (enviando) return;
+        const lote = tomarLote();
+        if (!lote) return;
+        enviando = true;
+        try {
+            const response = await fetch(URL_LOTE, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(lote),
+                keepalive: true
+            });
+            if (response.status >= 500) {
+                devolverLote(lote);
+            } else if (response.ok) {
+                const resultado = await response.json();
+                if (resultado.rechazados.length) {
+                    console.warn('⚠️ Eventos de analytics rechazados:', resultado.rechazados);
+                }
+            } else {
+                console.error('❌ Lote de analytics inválido:', response.status);
+            }
+        } catch (error) {
+            // Sin conexión: se reintenta en el próximo envío con los mismos ids
+            devolverLote(lote);
+        } finally {
+            enviando = false;
+        }
+    }
+
+    // Al ocultar o cerrar la pestaña: sendBeacon sobrevive a la descarga de la página
+    function enviarAlSalir() {
+        const lote = tomarLote();
+        if (!lote) return;
+        const blob = new Blob([JSON.stringify(lote)], { type: 'text/plain' });
+        if (!navigator.sendBeacon || !navigator.sendBeacon(URL_LOTE, blob)) {
+            devolverLote(lote);
+        }
+    }
+
+    setInterval(enviar, INTERVALO_MS);
+    document.addEventListener('visibilitychange', () => {
+        registrar('visibilidad', { valor_texto: document.visibilityState });
+        if (document.visibilityState === 'hidden') enviarAlSalir();
+    });
+    window.addEventListener('pagehide', enviarAlSalir);
+
+    return { registrar, marcarActividad, enviar };
+})();
+
 // --- Inactividad: configuración dinámica desde backend ---
 let inactividadTimeout;
 let timeoutConfiguracion = 600000; // Default: 10 minutos
@@ -136,8 +294,8 @@ async function cargarTimeoutConfiguracion() {
 function resetInactividad() {
     clearTimeout(inactividadTimeout);
     
-    // Actualizar actividad en backend
-    actualizarActividadSesion();
+    // La actividad viaja en el próximo lote de analytics
+    analyticsBuffer.marcarActividad();
     
     inactividadTimeout = setTimeout(async () => {
         // Validar sesión en backend antes de cerrar
@@ -234,27 +392,15 @@ document.addEventListener('DOMContentLoaded', function () {
             return;
         }
         
-        try {
-            const response = await fetch('/api/chatbot/calificacion', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    sesion_id: sesionId,
-                    estrellas: estrellas,
-                    categoria: 'servicio' // Categoría por defecto
-                })
-            });
-            
-            if (response.ok) {
-                const calificacion = await response.json();
-                console.log('✅ Calificación guardada:', calificacion);
-            } else {
-                console.error('❌ Error guardando calificación:', response.status);
-            }
-        } catch (error) {
-            console.error('❌ Error enviando calificación:', error);
+        const response = await enviarConReintentos('/api/chatbot/calificacion', {
+            sesion_id: sesionId,
+            estrellas: estrellas,
+            categoria: 'servicio' // Categoría por defecto
+        });
+        if (response && response.ok) {
+            console.log('✅ Calificación guardada:', await response.json());
+        } else {
+            console.error('❌ Error guardando calificación:', response ? response.status : 'sin conexión');
         }
     }
 });
@@ -292,6 +438,14 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Escuchar cambios de tema desde el dashboard
     escucharCambiosDeTema();
+    
+    // Analytics: vista de la página y botones de navegación (van en el próximo lote)
+    analyticsBuffer.registrar('vista', { valor_texto: window.location.pathname });
+    document.querySelectorAll('a.boton').forEach(boton => {
+        boton.addEventListener('click', () => {
+            analyticsBuffer.registrar('navegacion', { valor_texto: boton.id });
+        });
+    });
 });
 
 // Nueva función para escuchar cambios de tema
@@ -300,6 +454,7 @@ function escucharCambiosDeTema() {
     window.addEventListener('storage', function(e) {
         if (e.key === 'chatbot_tema_actualizado') {
             console.log('🔄 Tema actualizado detectado, recargando...');
+            analyticsBuffer.registrar('tema', { valor_texto: 'actualizado' });
             // Recargar configuraciones del backend
             cargarConfiguracionesBackend();
         }
@@ -332,7 +487,7 @@ async function restaurarSesionExistente() {
             if (sesion.activa) {
                 console.log('✅ Sesión restaurada:', sesion);
                 // Actualizar actividad
-                actualizarActividadSesion();
+                analyticsBuffer.marcarActividad();
             } else {
                 // Sesión inactiva, limpiar
                 sessionStorage.removeItem("sesionId");
@@ -16,9 +16,21 @@ const ENDPOINTS = {
     recetas: `${API_BASE}/recetas`,
     detalle: `${API_BASE}/receta`,
     buscar: `${API_BASE}/buscar`,
-    estadisticas: `${API_BASE}/estadisticas`
+    estadisticas: `${API_BASE}/estadisticas`,
+    cambios: '/menu-admin/api/cambios/',
+    autocompletar: '/menu-admin/api/autocompletar/'
 };
 
+// Autocompletado: cada tecla consulta el trie en memoria, no la búsqueda completa
+const TIPOS_SUGERENCIA_COCINA = 'receta,ingrediente,categoria';
+let sugerenciasActuales = [];
+
+// Sincronización incremental con el feed de cambios del catálogo
+const INTERVALO_SINCRONIZACION_MS = 30000;
+const CAMPOS_PRODUCTO_COCINA = 'nombre,descripcion,imagen_url,categoria_nombre,tiempo_preparacion,precio,disponible,tipo_producto';
+let cursorCambios = null;
+let sincronizando = false;
+
 // ==========================================
 //         INICIALIZACIÓN
 // ==========================================
@@ -26,6 +38,7 @@ document.addEventListener('DOMContentLoaded', function() {
     inicializarCocina();
     configurarEventos();
     iniciarReloj();
+    setInterval(sincronizarCambios, INTERVALO_SINCRONIZACION_MS);
 });
 
 /**
@@ -35,6 +48,9 @@ async function inicializarCocina() {
     mostrarCarga(true);
     
     try {
+        // Cursor tomado antes de la carga: lo que cambie mientras tanto llega en la próxima sincronización
+        cursorCambios = await obtenerCursorCambios();
+        
         // Cargar estadísticas y recetas en paralelo
         await Promise.all([
             cargarEstadisticas(),
@@ -61,7 +77,7 @@ function configurarEventos() {
     const btnBuscar = document.getElementById('btn-buscar');
     
     if (inputBusqueda) {
-        inputBusqueda.addEventListener('input', debounce(buscarRecetas, 500));
+        inputBusqueda.addEventListener('input', debounce(sugerirRecetas, 120));
         inputBusqueda.addEventListener('keypress', function(e) {
             if (e.key === 'Enter') {
                 buscarRecetas();
@@ -167,6 +183,138 @@ async function cargarRecetas() {
     }
 }
 
+// ==========================================
+//         SINCRONIZACIÓN INCREMENTAL
+// ==========================================
+
+/**
+ * Cursor actual del feed de cambios (null si no está disponible)
+ */
+async function obtenerCursorCambios() {
+    try {
+        const response = await fetch(ENDPOINTS.cambios);
+        if (!response.ok) return null;
+        const data = await response.json();
+        return data.success ? data.cursor : null;
+    } catch (error) {
+        console.warn('Sincronización incremental no disponible:', error);
+        return null;
+    }
+}
+
+/**
+ * Pedir los cambios desde el último cursor y aplicarlos sobre las recetas cargadas
+ */
+async function sincronizarCambios() {
+    if (cursorCambios === null || sincronizando || document.hidden) return;
+    sincronizando = true;
+    
+    try {
+        const cambios = [];
+        let hayMas = true;
+        while (hayMas) {
+            const url = `${ENDPOINTS.cambios}?desde=${cursorCambios}&tablas=productos,categorias,ingredientes&fields=${CAMPOS_PRODUCTO_COCINA}`;
+            const response = await fetch(url);
+            if (!response.ok) {
+                throw new Error(`Error HTTP: ${response.status}`);
+            }
+            const data = await response.json();
+            if (data.reiniciar) {
+                await inicializarCocina();
+                return;
+            }
+            cambios.push(...data.cambios);
+            cursorCambios = data.cursor;
+            hayMas = data.hay_mas;
+        }
+        
+        if (cambios.length > 0) {
+            await aplicarCambios(cambios);
+            cargarEstadisticas();
+        }
+        
+    } catch (error) {
+        console.error('Error al sincronizar cambios:', error);
+    } finally {
+        sincronizando = false;
+    }
+}
+
+/**
+ * Aplicar altas, modificaciones y borrados sobre recetasCargadas
+ */
+async function aplicarCambios(cambios) {
+    // Un cambio de categoría afecta el nombre mostrado en varias recetas: recarga completa
+    if (cambios.some(cambio => cambio.tabla === 'categorias')) {
+        await cargarRecetas();
+        return;
+    }
+    
+    let recargarConteos = false;
+    
+    cambios.forEach(cambio => {
+        if (cambio.tabla === 'ingredientes') {
+            recargarConteos = true;
+            return;
+        }
+        
+        const indice = recetasCargadas.findIndex(receta => receta.id === cambio.id);
+        const datos = cambio.datos;
+        
+        if (cambio.operacion === 'delete' || datos.tipo_producto !== 'preparado') {
+            if (indice >= 0) recetasCargadas.splice(indice, 1);
+            return;
+        }
+        
+        const anterior = indice >= 0 ? recetasCargadas[indice] : { tiene_ingredientes: false, total_ingredientes: 0 };
+        const receta = {
+            ...anterior,
+            id: datos.id,
+            nombre: datos.nombre,
+            descripcion: datos.descripcion,
+            imagen_url: datos.imagen_url,
+            categoria: datos.categoria_nombre || 'Sin categoría',
+            tiempo_preparacion: datos.tiempo_preparacion,
+            precio: datos.precio,
+            disponible: datos.disponible
+        };
+        
+        if (indice >= 0) {
+            recetasCargadas[indice] = receta;
+        } else {
+            recetasCargadas.push(receta);
+            recargarConteos = true;
+        }
+    });
+    
+    // Los borrados de ingredientes no traen el producto: se refrescan solo los conteos
+    if (recargarConteos) {
+        const response = await fetch(`${ENDPOINTS.recetas}?fields=total_ingredientes,tiene_ingredientes`);
+        if (response.ok) {
+            const data = await response.json();
+            const conteos = new Map((data.recetas || []).map(receta => [receta.id, receta]));
+            recetasCargadas.forEach(receta => {
+                const conteo = conteos.get(receta.id);
+                if (conteo) {
+                    receta.total_ingredientes = conteo.total_ingredientes;
+                    receta.tiene_ingredientes = conteo.tiene_ingredientes;
+                }
+            });
+        }
+    }
+    
+    recetasCargadas.forEach(receta => {
+        if (receta.categoria) categorias.add(receta.categoria);
+    });
+    
+    // Con una búsqueda activa se conserva el resultado en pantalla
+    const inputBusqueda = document.getElementById('busqueda-recetas');
+    if (!inputBusqueda || !inputBusqueda.value.trim()) {
+        recetasFiltradas = [...recetasCargadas];
+        aplicarFiltros();
+    }
+}
+
 // ==========================================
 //         RENDERIZADO
 // ==========================================
@@ -358,6 +506,39 @@ async function buscarRecetas() {
     }
 }
 
+/**
+ * Sugerencias mientras se escribe. La búsqueda completa se lanza con Enter, con el
+ * botón, al elegir una sugerencia o al vaciar el campo.
+ */
+async function sugerirRecetas() {
+    const input = document.getElementById('busqueda-recetas');
+    if (!input) return;
+    
+    const termino = input.value.trim();
+    if (!termino || sugerenciasActuales.includes(termino)) {
+        buscarRecetas();
+        return;
+    }
+    
+    try {
+        const response = await fetch(`${ENDPOINTS.autocompletar}?q=${encodeURIComponent(termino)}&tipos=${TIPOS_SUGERENCIA_COCINA}&limite=8`);
+        const data = await response.json();
+        if (!data.success) return;
+        
+        sugerenciasActuales = data.sugerencias.map(sugerencia => sugerencia.texto);
+        const lista = document.getElementById('sugerencias-recetas');
+        if (!lista) return;
+        lista.replaceChildren(...data.sugerencias.map(sugerencia => {
+            const opcion = document.createElement('option');
+            opcion.value = sugerencia.texto;
+            opcion.label = sugerencia.tipo;
+            return opcion;
+        }));
+    } catch (error) {
+        console.warn('Autocompletado no disponible:', error);
+    }
+}
+
 /**
  * Aplicar filtros a las recetas
  */
@@ -553,6 +734,7 @@ if (typeof module !== 'undefined' && module.exports) {
         inicializarCocina,
         cargarRecetas,
         buscarRecetas,
+        sugerirRecetas,
         aplicarFiltros,
         formatearTiempo
     };
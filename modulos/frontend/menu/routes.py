@@ -4,9 +4,9 @@ Solo funcionalidades esenciales para el menú público
 Incluye verificación de configuración de menú (propio vs externo)
 """
 
-from flask import Blueprint, render_template, request, redirect, url_for, jsonify
-import sqlite3
-import os
+from flask import Blueprint, render_template, request, redirect, url_for, jsonify, Response
+from modulos.backend.menu.endpoints.cache_http import respuesta_condicional
+from modulos.backend.menu.database.managers.servicio_configuracion import servicio_configuracion
 
 # Blueprint del menú público
 menu_bp = Blueprint('menu', __name__, 
@@ -18,26 +18,14 @@ menu_bp = Blueprint('menu', __name__,
 # ===== UTILIDADES DE CONFIGURACIÓN =====
 
 def verificar_configuracion_menu():
-    """Verificar configuración actual del sistema de menú"""
+    """Verificar configuración actual del sistema de menú (configuracion_sistema, servida desde memoria)"""
     try:
-        DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'modulos', 'backend', 'menu', 'database', 'menu.db')
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM configuracion_sistema")
-        rows = cursor.fetchall()
-        
-        config = {}
-        for row in rows:
-            config[row['clave']] = row['valor']
-        
-        conn.close()
+        config = servicio_configuracion.valores('sistema')
         
         return {
             'menu_activo': config.get('menu_activo', 'propio'),
             'menu_externo_url': config.get('menu_externo_url', ''),
-            'redirect_automatico': config.get('redirect_automatico', 'false').lower() == 'true',
+            'redirect_automatico': config.get('redirect_automatico', False),
             'mensaje_mantenimiento': config.get('mensaje_mantenimiento', 'Redirigiendo al menú...')
         }
     except Exception as e:
@@ -92,10 +80,11 @@ def menu_dia():
 def debug():
     """Página de debug simple para el menú"""
     try:
-        import requests
-        # Test rápido de conectividad
-        productos_response = requests.get("http://localhost:8080/menu-admin/api/productos", timeout=2)
-        productos_ok = productos_response.status_code == 200
+        from modulos.backend.menu.menu_snapshot import menu_snapshot
+        # Test rápido: el snapshot del menú se puede construir/servir
+        menu_snapshot.obtener()
+        productos_ok = True
+        snapshot = menu_snapshot.info()
         
         return f"""
         <html>
@@ -103,6 +92,7 @@ def debug():
         <body style="background: #333; color: white; font-family: Arial; padding: 20px;">
             <h1>🔍 Menu Debug</h1>
             <p><strong>Backend Status:</strong> {'✅ OK' if productos_ok else '❌ Error'}</p>
+            <p><strong>Snapshot:</strong> versión {snapshot['version']} | {snapshot['bytes']} bytes | {snapshot['reconstrucciones']} reconstrucciones</p>
             <p><strong>Cliente:</strong> {request.args.get('nombre', 'Invitado')} | Mesa: {request.args.get('mesa', 'N/A')}</p>
             <p><a href="/menu/general" style="color: yellow;">← Volver al Menú</a></p>
         </body>
@@ -121,35 +111,16 @@ def error():
 # ===== API SIMPLE DEL MENÚ =====
 
 @menu_bp.route('/api/menu-completo')
+@respuesta_condicional('productos', 'categorias', 'subcategorias')
 def api_menu_completo():
-    """API optimizada para obtener menú completo desde backend"""
+    """API del menú completo servida desde el snapshot materializado en memoria"""
     try:
-        import requests
-        
-        # Obtener categorías
-        categorias_response = requests.get("http://localhost:8080/menu-admin/api/categorias/", timeout=3)
-        if categorias_response.status_code == 200:
-            categorias_data = categorias_response.json()
-            categorias = categorias_data.get('categorias', [])
-        else:
-            categorias = []
-        
-        # Obtener productos
-        productos_response = requests.get("http://localhost:8080/menu-admin/api/productos/", timeout=3)
-        if productos_response.status_code == 200:
-            productos_data = productos_response.json()
-            productos_raw = productos_data.get('productos', [])
-            # Filtrar productos disponibles
-            productos = [p for p in productos_raw if p.get('disponible', True)]
-        else:
-            productos = []
-        
-        return jsonify({
-            'success': True,
-            'categorias': categorias,
-            'productos': productos,
-            'total': len(productos)
-        })
+        from modulos.backend.menu.menu_snapshot import menu_snapshot
+
+        contenido, estado = menu_snapshot.obtener()
+        response = Response(contenido, mimetype='application/json')
+        response.headers['X-Menu-Snapshot'] = estado
+        return response
         
     except Exception as e:
         import traceback
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, render_template
+from flask import Blueprint, jsonify, render_template, request
 import socket
 from datetime import datetime
 
@@ -131,10 +131,15 @@ def api_status():
             'cocina': True
         }
         
-        # Estadísticas básicas (simuladas por ahora)
+        # Estadísticas básicas: fila global de catalogo_estadisticas (sin recontar el catálogo)
+        from modulos.backend.menu.database.managers.db_manager import get_engine, MENU_DB_PATH
+        from modulos.backend.menu.database.managers.estadisticas_incrementales import leer_global
+        with get_engine(MENU_DB_PATH).connect() as conexion:
+            totales = leer_global(conexion)
         estadisticas = {
-            'total_productos': 0,  # Se puede conectar con la BD más adelante
-            'total_categorias': 0,
+            'total_productos': totales['productos'],
+            'total_categorias': totales['categorias'],
+            'productos_activos': totales['disponibles'],
             'uptime': '< 1 hora'
         }
         
@@ -152,4 +157,67 @@ def api_status():
             'servicios': {},
             'estadisticas': {},
             'timestamp': datetime.now().isoformat()
-        }), 500
\ No newline at end of file
+        }), 500
+
+@admin_bp.route('/api/db/wal')
+def api_estado_wal():
+    """Estado del WAL de cada base SQLite: tamaño, frames pendientes y último checkpoint"""
+    from modulos.backend.menu.database.managers.db_manager import (
+        MENU_DB_PATH, CHATBOT_DB_PATH, listar_bases_datos, obtener_estado_wal
+    )
+    try:
+        rutas = listar_bases_datos() or [MENU_DB_PATH, CHATBOT_DB_PATH]
+        bases = [obtener_estado_wal(ruta) for ruta in rutas]
+        return jsonify({
+            'success': True,
+            'bases_datos': bases,
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@admin_bp.route('/api/bus')
+def api_estado_bus():
+    """Estado del bus de eventos de este worker: backend, cursor, suscriptores y contadores"""
+    from modulos.backend.menu.database.managers.bus_eventos import bus_eventos
+    try:
+        return jsonify({
+            'success': True,
+            'bus': bus_eventos.info(),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@admin_bp.route('/api/configuracion/cache')
+def api_estado_configuracion():
+    """Servicio de configuración de este worker: versión global y recargas por fuente"""
+    from modulos.backend.menu.database.managers.servicio_configuracion import servicio_configuracion
+    try:
+        return jsonify({
+            'success': True,
+            'configuracion': servicio_configuracion.info(),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@admin_bp.route('/api/db/checkpoint', methods=['POST'])
+def api_forzar_checkpoint():
+    """Fuerza un checkpoint del WAL en todas las bases (modo PASSIVE por defecto)"""
+    from modulos.backend.menu.database.managers.db_manager import (
+        listar_bases_datos, ejecutar_checkpoint
+    )
+    try:
+        data = request.get_json(silent=True) or {}
+        modo = data.get('modo', 'PASSIVE')
+        resultados = {ruta: ejecutar_checkpoint(ruta, modo) for ruta in listar_bases_datos()}
+        return jsonify({
+            'success': True,
+            'resultados': resultados,
+            'timestamp': datetime.now().isoformat()
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -171,6 +171,91 @@ class VerificadorSistema:
         except Exception as e:
             self.log_resultado("base_datos", "conexion", False, f"Error de conexión: {str(e)}")
     
+    def verificar_migraciones(self):
+        """Verifica el historial de migraciones versionadas y los índices declarados"""
+        print("\nVERIFICANDO MIGRACIONES...")
+
+        import shutil
+        import tempfile
+        from types import SimpleNamespace
+        from modulos.backend.menu.database.migrations import runner
+        from modulos.backend.menu.database.migrations.comun import requerir_tablas, PrerrequisitoFaltante
+
+        bases_originales = dict(runner.BASES_DATOS)
+        carpeta = tempfile.mkdtemp(prefix='migraciones_')
+        try:
+            migraciones = runner.descubrir_migraciones()
+            versiones = [m.VERSION for m in migraciones]
+            self.log_resultado("migraciones", "orden_versiones", versiones == sorted(set(versiones)),
+                               f"Versiones encontradas: {versiones}")
+
+            def esquema(ruta):
+                conn = sqlite3.connect(ruta)
+                try:
+                    return {nombre for (nombre,) in conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') "
+                        "AND name NOT LIKE 'sqlite_%'"
+                    )}
+                finally:
+                    conn.close()
+
+            # 1) Arranque sobre copias de las bases actuales (lo que hace main.py)
+            for base, ruta in bases_originales.items():
+                copia = os.path.join(carpeta, f"{base}.db")
+                if os.path.exists(ruta):
+                    shutil.copy(ruta, copia)
+                runner.BASES_DATOS[base] = copia
+            runner.ejecutar_migraciones()
+            for base, info in runner.estado_migraciones().items():
+                self.log_resultado("migraciones", f"pendientes_{base}", not info['pendientes'],
+                                   f"Aplicadas {info['aplicadas']}, pendientes {info['pendientes']}")
+
+            conn = sqlite3.connect(runner.BASES_DATOS['menu'])
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM productos WHERE categoria_id = 1 AND disponible = 1"
+            ).fetchall()
+            conn.close()
+            detalle = " ".join(str(fila[-1]) for fila in plan)
+            self.log_resultado("migraciones", "indice_productos_categoria",
+                               'ix_productos_categoria_disponible' in detalle, detalle)
+            esquema_migrado = {base: esquema(ruta) for base, ruta in runner.BASES_DATOS.items()}
+
+            # 2) Base nueva: archivos vacíos -> tablas de los modelos y todas las migraciones
+            for base in bases_originales:
+                ruta = os.path.join(carpeta, f"nueva_{base}.db")
+                open(ruta, 'w').close()
+                runner.BASES_DATOS[base] = ruta
+            runner.ejecutar_migraciones()
+            estado = runner.estado_migraciones()
+            # configuracion_sistema viene de la base original y no tiene modelo
+            faltantes = {base: sorted(esquema_migrado[base] - esquema(runner.BASES_DATOS[base]) - {'configuracion_sistema'})
+                         for base in bases_originales}
+            self.log_resultado("migraciones", "base_nueva",
+                               not any(info['pendientes'] for info in estado.values()) and not any(faltantes.values()),
+                               f"Pendientes {[info['pendientes'] for info in estado.values()]}, "
+                               f"faltan respecto de la base migrada: {faltantes}")
+
+            # 3) Prerrequisito faltante: la migración falla y no queda registrada
+            ficticia = SimpleNamespace(
+                VERSION=9999, BASE='menu', DESCRIPCION='Prueba de prerrequisito',
+                __name__='m9999_prerrequisito',
+                aplicar=lambda conn: requerir_tablas(conn, 'tabla_inexistente')
+            )
+            try:
+                runner.migrar_base_datos('menu', migraciones + [ficticia])
+                lanzo = False
+            except PrerrequisitoFaltante:
+                lanzo = True
+            registrada = 9999 in runner.estado_migraciones()['menu']['aplicadas']
+            self.log_resultado("migraciones", "prerrequisito_faltante", lanzo and not registrada,
+                               f"Lanzó PrerrequisitoFaltante: {lanzo}; registrada: {registrada}")
+
+        except Exception as e:
+            self.log_resultado("migraciones", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            runner.BASES_DATOS.update(bases_originales)
+            shutil.rmtree(carpeta, ignore_errors=True)
+
     def verificar_conectividad(self):
         """Test de conectividad de endpoints principales"""
         print("\nVERIFICANDO CONECTIVIDAD DE ENDPOINTS...")
@@ -393,6 +478,7 @@ class VerificadorSistema:
         
         # Ejecutar todas las verificaciones
         self.verificar_base_datos()
+        self.verificar_migraciones()
         self.verificar_conectividad()
         self.verificar_apis()
         self.verificar_imagenes()
@@ -416,6 +502,8 @@ class VerificadorSistema:
         
         if modulo == "base_datos":
             self.verificar_base_datos()
+        elif modulo == "migraciones":
+            self.verificar_migraciones()
         elif modulo == "conectividad":
             self.verificar_conectividad()
         elif modulo == "apis":
@@ -449,9 +537,41 @@ class VerificadorSistema:
             self.verificar_sistema_personalizacion_completo()
         elif modulo == "codigo_duplicado":
             self.verificar_codigo_duplicado()
+        elif modulo == "benchmark_serializacion":
+            self.verificar_rendimiento_serializacion()
+        elif modulo == "busqueda_aproximada":
+            self.verificar_busqueda_aproximada()
+        elif modulo == "autocompletado":
+            self.verificar_autocompletado()
+        elif modulo == "consultas_estadisticas":
+            self.verificar_consultas_estadisticas()
+        elif modulo == "estadisticas_incrementales":
+            self.verificar_estadisticas_incrementales()
+        elif modulo == "rollups_analytics":
+            self.verificar_rollups_analytics()
+        elif modulo == "sumidero_analytics":
+            self.verificar_sumidero_analytics()
+        elif modulo == "analytics_lote":
+            self.verificar_analytics_lote()
+        elif modulo == "latidos_sesion":
+            self.verificar_latidos_sesion()
+        elif modulo == "expiracion_sesiones":
+            self.verificar_expiracion_sesiones()
+        elif modulo == "notificaciones_stream":
+            self.verificar_notificaciones_stream()
+        elif modulo == "bus_eventos":
+            self.verificar_bus_eventos()
+        elif modulo == "despachador_notificaciones":
+            self.verificar_despachador_notificaciones()
+        elif modulo == "idempotencia":
+            self.verificar_idempotencia()
+        elif modulo == "sesion_activa_unica":
+            self.verificar_sesion_activa_unica()
+        elif modulo == "servicio_configuracion":
+            self.verificar_servicio_configuracion()
         else:
             print(f"❌ Módulo '{modulo}' no reconocido")
-            print("Módulos disponibles: base_datos, conectividad, apis, imagenes, importaciones, cocina, anti_duplicacion, config_menu, dashboard_chatbot, temas, adaptativo, personalizacion, codigo_duplicado")
+            print("Módulos disponibles: base_datos, migraciones, conectividad, apis, imagenes, importaciones, cocina, anti_duplicacion, config_menu, dashboard_chatbot, temas, adaptativo, personalizacion, codigo_duplicado, benchmark_serializacion, busqueda_aproximada, autocompletado, consultas_estadisticas, estadisticas_incrementales, rollups_analytics, sumidero_analytics, analytics_lote, latidos_sesion, expiracion_sesiones, notificaciones_stream, bus_eventos, despachador_notificaciones, idempotencia, sesion_activa_unica, servicio_configuracion")
             return
         
         self.mostrar_resumen()
@@ -977,6 +1097,9 @@ class VerificadorSistema:
                     
                     for match in matches:
                         nombre_funcion = match.group(1)
+                        # Contrato del runner de migraciones: cada mNNNN_*.py define aplicar(conn)
+                        if nombre_funcion == 'aplicar' and re.match(r'm\d{4}_', os.path.basename(archivo)):
+                            continue
                         if nombre_funcion not in funciones:
                             funciones[nombre_funcion] = []
                         funciones[nombre_funcion].append(archivo)
@@ -1039,10 +1162,1911 @@ class VerificadorSistema:
             print(f"❌ Error en auditoría de código duplicado: {e}")
             self.errores.append("Fallo auditoría código duplicado")
 
+    def verificar_rendimiento_serializacion(self, total_productos=50000):
+        """
+        ⏱️ BENCHMARK DE SERIALIZACIÓN DEL CATÁLOGO
+        Compara el listado ORM (joinedload + producto_to_dict) con la capa de lectura
+        sin ORM (lectura_catalogo) sobre una base temporal con total_productos productos.
+        Reporta objetos/segundo y memoria pico de cada camino.
+        """
+        print("\n" + "="*50)
+        print(f"⏱️ BENCHMARK SERIALIZACIÓN ({total_productos} productos)")
+        print("="*50)
+
+        import shutil
+        import tempfile
+        import time
+        import tracemalloc
+
+        directorio = tempfile.mkdtemp(prefix="benchmark_catalogo_")
+        try:
+            from sqlalchemy import create_engine, insert
+            from sqlalchemy.orm import Session as OrmSession, joinedload
+            from modulos.backend.menu.database.base import Base
+            from modulos.backend.menu.database.models.producto import Producto
+            from modulos.backend.menu.database.models.categoria import Categoria
+            from modulos.backend.menu.database.models.subcategoria import Subcategoria
+            from modulos.backend.menu.database.models.ingrediente import Ingrediente  # noqa: F401
+            from modulos.backend.menu.database.managers.lectura_catalogo import leer_productos, serializar
+            from modulos.backend.menu.endpoints.productos_endpoints import producto_to_dict
+
+            engine = create_engine(f"sqlite:///{os.path.join(directorio, 'benchmark.db')}")
+            Base.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(insert(Categoria.__table__), [
+                    {'id': i, 'titulo': f'Categoría {i}', 'activa': True, 'orden': i} for i in range(1, 21)
+                ])
+                conn.execute(insert(Subcategoria.__table__), [
+                    {'id': i, 'nombre': f'Subcategoría {i}', 'categoria_id': (i % 20) + 1, 'activa': True}
+                    for i in range(1, 101)
+                ])
+                conn.execute(insert(Producto.__table__), [
+                    {
+                        'nombre': f'Producto {i}', 'precio': 1000 + i % 500,
+                        'descripcion': 'Descripción de prueba para el benchmark de serialización',
+                        'categoria_id': (i % 20) + 1, 'subcategoria_id': (i % 100) + 1,
+                        'disponible': i % 7 != 0, 'tipo_producto': 'preparado' if i % 3 == 0 else 'simple',
+                        'tiempo_preparacion': '10 min', 'instrucciones_preparacion': 'Servir frío'
+                    }
+                    for i in range(1, total_productos + 1)
+                ])
+
+            def camino_orm():
+                session = OrmSession(bind=engine)
+                try:
+                    productos = session.query(Producto)\
+                        .options(joinedload(Producto.categoria))\
+                        .options(joinedload(Producto.subcategoria))\
+                        .all()
+                    return [producto_to_dict(producto) for producto in productos]
+                finally:
+                    session.close()
+
+            def camino_core():
+                with engine.connect() as conn:
+                    return serializar(leer_productos(conn))
+
+            resultados = {}
+            for nombre, camino in (("orm", camino_orm), ("core", camino_core)):
+                camino()  # Calentamiento (compilación de sentencias, caché de páginas)
+                inicio = time.perf_counter()
+                datos = camino()
+                segundos = time.perf_counter() - inicio
+
+                # Memoria medida en una pasada aparte para no sesgar el tiempo
+                tracemalloc.start()
+                camino()
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                resultados[nombre] = (datos, segundos, pico)
+                print(f"   • {nombre.upper():4}: {len(datos)/segundos:>10,.0f} objetos/s | "
+                      f"{segundos*1000:>8.1f} ms | pico {pico/1024/1024:>7.1f} MB")
+
+            datos_orm, segundos_orm, pico_orm = resultados["orm"]
+            datos_core, segundos_core, pico_core = resultados["core"]
+
+            self.log_resultado("benchmark_serializacion", "mismo_resultado", datos_orm == datos_core,
+                               f"{len(datos_core)} productos serializados")
+            self.log_resultado("benchmark_serializacion", "objetos_por_segundo", segundos_core < segundos_orm,
+                               f"Core {segundos_orm/segundos_core:.1f}x más rápido que ORM")
+            self.log_resultado("benchmark_serializacion", "memoria_pico", pico_core < pico_orm,
+                               f"Core usa {pico_core/pico_orm:.0%} de la memoria pico del ORM")
+            engine.dispose()
+
+        except Exception as e:
+            self.log_resultado("benchmark_serializacion", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def verificar_busqueda_aproximada(self, total_productos=20000, repeticiones=200):
+        """
+        🔤 BÚSQUEDA TOLERANTE A ERRORES (TRIGRAMAS)
+        Indexa total_productos nombres sintéticos con IndiceTrigramas y mide el tiempo de
+        consultas con tildes omitidas y con uno o dos errores de tipeo (objetivo < 5 ms).
+        """
+        print("\n" + "="*50)
+        print(f"🔤 BÚSQUEDA APROXIMADA ({total_productos} productos)")
+        print("="*50)
+
+        import random
+        import statistics
+        import time
+
+        try:
+            from modulos.backend.menu.database.managers.busqueda_trigramas import IndiceTrigramas, normalizar
+
+            random.seed(11)
+            platos = ['Café', 'Capuccino', 'Cerveza', 'Hamburguesa', 'Limonada', 'Ensalada', 'Pizza',
+                      'Empanada', 'Arepa', 'Jugo', 'Malteada', 'Sándwich', 'Chocolate', 'Té', 'Brownie',
+                      'Lasaña', 'Ajiaco', 'Bandeja', 'Patacón', 'Mojito', 'Michelada', 'Tostada', 'Crepe']
+            variantes = ['Clásico', 'Especial', 'Artesanal', 'Grande', 'Pequeño', 'Doble', 'Light',
+                         'Picante', 'Dulce', 'Helado', 'Caliente', 'Casero', 'Premium', 'Mixto']
+            silabas = ['ma', 'ri', 'to', 'la', 'pe', 'su', 'ca', 'no', 'de', 'ra', 'vi', 'lo', 'mi', 'sa']
+            marcas = list({''.join(random.choice(silabas) for _ in range(3)).capitalize() for _ in range(600)})
+            categorias = {i: f'Categoría {nombre}' for i, nombre in enumerate(
+                ['Bebidas Calientes', 'Cervezas Artesanales', 'Platos Fuertes', 'Postres', 'Entradas'], 1)}
+
+            indice = IndiceTrigramas()
+            nombres = {}
+            inicio = time.perf_counter()
+            for producto_id in range(1, total_productos + 1):
+                nombre = f"{random.choice(platos)} {random.choice(variantes)} {random.choice(marcas)}"
+                nombres[producto_id] = nombre
+                indice.agregar(producto_id, [
+                    (normalizar(nombre), 1.0), (normalizar(categorias[producto_id % 5 + 1]), 0.5)
+                ])
+            segundos_indexado = time.perf_counter() - inicio
+            print(f"   • Indexado: {segundos_indexado*1000:.0f} ms")
+
+            # (consulta, palabra que debe contener el primer resultado)
+            consultas = [
+                ('cafe clasico', 'café'),                 # sin tildes
+                ('capuchino', 'capuccino'),               # 1 error
+                ('hamburgesa doble', 'hamburguesa'),      # 1 error
+                ('limonda', 'limonada'),                  # 1 error
+                ('cerbesa artesanal', 'cerveza'),         # 2 errores
+                ('malteda heldo', 'malteada'),            # 1 + 1 errores
+                ('michealda', 'michelada'),               # transposición
+            ]
+
+            tiempos = []
+            for consulta, esperada in consultas:
+                resultados = indice.buscar(consulta, limite=20)
+                acierto = bool(resultados) and esperada in nombres[resultados[0][0]].lower()
+                muestras = []
+                for _ in range(repeticiones):
+                    inicio = time.perf_counter()
+                    indice.buscar(consulta, limite=20)
+                    muestras.append((time.perf_counter() - inicio) * 1000)
+                tiempos.extend(muestras)
+                mediana = statistics.median(muestras)
+                primero = nombres[resultados[0][0]] if resultados else '-'
+                print(f"   • {consulta:20} -> {primero:35} {mediana:6.2f} ms")
+                self.log_resultado("busqueda_aproximada", f"encuentra_{consulta.replace(' ', '_')}", acierto,
+                                   f"{len(resultados)} resultados, primero: {primero}")
+
+            tiempos.sort()
+            p95 = tiempos[int(len(tiempos) * 0.95) - 1]
+            self.log_resultado("busqueda_aproximada", "latencia_p95", p95 < 5,
+                               f"p50 {statistics.median(tiempos):.2f} ms | p95 {p95:.2f} ms (objetivo < 5 ms)")
+
+        except Exception as e:
+            self.log_resultado("busqueda_aproximada", "ejecucion", False, f"Error: {str(e)}")
+
+    def verificar_autocompletado(self, total_productos=20000, repeticiones=500):
+        """
+        ⌨️ AUTOCOMPLETADO POR PREFIJO (TRIE EN MEMORIA)
+        Carga total_productos nombres en el Trie, compara sus sugerencias con un recorrido
+        completo antes y después de altas/bajas incrementales y mide el tiempo por tecla.
+        """
+        print("\n" + "="*50)
+        print(f"⌨️ AUTOCOMPLETADO ({total_productos} productos)")
+        print("="*50)
+
+        import random
+        import statistics
+        import time
+
+        try:
+            from modulos.backend.menu.database.managers.autocompletado import Trie, terminos_de
+
+            random.seed(7)
+            palabras = ['Café', 'Capuccino', 'Cerveza', 'Limonada', 'Ensalada', 'Empanada', 'Arepa',
+                        'Clásico', 'Especial', 'Doble', 'Latte', 'Vainilla', 'Caramelo', 'Coco', 'Mango']
+            entradas = {}
+            for producto_id in range(1, total_productos + 1):
+                nombre = ' '.join(random.sample(palabras, 3)) + f' {producto_id}'
+                entradas[('p', producto_id)] = (nombre, 3.0 + (producto_id % 3) * 0.5)
+
+            trie = Trie()
+            inicio = time.perf_counter()
+            for clave, (nombre, peso) in entradas.items():
+                trie.insertar(clave, {'texto': nombre, 'id': clave[1]}, terminos_de(nombre, peso), recalcular=False)
+            trie.recalcular_todo()
+            print(f"   • Carga: {(time.perf_counter() - inicio)*1000:.0f} ms")
+
+            def esperado(prefijo, limite=8):
+                candidatos = {}
+                for clave, (nombre, peso) in entradas.items():
+                    for termino, peso_termino in terminos_de(nombre, peso):
+                        if termino.startswith(prefijo):
+                            orden = (-peso_termino, len(termino), termino, clave)
+                            candidatos[clave] = min(candidatos.get(clave, orden), orden)
+                return [clave[1] for clave in sorted(candidatos, key=candidatos.get)[:limite]]
+
+            prefijos = ['c', 'ca', 'cap', 'latte v', 'mango coco', 'vai', 'arepa clasico', 'zz']
+
+            def coinciden():
+                return all(
+                    [datos['id'] for _, datos in trie.buscar(prefijo)] == esperado(prefijo)
+                    for prefijo in prefijos
+                )
+
+            self.log_resultado("autocompletado", "carga_completa", coinciden(),
+                               "Sugerencias iguales a un recorrido completo")
+
+            # Altas, modificaciones y bajas incrementales (solo se recalculan los nodos afectados)
+            inicio = time.perf_counter()
+            for producto_id in random.sample(range(1, total_productos + 1), 200):
+                del entradas[('p', producto_id)]
+                trie.quitar(('p', producto_id))
+            for producto_id in range(total_productos + 1, total_productos + 201):
+                nombre = f'Cappuccino Vainilla Especial {producto_id}'
+                entradas[('p', producto_id)] = (nombre, 4.0)
+                trie.insertar(('p', producto_id), {'texto': nombre, 'id': producto_id}, terminos_de(nombre, 4.0))
+            promedio = (time.perf_counter() - inicio) * 1000 / 400
+            self.log_resultado("autocompletado", "actualizacion_incremental", coinciden(),
+                               f"{promedio:.2f} ms por alta/baja")
+
+            tiempos = []
+            for prefijo in prefijos:
+                for _ in range(repeticiones):
+                    inicio = time.perf_counter()
+                    trie.buscar(prefijo)
+                    tiempos.append((time.perf_counter() - inicio) * 1_000_000)
+            tiempos.sort()
+            p95 = tiempos[int(len(tiempos) * 0.95) - 1]
+            self.log_resultado("autocompletado", "latencia_por_tecla", p95 < 1000,
+                               f"p50 {statistics.median(tiempos):.0f} µs | p95 {p95:.0f} µs")
+
+        except Exception as e:
+            self.log_resultado("autocompletado", "ejecucion", False, f"Error: {str(e)}")
+
+    def verificar_consultas_estadisticas(self, escenarios=(5, 60)):
+        """
+        📊 NÚMERO DE CONSULTAS DE LOS ENDPOINTS DE ESTADÍSTICAS
+        Ejecuta cada endpoint sobre bases temporales con distinta cantidad de categorías y
+        cuenta las sentencias SQL: debe ser la misma (y la esperada) en todos los escenarios.
+        """
+        print("\n" + "="*50)
+        print("📊 CONSULTAS POR ENDPOINT DE ESTADÍSTICAS")
+        print("="*50)
+
+        import shutil
+        import tempfile
+
+        # /resumen lee los contadores incrementales: fila global + filas por categoría
+        consultas_esperadas = {'/general': 3, '/productos': 2, '/categorias': 1, '/salud': 3, '/resumen': 2}
+        directorio = tempfile.mkdtemp(prefix="estadisticas_consultas_")
+        try:
+            from flask import Flask
+            from sqlalchemy import create_engine, insert, event
+            from sqlalchemy.orm import sessionmaker
+            from modulos.backend.menu.database.base import Base
+            from modulos.backend.menu.database.models.producto import Producto
+            from modulos.backend.menu.database.models.categoria import Categoria
+            from modulos.backend.menu.database.models.subcategoria import Subcategoria
+            from modulos.backend.menu.database.models.ingrediente import Ingrediente
+            from modulos.backend.menu.database.migrations import m0009_catalogo_estadisticas
+            from modulos.backend.menu.endpoints import estadisticas_endpoints
+
+            conteos = {}
+            session_original = estadisticas_endpoints.Session
+            try:
+                for total_categorias in escenarios:
+                    engine = create_engine(f"sqlite:///{os.path.join(directorio, f'stats_{total_categorias}.db')}")
+                    Base.metadata.create_all(engine)
+                    with engine.begin() as conn:
+                        conn.execute(insert(Categoria.__table__), [
+                            {'id': i, 'titulo': f'Categoría {i}', 'activa': True} for i in range(1, total_categorias + 1)
+                        ])
+                        conn.execute(insert(Subcategoria.__table__), [
+                            {'nombre': f'Subcategoría {i}', 'categoria_id': i % total_categorias + 1, 'activa': True}
+                            for i in range(total_categorias * 2)
+                        ])
+                        conn.execute(insert(Producto.__table__), [
+                            {'nombre': f'Producto {i}', 'precio': 1000 + i, 'categoria_id': i % (total_categorias + 1) or None,
+                             'disponible': i % 4 != 0, 'tipo_producto': 'preparado' if i % 2 else 'simple'}
+                            for i in range(total_categorias * 10)
+                        ])
+                        conn.execute(insert(Ingrediente.__table__), [
+                            {'producto_id': i + 1, 'nombre': f'Ingrediente {i}'} for i in range(total_categorias * 5)
+                        ])
+                    # Tabla catalogo_estadisticas cargada con el estado sembrado
+                    with sqlite3.connect(os.path.join(directorio, f'stats_{total_categorias}.db')) as crudo:
+                        m0009_catalogo_estadisticas.aplicar(crudo)
+
+                    sentencias = []
+                    event.listen(engine, 'before_cursor_execute',
+                                 lambda conn, cursor, sql, *args: sentencias.append(sql))
+                    estadisticas_endpoints.Session = sessionmaker(bind=engine)
+
+                    app = Flask(__name__)
+                    app.register_blueprint(estadisticas_endpoints.estadisticas_bp, url_prefix='/estadisticas')
+                    cliente = app.test_client()
+
+                    for ruta in consultas_esperadas:
+                        cliente.get(f'/estadisticas{ruta}')  # calentamiento: cachés de existencia de tablas
+                        sentencias.clear()
+                        respuesta = cliente.get(f'/estadisticas{ruta}')
+                        conteos[(ruta, total_categorias)] = (respuesta.status_code, len(sentencias))
+                    engine.dispose()
+            finally:
+                estadisticas_endpoints.Session = session_original
+
+            for ruta, esperadas in consultas_esperadas.items():
+                resultados = [conteos[(ruta, total)] for total in escenarios]
+                constante = all(estado == 200 and total == esperadas for estado, total in resultados)
+                detalle = ', '.join(f"{total} categorías: {n} consultas" for total, (_, n) in zip(escenarios, resultados))
+                print(f"   • {ruta:12} {detalle}")
+                self.log_resultado("consultas_estadisticas", f"constante{ruta.replace('/', '_')}", constante,
+                                   f"{detalle} (esperadas {esperadas})")
+
+        except Exception as e:
+            self.log_resultado("consultas_estadisticas", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def verificar_estadisticas_incrementales(self, total_productos=20000, operaciones=400, repeticiones=200):
+        """
+        📈 CONTADORES INCREMENTALES DEL CATÁLOGO
+        Sobre una base temporal: altas, modificaciones (también de objetos expirados) y
+        borrados por el ORM deben dejar catalogo_estadisticas igual a un recálculo completo;
+        una escritura por SQL crudo se detecta como desvío y reconstruir() la corrige.
+        Compara además la lectura de la fila global con el recuento de la tabla productos.
+        """
+        print("\n" + "="*50)
+        print("📈 ESTADÍSTICAS INCREMENTALES DEL CATÁLOGO")
+        print("="*50)
+
+        import random
+        import shutil
+        import tempfile
+        import time
+
+        directorio = tempfile.mkdtemp(prefix="estadisticas_incrementales_")
+        try:
+            from sqlalchemy import create_engine, insert
+            from sqlalchemy.orm import sessionmaker
+            from modulos.backend.menu.database.base import Base
+            from modulos.backend.menu.database.models.producto import Producto
+            from modulos.backend.menu.database.models.categoria import Categoria
+            from modulos.backend.menu.database.models.subcategoria import Subcategoria
+            from modulos.backend.menu.database.models.ingrediente import Ingrediente
+            from modulos.backend.menu.database.migrations import m0009_catalogo_estadisticas
+            from modulos.backend.menu.database.managers.estadisticas_catalogo import agregados_productos
+            from modulos.backend.menu.database.managers.estadisticas_incrementales import (
+                leer_global, diferencias, reconstruir
+            )
+
+            ruta = os.path.join(directorio, 'estadisticas.db')
+            engine = create_engine(f"sqlite:///{ruta}")
+            Base.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(insert(Categoria.__table__), [
+                    {'id': i, 'titulo': f'Categoría {i}', 'activa': i % 5 != 0} for i in range(1, 21)
+                ])
+                conn.execute(insert(Producto.__table__), [
+                    {'nombre': f'Producto {i}', 'precio': (i % 50) * 100, 'categoria_id': i % 21 or None,
+                     'disponible': i % 4 != 0, 'tipo_producto': 'preparado' if i % 3 else 'simple',
+                     'imagen_url': f'/img/{i}.png' if i % 2 else None}
+                    for i in range(total_productos)
+                ])
+            with sqlite3.connect(ruta) as crudo:
+                m0009_catalogo_estadisticas.aplicar(crudo)
+
+            Session = sessionmaker(bind=engine)
+            azar = random.Random(14)
+            session = Session()
+            try:
+                for paso in range(operaciones):
+                    accion = azar.choice(('alta', 'modificar', 'modificar_expirado', 'borrar', 'otras'))
+                    if accion == 'alta':
+                        producto = Producto(nombre=f'Nuevo {paso}', precio=azar.choice((0, 1500, 2990)),
+                                            categoria_id=azar.choice((None, 1, 7, 20)),
+                                            tipo_producto=azar.choice(('simple', 'preparado')))
+                        session.add(producto)
+                        session.flush()
+                        session.add(Ingrediente(nombre=f'Ingrediente {paso}', producto_id=producto.id))
+                    elif accion in ('modificar', 'modificar_expirado'):
+                        producto = session.get(Producto, azar.randint(1, total_productos))
+                        if producto is None:
+                            continue
+                        if accion == 'modificar_expirado':
+                            session.expire(producto)
+                        producto.categoria_id = azar.choice((None, 2, 3, 20))
+                        producto.disponible = azar.random() < 0.5
+                        producto.precio = azar.choice((0, 990, 4500))
+                    elif accion == 'borrar':
+                        producto = session.get(Producto, azar.randint(1, total_productos))
+                        if producto is None or producto.ingredientes:
+                            continue
+                        session.delete(producto)
+                    else:
+                        categoria = session.get(Categoria, azar.randint(1, 20))
+                        categoria.activa = not categoria.activa
+                        session.add(Subcategoria(nombre=f'Sub {paso}', categoria_id=categoria.id))
+                    if paso % 10 == 9:
+                        session.commit()
+                session.commit()
+            finally:
+                session.close()
+
+            with engine.connect() as conexion:
+                desvios = diferencias(conexion)
+            self.log_resultado("estadisticas_incrementales", "listeners_orm", not desvios,
+                               f"{operaciones} operaciones ORM, desvíos: {desvios or 'ninguno'}")
+
+            with engine.begin() as conexion:
+                conexion.exec_driver_sql("UPDATE productos SET disponible = 0 WHERE id <= 10")
+                detectado = bool(diferencias(conexion))
+                reconstruir(conexion)
+                reparado = not diferencias(conexion)
+            self.log_resultado("estadisticas_incrementales", "reconstruccion", detectado and reparado,
+                               f"Desvío por SQL crudo detectado: {detectado}, corregido: {reparado}")
+
+            with engine.connect() as conexion:
+                global_ = leer_global(conexion)
+                agregados = agregados_productos(conexion)
+                coinciden = global_['productos'] == agregados['total'] and all(
+                    global_[clave] == agregados[clave]
+                    for clave in ('disponibles', 'preparados', 'simples', 'con_imagen', 'con_precio')
+                )
+
+                def medir(funcion):
+                    tiempos = []
+                    for _ in range(repeticiones):
+                        inicio = time.perf_counter()
+                        funcion(conexion)
+                        tiempos.append((time.perf_counter() - inicio) * 1000)
+                    tiempos.sort()
+                    return tiempos[len(tiempos) // 2]
+
+                lectura_ms = medir(leer_global)
+                recuento_ms = medir(agregados_productos)
+
+            print(f"   • Fila global: {lectura_ms:.3f} ms | recuento de {total_productos} productos: {recuento_ms:.2f} ms (mediana)")
+            self.log_resultado("estadisticas_incrementales", "coincide_con_recuento", coinciden,
+                               f"{global_['productos']} productos, {global_['disponibles']} disponibles")
+            self.log_resultado("estadisticas_incrementales", "lectura_constante", lectura_ms < recuento_ms,
+                               f"{lectura_ms:.3f} ms vs {recuento_ms:.2f} ms")
+            engine.dispose()
+
+        except Exception as e:
+            self.log_resultado("estadisticas_incrementales", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def verificar_rollups_analytics(self, total_sesiones=100000, dias=30, repeticiones=20):
+        """
+        📆 ROLLUPS DE ANALYTICS DEL CHATBOT
+        Sobre una base temporal: las series por día, el promedio de calificaciones y las
+        mesas más activas leídas de los rollups deben coincidir con el GROUP BY sobre las
+        filas crudas, también tras eventos tardíos y calificaciones modificadas por el ORM.
+        """
+        print("\n" + "="*50)
+        print("📆 ROLLUPS DE ANALYTICS DEL CHATBOT")
+        print("="*50)
+
+        import random
+        import shutil
+        import tempfile
+        import time
+        from datetime import timedelta
+
+        directorio = tempfile.mkdtemp(prefix="rollups_analytics_")
+        try:
+            from sqlalchemy import create_engine, insert, func
+            from sqlalchemy.orm import sessionmaker
+            from modulos.backend.menu.database.base import Base
+            from modulos.backend.chatbot.models import Sesion, Calificacion, NotificacionMesero
+            from modulos.backend.chatbot import analytics_rollups as rollups
+
+            engine = create_engine(f"sqlite:///{os.path.join(directorio, 'chatbot.db')}")
+            Base.metadata.create_all(engine)
+
+            azar = random.Random(15)
+            ahora = datetime.utcnow()
+
+            def sembrar(cantidad, antiguedad_maxima):
+                fechas = [ahora - timedelta(seconds=azar.randint(0, antiguedad_maxima)) for _ in range(cantidad)]
+                with engine.begin() as conn:
+                    primer_id = conn.execute(func.coalesce(func.max(Sesion.id), 0).select()).scalar() + 1
+                    conn.execute(insert(Sesion.__table__), [
+                        {'mesa': str(azar.randint(1, 25)), 'fecha_inicio': fecha, 'activa': False} for fecha in fechas
+                    ])
+                    conn.execute(insert(Calificacion.__table__), [
+                        {'sesion_id': primer_id + i, 'estrellas': azar.randint(1, 5),
+                         'categoria': azar.choice(('general', 'comida', 'servicio', None)), 'fecha_calificacion': fecha}
+                        for i, fecha in enumerate(fechas) if i % 3 == 0
+                    ])
+                    conn.execute(insert(NotificacionMesero.__table__), [
+                        {'sesion_id': primer_id + i, 'tipo_notificacion': azar.choice(('llamar_mesero', 'pedir_cuenta')),
+                         'prioridad': azar.choice(('normal', 'alta')), 'fecha_notificacion': fecha}
+                        for i, fecha in enumerate(fechas) if i % 4 == 0
+                    ])
+
+            # Inicio del rango a medianoche: la precisión horaria del borde no interviene
+            desde = (ahora - timedelta(days=dias)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+            def crudo(conn):
+                return {
+                    'sesiones': [tuple(f) for f in conn.execute(
+                        Sesion.__table__.select().with_only_columns(func.date(Sesion.fecha_inicio).label('d'), func.count())
+                        .where(Sesion.fecha_inicio >= desde).group_by('d').order_by('d'))],
+                    'calificaciones': [(f[0], round(f[1], 6)) for f in conn.execute(
+                        Calificacion.__table__.select().with_only_columns(
+                            func.date(Calificacion.fecha_calificacion).label('d'), func.avg(Calificacion.estrellas))
+                        .where(Calificacion.fecha_calificacion >= desde).group_by('d').order_by('d'))],
+                    'notificaciones': [tuple(f) for f in conn.execute(
+                        NotificacionMesero.__table__.select().with_only_columns(
+                            NotificacionMesero.tipo_notificacion, func.count())
+                        .where(NotificacionMesero.fecha_notificacion >= desde)
+                        .group_by(NotificacionMesero.tipo_notificacion).order_by(NotificacionMesero.tipo_notificacion))],
+                }
+
+            def desde_rollups(conn):
+                rollups.consolidar(conn)
+                return {
+                    'sesiones': [tuple(f) for f in rollups.sesiones_por_dia(conn, desde)],
+                    'calificaciones': [(f[0], round(f[1], 6)) for f in rollups.calificaciones_por_dia(conn, desde)],
+                    'notificaciones': [tuple(f) for f in rollups.notificaciones_por_tipo(conn, desde)],
+                }
+
+            sembrar(total_sesiones, (dias + 10) * 86400)
+            with engine.begin() as conn:
+                coinciden = desde_rollups(conn) == crudo(conn)
+            self.log_resultado("rollups_analytics", "coincide_con_crudo", coinciden,
+                               f"{total_sesiones} sesiones en {dias + 10} días")
+
+            # Eventos tardíos: fechas de periodos ya cerrados, ids nuevos
+            sembrar(2000, dias * 86400)
+            with engine.begin() as conn:
+                coinciden = desde_rollups(conn) == crudo(conn)
+                repetida = rollups.consolidar(conn)
+            self.log_resultado("rollups_analytics", "eventos_tardios", coinciden and not repetida,
+                               f"2000 eventos con fechas pasadas; segunda pasada vacía: {not repetida}")
+
+            # Calificaciones consolidadas modificadas por el ORM (nuevas estrellas y fecha)
+            Session = sessionmaker(bind=engine)
+            session = Session()
+            try:
+                for calificacion in session.query(Calificacion).order_by(Calificacion.id).limit(50):
+                    calificacion.estrellas = 6 - calificacion.estrellas
+                    calificacion.fecha_calificacion = datetime.utcnow()
+                session.commit()
+            finally:
+                session.close()
+            with engine.begin() as conn:
+                coinciden = desde_rollups(conn) == crudo(conn)
+            self.log_resultado("rollups_analytics", "calificaciones_modificadas", coinciden,
+                               "50 calificaciones consolidadas actualizadas por el ORM")
+
+            with engine.begin() as conn:
+                def medir(funcion):
+                    inicio = time.perf_counter()
+                    for _ in range(repeticiones):
+                        funcion(conn)
+                    return (time.perf_counter() - inicio) * 1000 / repeticiones
+                crudo_ms = medir(crudo)
+                rollups_ms = medir(desde_rollups)
+            print(f"   • Gráficos de {dias} días: crudo {crudo_ms:.1f} ms | rollups {rollups_ms:.2f} ms")
+            self.log_resultado("rollups_analytics", "rendimiento", rollups_ms < crudo_ms,
+                               f"{rollups_ms:.2f} ms vs {crudo_ms:.1f} ms")
+            engine.dispose()
+
+        except Exception as e:
+            self.log_resultado("rollups_analytics", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def verificar_sumidero_analytics(self, eventos=5000, hilos=4):
+        """
+        📨 ESCRITOR ASÍNCRONO DE ANALYTICS
+        Sobre una base temporal: todo lo encolado se escribe en lotes; con la base
+        bloqueada por otro escritor la cola llena descarta (y cuenta) en lugar de
+        bloquear las peticiones, y al liberarse se escribe todo lo aceptado.
+        """
+        print("\n" + "="*50)
+        print("📨 ESCRITOR ASÍNCRONO DE ANALYTICS")
+        print("="*50)
+
+        import shutil
+        import tempfile
+        import threading
+        import time
+
+        directorio = tempfile.mkdtemp(prefix="sumidero_analytics_")
+        try:
+            from sqlalchemy import create_engine
+            from modulos.backend.menu.database.base import Base
+            from modulos.backend.chatbot.models import Analytics
+            from modulos.backend.chatbot.analytics_sink import SumideroAnalytics
+
+            ruta = os.path.join(directorio, 'chatbot.db')
+            engine = create_engine(f"sqlite:///{ruta}")
+            Base.metadata.create_all(engine, tables=[Analytics.__table__])
+            engine.dispose()
+
+            def filas():
+                with sqlite3.connect(ruta) as conn:
+                    return conn.execute("SELECT COUNT(*) FROM chatbot_analytics").fetchone()[0]
+
+            # 1. Volumen desde varios hilos: todo se escribe, en pocos lotes
+            sumidero = SumideroAnalytics(db_path=ruta)
+            latencias = []
+
+            def productor(numero):
+                for i in range(eventos // hilos):
+                    inicio = time.perf_counter()
+                    sumidero.registrar('acceso', mesa=str(numero), valor_texto=f'evento {i}')
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+
+            trabajadores = [threading.Thread(target=productor, args=(n,)) for n in range(hilos)]
+            for hilo in trabajadores:
+                hilo.start()
+            for hilo in trabajadores:
+                hilo.join()
+            sumidero.vaciar()
+            info = sumidero.info()
+            latencias.sort()
+            p99 = latencias[int(len(latencias) * 0.99)]
+            print(f"   • {eventos} eventos en {info['lotes']} lotes | registrar() p99 {p99:.3f} ms")
+            self.log_resultado("sumidero_analytics", "todo_escrito",
+                               filas() == eventos and info['escritos'] == eventos and info['descartados'] == 0,
+                               f"{filas()} filas, {info['lotes']} lotes")
+            sumidero.detener()
+
+            # 2. Contrapresión: base bloqueada, cola chica
+            sumidero = SumideroAnalytics(db_path=ruta, capacidad=100, tamano_lote=50, intervalo_ms=20)
+            bloqueo = sqlite3.connect(ruta, isolation_level=None)
+            bloqueo.execute("BEGIN IMMEDIATE")
+            try:
+                inicio = time.perf_counter()
+                # Menos eventos que lo que tarda en vencer el busy_timeout del escritor
+                aceptados = sum(sumidero.registrar('calificacion', mesa='1', valor_numerico=5) for _ in range(200))
+                espera_media_ms = (time.perf_counter() - inicio) * 1000 / 200
+            finally:
+                bloqueo.execute("ROLLBACK")
+                bloqueo.close()
+            sumidero.vaciar()
+            info = sumidero.info()
+            coherente = (info['descartados'] > 0 and info['encolados'] == aceptados
+                         and aceptados + info['descartados'] == 200 and info['errores'] == 0
+                         and filas() == eventos + aceptados)
+            self.log_resultado("sumidero_analytics", "contrapresion", coherente,
+                               f"aceptados {aceptados}, descartados {info['descartados']}, "
+                               f"espera media por evento {espera_media_ms:.1f} ms")
+            sumidero.detener()
+
+        except Exception as e:
+            self.log_resultado("sumidero_analytics", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def verificar_analytics_lote(self, eventos=500):
+        """
+        📦 INGESTA POR LOTES DE ANALYTICS
+        Sobre una base temporal con el esquema previo a la migración 0011: un lote
+        del navegador se escribe en una transacción, su reenvío no duplica filas y
+        los eventos inválidos se rechazan con su posición sin frenar al resto.
+        """
+        print("\n" + "="*50)
+        print("📦 INGESTA POR LOTES DE ANALYTICS")
+        print("="*50)
+
+        import shutil
+        import tempfile
+        import time
+        from datetime import datetime, timedelta, timezone
+
+        directorio = tempfile.mkdtemp(prefix="analytics_lote_")
+        try:
+            from modulos.backend.menu.database.managers.db_manager import get_engine
+            from modulos.backend.menu.database.migrations import m0011_analytics_id_cliente
+            from modulos.backend.chatbot.analytics_lote import validar_lote, escribir_lote
+
+            ruta = os.path.join(directorio, 'chatbot.db')
+            with sqlite3.connect(ruta) as conn:
+                conn.execute("""CREATE TABLE chatbot_analytics (
+                    id INTEGER PRIMARY KEY, fecha DATETIME, mesa VARCHAR(20), evento VARCHAR(50),
+                    valor_numerico FLOAT, valor_texto VARCHAR(500), metadatos TEXT)""")
+                m0011_analytics_id_cliente.aplicar(conn)
+                m0011_analytics_id_cliente.aplicar(conn)  # Idempotente
+            self.log_resultado("analytics_lote", "migracion_0011", True, "id_cliente + índice único")
+
+            ahora = datetime.utcnow()
+            base_ms = int((ahora - timedelta(minutes=10)).replace(tzinfo=timezone.utc).timestamp() * 1000)
+            lote = [{'id': f'pestana-{i}', 'evento': 'navegacion', 't': base_ms + i,
+                     'valor_texto': 'btn-menu', 'metadatos': {'orden': i}} for i in range(eventos)]
+
+            # 1. Un lote, una transacción; el reenvío del mismo lote no duplica
+            engine = get_engine(ruta)
+            inicio = time.perf_counter()
+            filas, rechazados, _ = validar_lote(lote, '5', ahora)
+            with engine.begin() as conexion:
+                insertados = escribir_lote(conexion, filas)
+            tiempo_lote = (time.perf_counter() - inicio) * 1000
+            with engine.begin() as conexion:
+                reenviados = escribir_lote(conexion, validar_lote(lote, '5', ahora)[0])
+            total = engine.connect().exec_driver_sql("SELECT COUNT(*) FROM chatbot_analytics").scalar()
+            self.log_resultado("analytics_lote", "idempotencia",
+                               insertados == eventos and reenviados == 0 and total == eventos and not rechazados,
+                               f"{insertados} insertados, {reenviados} en el reenvío, {total} filas")
+
+            # 2. Referencia: un POST (una transacción) por evento
+            individuales = [{**evento, 'id': f'individual-{i}'} for i, evento in enumerate(lote)]
+            inicio = time.perf_counter()
+            for evento in individuales:
+                with engine.begin() as conexion:
+                    escribir_lote(conexion, validar_lote([evento], '5', ahora)[0])
+            tiempo_individual = (time.perf_counter() - inicio) * 1000
+            print(f"   • {eventos} eventos: lote {tiempo_lote:.1f} ms | una transacción por evento {tiempo_individual:.1f} ms")
+            self.log_resultado("analytics_lote", "una_transaccion", tiempo_lote < tiempo_individual,
+                               f"{tiempo_individual / max(tiempo_lote, 0.001):.0f}x menos tiempo de escritura")
+
+            # 3. Validación en bloque: cada inválido con su índice, el resto se acepta
+            mixto = [
+                {'id': 'ok-1', 'evento': 'vista', 't': base_ms},
+                {'id': 'viejo', 'evento': 'vista', 't': base_ms - 2 * 24 * 3600 * 1000},
+                {'id': 'futuro', 'evento': 'vista', 't': base_ms + 3600 * 1000},
+                {'id': 'adelantado', 'evento': 'vista', 't': (ahora + timedelta(minutes=1)).isoformat() + 'Z'},
+                {'id': 'servidor', 'evento': 'calificacion', 't': base_ms},
+                {'evento': 'vista', 't': base_ms},
+                {'id': 'ok-1', 'evento': 'vista', 't': base_ms},
+                {'id': 'numero', 'evento': 'vista', 't': base_ms, 'valor_numerico': 'cinco'},
+                'no-es-objeto',
+            ]
+            filas, rechazados, ultima = validar_lote(mixto, '5', ahora)
+            aceptados = [fila[-1] for fila in filas]
+            indices = [rechazo['indice'] for rechazo in rechazados]
+            self.log_resultado("analytics_lote", "validacion",
+                               aceptados == ['ok-1', 'adelantado'] and indices == [1, 2, 4, 5, 6, 7, 8]
+                               and ultima == ahora,
+                               f"{len(filas)} aceptados, rechazados en posiciones {indices}")
+            engine.dispose()
+
+        except Exception as e:
+            self.log_resultado("analytics_lote", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def verificar_latidos_sesion(self, sesiones=200, latidos=20000, hilos=4):
+        """
+        💓 LATIDOS DE SESIÓN CON ESCRITURA DIFERIDA
+        Sobre una base temporal: miles de latidos se vuelcan en un solo UPDATE por
+        lotes, las lecturas ven lo pendiente antes del volcado, la fecha nunca
+        retrocede y las sesiones cerradas no se tocan.
+        """
+        print("\n" + "="*50)
+        print("💓 LATIDOS DE SESIÓN CON ESCRITURA DIFERIDA")
+        print("="*50)
+
+        import shutil
+        import tempfile
+        import threading
+        import time
+        from datetime import datetime, timedelta
+
+        directorio = tempfile.mkdtemp(prefix="latidos_sesion_")
+        try:
+            from sqlalchemy import create_engine
+            from modulos.backend.menu.database.base import Base
+            from modulos.backend.chatbot.models import Sesion
+            from modulos.backend.chatbot.latidos_sesion import LatidosSesion
+            from modulos.backend.menu.database.managers.db_manager import get_session
+
+            ruta = os.path.join(directorio, 'chatbot.db')
+            engine = create_engine(f"sqlite:///{ruta}")
+            Base.metadata.create_all(engine, tables=[Sesion.__table__])
+            engine.dispose()
+
+            inicio_noche = datetime.utcnow() - timedelta(hours=1)
+            session = get_session(ruta)
+            session.add_all(Sesion(mesa=str(i), fecha_inicio=inicio_noche, fecha_ultimo_acceso=inicio_noche)
+                            for i in range(sesiones))
+            session.commit()
+            session.close()
+
+            def leer(sesion_id):
+                with sqlite3.connect(ruta) as conn:
+                    return conn.execute("SELECT fecha_ultimo_acceso FROM chatbot_sesiones WHERE id = ?",
+                                        (sesion_id,)).fetchone()[0]
+
+            # 1. Muchos latidos concurrentes: se vuelca uno por sesión en una transacción
+            latidos_sesion = LatidosSesion(db_path=ruta, intervalo_s=3600)
+            ultimo_por_sesion = {}
+            candado = threading.Lock()
+
+            def telefono(numero):
+                for i in range(latidos // hilos):
+                    sesion_id = (numero * 7919 + i) % sesiones + 1
+                    fecha = latidos_sesion.registrar(sesion_id)
+                    with candado:
+                        ultimo_por_sesion[sesion_id] = max(fecha, ultimo_por_sesion.get(sesion_id, fecha))
+
+            inicio = time.perf_counter()
+            trabajadores = [threading.Thread(target=telefono, args=(n,)) for n in range(hilos)]
+            for hilo in trabajadores:
+                hilo.start()
+            for hilo in trabajadores:
+                hilo.join()
+            tiempo_registro = (time.perf_counter() - inicio) * 1000
+
+            # Antes del volcado la lectura fusiona lo pendiente
+            sesion_id = next(iter(ultimo_por_sesion))
+            fusionado = latidos_sesion.ultimo_acceso(sesion_id, inicio_noche) == ultimo_por_sesion[sesion_id]
+            self.log_resultado("latidos_sesion", "lectura_fusionada",
+                               fusionado and leer(sesion_id).startswith(inicio_noche.strftime('%Y-%m-%d %H:%M')),
+                               "la lectura ve el latido antes del volcado")
+
+            inicio = time.perf_counter()
+            actualizadas = latidos_sesion.vaciar()
+            tiempo_volcado = (time.perf_counter() - inicio) * 1000
+            info = latidos_sesion.info()
+            correctas = all(leer(sid) == fecha.strftime('%Y-%m-%d %H:%M:%S.%f') for sid, fecha in ultimo_por_sesion.items())
+            print(f"   • {latidos} latidos: registro {tiempo_registro:.1f} ms, volcado {tiempo_volcado:.1f} ms "
+                  f"({info['volcados']} transacción, {actualizadas} filas)")
+            self.log_resultado("latidos_sesion", "volcado_por_lotes",
+                               correctas and actualizadas == len(ultimo_por_sesion) and info['volcados'] == 1
+                               and info['pendientes'] == 0,
+                               f"{latidos} latidos -> {actualizadas} filas en 1 UPDATE por lotes")
+
+            # 2. Referencia: SELECT + COMMIT por latido (comportamiento anterior), muestra de 500
+            session = get_session(ruta)
+            inicio = time.perf_counter()
+            for i in range(500):
+                sesion = session.query(Sesion).filter_by(id=i % sesiones + 1).first()
+                sesion.fecha_ultimo_acceso = datetime.utcnow()
+                session.commit()
+            tiempo_directo = (time.perf_counter() - inicio) * 1000 / 500 * latidos
+            session.close()
+            print(f"   • Escritura directa estimada para {latidos} latidos: {tiempo_directo:.0f} ms")
+            self.log_resultado("latidos_sesion", "menos_transacciones", tiempo_registro + tiempo_volcado < tiempo_directo,
+                               f"{tiempo_directo / (tiempo_registro + tiempo_volcado):.0f}x menos tiempo")
+
+            # 3. Un latido atrasado no retrocede la fecha; una sesión cerrada no se toca
+            with sqlite3.connect(ruta) as conn:
+                conn.execute("UPDATE chatbot_sesiones SET activa = 0 WHERE id = 2")
+            antes_cerrada = leer(2)
+            antes = leer(1)
+            latidos_sesion.registrar(1, inicio_noche)
+            latidos_sesion.registrar(2)
+            latidos_sesion.vaciar()
+            self.log_resultado("latidos_sesion", "sin_retroceso", leer(1) == antes and leer(2) == antes_cerrada,
+                               "latido atrasado y sesión cerrada sin cambios")
+            latidos_sesion.detener()
+
+        except Exception as e:
+            self.log_resultado("latidos_sesion", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def verificar_expiracion_sesiones(self, vencidas=2000, vigentes=50):
+        """
+        🧹 EXPIRACIÓN DE SESIONES EN EL SERVIDOR
+        Sobre una base temporal: un barrido cierra con un UPDATE indexado las sesiones
+        sin acceso desde el timeout configurado, respeta los latidos aún no volcados,
+        solo un worker a la vez tiene el turno y el resultado queda registrado.
+        """
+        print("\n" + "="*50)
+        print("🧹 EXPIRACIÓN DE SESIONES EN EL SERVIDOR")
+        print("="*50)
+
+        import shutil
+        import tempfile
+        from datetime import datetime, timedelta
+
+        directorio = tempfile.mkdtemp(prefix="expiracion_sesiones_")
+        try:
+            from sqlalchemy import create_engine
+            from modulos.backend.menu.database.base import Base
+            from modulos.backend.chatbot.models import Sesion, ConfiguracionChatbot, TareaChatbot
+            from modulos.backend.chatbot.latidos_sesion import LatidosSesion
+            from modulos.backend.chatbot.expiracion_sesiones import (
+                BarridoSesiones, estado_tarea, DURACION_TURNO_S
+            )
+            from modulos.backend.menu.database.managers.db_manager import get_session, get_engine
+
+            ruta = os.path.join(directorio, 'chatbot.db')
+            engine = create_engine(f"sqlite:///{ruta}")
+            Base.metadata.create_all(engine, tables=[Sesion.__table__, ConfiguracionChatbot.__table__,
+                                                     TareaChatbot.__table__])
+            engine.dispose()
+
+            ahora = datetime.utcnow()
+            hace_una_hora = ahora - timedelta(hours=1)
+            session = get_session(ruta)
+            session.add(ConfiguracionChatbot(clave='sesion_timeout', valor='10', tipo='integer'))
+            # Una sesión activa por mesa (índice único parcial ux_chatbot_sesiones_mesa_activa)
+            session.add_all(Sesion(mesa=f'v{i}', fecha_inicio=hace_una_hora, fecha_ultimo_acceso=hace_una_hora)
+                            for i in range(vencidas))
+            session.add_all(Sesion(mesa=f'a{i}', fecha_inicio=hace_una_hora,
+                                   fecha_ultimo_acceso=ahora - timedelta(minutes=2))
+                            for i in range(vigentes))
+            session.commit()
+            session.close()
+
+            def activas():
+                with sqlite3.connect(ruta) as conn:
+                    return conn.execute("SELECT COUNT(*) FROM chatbot_sesiones WHERE activa = 1").fetchone()[0]
+
+            with sqlite3.connect(ruta) as conn:
+                plan = " ".join(fila[-1] for fila in conn.execute(
+                    "EXPLAIN QUERY PLAN UPDATE chatbot_sesiones SET activa = 0 WHERE activa = 1 "
+                    "AND (fecha_ultimo_acceso < ? OR (fecha_ultimo_acceso IS NULL AND fecha_inicio < ?))",
+                    (ahora, ahora)))
+            self.log_resultado("expiracion_sesiones", "indice", "ix_chatbot_sesiones_activa_acceso" in plan, plan)
+
+            # 1. Barrido: cierra las vencidas salvo la que tiene un latido sin volcar
+            latidos = LatidosSesion(db_path=ruta, intervalo_s=3600)
+            latidos.registrar(1, ahora)
+            barrido = BarridoSesiones(db_path=ruta, latidos=latidos)
+            barrido.propietario = 'worker-a'
+            resultado = barrido.barrer(ahora)
+            print(f"   • {resultado['cerradas']} sesiones cerradas en {resultado['duracion_ms']} ms "
+                  f"(timeout {resultado['timeout_minutos']} min)")
+            self.log_resultado("expiracion_sesiones", "barrido",
+                               resultado['cerradas'] == vencidas - 1 and activas() == vigentes + 1,
+                               f"{resultado['cerradas']} cerradas, {activas()} siguen activas")
+
+            # 2. Turno: otro worker no barre mientras el turno está vigente; al vencer lo toma
+            otro = BarridoSesiones(db_path=ruta, latidos=None)
+            otro.propietario = 'worker-b'
+            sin_turno = otro.barrer(ahora + timedelta(seconds=10)) is None
+            renovado = barrido.barrer(ahora + timedelta(seconds=60)) is not None
+            tomado = otro.barrer(ahora + timedelta(seconds=60 + DURACION_TURNO_S + 1)) is not None
+            self.log_resultado("expiracion_sesiones", "turno_entre_workers", sin_turno and renovado and tomado,
+                               "un solo worker barre; el turno se renueva y se transfiere al vencer")
+
+            # 3. El timeout se lee en cada pasada y el resultado queda en chatbot_tareas
+            session = get_session(ruta)
+            session.query(ConfiguracionChatbot).filter_by(clave='sesion_timeout').update({'valor': '1'})
+            session.commit()
+            session.close()
+            resultado = otro.barrer(ahora + timedelta(seconds=70 + DURACION_TURNO_S))
+            with get_engine(ruta).connect() as conexion:
+                tarea = estado_tarea(conexion)
+            self.log_resultado("expiracion_sesiones", "timeout_configurado",
+                               resultado['timeout_minutos'] == 1 and activas() == 0
+                               and tarea['ultimo_resultado'] == vigentes + 1 and tarea['total'] == vencidas + vigentes
+                               and tarea['propietario'] == 'worker-b',
+                               f"timeout 1 min: {resultado['cerradas']} cerradas, total registrado {tarea['total']}")
+
+        except Exception as e:
+            self.log_resultado("expiracion_sesiones", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def verificar_notificaciones_stream(self):
+        """
+        🔔 NOTIFICACIONES AL MESERO EN VIVO (SSE)
+        Sobre una base temporal: una llamada confirmada llega al suscriptor en menos
+        de 100 ms, la atención también, un rollback no publica nada, Last-Event-ID
+        reanuda sin instantánea y el cupo de suscriptores se respeta.
+        """
+        print("\n" + "="*50)
+        print("🔔 NOTIFICACIONES AL MESERO EN VIVO (SSE)")
+        print("="*50)
+
+        import shutil
+        import tempfile
+        import threading
+        import time
+        import queue
+
+        directorio = tempfile.mkdtemp(prefix="notificaciones_stream_")
+        try:
+            from sqlalchemy import create_engine
+            from modulos.backend.menu.database.base import Base
+            from modulos.backend.chatbot.models import Sesion, NotificacionMesero
+            from modulos.backend.chatbot.notificaciones_stream import (
+                canal_notificaciones, flujo, CanalNotificaciones, LimiteSuscriptores
+            )
+            from modulos.backend.chatbot.despachador_notificaciones import listar_pendientes
+            from modulos.backend.menu.database.managers.db_manager import get_session
+
+            ruta = os.path.join(directorio, 'chatbot.db')
+            engine = create_engine(f"sqlite:///{ruta}")
+            Base.metadata.create_all(engine, tables=[Sesion.__table__, NotificacionMesero.__table__])
+            engine.dispose()
+
+            session = get_session(ruta)
+            session.add(Sesion(mesa='12', nombre_cliente='Lucía'))
+            session.commit()
+            session.close()
+
+            def instantanea():
+                db = get_session(ruta)
+                try:
+                    return listar_pendientes(db)
+                finally:
+                    db.close()
+
+            # Suscriptor en un hilo: cada bloque SSE recibido va a una cola con su hora
+            recibidos = queue.Queue()
+            detener = threading.Event()
+
+            def suscriptor(ultimo_id=None):
+                for bloque in flujo(canal_notificaciones, ultimo_id, instantanea, latido_s=0.05, duracion_s=5):
+                    recibidos.put((time.perf_counter(), bloque))
+                    if detener.is_set():
+                        break
+
+            def esperar_evento(tipo, timeout=2):
+                limite = time.perf_counter() + timeout
+                while time.perf_counter() < limite:
+                    try:
+                        hora, bloque = recibidos.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if f"event: {tipo}\n" in bloque:
+                        return hora, bloque
+                return None, None
+
+            hilo = threading.Thread(target=suscriptor, daemon=True)
+            hilo.start()
+            _, bloque = esperar_evento('pendientes')
+            self.log_resultado("notificaciones_stream", "instantanea_inicial", bloque is not None,
+                               "evento 'pendientes' al conectar")
+
+            # 1. Llamada al mesero: del commit al suscriptor
+            session = get_session(ruta)
+            session.add(NotificacionMesero(sesion_id=1, tipo_notificacion='llamar_mesero', mensaje='La cuenta',
+                                           prioridad='alta'))
+            inicio = time.perf_counter()
+            session.commit()
+            hora, bloque = esperar_evento('nueva')
+            latencia_ms = (hora - inicio) * 1000 if hora else float('inf')
+            print(f"   • Commit -> suscriptor: {latencia_ms:.2f} ms")
+            self.log_resultado("notificaciones_stream", "latencia_nueva",
+                               latencia_ms < 100 and '"mesa": "12"' in bloque,
+                               f"{latencia_ms:.2f} ms con mesa y cliente")
+            id_nueva = bloque.split("\n")[0][4:]
+
+            # 2. Rollback: no se publica; atención: evento 'atendida'
+            session.add(NotificacionMesero(sesion_id=1, tipo_notificacion='emergencia'))
+            session.flush()
+            session.rollback()
+            notificacion = session.query(NotificacionMesero).first()
+            notificacion.atendida = True
+            notificacion.atendida_por = 'Verificador'
+            session.commit()
+            session.close()
+            _, bloque = esperar_evento('atendida')
+            _, fantasma = esperar_evento('nueva', timeout=0.3)
+            self.log_resultado("notificaciones_stream", "atendida_sin_rollback",
+                               bloque is not None and '"Verificador"' in bloque and fantasma is None,
+                               "atención publicada, cambio revertido no publicado")
+
+            # 3. Latido mientras no hay cambios
+            _, latido = None, None
+            limite = time.perf_counter() + 1
+            while time.perf_counter() < limite and latido is None:
+                try:
+                    _, candidato = recibidos.get(timeout=0.1)
+                    latido = candidato if candidato.startswith(": latido") else None
+                except queue.Empty:
+                    pass
+            self.log_resultado("notificaciones_stream", "latido", latido is not None, "comentario ': latido'")
+            detener.set()
+
+            # 4. Reanudación con Last-Event-ID: solo lo posterior, sin instantánea
+            reanudado = flujo(canal_notificaciones, id_nueva, instantanea, latido_s=0.05, duracion_s=0.2)
+            bloques = [b for b in reanudado if b.startswith("id:")]
+            otro_proceso = flujo(canal_notificaciones, "otraepoca-3", instantanea, latido_s=0.05, duracion_s=0.1)
+            primero = next(b for b in otro_proceso if b.startswith("id:"))
+            self.log_resultado("notificaciones_stream", "last_event_id",
+                               len(bloques) == 1 and "event: atendida" in bloques[0] and "event: pendientes" in primero,
+                               "reanuda con lo que faltó; id de otro proceso recibe instantánea")
+
+            # 5. Cupo de suscriptores por worker
+            canal = CanalNotificaciones(maximo_suscriptores=2)
+            canal.suscribir()
+            canal.suscribir()
+            try:
+                canal.suscribir()
+                rechazado = False
+            except LimiteSuscriptores:
+                rechazado = True
+            canal.desuscribir()
+            canal.suscribir()
+            self.log_resultado("notificaciones_stream", "cupo_suscriptores", rechazado,
+                               "el tercer suscriptor se rechaza y el cupo se libera al cerrar")
+
+            # 6. Con el cupo de streams lleno, el worker (gunicorn gthread) sigue atendiendo
+            import socket
+            import subprocess
+            import requests as http
+            with socket.socket() as libre:
+                libre.bind(('127.0.0.1', 0))
+                puerto = libre.getsockname()[1]
+            with open(os.path.join(directorio, 'app_hilos.py'), 'w', encoding='utf-8') as archivo:
+                archivo.write(
+                    "from flask import Flask, request\n"
+                    "from modulos.backend.chatbot.notificaciones_stream import canal_notificaciones, responder_stream\n"
+                    "app = Flask(__name__)\n"
+                    "@app.route('/stream')\n"
+                    "def stream():\n"
+                    "    return responder_stream(canal_notificaciones, request.args.get('ultimo_id'), lambda: [])\n"
+                    "@app.route('/ping')\n"
+                    "def ping():\n"
+                    "    return 'ok'\n"
+                )
+            hilos = 10
+            entorno = dict(os.environ, GUNICORN_THREADS=str(hilos), BUS_EVENTOS='memoria',
+                           PYTHONPATH=os.pathsep.join([os.getcwd(), directorio]))
+            servidor = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{puerto}', '--worker-class', 'gthread',
+                 '--threads', str(hilos), '--graceful-timeout', '1', '--chdir', directorio, 'app_hilos:app'],
+                env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            abiertos = []
+            try:
+                base = f'http://127.0.0.1:{puerto}'
+                limite = time.perf_counter() + 15
+                while True:
+                    try:
+                        http.get(f'{base}/ping', timeout=1)
+                        break
+                    except http.exceptions.ConnectionError:
+                        if time.perf_counter() > limite:
+                            raise
+                        time.sleep(0.2)
+                cupo = hilos - 8
+                for _ in range(cupo):
+                    stream = http.get(f'{base}/stream', stream=True, timeout=5)
+                    next(stream.iter_content(chunk_size=None))
+                    abiertos.append(stream)
+                rechazado = http.get(f'{base}/stream', timeout=5).status_code
+                inicio = time.perf_counter()
+                ping = http.get(f'{base}/ping', timeout=5)
+                ms = (time.perf_counter() - inicio) * 1000
+                self.log_resultado("notificaciones_stream", "hilos_libres_con_cupo_lleno",
+                                   rechazado == 503 and ping.status_code == 200,
+                                   f"--threads {hilos}: {cupo} streams abiertos, el siguiente -> {rechazado}, "
+                                   f"petición normal {ping.status_code} en {ms:.0f} ms")
+            finally:
+                for stream in abiertos:
+                    stream.close()
+                servidor.terminate()
+                try:
+                    servidor.wait(10)
+                except subprocess.TimeoutExpired:
+                    servidor.kill()
+
+        except Exception as e:
+            self.log_resultado("notificaciones_stream", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def verificar_bus_eventos(self):
+        """
+        📡 BUS DE EVENTOS ENTRE WORKERS
+        Otro proceso publica sobre el mismo archivo del bus: los eventos llegan a este
+        en decenas de ms, en orden y sin eco de lo propio; un rollback no publica.
+        """
+        print("\n" + "="*50)
+        print("📡 BUS DE EVENTOS ENTRE WORKERS")
+        print("="*50)
+
+        import shutil
+        import subprocess
+        import tempfile
+        import threading
+        import time
+
+        directorio = tempfile.mkdtemp(prefix="bus_eventos_")
+        bus = None
+        try:
+            from modulos.backend.menu.database.managers.bus_eventos import (
+                BusSQLite, BusMemoria, bus_eventos, publicar_al_confirmar
+            )
+            from sqlalchemy import text
+            from modulos.backend.menu.database.managers.db_manager import get_session
+
+            ruta = os.path.join(directorio, 'bus.db')
+            bus = BusSQLite(db_path=ruta)
+            bus.iniciar()
+            recibidos = []
+            completo = threading.Event()
+            total = 50
+
+            def al_recibir(tema, datos):
+                recibidos.append((time.time(), tema, datos))
+                if len(recibidos) >= total:
+                    completo.set()
+
+            for tema in ('catalogo', 'notificaciones'):
+                bus.suscribir(tema, al_recibir)
+
+            # 1. Eventos propios: entrega local inmediata y sin eco desde la tabla
+            bus.publicar('catalogo', {'n': -1, 't': time.time()})
+            time.sleep(0.2)
+            propios = len(recibidos)
+            recibidos.clear()
+            self.log_resultado("bus_eventos", "sin_eco", propios == 1,
+                               f"{propios} entrega(s) del evento propio")
+
+            # 2. Otro proceso publica cada 10 ms sobre el mismo archivo
+            publicador = (
+                "import sys, time\n"
+                "sys.path.insert(0, sys.argv[1])\n"
+                "from modulos.backend.menu.database.managers.bus_eventos import BusSQLite\n"
+                "bus = BusSQLite(db_path=sys.argv[2])\n"
+                f"for n in range({total}):\n"
+                "    bus.publicar('catalogo' if n % 2 else 'notificaciones', {'n': n, 't': time.time()})\n"
+                "    time.sleep(0.01)\n"
+                "bus.detener()\n"
+            )
+            proceso = subprocess.run(
+                [sys.executable, "-c", publicador, os.getcwd(), ruta],
+                capture_output=True, text=True, timeout=60
+            )
+            completo.wait(5)
+            latencias = sorted((hora - datos['t']) * 1000 for hora, _, datos in recibidos)
+            orden = [datos['n'] for _, _, datos in recibidos]
+            if latencias:
+                p50 = latencias[len(latencias) // 2]
+                p95 = latencias[int(len(latencias) * 0.95) - 1]
+                print(f"   • {len(latencias)} eventos remotos: p50 {p50:.1f} ms, p95 {p95:.1f} ms, máx {latencias[-1]:.1f} ms")
+            else:
+                p95 = float('inf')
+                print(f"   • Sin eventos remotos (salida del publicador: {proceso.stderr[-300:]})")
+            self.log_resultado("bus_eventos", "entrega_entre_procesos",
+                               proceso.returncode == 0 and orden == list(range(total)),
+                               f"{len(orden)}/{total} eventos, en orden")
+            self.log_resultado("bus_eventos", "latencia_remota", p95 < 100,
+                               f"p95 {p95:.1f} ms (< 100 ms)")
+
+            # 3. Backend en memoria: solo el proceso, mismo contrato
+            memoria = BusMemoria()
+            vistos = []
+            memoria.suscribir('fondos', lambda tema, datos: vistos.append(datos))
+            memoria.publicar('fondos', {'fondo_id': 1})
+            try:
+                memoria.publicar('desconocido', {})
+                tema_invalido = False
+            except ValueError:
+                tema_invalido = True
+            self.log_resultado("bus_eventos", "backend_memoria", vistos == [{'fondo_id': 1}] and tema_invalido,
+                               "entrega local y rechazo de temas desconocidos")
+
+            # 4. Publicación desde el ORM: solo tras el commit
+            session = get_session(os.path.join(directorio, 'orm.db'))
+            configuraciones = []
+            escuchar = lambda tema, datos: configuraciones.append(datos)
+            bus_eventos.suscribir('configuracion', escuchar)
+            session.execute(text("SELECT 1"))
+            publicar_al_confirmar(session, 'configuracion', {'clave': 'revertida'})
+            session.rollback()
+            session.execute(text("SELECT 1"))
+            publicar_al_confirmar(session, 'configuracion', {'clave': 'confirmada'})
+            session.commit()
+            session.close()
+            bus_eventos._suscriptores['configuracion'].remove(escuchar)
+            self.log_resultado("bus_eventos", "orm_commit_rollback",
+                               [datos['clave'] for datos in configuraciones] == ['confirmada'],
+                               "se publica lo confirmado y no lo revertido")
+
+            suscritos = bus_eventos.info()['suscriptores']
+            self.log_resultado("bus_eventos", "suscriptores_sistema",
+                               suscritos.get('catalogo', 0) >= 1,
+                               f"temas con suscriptores: {suscritos}")
+
+        except Exception as e:
+            self.log_resultado("bus_eventos", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            if bus is not None:
+                bus.detener()
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def verificar_despachador_notificaciones(self):
+        """
+        🛎️ DESPACHADOR DE LLAMADAS AL MESERO
+        Orden numérico con envejecimiento, asignación sin duplicados entre workers,
+        p50/p95 del tiempo hasta la atención, reconstrucción desde la base y tras un
+        hueco en el bus de eventos.
+        """
+        print("\n" + "="*50)
+        print("🛎️ DESPACHADOR DE LLAMADAS AL MESERO")
+        print("="*50)
+
+        import shutil
+        import tempfile
+        import time
+        from datetime import datetime, timedelta
+
+        directorio = tempfile.mkdtemp(prefix="despachador_")
+        despachador = None
+        try:
+            from sqlalchemy import create_engine
+            from modulos.backend.menu.database.base import Base
+            from modulos.backend.menu.database.managers.bus_eventos import bus_eventos
+            from modulos.backend.menu.database.managers.db_manager import get_session
+            from modulos.backend.chatbot.models import Sesion, NotificacionMesero
+            from modulos.backend.chatbot.despachador_notificaciones import (
+                DespachadorNotificaciones, listar_pendientes
+            )
+
+            ruta = os.path.join(directorio, 'chatbot.db')
+            engine = create_engine(f"sqlite:///{ruta}")
+            Base.metadata.create_all(engine, tables=[Sesion.__table__, NotificacionMesero.__table__])
+            engine.dispose()
+
+            ahora = datetime.utcnow()
+            session = get_session(ruta)
+            session.add(Sesion(mesa='7', nombre_cliente='Verificador'))
+            session.flush()
+            llamadas = {
+                'A': ('normal', 1), 'B': ('alta', 1), 'C': ('urgente', 0),
+                'D': ('baja', 30), 'E': ('normal', 12)
+            }
+            for nombre, (prioridad, minutos) in llamadas.items():
+                session.add(NotificacionMesero(
+                    sesion_id=1, tipo_notificacion='llamar_mesero', mensaje=nombre, prioridad=prioridad,
+                    fecha_notificacion=ahora - timedelta(minutes=minutos)
+                ))
+            session.commit()
+
+            # Otro "worker" que ya cargó la cola y no recibe los eventos del bus
+            otro_worker = DespachadorNotificaciones(db_path=ruta)
+            otro_worker.reconstruir()
+            despachador = DespachadorNotificaciones(db_path=ruta)
+            bus_eventos.suscribir('notificaciones', despachador.al_cambiar)
+
+            # 1. Orden numérico con envejecimiento (5 min por nivel)
+            pendientes = despachador.listar(ahora)
+            orden = ''.join(n['mensaje'] for n in pendientes)
+            efectiva_d = pendientes[0]['prioridad_efectiva']
+            self.log_resultado("despachador", "orden_envejecido", orden == 'DECBA' and efectiva_d == 'urgente',
+                               f"orden {orden} (esperado DECBA); baja tras 30 min -> {efectiva_d}")
+
+            # 2. Asignación: la más prioritaria sin asignar; nunca la misma a dos meseros
+            primera = despachador.asignar('Ana', ahora)
+            segunda = despachador.asignar('Luis', ahora)
+            tercera = otro_worker.asignar('Pedro', ahora)
+            info = despachador.info(ahora)
+            asignadas = [n['mensaje'] if n else None for n in (primera, segunda, tercera)]
+            self.log_resultado("despachador", "asignacion", asignadas == ['D', 'E', 'C']
+                               and info['sin_asignar'] == 2 and info['pendientes'] == 5,
+                               f"asignadas {asignadas}; el otro worker saltó las ya tomadas")
+
+            # 3. Atención: muestras de tiempo hasta la atención
+            esperas = {'D': 120, 'E': 60, 'C': 30}
+            for notificacion in session.query(NotificacionMesero).filter(
+                    NotificacionMesero.mensaje.in_(list(esperas))).all():
+                notificacion.atendida = True
+                notificacion.atendida_por = notificacion.asignada_a
+                notificacion.fecha_atencion = notificacion.fecha_notificacion + timedelta(
+                    seconds=esperas[notificacion.mensaje])
+            session.commit()
+            info = despachador.info(ahora)
+            tiempos = info['tiempo_atencion']
+            print(f"   • Tiempo hasta la atención: p50 {tiempos['p50_segundos']} s, p95 {tiempos['p95_segundos']} s")
+            self.log_resultado("despachador", "tiempo_atencion",
+                               info['pendientes'] == 2 and tiempos['p50_segundos'] == 60 and tiempos['p95_segundos'] == 120,
+                               f"{tiempos['muestras']} muestras, pendientes {info['pendientes']}")
+
+            # 4. Reconstrucción desde la base (arranque de un worker)
+            nuevo = DespachadorNotificaciones(db_path=ruta)
+            info_nuevo = nuevo.info(ahora)
+            self.log_resultado("despachador", "reconstruccion",
+                               info_nuevo['pendientes'] == 2 and info_nuevo['sin_asignar'] == 2
+                               and info_nuevo['tiempo_atencion'] == tiempos,
+                               "misma cola y mismos percentiles que el proceso en marcha")
+
+            # 5. Consultas del panel: heap en memoria vs JOIN en SQL
+            for indice in range(2000):
+                session.add(NotificacionMesero(
+                    sesion_id=1, tipo_notificacion='llamar_mesero', mensaje=f'carga {indice}',
+                    prioridad=('baja', 'normal', 'alta', 'urgente')[indice % 4],
+                    fecha_notificacion=ahora - timedelta(seconds=indice)
+                ))
+            session.commit()
+            session.close()
+
+            def medir(funcion, repeticiones=20):
+                inicio = time.perf_counter()
+                for _ in range(repeticiones):
+                    resultado = funcion()
+                return (time.perf_counter() - inicio) * 1000 / repeticiones, resultado
+
+            ms_heap, desde_heap = medir(lambda: despachador.listar())
+            consulta = get_session(ruta)
+            ms_sql, desde_sql = medir(lambda: listar_pendientes(consulta))
+            consulta.close()
+            print(f"   • {len(desde_heap)} pendientes: despachador {ms_heap:.2f} ms vs JOIN {ms_sql:.2f} ms")
+            self.log_resultado("despachador", "consulta_desde_memoria",
+                               [n['id'] for n in desde_heap] == [n['id'] for n in desde_sql] and ms_heap < ms_sql,
+                               f"mismo orden que la base, {ms_heap:.2f} ms vs {ms_sql:.2f} ms")
+
+            # 6. Evento perdido: escrita sin pasar por el ORM (sin evento) no aparece hasta que
+            #    el bus detecta un hueco en los ids y el despachador reconstruye
+            from modulos.backend.menu.database.managers.bus_eventos import BusSQLite
+            conexion = sqlite3.connect(ruta)
+            conexion.execute(
+                "INSERT INTO chatbot_notificaciones (sesion_id, tipo_notificacion, mensaje, prioridad, "
+                "fecha_notificacion, atendida) VALUES (1, 'llamar_mesero', 'sin evento', 'urgente', ?, 0)",
+                (ahora.isoformat(sep=' '),)
+            )
+            conexion.commit()
+            conexion.close()
+            antes = any(n['mensaje'] == 'sin evento' for n in despachador.listar(ahora))
+
+            bus = BusSQLite(db_path=os.path.join(directorio, 'bus.db'))
+            bus.al_perder_eventos(despachador.invalidar)
+            conexion = sqlite3.connect(bus.db_path)
+            conexion.execute(
+                "CREATE TABLE bus_eventos (id INTEGER PRIMARY KEY AUTOINCREMENT, tema TEXT NOT NULL, "
+                "origen TEXT NOT NULL, datos TEXT NOT NULL, fecha REAL NOT NULL)"
+            )
+            # Tres eventos de otro worker; la limpieza ya borró los dos primeros
+            for _ in range(3):
+                conexion.execute("INSERT INTO bus_eventos (tema, origen, datos, fecha) "
+                                 "VALUES ('catalogo', 'otro:1', '{}', ?)", (time.time(),))
+            conexion.execute("DELETE FROM bus_eventos WHERE id < 3")
+            conexion.commit()
+            bus._cursor = 0
+            bus._leer(conexion.cursor())
+            conexion.close()
+            despues = any(n['mensaje'] == 'sin evento' for n in despachador.listar(ahora))
+            huecos = bus.info()['huecos']
+            self.log_resultado("despachador", "hueco_en_bus", not antes and despues and huecos == 1,
+                               f"antes del aviso visible: {antes}; después: {despues}; huecos {huecos}")
+
+        except Exception as e:
+            self.log_resultado("despachador", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            if despachador is not None and despachador.al_cambiar in bus_eventos._suscriptores['notificaciones']:
+                bus_eventos._suscriptores['notificaciones'].remove(despachador.al_cambiar)
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def verificar_idempotencia(self):
+        """
+        🔁 REINTENTOS IDEMPOTENTES
+        Idempotency-Key (repetición, conflicto, peticiones concurrentes, 5xx no guardadas),
+        cachés acotadas y ventana de llamadas al mesero cerrada por el bus.
+        """
+        print("\n" + "="*50)
+        print("🔁 REINTENTOS IDEMPOTENTES")
+        print("="*50)
+
+        import threading
+        import time
+
+        try:
+            from flask import Flask, jsonify
+            from modulos.backend.chatbot.idempotencia import CacheTTL, Idempotencia, idempotente, idempotencia
+
+            ejecuciones = {'calificar': 0, 'fallar': 0}
+            app = Flask(__name__)
+
+            @app.route('/calificar', methods=['POST'])
+            @idempotente
+            def calificar():
+                ejecuciones['calificar'] += 1
+                time.sleep(0.05)
+                return jsonify({'success': True, 'ejecucion': ejecuciones['calificar']}), 201
+
+            @app.route('/fallar', methods=['POST'])
+            @idempotente
+            def fallar():
+                ejecuciones['fallar'] += 1
+                return jsonify({'success': False, 'error': 'caída'}), 500
+
+            cliente = app.test_client()
+            clave = f"verificador-{time.time()}"
+
+            # 1. Repetición con la misma clave: una sola ejecución, misma respuesta
+            primera = cliente.post('/calificar', json={'estrellas': 5}, headers={'Idempotency-Key': clave})
+            segunda = cliente.post('/calificar', json={'estrellas': 5}, headers={'Idempotency-Key': clave})
+            self.log_resultado("idempotencia", "repeticion",
+                               ejecuciones['calificar'] == 1 and segunda.status_code == 201
+                               and segunda.get_json() == primera.get_json()
+                               and segunda.headers.get('Idempotent-Replayed') == 'true',
+                               f"{ejecuciones['calificar']} ejecución, estado repetido {segunda.status_code}")
+
+            # 2. Misma clave con otro cuerpo: 422; clave inválida: 400
+            conflicto = cliente.post('/calificar', json={'estrellas': 1}, headers={'Idempotency-Key': clave})
+            invalida = cliente.post('/calificar', json={'estrellas': 1}, headers={'Idempotency-Key': 'x' * 500})
+            self.log_resultado("idempotencia", "validacion",
+                               conflicto.status_code == 422 and invalida.status_code == 400
+                               and ejecuciones['calificar'] == 1,
+                               f"otro cuerpo -> {conflicto.status_code}, clave de 500 caracteres -> {invalida.status_code}")
+
+            # 3. Reintentos concurrentes (la original sigue en curso): una sola ejecución
+            clave_concurrente = f"{clave}-concurrente"
+            estados = []
+
+            def enviar():
+                with app.test_client() as propio:
+                    respuesta = propio.post('/calificar', json={'estrellas': 4},
+                                            headers={'Idempotency-Key': clave_concurrente})
+                    estados.append((respuesta.status_code, respuesta.get_json()['ejecucion']))
+
+            hilos = [threading.Thread(target=enviar) for _ in range(8)]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+            self.log_resultado("idempotencia", "concurrentes",
+                               ejecuciones['calificar'] == 2 and len(set(estados)) == 1 and estados[0][0] == 201,
+                               f"8 peticiones simultáneas -> {ejecuciones['calificar'] - 1} ejecución")
+
+            # 4. Las 5xx no se guardan: el reintento vuelve a ejecutar la vista
+            for _ in range(2):
+                cliente.post('/fallar', json={}, headers={'Idempotency-Key': clave})
+            self.log_resultado("idempotencia", "errores_no_guardados", ejecuciones['fallar'] == 2,
+                               f"{ejecuciones['fallar']} ejecuciones tras dos 500 con la misma clave")
+
+            # 5. Caché acotada: vencimiento y descarte de las más antiguas
+            cache = CacheTTL(ttl_s=10, maximo=3)
+            for indice in range(5):
+                cache.guardar(indice, indice, ahora=100 + indice)
+            vencida = cache.obtener(4, ahora=120)
+            self.log_resultado("idempotencia", "cache_acotada",
+                               len(cache) == 2 and cache.desalojadas == 2 and vencida is None and cache.expiradas == 1,
+                               f"máximo 3 -> {cache.desalojadas} desalojadas; vencida tras TTL: {vencida}")
+
+            # 6. Ventana de llamadas al mesero: repetición dentro de la ventana, cerrada al atender
+            ventana = Idempotencia(ventana_s=60)
+            ventana.registrar_llamada(7, 'llamar_mesero', {'notificacion_id': 1})
+            repetida = ventana.llamada_reciente('7', 'llamar_mesero')
+            otro_tipo = ventana.llamada_reciente(7, 'pedir_cuenta')
+            ventana.al_cambiar_notificacion('notificaciones', {
+                'tipo': 'actualizada',
+                'notificacion': {'sesion_id': 7, 'tipo': 'llamar_mesero', 'atendida': True}
+            })
+            tras_atender = ventana.llamada_reciente(7, 'llamar_mesero')
+            self.log_resultado("idempotencia", "ventana_llamadas",
+                               repetida == {'notificacion_id': 1} and otro_tipo is None and tras_atender is None,
+                               "repetición detectada, otro tipo independiente, ventana cerrada al atender")
+
+            # 7. Toques simultáneos de "llamar mesero" por el endpoint real: una sola fila
+            import shutil
+            import tempfile
+            from sqlalchemy import create_engine
+            from modulos.backend.menu.database.base import Base
+            from modulos.backend.menu.database.managers.db_manager import get_engine, get_session, get_session_escritura
+            from modulos.backend.chatbot import api_endpoints
+            from modulos.backend.chatbot.models import Sesion, NotificacionMesero, Analytics
+            from modulos.backend.chatbot.analytics_sink import SumideroAnalytics
+
+            directorio = tempfile.mkdtemp(prefix="idempotencia_")
+            ruta = os.path.join(directorio, 'chatbot.db')
+            engine = create_engine(f"sqlite:///{ruta}")
+            Base.metadata.create_all(engine, tables=[Sesion.__table__, NotificacionMesero.__table__, Analytics.__table__])
+            engine.dispose()
+            rondas = 10
+            session = get_session(ruta)
+            session.add_all(Sesion(mesa=str(mesa), nombre_cliente='Verificador') for mesa in range(rondas))
+            session.commit()
+            sesiones = [fila.id for fila in session.query(Sesion.id).all()]
+            session.close()
+
+            sumidero = SumideroAnalytics(db_path=ruta)
+            originales = (api_endpoints.get_db_session_escritura, api_endpoints.sumidero_analytics)
+            api_endpoints.get_db_session_escritura = lambda: get_session_escritura(ruta)
+            api_endpoints.sumidero_analytics = sumidero
+            try:
+                app_api = Flask(__name__)
+                app_api.register_blueprint(api_endpoints.chatbot_api_bp)
+                toques = 8
+                respuestas = []
+
+                def tocar(sesion_id, barrera):
+                    with app_api.test_client() as propio:
+                        barrera.wait()
+                        respuesta = propio.post('/api/chatbot/notificacion/mesero', json={
+                            'sesion_id': sesion_id, 'tipo': 'llamar_mesero', 'mensaje': 'Ayuda'
+                        })
+                        respuestas.append((sesion_id, respuesta.status_code, respuesta.get_json().get('notificacion_id'),
+                                           respuesta.headers.get('X-Llamada-Repetida')))
+
+                # Una ronda de toques simultáneos por sesión (la carrera no sale en todas)
+                for sesion_id in sesiones:
+                    barrera = threading.Barrier(toques)
+                    hilos = [threading.Thread(target=tocar, args=(sesion_id, barrera)) for _ in range(toques)]
+                    for hilo in hilos:
+                        hilo.start()
+                    for hilo in hilos:
+                        hilo.join()
+                with sqlite3.connect(ruta) as conn:
+                    filas = dict(conn.execute(
+                        "SELECT sesion_id, COUNT(*) FROM chatbot_notificaciones GROUP BY sesion_id").fetchall())
+                ids = {sesion_id: {r[2] for r in respuestas if r[0] == sesion_id} for sesion_id in sesiones}
+                repetidas = sum(1 for r in respuestas if r[3] == 'true')
+                duplicadas = sum(total - 1 for total in filas.values())
+                self.log_resultado("idempotencia", "llamadas_concurrentes",
+                                   all(filas.get(s) == 1 and len(ids[s]) == 1 for s in sesiones)
+                                   and repetidas == rondas * (toques - 1)
+                                   and {r[1] for r in respuestas} == {200},
+                                   f"{rondas} rondas de {toques} toques simultáneos -> {duplicadas} filas duplicadas, "
+                                   f"{repetidas} marcadas como repetidas")
+            finally:
+                api_endpoints.get_db_session_escritura, api_endpoints.sumidero_analytics = originales
+                for sesion_id in sesiones:
+                    idempotencia.llamadas.descartar((str(sesion_id), 'llamar_mesero'))
+                sumidero.detener()
+                get_engine(ruta).dispose()
+                get_session_escritura(ruta).get_bind().dispose()
+                shutil.rmtree(directorio, ignore_errors=True)
+
+            print(f"   • Contadores del proceso: {idempotencia.info()}")
+
+        except Exception as e:
+            self.log_resultado("idempotencia", "ejecucion", False, f"Error: {str(e)}")
+
+    def verificar_sesion_activa_unica(self, concurrentes=50):
+        """
+        🪑 UNA SESIÓN ACTIVA POR MESA
+        Inicios simultáneos de sesión para la misma mesa (varios teléfonos escaneando el QR):
+        una sola fila activa, un único id para todos y una sola sentencia por inicio.
+        """
+        print("\n" + "="*50)
+        print("🪑 UNA SESIÓN ACTIVA POR MESA")
+        print("="*50)
+
+        import shutil
+        import tempfile
+        import threading
+
+        directorio = tempfile.mkdtemp(prefix="sesion_activa_")
+        sumidero = None
+        try:
+            from flask import Flask
+            from sqlalchemy import create_engine, event
+            from modulos.backend.menu.database.base import Base
+            from modulos.backend.menu.database.managers.db_manager import get_engine, get_session
+            from modulos.backend.menu.database.migrations import m0014_sesion_activa_unica
+            from modulos.backend.chatbot import api_endpoints
+            from modulos.backend.chatbot.models import Sesion, Analytics
+            from modulos.backend.chatbot.analytics_sink import SumideroAnalytics
+
+            # 1. La migración cierra los duplicados que ya existían y crea el índice parcial
+            ruta_vieja = os.path.join(directorio, 'previa.db')
+            with sqlite3.connect(ruta_vieja) as conn:
+                conn.execute("CREATE TABLE chatbot_sesiones (id INTEGER PRIMARY KEY, mesa VARCHAR(20), activa BOOLEAN)")
+                conn.executemany("INSERT INTO chatbot_sesiones (mesa, activa) VALUES (?, ?)",
+                                 [('1', 1), ('1', 1), ('1', 1), ('2', 1), ('2', 0)])
+                m0014_sesion_activa_unica.aplicar(conn)
+                activas = conn.execute("SELECT mesa, id FROM chatbot_sesiones WHERE activa = 1 ORDER BY mesa").fetchall()
+                try:
+                    conn.execute("INSERT INTO chatbot_sesiones (mesa, activa) VALUES ('1', 1)")
+                    rechaza = False
+                except sqlite3.IntegrityError:
+                    rechaza = True
+            self.log_resultado("sesion_activa_unica", "migracion", activas == [('1', 3), ('2', 4)] and rechaza,
+                               f"activas tras migrar {activas}; segunda activa rechazada: {rechaza}")
+
+            # 2. Inicios simultáneos a través del endpoint real
+            ruta = os.path.join(directorio, 'chatbot.db')
+            engine = create_engine(f"sqlite:///{ruta}")
+            Base.metadata.create_all(engine, tables=[Sesion.__table__, Analytics.__table__])
+            engine.dispose()
+
+            sentencias = []
+            event.listen(get_engine(ruta), 'before_cursor_execute',
+                         lambda conn, cursor, sql, *args: sentencias.append(sql))
+            sumidero = SumideroAnalytics(db_path=ruta)
+            originales = (api_endpoints.get_db_session, api_endpoints.sumidero_analytics)
+            api_endpoints.get_db_session = lambda: get_session(ruta)
+            api_endpoints.sumidero_analytics = sumidero
+            try:
+                app = Flask(__name__)
+                app.register_blueprint(api_endpoints.chatbot_api_bp)
+                barrera = threading.Barrier(concurrentes)
+                respuestas = []
+
+                def iniciar(numero):
+                    with app.test_client() as cliente:
+                        barrera.wait()
+                        respuesta = cliente.post('/api/chatbot/sesion/iniciar', json={
+                            'mesa': '12', 'nombre_cliente': 'Ana' if numero == 0 else ''
+                        })
+                        respuestas.append((respuesta.status_code, respuesta.get_json().get('sesion_id')))
+
+                hilos = [threading.Thread(target=iniciar, args=(n,)) for n in range(concurrentes)]
+                for hilo in hilos:
+                    hilo.start()
+                for hilo in hilos:
+                    hilo.join()
+
+                with sqlite3.connect(ruta) as conn:
+                    filas = conn.execute(
+                        "SELECT id, nombre_cliente FROM chatbot_sesiones WHERE mesa = '12' AND activa = 1").fetchall()
+                ids = {sesion_id for _, sesion_id in respuestas}
+                estados = {estado for estado, _ in respuestas}
+                print(f"   • {concurrentes} inicios simultáneos: estados {sorted(estados)}, ids {sorted(ids)}, filas activas {len(filas)}")
+                self.log_resultado("sesion_activa_unica", "inicios_concurrentes",
+                                   estados == {200} and len(ids) == 1 and len(filas) == 1 and filas[0][1] == 'Ana',
+                                   f"{len(respuestas)} respuestas, {len(ids)} id, {len(filas)} fila activa; "
+                                   "los nombres vacíos no borran el de la sesión")
+
+                # 3. Un único viaje a la base por inicio
+                sentencias.clear()
+                with app.test_client() as cliente:
+                    otra = cliente.post('/api/chatbot/sesion/iniciar', json={'mesa': '12'}).get_json()
+                consultas = [sql for sql in sentencias if sql.lstrip().upper().startswith(('SELECT', 'INSERT', 'UPDATE'))]
+                self.log_resultado("sesion_activa_unica", "una_sentencia",
+                                   len(consultas) == 1 and 'ON CONFLICT' in consultas[0] and 'RETURNING' in consultas[0]
+                                   and otra['sesion_id'] in ids,
+                                   f"{len(consultas)} sentencia(s) por inicio: INSERT ... ON CONFLICT DO UPDATE ... RETURNING")
+
+                # 4. Cerrada la sesión, la mesa vuelve a abrir una nueva
+                with sqlite3.connect(ruta) as conn:
+                    conn.execute("UPDATE chatbot_sesiones SET activa = 0 WHERE mesa = '12'")
+                with app.test_client() as cliente:
+                    nueva = cliente.post('/api/chatbot/sesion/iniciar', json={'mesa': '12'}).get_json()
+                with sqlite3.connect(ruta) as conn:
+                    total = conn.execute("SELECT COUNT(*), SUM(activa) FROM chatbot_sesiones WHERE mesa = '12'").fetchone()
+                self.log_resultado("sesion_activa_unica", "nueva_tras_cierre",
+                                   nueva['sesion_id'] not in ids and total == (2, 1),
+                                   f"sesión {nueva['sesion_id']} nueva; {total[0]} filas, {total[1]} activa")
+            finally:
+                api_endpoints.get_db_session, api_endpoints.sumidero_analytics = originales
+                sumidero.detener()
+                get_engine(ruta).dispose()
+
+        except Exception as e:
+            self.log_resultado("sesion_activa_unica", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    def verificar_servicio_configuracion(self, lecturas=100000):
+        """
+        ⚙️ SERVICIO DE CONFIGURACIÓN
+        Valores tipados de las tres fuentes, costo de lectura, invalidación al escribir
+        (bus) y por cambios externos (data_version, mtime), y escritura atómica del JSON.
+        """
+        print("\n" + "="*50)
+        print("⚙️ SERVICIO DE CONFIGURACIÓN")
+        print("="*50)
+
+        import json
+        import shutil
+        import tempfile
+        import threading
+        import time
+
+        directorio = tempfile.mkdtemp(prefix="servicio_configuracion_")
+        servicio = None
+        try:
+            from sqlalchemy import create_engine
+            from modulos.backend.menu.database.base import Base
+            from modulos.backend.menu.database.managers.bus_eventos import bus_eventos
+            from modulos.backend.menu.database.managers.db_manager import get_engine, get_session
+            from modulos.backend.menu.database.managers.servicio_configuracion import ServicioConfiguracion
+            from modulos.backend.chatbot.models import ConfiguracionChatbot
+            from modulos.backend.chatbot import eventos_configuracion  # noqa: F401 - publica los cambios del ORM
+
+            menu_db = os.path.join(directorio, 'menu.db')
+            chatbot_db = os.path.join(directorio, 'chatbot.db')
+            config_menu = os.path.join(directorio, 'config_menu.json')
+            with sqlite3.connect(menu_db) as conn:
+                conn.execute("CREATE TABLE configuracion_sistema (id INTEGER PRIMARY KEY, clave TEXT UNIQUE NOT NULL, "
+                             "valor TEXT NOT NULL, descripcion TEXT, fecha_actualizacion TIMESTAMP)")
+                conn.execute("CREATE TABLE otra_tabla (id INTEGER PRIMARY KEY)")
+                conn.executemany("INSERT INTO configuracion_sistema (clave, valor) VALUES (?, ?)",
+                                 [('menu_activo', 'externo'), ('redirect_automatico', 'true'),
+                                  ('menu_externo_url', 'https://ejemplo.test/menu')])
+            engine = create_engine(f"sqlite:///{chatbot_db}")
+            Base.metadata.create_all(engine, tables=[ConfiguracionChatbot.__table__])
+            engine.dispose()
+            session = get_session(chatbot_db)
+            session.add_all([
+                ConfiguracionChatbot(clave='sesion_timeout', valor='15', tipo='integer'),
+                ConfiguracionChatbot(clave='notificaciones_habilitadas', valor='false', tipo='boolean'),
+                ConfiguracionChatbot(clave='horarios', valor='{"abre": 8}', tipo='json'),
+                ConfiguracionChatbot(clave='fondo_tipo', valor='color', tipo='string')
+            ])
+            session.commit()
+            with open(config_menu, 'w', encoding='utf-8') as archivo:
+                json.dump({'menu_activo': 'treinta'}, archivo)
+
+            # Intervalo largo: solo el bus puede invalidar durante la prueba de escritura
+            servicio = ServicioConfiguracion(menu_db=menu_db, chatbot_db=chatbot_db,
+                                             config_menu=config_menu, intervalo_s=3600)
+            bus_eventos.suscribir('configuracion', servicio.al_cambiar)
+            bus_eventos.suscribir('fondos', servicio.al_cambiar)
+
+            # 1. Valores tipados de las tres fuentes
+            tipados = (servicio.obtener('chatbot', 'sesion_timeout'), servicio.obtener('chatbot', 'notificaciones_habilitadas'),
+                       servicio.obtener('chatbot', 'horarios'), servicio.obtener('sistema', 'redirect_automatico'),
+                       servicio.obtener('menu', 'menu_activo'))
+            self.log_resultado("servicio_configuracion", "valores_tipados",
+                               tipados == (15, False, {'abre': 8}, True, 'treinta'),
+                               f"integer, boolean, json, booleano de sistema y JSON: {tipados}")
+
+            # 2. Costo de una lectura frente a la conexión sqlite3 por request de antes
+            inicio = time.perf_counter()
+            for _ in range(lecturas):
+                servicio.obtener('sistema', 'menu_activo')
+            us_cache = (time.perf_counter() - inicio) * 1e6 / lecturas
+            inicio = time.perf_counter()
+            for _ in range(200):
+                conn = sqlite3.connect(menu_db)
+                dict(conn.execute("SELECT clave, valor FROM configuracion_sistema").fetchall())
+                conn.close()
+            us_sqlite = (time.perf_counter() - inicio) * 1e6 / 200
+            print(f"   • Lectura: {us_cache:.2f} µs en memoria vs {us_sqlite:.0f} µs abriendo sqlite3")
+            self.log_resultado("servicio_configuracion", "lectura_microsegundos", us_cache < 10 and us_cache * 20 < us_sqlite,
+                               f"{us_cache:.2f} µs por lectura ({us_sqlite / us_cache:.0f}x más rápida)")
+
+            # 3. Escritura por el ORM: el bus invalida y la siguiente lectura ya ve el valor
+            version = servicio.version
+            config = session.query(ConfiguracionChatbot).filter_by(clave='sesion_timeout').one()
+            config.valor = '30'
+            session.add(ConfiguracionChatbot(clave='fondo_valor', valor='#112233', tipo='string'))
+            session.commit()
+            session.close()
+            leidos = (servicio.obtener('chatbot', 'sesion_timeout'), servicio.obtener('chatbot', 'fondo_valor'))
+            self.log_resultado("servicio_configuracion", "invalidacion_al_escribir",
+                               leidos == (30, '#112233') and servicio.version == version + 1,
+                               f"tras el commit: {leidos}, versión {version} -> {servicio.version}")
+
+            # 4. Cambios externos: data_version de la base y mtime del JSON, tras el intervalo
+            servicio.intervalo_s = 0.05
+            servicio.valores('sistema')
+            servicio.valores('menu')
+            with sqlite3.connect(menu_db) as conn:
+                conn.execute("UPDATE configuracion_sistema SET valor = 'propio' WHERE clave = 'menu_activo'")
+            with open(config_menu, 'w', encoding='utf-8') as archivo:
+                json.dump({'menu_activo': 'proyecto', 'fecha_cambio': 'a mano'}, archivo)
+            antes = (servicio.obtener('sistema', 'menu_activo'), servicio.obtener('menu', 'menu_activo'))
+            time.sleep(0.1)
+            despues = (servicio.obtener('sistema', 'menu_activo'), servicio.obtener('menu', 'menu_activo'))
+            self.log_resultado("servicio_configuracion", "cambios_externos",
+                               antes == ('externo', 'treinta') and despues == ('propio', 'proyecto'),
+                               f"dentro del intervalo {antes}, después {despues}")
+
+            # 5. Otra escritura en la misma base sin tocar la configuración: recarga sin nueva versión
+            version = servicio.version
+            recargas = servicio.info()['fuentes']['sistema']['recargas']
+            with sqlite3.connect(menu_db) as conn:
+                conn.execute("INSERT INTO otra_tabla DEFAULT VALUES")
+            time.sleep(0.1)
+            servicio.valores('sistema')
+            info = servicio.info()['fuentes']['sistema']
+            self.log_resultado("servicio_configuracion", "version_estable",
+                               info['recargas'] == recargas + 1 and servicio.version == version,
+                               f"recargas {recargas} -> {info['recargas']}, versión {version} sin cambios")
+
+            # 6. Escritura atómica: un lector concurrente nunca ve el JSON a medias
+            errores = []
+            terminado = threading.Event()
+
+            def leer_archivo():
+                while not terminado.is_set():
+                    try:
+                        with open(config_menu, 'r', encoding='utf-8') as archivo:
+                            json.load(archivo)
+                    except ValueError as e:
+                        errores.append(str(e))
+
+            lector = threading.Thread(target=leer_archivo)
+            lector.start()
+            for indice in range(200):
+                servicio.escribir_menu({'menu_activo': 'treinta' if indice % 2 else 'proyecto',
+                                        'descripcion': 'x' * (indice * 37 % 4000)})
+            terminado.set()
+            lector.join()
+            temporales = [nombre for nombre in os.listdir(directorio) if nombre.endswith('.tmp')]
+            self.log_resultado("servicio_configuracion", "escritura_atomica",
+                               not errores and not temporales and servicio.obtener('menu', 'menu_activo') == 'treinta',
+                               f"200 escrituras con un lector concurrente: {len(errores)} lecturas rotas, "
+                               f"{len(temporales)} temporales")
+
+        except Exception as e:
+            self.log_resultado("servicio_configuracion", "ejecucion", False, f"Error: {str(e)}")
+        finally:
+            if servicio is not None:
+                for tema in ('configuracion', 'fondos'):
+                    if servicio.al_cambiar in bus_eventos._suscriptores[tema]:
+                        bus_eventos._suscriptores[tema].remove(servicio.al_cambiar)
+                for conexion in servicio._conexiones.values():
+                    conexion.close()
+            for ruta in (os.path.join(directorio, 'menu.db'), os.path.join(directorio, 'chatbot.db')):
+                get_engine(ruta).dispose()
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
 def main():
     """Función principal con manejo de argumentos"""
     parser = argparse.ArgumentParser(description="Verificador Sistema Completo - Eterials")
-    parser.add_argument('--modulo', type=str, help='Verificar módulo específico (base_datos, conectividad, apis, imagenes, importaciones, cocina, dashboard_chatbot, temas, wcag_colores, metricas_contraste, configurar_color)')
+    parser.add_argument('--modulo', type=str, help='Verificar módulo específico (base_datos, migraciones, conectividad, apis, imagenes, importaciones, cocina, dashboard_chatbot, temas, wcag_colores, metricas_contraste, configurar_color, benchmark_serializacion, busqueda_aproximada, autocompletado, consultas_estadisticas, estadisticas_incrementales, rollups_analytics, sumidero_analytics, analytics_lote, latidos_sesion, expiracion_sesiones, notificaciones_stream, bus_eventos, despachador_notificaciones, idempotencia, sesion_activa_unica, servicio_configuracion)')
     parser.add_argument('--version', action='version', version='Verificador Sistema v1.0.0')
     
     args = parser.parse_args()